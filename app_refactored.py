@@ -12,8 +12,10 @@ from core.constants import UIConstants, MessageConstants
 from core.utils import show_message
 
 # Services
-from services.document_management_service import DocumentManagementService
+from services.document_management_service import get_document_manager
 from services.ai_analysis_orchestrator_refactored import AIAnalysisOrchestrator
+from services.ingestion_worker import start_ingestion_worker
+from services.warmup import start_background_warmup
 
 # UI Components
 from ui.styles import load_app_styles
@@ -46,7 +48,13 @@ class MainApplication:
         
         # 문서 관리 서비스 초기화
         if 'doc_manager' not in st.session_state:
-            st.session_state.doc_manager = DocumentManagementService()
+            st.session_state.doc_manager = get_document_manager()
+        
+        # 문서 인덱싱 워커 시작 (프로세스당 한 번)
+        start_ingestion_worker()
+        
+        # 연결 풀/인덱스 스키마/모델/목록 캐시 준비 (프로세스당 한 번, 백그라운드)
+        start_background_warmup(st.session_state.doc_manager)
     
     def run(self):
         """애플리케이션 실행"""
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Azure Storage 전송 성능 벤치마크
+파일 크기와 병렬 전송 수(max_concurrency) 조합별 업로드/다운로드 속도(MB/s) 측정
+
+Azurite 로컬 에뮬레이터로 실행:
+    azurite-blob --location /tmp/azurite &
+    python benchmark_storage.py --azurite
+실제 계정으로 실행 (.env의 Azure Storage 설정 사용, 별도 컨테이너에 기록 후 삭제):
+    python benchmark_storage.py --sizes 8 64 256 --concurrency 1 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import AZURITE_CONNECTION_STRING
+from utils.azure_storage_service import AzureStorageService
+
+MB = 1024 * 1024
+
+class RandomStream:
+    """지정한 크기만큼 난수 바이트를 내보내는 스트림 (전체를 메모리에 만들지 않음)"""
+
+    def __init__(self, size: int, block: bytes):
+        self.remaining = size
+        self.block = block
+
+    def read(self, n: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        n = self.remaining if n is None or n < 0 else min(n, self.remaining)
+        self.remaining -= n
+        # 같은 블록을 반복하되 블록마다 앞부분을 바꿔 압축/중복 제거 효과를 배제
+        repeats = n // len(self.block) + 1
+        chunk = (self.block * repeats)[:n]
+        return os.urandom(min(16, n)) + chunk[16:]
+
+def measure(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def run_benchmark(service: AzureStorageService, sizes_mb, concurrency_levels):
+    """크기 × 병렬 수 조합별 측정 결과 출력"""
+    block = os.urandom(MB)
+    print(f"{'크기':>8} {'병렬':>4} {'업로드(스트림)':>14} {'업로드(bytes)':>14} {'다운로드(파일)':>14} {'다운로드(메모리)':>16}")
+
+    for size_mb in sizes_mb:
+        size = int(size_mb * MB)
+        payload = RandomStream(size, block).read()
+        for concurrency in concurrency_levels:
+            blob_name = f"benchmark/{size_mb}mb-c{concurrency}.bin"
+            results = {}
+
+            def upload_stream():
+                result = service.upload_document(RandomStream(size, block), os.path.basename(blob_name),
+                                                 document_type="benchmark", blob_name=blob_name,
+                                                 max_concurrency=concurrency)
+                if not result["success"]:
+                    raise RuntimeError(result.get("error"))
+
+            def upload_bytes():
+                result = service.upload_document(payload, os.path.basename(blob_name),
+                                                 document_type="benchmark", blob_name=blob_name,
+                                                 max_concurrency=concurrency)
+                if not result["success"]:
+                    raise RuntimeError(result.get("error"))
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                path = os.path.join(temp_dir, "download.bin")
+                results["upload_stream"] = measure(upload_stream)
+                results["upload_bytes"] = measure(upload_bytes)
+                results["download_file"] = measure(
+                    lambda: service.download_document_to_file(blob_name, path, max_concurrency=concurrency)
+                )
+                results["download_memory"] = measure(
+                    lambda: service.download_document(blob_name, max_concurrency=concurrency)
+                )
+
+            service.delete_document(blob_name)
+            rates = {key: size_mb / elapsed if elapsed else 0.0 for key, elapsed in results.items()}
+            print(f"{size_mb:>6}MB {concurrency:>4} {rates['upload_stream']:>11.1f}MB/s {rates['upload_bytes']:>11.1f}MB/s "
+                  f"{rates['download_file']:>11.1f}MB/s {rates['download_memory']:>13.1f}MB/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Azure Storage 업로드/다운로드 속도 측정")
+    parser.add_argument("--azurite", action="store_true", help="Azurite 로컬 에뮬레이터 사용")
+    parser.add_argument("--connection-string", default=None, help="연결 문자열 직접 지정")
+    parser.add_argument("--container", default="transfer-benchmark", help="측정용 컨테이너 (없으면 생성)")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 8, 32, 128], help="파일 크기 (MB)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="병렬 전송 수")
+    parser.add_argument("--block-size", type=int, default=None, help="블록 크기 (MB)")
+    args = parser.parse_args()
+
+    transfer_options = {}
+    if args.block_size:
+        transfer_options["block_size"] = args.block_size * MB
+        transfer_options["download_chunk_size"] = args.block_size * MB
+
+    connection_string = args.connection_string or (AZURITE_CONNECTION_STRING if args.azurite else None)
+    service = AzureStorageService(connection_string=connection_string, container_name=args.container,
+                                  transfer_options=transfer_options)
+    if not service.available:
+        print("❌ Azure Storage에 연결할 수 없습니다.")
+        return 1
+
+    print(f"🔧 전송 설정: {service.transfer}")
+    run_benchmark(service, args.sizes, args.concurrency)
+    print("✅ 벤치마크 완료")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
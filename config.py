@@ -2,7 +2,9 @@
 설정 파일 - 애플리케이션 전체 설정 관리
 """
 import os
+import json
 from dotenv import load_dotenv
+from core.constants import ConfigConstants
 
 # Azure App Service 환경 감지
 IS_AZURE_APP_SERVICE = os.getenv('WEBSITE_SITE_NAME') is not None
@@ -22,14 +24,177 @@ AI_CONFIG = {
     "embedding_deployment_name": os.getenv("OPENAI_EMBEDDING_DEPLOYMENT_NAME", "text-embedding-3-large"),
     "api_version": os.getenv("OPENAI_API_VERSION", "2024-12-01-preview"),
     "max_tokens": 1000,
-    "temperature": 0.7
+    "temperature": 0.7,
+    "context_window_tokens": int(os.getenv("OPENAI_CONTEXT_WINDOW_TOKENS", "128000")),  # 모델 컨텍스트 한도
+    "context_budget_tokens": int(os.getenv("OPENAI_CONTEXT_BUDGET_TOKENS", "12000")),   # 최종 분석 입력 토큰 예산
+    "analysis_max_tokens": 1500,  # 최종 분석 출력 토큰
+    "map_reduce_threshold_tokens": int(os.getenv("OPENAI_MAP_REDUCE_THRESHOLD_TOKENS", "8000")),  # 초과 시 맵리듀스 분석
+    "map_reduce_section_tokens": 3000,   # 맵 단계 섹션 크기
+    "map_reduce_max_parallel": int(os.getenv("OPENAI_MAP_REDUCE_MAX_PARALLEL", "4")),  # 섹션 동시 분석 수
+    "map_section_max_tokens": 500,       # 섹션별 부분 분석 출력 토큰
+    "perspective_max_parallel": int(os.getenv("OPENAI_PERSPECTIVE_MAX_PARALLEL", "3"))  # 다중 관점 분석 동시 생성 수
+}
+
+# 빠른 분석 모드 설정 (간단한 수정 요청용 - 단일 LLM 호출, 외부 검색 생략, 전체 제한 시간)
+QUICK_ANALYSIS_CONFIG = {
+    "deployment_name": os.getenv("OPENAI_QUICK_DEPLOYMENT_NAME", "gpt-4o-mini"),  # 작고 빠른 배포
+    "deadline_seconds": float(os.getenv("QUICK_ANALYSIS_DEADLINE_SECONDS", "3")),  # 요청부터 결과까지 최대 시간
+    "search_budget_seconds": 0.6,    # 사내 검색 최대 대기 (넘으면 참고 자료 없이 진행)
+    "search_cache_ttl_seconds": 600, # 빠른 분석용 사내 검색 결과 캐시 유지 시간
+    "internal_top": 3,               # 참고할 사내 문서 수
+    "document_max_chars": 4000,      # 프롬프트에 넣을 분석 대상 최대 길이
+    "max_tokens": 400                # 출력 토큰 (짧을수록 빠름)
+}
+
+# 분석 요청 전체 마감 시간과 단계별 시간 예산
+# 남은 시간이 부족하면 고도화 생략 → 외부 검색 생략 → 컨텍스트/출력 축소 순으로 줄이고 결과에 기록
+ANALYSIS_DEADLINE_CONFIG = {
+    "total_seconds": float(os.getenv("ANALYSIS_DEADLINE_SECONDS", str(ConfigConstants.ANALYSIS_TIMEOUT))),  # 0이면 제한 없음
+    "final_reserve_seconds": 12.0,     # 최종 분석용으로 앞 단계가 남겨 둬야 하는 시간
+    "plan_seconds": 6.0,               # 1단계(고도화+쿼리 생성) 호출 최대 시간
+    "plan_min_seconds": 2.0,           # 1단계에 줄 수 있는 시간이 이보다 적으면 고도화 생략
+    "search_seconds": 6.0,             # 3단계 검색 최대 대기 시간 (넘으면 끝난 결과만 사용)
+    "external_min_seconds": 2.0,       # 검색에 줄 수 있는 시간이 이보다 적으면 외부 검색 생략
+    "map_reduce_min_seconds": 20.0,    # 남은 시간이 이보다 적으면 섹션 분석 없이 한 번에 분석
+    "reduce_reserve_ratio": 0.4,       # 섹션 분석(맵) 시작 시 남은 시간 중 종합(리듀스)용으로 남겨 둘 비율
+    "full_context_min_seconds": 15.0,  # 남은 시간이 이보다 적으면 컨텍스트와 출력 토큰 축소
+    "reduced_context_ratio": 0.5       # 축소 시 컨텍스트 예산/출력 토큰 비율
+}
+
+# 분석 단계별 모델 라우팅
+# 단계마다 배포 후보를 쉼표로 나열 (앞쪽 우선, 실패하거나 느리면 다음 배포로 대체)
+MODEL_ROUTING_CONFIG = {
+    "stages": {
+        # 1~2단계: 단순 재작성 작업이라 작은 배포로 충분
+        "refine": {
+            "deployments": os.getenv("OPENAI_REFINE_DEPLOYMENTS", f"gpt-4o-mini,{AI_CONFIG['deployment_name']}").split(","),
+            "max_latency_seconds": 5.0
+        },
+        "queries": {
+            "deployments": os.getenv("OPENAI_QUERY_DEPLOYMENTS", f"gpt-4o-mini,{AI_CONFIG['deployment_name']}").split(","),
+            "max_latency_seconds": 5.0
+        },
+        # 1+2단계 통합 호출 (고도화 프롬프트 + 검색 쿼리 + 검색 힌트를 한 번에 구조화 출력)
+        "plan": {
+            "deployments": os.getenv("OPENAI_PLAN_DEPLOYMENTS", f"gpt-4o-mini,{AI_CONFIG['deployment_name']}").split(","),
+            "max_latency_seconds": 6.0
+        },
+        # 4단계: 맵(섹션 분석)과 최종 분석은 큰 배포, 장애 시에만 작은 배포로 대체
+        "map": {
+            "deployments": os.getenv("OPENAI_MAP_DEPLOYMENTS", f"{AI_CONFIG['deployment_name']},gpt-4o-mini").split(","),
+            "max_latency_seconds": None
+        },
+        "analysis": {
+            "deployments": os.getenv("OPENAI_ANALYSIS_DEPLOYMENTS", f"{AI_CONFIG['deployment_name']},gpt-4o-mini").split(","),
+            "max_latency_seconds": None
+        },
+        "quick": {
+            "deployments": [QUICK_ANALYSIS_CONFIG["deployment_name"]],
+            "max_latency_seconds": None
+        }
+    },
+    "default_stage": "analysis",
+    "prefer_cheaper": os.getenv("OPENAI_ROUTING_PREFER_CHEAPER", "false").lower() == "true",  # 후보 순서 대신 비용 순
+    # 배포별 1K 토큰당 비용 (USD, 지표 표시용) - 예: {"gpt-4o": {"input": 0.0025, "output": 0.01}}
+    "deployment_costs": json.loads(os.getenv("OPENAI_DEPLOYMENT_COSTS", json.dumps({
+        "gpt-4o": {"input": 0.0025, "output": 0.01},
+        "gpt-4o-mini": {"input": 0.00015, "output": 0.0006}
+    }))),
+    "failure_cooldown_seconds": 60,       # 호출 실패한 배포를 후순위로 미루는 시간
+    "missing_cooldown_seconds": 600,      # 존재하지 않는 배포(404)를 후순위로 미루는 시간
+    "latency_ewma_alpha": 0.3,            # 배포별 지연 시간 이동 평균 가중치
+    "metrics_window": 200                 # 단계별로 보관할 최근 지연 시간 표본 수
+}
+
+# Azure OpenAI 속도 제한/재시도 설정 (프로세스 내 모든 세션이 공유)
+OPENAI_RATE_LIMIT_CONFIG = {
+    "requests_per_minute": int(os.getenv("OPENAI_RPM_LIMIT", "60")),      # 배포별 기본 RPM
+    "tokens_per_minute": int(os.getenv("OPENAI_TPM_LIMIT", "60000")),     # 배포별 기본 TPM
+    # 배포별 개별 한도 (예: {"gpt-4o": {"rpm": 60, "tpm": 80000}})
+    "deployment_limits": json.loads(os.getenv("OPENAI_DEPLOYMENT_LIMITS", "{}")),
+    "background_reserve_ratio": 0.2,       # 백그라운드 작업이 남겨둘 대화형 예비 용량 비율
+    "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", "5")),
+    "backoff_base_seconds": 1.0,
+    "backoff_max_seconds": 30.0,
+    "request_timeout_seconds": 60,
+    "embedding_hedge_after_seconds": float(os.getenv("OPENAI_EMBEDDING_HEDGE_AFTER", "1.5")),  # 0이면 헤징 끔
+    "chat_hedge_after_seconds": float(os.getenv("OPENAI_CHAT_HEDGE_AFTER", "0")),
+    "hedge_max_tokens": 500,               # 이 출력 토큰 이하의 짧은 호출만 헤징
+    "embedding_cache_ttl_seconds": 1800,   # 대화형 임베딩(검색 쿼리/요청) 결과 캐시 유지 시간
+    "embedding_cache_max_entries": 256,
+    "hedge_max_workers": 8
 }
 
 # Tavily 검색 API 설정
 TAVILY_CONFIG = {
     "api_key": os.getenv("TAVILY_API_KEY"),
     "search_depth": "advanced",
-    "max_results": 10
+    "max_results": 10,
+    "endpoint": "https://api.tavily.com/search"
+}
+
+# 외부 웹 검색 클라이언트 설정
+EXTERNAL_SEARCH_CONFIG = {
+    # 검색 제공자 (tavily / local) - 키가 없으면 로컬 대체 제공자 사용
+    "provider": os.getenv("EXTERNAL_SEARCH_PROVIDER", "tavily" if TAVILY_CONFIG["api_key"] else "local"),
+    "connect_timeout": 3.05,
+    "read_timeout": float(os.getenv("EXTERNAL_SEARCH_READ_TIMEOUT", "15")),
+    "max_retries": 2,
+    "backoff_factor": 0.5,
+    "pool_connections": 4,
+    "pool_maxsize": 16,
+    "cache_ttl_seconds": int(os.getenv("EXTERNAL_SEARCH_CACHE_TTL", "900")),  # 15분
+    "cache_max_entries": 512
+}
+
+# 외부 의존 서비스 서킷 브레이커 (프로세스 내 모든 세션이 상태 공유)
+# 연속 실패가 failure_threshold번이면 차단 → recovery_seconds 후 half_open_max_calls개 시험 요청 → 성공 시 복구
+CIRCUIT_BREAKER_CONFIG = {
+    "enabled": os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true",
+    "failure_threshold": int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")),
+    "recovery_seconds": float(os.getenv("CIRCUIT_BREAKER_RECOVERY_SECONDS", "30")),
+    "half_open_max_calls": 1,
+    # 서비스별 덮어쓰기 (SDK 재시도 안에서 시도마다 기록되는 서비스는 임계값을 높게)
+    "services": {
+        "azure_search": {},
+        "azure_storage": {"failure_threshold": 8},
+        "openai": {"failure_threshold": 3},
+        "tavily": {"recovery_seconds": 60.0}
+    }
+}
+
+# 의미 기반 분석 결과 캐시 (표현만 다른 같은 요청은 이전 분석 결과 재사용)
+SEMANTIC_CACHE_CONFIG = {
+    "enabled": os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true",
+    "similarity_threshold": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),  # 요청 임베딩 코사인 유사도 하한
+    "ttl_hours": int(os.getenv("SEMANTIC_CACHE_TTL_HOURS", "24")),
+    "max_memory_entries": 2000,           # 메모리 인덱스 최대 항목 수 (넘으면 오래 안 쓴 묶음부터 제거)
+    "persist": os.getenv("SEMANTIC_CACHE_PERSIST", "true").lower() == "true",  # 로컬 SQLite에도 저장 (재시작 후 재사용)
+    "max_persisted_entries": 20000,
+    "max_embed_chars": 4000,              # 임베딩할 요청 최대 길이
+    "max_request_chars": 1000,            # 이보다 긴 요청은 분석 대상 본문으로 보고 정확히 같을 때만 재사용
+    "generation_check_seconds": 30        # 사내 문서 코퍼스 세대(인덱스 문서 수) 재확인 주기
+}
+
+# 사내 문서 검색(Retrieval) 설정
+RETRIEVAL_CONFIG = {
+    "num_internal_queries": int(os.getenv("RETRIEVAL_NUM_INTERNAL_QUERIES", "3")),  # 다중 서브 쿼리 수
+    "per_query_top": 10,        # 서브 쿼리당 검색 결과 수
+    "fused_top": 10,            # RRF 융합 후 최종 결과 수
+    "rrf_k": 60,                # Reciprocal Rank Fusion 상수
+    "max_parallel_searches": 4,  # 동시 검색 요청 수
+    "near_duplicate_max_distance": int(os.getenv("RETRIEVAL_NEAR_DUP_DISTANCE", "3")),  # SimHash 해밍 거리 이하면 같은 문서로 묶음
+    "cache_ttl_seconds": 600,    # 쿼리별 사내 검색 결과 캐시 (코퍼스 세대가 바뀌면 무효)
+    "cache_max_entries": 256,
+    "anchor_query_chars": 500    # 분석 대상 내용으로 만드는 고정 서브 쿼리 길이 (선행 검색과 3단계가 같은 쿼리 사용)
+}
+
+# 편집 중 사내 문서 선행 검색 (분석 버튼을 누르기 전에 검색 캐시를 데워 둠)
+RETRIEVAL_PREFETCH_CONFIG = {
+    "enabled": os.getenv("RETRIEVAL_PREFETCH_ENABLED", "false").lower() == "true",  # 편집 화면 체크박스 기본값
+    "debounce_seconds": float(os.getenv("RETRIEVAL_PREFETCH_DEBOUNCE_SECONDS", "2")),  # 내용이 이 시간 동안 그대로면 실행
+    "min_chars": 20,             # 이보다 짧은 내용은 선행 검색하지 않음
+    "max_sessions": 256          # 디바운스 상태를 유지할 최대 세션 수
 }
 
 # Azure Search 설정
@@ -46,9 +211,24 @@ AZURE_STORAGE_CONFIG = {
     "account_name": os.getenv("AZURE_STORAGE_ACCOUNT_NAME"),
     "account_key": os.getenv("AZURE_STORAGE_ACCOUNT_KEY"),
     "container_name": os.getenv("AZURE_STORAGE_CONTAINER_NAME", "documents"),
-    "blob_service_url": os.getenv("AZURE_STORAGE_BLOB_SERVICE_URL")
+    "blob_service_url": os.getenv("AZURE_STORAGE_BLOB_SERVICE_URL"),
+    # 연결 문자열을 지정하면 계정 이름/키 대신 사용 (Azurite 로컬 에뮬레이터 등)
+    "connection_string": os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
+    # 전송 설정 - 업로드는 블록 단위 스테이징, 다운로드는 청크 단위 스트리밍 (동시 처리 수 × 블록 크기만큼만 메모리 사용)
+    "block_size": int(os.getenv("AZURE_STORAGE_BLOCK_SIZE_MB", "4")) * 1024 * 1024,
+    "single_put_threshold": int(os.getenv("AZURE_STORAGE_SINGLE_PUT_MB", "8")) * 1024 * 1024,  # 이하 크기는 한 번의 요청으로 업로드
+    "single_get_size": int(os.getenv("AZURE_STORAGE_SINGLE_GET_MB", "8")) * 1024 * 1024,  # 다운로드 첫 요청 크기
+    "download_chunk_size": int(os.getenv("AZURE_STORAGE_DOWNLOAD_CHUNK_MB", "4")) * 1024 * 1024,
+    "max_concurrency": int(os.getenv("AZURE_STORAGE_MAX_CONCURRENCY", "4"))
 }
 
+# Azurite 로컬 에뮬레이터 기본 연결 문자열 (공개된 개발용 키)
+AZURITE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+)
+
 # LangSmith 추적 설정
 LANGSMITH_CONFIG = {
     "api_key": os.getenv("LANGSMITH_API_KEY"),
@@ -62,9 +242,106 @@ APP_CONFIG = {
     "page_title": "AI 문서 작성 어시스턴트",
     "page_icon": "📝",
     "layout": "wide",
-    "max_upload_size": 10 * 1024 * 1024,  # 10MB
+    # 업로드 최대 크기 (Streamlit server.maxUploadSize 기본값 200MB를 넘기려면 그 설정도 함께 올려야 함)
+    "max_upload_size": int(os.getenv("MAX_UPLOAD_SIZE_MB", "10")) * 1024 * 1024,
     "supported_formats": [".docx", ".pptx", ".pdf", ".txt", ".md"],
     "cache_duration": 300,  # 5분
+    # 작업 상태/큐 등 로컬 영속 데이터 위치 (App Service는 /home 아래가 재시작 후에도 유지됨)
+    "data_dir": os.getenv("APP_DATA_DIR", "/home/appdata" if IS_AZURE_APP_SERVICE else ".appdata"),
+    # SQLite 저널 모드 - App Service의 /home은 모든 인스턴스가 함께 마운트하는 네트워크(SMB) 공유라 WAL을 쓸 수 없음
+    # (APP_DATA_DIR를 인스턴스 로컬 디스크로 바꾼 경우에만 WAL 사용)
+    "sqlite_journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "DELETE" if IS_AZURE_APP_SERVICE else "WAL"),
     "editor_heights": [300, 400, 500, 600, 700, 800],
     "font_sizes": [12, 14, 16, 18, 20]
-}
\ No newline at end of file
+}
+
+# 백그라운드 분석 작업 설정
+JOB_CONFIG = {
+    "max_workers": int(os.getenv("ANALYSIS_MAX_WORKERS", "4")),  # 동시 실행 분석 작업 수
+    "poll_interval_seconds": 1.0,  # UI 상태 갱신 주기
+    "retention_hours": 24,         # 완료된 작업 보관 기간
+    # 작업 큐 분석 마감 시간 (화면에서 기다리지 않으므로 대화형보다 길게 - 긴 문서 맵리듀스 포함, 0이면 제한 없음)
+    "deadline_seconds": float(os.getenv("ANALYSIS_JOB_DEADLINE_SECONDS", "180"))
+}
+
+# 분석 입장 제어 - 인스턴스당 동시 실행 분석 수 제한, 세션별 대기열을 번갈아 꺼내는 공정 대기열
+# 대화형 분석이 밀리면 백그라운드 작업(선행 검색, 인덱싱)을 잠시 미룸
+ADMISSION_CONFIG = {
+    "max_concurrent": JOB_CONFIG["max_workers"],  # 동시 실행 분석 수 (빠른 분석/화면 실행 분석 포함)
+    "max_queued_per_session": 3,   # 세션별 최대 대기 분석 수 (넘으면 접수 거절)
+    "max_queue_length": int(os.getenv("ANALYSIS_MAX_QUEUE_LENGTH", "50")),  # 인스턴스 전체 최대 대기 분석 수
+    "inline_wait_seconds": 120.0,  # 화면에서 바로 실행하는 분석의 최대 입장 대기 시간
+    "quick_wait_seconds": 2.0,     # 빠른 분석의 최대 입장 대기 시간 (넘으면 실행하지 않음)
+    "shed_running_ratio": 1.0,     # 실행 중 분석 수가 한도의 이 비율 이상이면 백그라운드 작업 보류
+    "shed_wait_seconds": float(os.getenv("ADMISSION_SHED_WAIT_SECONDS", "2")),  # 최근 입장 대기 p95가 이보다 길면 보류
+    "wait_window_seconds": 120.0   # 입장 대기 시간 p95를 계산할 최근 구간
+}
+
+# 문서 목록/통계 캐시 (화면마다 Storage/Search를 다시 조회하지 않도록 모든 세션이 공유, 문서를 바꾸면 비움)
+DOCUMENT_LIST_CACHE_CONFIG = {
+    "ttl_seconds": int(os.getenv("DOCUMENT_LIST_CACHE_TTL", "60"))
+}
+
+# 프로세스 시작 준비(warm-up) - 연결 수립, 인덱스 스키마 확인, 모델 ping, 목록/통계 캐시 적재 후 준비 상태 기록
+WARMUP_CONFIG = {
+    "enabled": os.getenv("WARMUP_ENABLED", "true").lower() == "true",
+    "timeout_seconds": float(os.getenv("WARMUP_TIMEOUT_SECONDS", "90")),  # 넘으면 끝나지 않은 단계는 두고 준비 완료 보고
+    "ping_models": os.getenv("WARMUP_PING_MODELS", "true").lower() == "true"  # 임베딩/채팅 1토큰 호출 (소액 비용 발생)
+}
+
+# 문서 인덱싱(ingestion) 큐 설정
+INGESTION_CONFIG = {
+    "run_in_process": os.getenv("INGESTION_IN_PROCESS_WORKER", "true").lower() == "true",  # 앱 프로세스 내 워커 실행
+    "worker_threads": int(os.getenv("INGESTION_WORKER_THREADS", "2")),  # 동시 처리 파일 수
+    "poll_interval_seconds": 2.0,
+    "max_attempts": 5,
+    "retry_base_seconds": 10,     # 재시도 대기 (지수 증가)
+    "lease_seconds": 600,         # 처리 중 항목 점유 시간 (워커 비정상 종료 시 재처리)
+    "retention_hours": 72,
+    "dedupe_uploads": os.getenv("INGESTION_DEDUPE_UPLOADS", "true").lower() == "true",  # 같은 내용 파일은 기존 문서에 연결
+    "duplicate_wait_seconds": 15  # 같은 내용의 앞선 항목이 처리 중이면 기다렸다가 연결
+}
+
+# 문서 일괄 작업 설정
+BULK_OPERATION_CONFIG = {
+    "max_parallel": int(os.getenv("BULK_MAX_PARALLEL", "8")),  # 동시 처리 수 (메타데이터 변경/복사/추출)
+    "blob_batch_size": 256,          # Blob Batch 요청당 최대 하위 요청 수 (서비스 제한)
+    "index_delete_batch_size": 1000, # 인덱스 삭제 배치 크기 (서비스 제한)
+    "index_upload_batch_size": 20    # 인덱스 업로드 배치 크기 (임베딩 포함 문서라 요청 크기 16MB 제한을 고려)
+}
+
+# 백업/복원 설정
+BACKUP_CONFIG = {
+    "local_dir": os.getenv("BACKUP_LOCAL_DIR"),  # 아카이브 작성 위치 (없으면 앱 데이터 디렉터리 아래 backups)
+    "max_parallel": int(os.getenv("BACKUP_MAX_PARALLEL", "8")),  # 동시 다운로드/업로드 수
+    "index_part_size": 200,          # 아카이브의 인덱스 레코드 파일당 문서 수 (임베딩 포함)
+    "upload_to_container": os.getenv("BACKUP_UPLOAD_TO_CONTAINER", "true").lower() == "true",  # 완성된 아카이브를 컨테이너에 업로드
+    "blob_prefix": "backups/",       # 컨테이너 내 아카이브 위치 (백업 대상에서 제외)
+    "keep_local_archive": False,     # 컨테이너 업로드 후 로컬 아카이브 유지 여부
+    "temp_retention_hours": 24       # 임시 파일 정리 기준
+}
+
+# 검색 인덱싱 파이프라인 설정
+INDEXING_CONFIG = {
+    # 텍스트 추출/청크 로직을 바꾸면 올려서 증분 재인덱싱 대상이 되도록 함
+    "pipeline_version": os.getenv("INDEX_PIPELINE_VERSION", "1"),
+    "reindex_max_parallel": int(os.getenv("REINDEX_MAX_PARALLEL", "4"))
+}
+
+# 텍스트 추출 설정 (PDF/Word는 별도 프로세스에서 파싱하여 앱 스레드와 격리)
+EXTRACTION_CONFIG = {
+    "process_workers": int(os.getenv("EXTRACTION_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1)))),  # 0이면 앱 프로세스 안에서 추출
+    "timeout_seconds": float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "60")),  # 파일당 최대 추출 시간 (넘으면 부분 결과)
+    "memory_limit_mb": int(os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1024")),  # 워커 프로세스당 메모리 상한 (Linux)
+    "page_fanout_threshold": 32,     # 이보다 페이지가 많은 PDF는 페이지 범위로 나눠 병렬 추출
+    "pages_per_task": 16             # 병렬 추출 시 작업당 페이지 수
+}
+
+# 텍스트 추출 결과 캐시 설정 (내용 해시 기준, 재인덱싱/미리보기에서 재사용)
+EXTRACTION_CACHE_CONFIG = {
+    "enabled": os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true",
+    "max_local_cache_mb": int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512")),  # 로컬 캐시 최대 크기 (넘으면 오래 안 쓴 항목부터 삭제)
+    "memory_items": 64,              # 프로세스 내 메모리 캐시 항목 수
+    # 여러 인스턴스가 공유할 사이드카 Blob 컨테이너 (문서 컨테이너와 분리, 비우면 로컬 캐시만 사용)
+    "sidecar_container": os.getenv("EXTRACTION_SIDECAR_CONTAINER", "")
+}
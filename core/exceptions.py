@@ -37,6 +37,15 @@ class AIAnalysisException(BaseAppException):
             message += f": {details}"
         super().__init__(message, "AI_ANALYSIS_ERROR")
 
+class AnalysisCancelledException(BaseAppException):
+    """AI 분석 취소 예외"""
+    
+    def __init__(self, stage: str = None):
+        message = "AI 분석이 취소되었습니다"
+        if stage:
+            message += f" ({stage} 단계)"
+        super().__init__(message, "AI_ANALYSIS_CANCELLED")
+
 class ValidationException(BaseAppException):
     """데이터 검증 예외"""
     
@@ -55,6 +64,15 @@ class ConfigurationException(BaseAppException):
             message += f" - {details}"
         super().__init__(message, "CONFIGURATION_ERROR")
 
+class AdmissionRejectedException(BaseAppException):
+    """분석 대기열 초과 예외"""
+
+    def __init__(self, details: str = None):
+        message = "분석 요청이 많아 지금은 접수할 수 없습니다"
+        if details:
+            message += f": {details}"
+        super().__init__(message, "ADMISSION_REJECTED")
+
 def handle_exception(e: Exception, context: str = "작업") -> str:
     """통일된 예외 처리 함수"""
     if isinstance(e, BaseAppException):
@@ -59,7 +59,8 @@ class SessionStateManager:
             'ai_analysis_result': '',
             'search_results': [],
             'last_analysis_hash': '',
-            'analysis_mode': 'full'
+            'analysis_mode': 'full',
+            'analysis_job_id': None
         }
         
         for key, default_value in ai_defaults.items():
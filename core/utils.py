@@ -3,6 +3,9 @@
 """
 import time
 import hashlib
+import threading
+import uuid
+from collections import OrderedDict
 import re
 import json
 from datetime import datetime
@@ -23,6 +26,12 @@ def show_message(message_type: str, message: str, key: Optional[str] = None):
     else:
         st.write(message)
 
+def get_session_id() -> str:
+    """현재 브라우저 세션 식별자 (세션 상태에 한 번 생성하여 유지)"""
+    if 'client_session_id' not in st.session_state:
+        st.session_state.client_session_id = uuid.uuid4().hex
+    return st.session_state.client_session_id
+
 def validate_content(content: str, min_length: int = 1) -> bool:
     """콘텐츠 유효성 검증"""
     return content and len(content.strip()) >= min_length
@@ -127,16 +136,63 @@ def safe_json_loads(json_str: str, default: Any = None) -> Any:
     except:
         return default
 
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], k: int = 60,
+                           key_func=None, top: Optional[int] = None) -> List[Dict[str, Any]]:
+    """여러 검색 결과 목록을 Reciprocal Rank Fusion으로 병합 (중복 제거 포함)"""
+    if key_func is None:
+        key_func = lambda doc: doc.get("id")
+
+    scores: Dict[Any, float] = {}
+    best_rank: Dict[Any, int] = {}
+    representatives: Dict[Any, Dict[str, Any]] = {}
+
+    for results in result_lists:
+        for rank, doc in enumerate(results or []):
+            key = key_func(doc)
+            if key is None:
+                continue
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+
+            # 가장 높은 순위로 등장한 문서를 대표로 사용
+            if key not in best_rank or rank < best_rank[key]:
+                best_rank[key] = rank
+                representatives[key] = doc
+
+    fused = []
+    for key in sorted(scores, key=lambda x: scores[x], reverse=True):
+        doc = dict(representatives[key])
+        doc["rrf_score"] = scores[key]
+        fused.append(doc)
+
+    return fused[:top] if top else fused
+
 def debounce_function(func, delay: float = 0.5):
-    """함수 디바운싱"""
-    last_called = [0]
+    """
+    함수 디바운싱 (trailing)
+    
+    호출될 때마다 대기를 다시 시작하고, 마지막 호출 후 delay초 동안 더 호출되지 않으면
+    마지막 인자로 한 번만 실행한다. 실행은 타이머 스레드에서 이루어지므로 반환값은 없다.
+    wrapper.cancel()로 대기 중인 실행을 취소할 수 있다.
+    """
+    lock = threading.Lock()
+    pending = [None]
     
     def wrapper(*args, **kwargs):
-        now = time.time()
-        if now - last_called[0] >= delay:
-            last_called[0] = now
-            return func(*args, **kwargs)
+        with lock:
+            if pending[0] is not None:
+                pending[0].cancel()
+            timer = threading.Timer(delay, func, args, kwargs)
+            timer.daemon = True
+            pending[0] = timer
+            timer.start()
+    
+    def cancel():
+        with lock:
+            if pending[0] is not None:
+                pending[0].cancel()
+                pending[0] = None
     
+    wrapper.cancel = cancel
     return wrapper
 
 def batch_process(items: List[Any], batch_size: int = 10, progress_callback=None):
@@ -180,4 +236,94 @@ class TimerContext:
     def elapsed(self) -> float:
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+class TTLCache:
+    """만료 시간(TTL)과 최대 크기를 가진 스레드 안전 LRU 캐시"""
+
+    def __init__(self, ttl_seconds: float = 300, max_size: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Any):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class Deadline:
+    """
+    요청 단위 마감 시각 (time.monotonic 기준)
+    
+    요청 시작 시 한 번 만들어 모든 단계에 전달하고, 각 단계는 남은 시간으로 작업 범위를 정하거나
+    at(절대 마감 시각)을 하위 호출의 deadline 인자로 넘긴다. seconds가 없거나 0이면 제한 없음.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.at = self.started + seconds if seconds else None
+
+    def remaining(self) -> float:
+        """남은 시간(초), 제한이 없으면 무한대"""
+        if self.at is None:
+            return float("inf")
+        return max(self.at - time.monotonic(), 0.0)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+    def budget(self, seconds: Optional[float] = None, reserve: float = 0.0) -> Optional[float]:
+        """
+        뒤 단계용 reserve초를 남기고 이 단계에 쓸 수 있는 시간
+        
+        Args:
+            seconds: 이 단계의 최대 시간 (None이면 남은 시간 전부)
+            reserve: 뒤 단계를 위해 남겨 둘 시간
+            
+        Returns:
+            사용할 수 있는 시간(초), 제한이 없으면 None
+        """
+        if self.at is None:
+            return None
+        available = self.remaining() - reserve
+        if seconds is not None:
+            available = min(seconds, available)
+        return max(available, 0.0)
+
+    def until(self, seconds: Optional[float] = None, reserve: float = 0.0) -> Optional[float]:
+        """budget()만큼의 시간을 하위 호출에 줄 때의 절대 마감 시각 (제한이 없으면 None)"""
+        budget = self.budget(seconds, reserve)
+        return None if budget is None else time.monotonic() + budget
@@ -0,0 +1,33 @@
+"""
+🚀 배포용 서버 진입점 (startup.sh)
+시작 준비(warm-up)를 마친 뒤 같은 프로세스에서 Streamlit 서버를 띄운다.
+
+준비한 연결 풀/캐시가 앱에서 그대로 쓰이고, 포트와 /_stcore/health는 이 인스턴스의 준비가 끝난 뒤에야 응답하므로
+App Service는 준비된 인스턴스에만 트래픽을 보낸다.
+"""
+import sys
+import os
+
+# 프로젝트 루트 경로를 Python path에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.warmup import run_startup_warmup
+
+def main(port: str):
+    try:
+        run_startup_warmup()
+    except Exception as e:
+        print(f"⚠️ 시작 준비 실패 - 준비 없이 서버를 시작합니다: {e}")
+
+    from streamlit.web import cli as stcli
+
+    sys.argv = [
+        "streamlit", "run", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_refactored.py"),
+        "--server.port", port,
+        "--server.address", "0.0.0.0",
+        "--server.headless", "true"
+    ]
+    sys.exit(stcli.main())
+
+if __name__ == "__main__":
+    main(os.getenv("PORT") or os.getenv("WEBSITES_PORT") or "8000")
@@ -0,0 +1,273 @@
+"""
+분석 입장 제어 (admission control)
+인스턴스당 동시에 실행하는 분석 수를 제한하고, 대기 중인 분석은 실행 중인 분석이 가장 적은 세션부터
+(같으면 돌아가며) 꺼내 한 세션이 요청을 여러 개 쌓아도 다른 세션이 그 뒤로 밀리지 않도록 한다.
+
+작업 큐의 분석은 입장 시 워커 풀에 제출되고(on_admit), 화면에서 바로 실행하는 분석은 admit()으로
+현재 스레드에서 차례를 기다린다. 대화형 분석이 밀리는 동안에는 백그라운드 작업(선행 검색, 인덱싱)이
+should_shed_background()로 이번 차례를 미룬다.
+"""
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from config import ADMISSION_CONFIG
+from core.exceptions import AdmissionRejectedException
+
+class _Ticket:
+    """대기/실행 중인 분석 하나"""
+
+    __slots__ = ("ticket_id", "session_id", "on_admit", "event", "enqueued_at", "admitted_at")
+
+    def __init__(self, ticket_id: str, session_id: str, on_admit: Optional[Callable[[], Any]]):
+        self.ticket_id = ticket_id
+        self.session_id = session_id
+        self.on_admit = on_admit
+        self.event = threading.Event()
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+
+class AdmissionController:
+    """동시 실행 제한 + 세션별 공정 대기열"""
+
+    def __init__(self, max_concurrent: Optional[int] = None):
+        self.max_concurrent = max(int(max_concurrent or ADMISSION_CONFIG["max_concurrent"]), 1)
+        # 세션별 대기열 (실행 중인 분석 수가 같으면 키 순서대로 꺼냄)
+        self._queues: "OrderedDict[str, Deque[_Ticket]]" = OrderedDict()
+        self._waiting: Dict[str, _Ticket] = {}
+        self._running: Dict[str, _Ticket] = {}
+        self._running_per_session: Counter = Counter()
+        self._recent_waits: Deque = deque()  # (입장 시각, 대기 시간)
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+
+    def enqueue(self, session_id: str, ticket_id: Optional[str] = None,
+                on_admit: Optional[Callable[[], Any]] = None) -> str:
+        """
+        분석 접수 (자리가 있으면 바로 입장)
+
+        Args:
+            session_id: 요청한 세션 ID
+            ticket_id: 항목 ID (작업 ID 등, 없으면 생성)
+            on_admit: 입장 시 호출할 함수 (입장을 처리한 스레드에서 호출되므로 오래 걸리면 안 됨)
+
+        Returns:
+            항목 ID (대기열이 가득 차면 AdmissionRejectedException)
+        """
+        ticket = _Ticket(ticket_id or uuid.uuid4().hex, session_id or "anonymous", on_admit)
+        with self._lock:
+            session_queue = self._queues.get(ticket.session_id)
+            if len(self._waiting) >= ADMISSION_CONFIG["max_queue_length"]:
+                self.rejected += 1
+                raise AdmissionRejectedException(f"대기 중인 분석 {len(self._waiting)}개")
+            if session_queue and len(session_queue) >= ADMISSION_CONFIG["max_queued_per_session"]:
+                self.rejected += 1
+                raise AdmissionRejectedException("이 세션에서 대기 중인 분석이 너무 많습니다")
+
+            self._queues.setdefault(ticket.session_id, deque()).append(ticket)
+            self._waiting[ticket.ticket_id] = ticket
+            admitted = self._dispatch()
+        self._notify(admitted)
+        return ticket.ticket_id
+
+    def acquire(self, session_id: str, timeout: Optional[float] = None,
+                on_wait: Optional[Callable[[int], Any]] = None, poll_seconds: float = 0.5) -> Optional[str]:
+        """
+        현재 스레드에서 입장할 때까지 대기
+
+        Args:
+            session_id: 요청한 세션 ID
+            timeout: 최대 대기 시간 (초, None이면 무제한)
+            on_wait: 대기 중 주기적으로 대기열 순번을 전달받을 함수
+            poll_seconds: on_wait 호출 주기
+
+        Returns:
+            항목 ID (제한 시간 안에 입장하지 못하면 대기열에서 빼고 None)
+        """
+        ticket_id = self.enqueue(session_id)
+        with self._lock:
+            ticket = self._waiting.get(ticket_id) or self._running[ticket_id]
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+
+        try:
+            while True:
+                wait_seconds = poll_seconds if give_up_at is None else min(poll_seconds, max(give_up_at - time.monotonic(), 0))
+                if ticket.event.wait(wait_seconds):
+                    return ticket_id
+                if give_up_at is not None and time.monotonic() >= give_up_at:
+                    # 마지막 순간에 입장했으면 그대로 진행
+                    return None if self.cancel(ticket_id) else ticket_id
+                if on_wait:
+                    on_wait(self.position(ticket_id))
+        except BaseException:
+            # on_wait 예외(Streamlit 재실행 중단 등)로 빠져나가면 호출 측이 release할 수 없으므로 여기서 정리
+            if not self.cancel(ticket_id):
+                self.release(ticket_id)
+            raise
+
+    @contextmanager
+    def admit(self, session_id: str, timeout: Optional[float] = None,
+              on_wait: Optional[Callable[[int], Any]] = None) -> Iterator[Optional[str]]:
+        """
+        입장 후 블록 실행, 끝나면 자리 반환
+
+        with controller.admit(session_id, timeout=60) as ticket_id:
+            if ticket_id is None:  # 대기 시간 초과 또는 대기열 초과
+                ...
+
+        Yields:
+            항목 ID (입장하지 못했으면 None)
+        """
+        try:
+            ticket_id = self.acquire(session_id, timeout=timeout, on_wait=on_wait)
+        except AdmissionRejectedException as e:
+            print(f"⏳ 분석 입장 거절: {e.message}")
+            ticket_id = None
+        try:
+            yield ticket_id
+        finally:
+            if ticket_id:
+                self.release(ticket_id)
+
+    def release(self, ticket_id: str):
+        """실행 종료 - 자리를 반환하고 다음 분석 입장"""
+        with self._lock:
+            ticket = self._running.pop(ticket_id, None)
+            if ticket is None:
+                return
+            self._running_per_session[ticket.session_id] -= 1
+            if self._running_per_session[ticket.session_id] <= 0:
+                del self._running_per_session[ticket.session_id]
+            admitted = self._dispatch()
+        self._notify(admitted)
+
+    def cancel(self, ticket_id: str) -> bool:
+        """대기 중인 항목을 대기열에서 제거 (이미 입장했으면 False)"""
+        with self._lock:
+            ticket = self._waiting.pop(ticket_id, None)
+            if ticket is None:
+                return False
+            session_queue = self._queues.get(ticket.session_id)
+            if session_queue is not None:
+                session_queue.remove(ticket)
+                if not session_queue:
+                    del self._queues[ticket.session_id]
+            return True
+
+    def position(self, ticket_id: str) -> int:
+        """대기열 순번 (1부터, 이미 입장했거나 없으면 0)"""
+        with self._lock:
+            if ticket_id not in self._waiting:
+                return 0
+            for index, queued_id in enumerate(self._dispatch_order()):
+                if queued_id == ticket_id:
+                    return index + 1
+        return 0
+
+    def should_shed_background(self) -> bool:
+        """대화형 분석이 밀리고 있으면 True (백그라운드 작업은 이번 차례를 미룸)"""
+        with self._lock:
+            overloaded = (
+                bool(self._waiting)
+                or len(self._running) >= self.max_concurrent * ADMISSION_CONFIG["shed_running_ratio"]
+                or self._recent_wait_p95() > ADMISSION_CONFIG["shed_wait_seconds"]
+            )
+            if overloaded:
+                self.shed += 1
+            return overloaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": len(self._running),
+                "queued": len(self._waiting),
+                "waiting_sessions": len(self._queues),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "shed": self.shed,
+                "recent_wait_p95": self._recent_wait_p95()
+            }
+
+    @staticmethod
+    def _pick_session(session_ids, running: Counter) -> str:
+        """실행 중인 분석이 가장 적은 세션 (같으면 대기열 순서가 앞선 세션)"""
+        return min(session_ids, key=lambda session_id: running[session_id])
+
+    def _dispatch(self) -> List[_Ticket]:
+        """빈 자리만큼 공정 순서로 입장 (호출 측에서 잠금 보유)"""
+        admitted = []
+        now = time.monotonic()
+        while len(self._running) < self.max_concurrent and self._queues:
+            session_id = self._pick_session(self._queues, self._running_per_session)
+            session_queue = self._queues[session_id]
+            ticket = session_queue.popleft()
+            if session_queue:
+                self._queues.move_to_end(session_id)
+            else:
+                del self._queues[session_id]
+
+            del self._waiting[ticket.ticket_id]
+            ticket.admitted_at = now
+            self._running[ticket.ticket_id] = ticket
+            self._running_per_session[session_id] += 1
+            self._recent_waits.append((now, now - ticket.enqueued_at))
+            self.admitted += 1
+            admitted.append(ticket)
+        return admitted
+
+    def _notify(self, admitted: List[_Ticket]):
+        """입장한 항목 알림 (잠금 밖에서 호출, on_admit 실패 시 자리 반환)"""
+        for ticket in admitted:
+            ticket.event.set()
+            if ticket.on_admit is None:
+                continue
+            try:
+                ticket.on_admit()
+            except Exception as e:
+                print(f"❌ 분석 시작 실패 ({ticket.ticket_id}): {e}")
+                self.release(ticket.ticket_id)
+
+    def _dispatch_order(self) -> List[str]:
+        """대기 중인 항목이 입장할 예상 순서 (호출 측에서 잠금 보유)"""
+        queues = OrderedDict((session_id, list(session_queue)) for session_id, session_queue in self._queues.items())
+        running = Counter(self._running_per_session)
+        order = []
+        while queues:
+            session_id = self._pick_session(queues, running)
+            session_queue = queues[session_id]
+            order.append(session_queue.pop(0).ticket_id)
+            running[session_id] += 1
+            if session_queue:
+                queues.move_to_end(session_id)
+            else:
+                del queues[session_id]
+        return order
+
+    def _recent_wait_p95(self) -> float:
+        """최근 구간 입장 대기 시간 p95 (호출 측에서 잠금 보유)"""
+        cutoff = time.monotonic() - ADMISSION_CONFIG["wait_window_seconds"]
+        while self._recent_waits and self._recent_waits[0][0] < cutoff:
+            self._recent_waits.popleft()
+        if not self._recent_waits:
+            return 0.0
+        waits = sorted(wait for _, wait in self._recent_waits)
+        return waits[int(0.95 * (len(waits) - 1))]
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_admission_controller: Optional[AdmissionController] = None
+_admission_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    """공유 입장 제어기 반환"""
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_controller_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController()
+    return _admission_controller
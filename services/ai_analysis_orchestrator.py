@@ -16,10 +16,12 @@ from typing import List, Dict, Literal, Optional, Any
 import time
 
 from utils.azure_search_management import AzureSearchService
-import requests
-import openai
 import streamlit as st
 from config import AI_CONFIG
+from utils.openai_client import get_openai_client
+from utils.model_router import get_model_router
+from utils.external_search import get_external_search_client
+from core.exceptions import ServiceConnectionException
 
 # 환경 변수에서 설정값 로드
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
@@ -36,12 +38,10 @@ class AIAnalysisOrchestrator:
         self.result: Optional[str] = None
         self.lock = threading.Lock()
         
-        # Azure OpenAI 클라이언트 초기화
-        self.openai_client = openai.AzureOpenAI(
-            azure_endpoint=AI_CONFIG["openai_endpoint"],
-            api_key=AI_CONFIG["openai_api_key"],
-            api_version=AI_CONFIG["api_version"]
-        )
+        # Azure OpenAI 공유 클라이언트 (속도 제한/재시도 적용)
+        self.openai_client = get_openai_client()
+        # 단계별 모델 라우팅 (1~2단계는 작은 배포, 최종 분석은 큰 배포)
+        self.model_router = get_model_router()
 
     def cancel(self):
         with self.lock:
@@ -111,8 +111,8 @@ class AIAnalysisOrchestrator:
             if self.mode == "selection" and selection:
                 user_prompt += f"\n\n분석 대상 텍스트: {selection}"
 
-            response = self.openai_client.chat.completions.create(
-                model=AZURE_OPENAI_DEPLOYMENT,
+            response, _ = self.model_router.chat_completion(
+                "refine",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -146,8 +146,8 @@ class AIAnalysisOrchestrator:
 사내검색: [사내 문서 검색 쿼리]
 외부검색: [외부 자료 검색 쿼리]"""
 
-            response = self.openai_client.chat.completions.create(
-                model=AZURE_OPENAI_DEPLOYMENT,
+            response, _ = self.model_router.chat_completion(
+                "queries",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"프롬프트: {prompt}"}
@@ -225,41 +225,24 @@ class AIAnalysisOrchestrator:
             if not TAVILY_API_KEY:
                 return [{"title": "Tavily API 키 없음", "content": "TAVILY_API_KEY가 설정되지 않았습니다.", "url": "", "source": "external"}]
             
-            # Tavily API 호출
-            response = requests.post(
-                "https://api.tavily.com/search",
-                json={
-                    "api_key": TAVILY_API_KEY,
-                    "query": query,
-                    "search_depth": "advanced",
-                    "include_answer": True,
-                    "include_raw_content": False,
-                    "max_results": 5
-                },
-                timeout=15
-            )
+            # Tavily API 호출 (공유 세션 + 응답 캐시)
+            results = get_external_search_client().search(query, max_results=5, search_depth="advanced")
             
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get("results", [])
-                
-                # 결과를 표준화된 형태로 변환
-                formatted_results = []
-                for item in results:
-                    formatted_results.append({
-                        "title": item.get("title", "제목없음"),
-                        "content": item.get("content", "")[:500],  # 500자 제한
-                        "url": item.get("url", ""),
-                        "source": "external",
-                        "score": item.get("score", 0)
-                    })
-                
-                return formatted_results
-            else:
-                return [{"title": "Tavily API 오류", "content": f"HTTP {response.status_code}: {response.text}", "url": "", "source": "external"}]
+            # 결과를 표준화된 형태로 변환
+            formatted_results = []
+            for item in results:
+                formatted_results.append({
+                    "title": item.get("title") or "제목없음",
+                    "content": item.get("content", "")[:500],  # 500자 제한
+                    "url": item.get("url", ""),
+                    "source": "external",
+                    "score": item.get("score", 0)
+                })
+            
+            return formatted_results
                 
-        except requests.exceptions.Timeout:
-            return [{"title": "Tavily 검색 시간초과", "content": "외부 검색 요청이 시간 초과되었습니다.", "url": "", "source": "external"}]
+        except ServiceConnectionException as e:
+            return [{"title": "Tavily API 오류", "content": e.message, "url": "", "source": "external"}]
         except Exception as e:
             return [{"title": "Tavily 검색 예외", "content": f"검색 중 오류 발생: {str(e)}", "url": "", "source": "external"}]
 
@@ -298,8 +281,8 @@ class AIAnalysisOrchestrator:
 
 위 정보를 바탕으로 종합적인 분석 결과를 제공해주세요."""
 
-            response = self.openai_client.chat.completions.create(
-                model=AZURE_OPENAI_DEPLOYMENT,
+            response, _ = self.model_router.chat_completion(
+                "analysis",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
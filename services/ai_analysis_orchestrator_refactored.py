@@ -3,87 +3,287 @@
 4단계 AI 분석 프로세스를 담당하는 핵심 서비스
 """
 import streamlit as st
+import queue
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 import hashlib
 
+from config import AI_CONFIG, QUICK_ANALYSIS_CONFIG, SEMANTIC_CACHE_CONFIG, ANALYSIS_DEADLINE_CONFIG, JOB_CONFIG
 from core.constants import UIConstants, MessageConstants
-from core.utils import show_message, create_progress_tracker, update_progress
-from core.exceptions import AIAnalysisException
-from utils.ai_service import AIService
-from services.document_management_service import DocumentManagementService
+from core.utils import show_message, create_progress_tracker, update_progress, Deadline
+from core.exceptions import AIAnalysisException, AnalysisCancelledException
+from utils.ai_service import AIService, ANALYSIS_PERSPECTIVES
+from utils.model_router import summarize_stage_records
+from utils.context_packer import count_tokens, split_into_sections
+from services.document_management_service import get_document_manager
+from services.semantic_cache import get_semantic_cache, SemanticAnalysisCache, KIND_REQUEST, KIND_REFINED
+from services.retrieval_prefetcher import build_anchor_query
+
+# 빠른 분석의 사내 검색용 (제한 시간을 넘긴 검색은 기다리지 않고 버림)
+_quick_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="quick-search")
+
+# 3단계 사내/외부 검색용 (마감 시간 안에 끝나지 않은 검색은 기다리지 않고 버림)
+_reference_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="reference-search")
 
 class AIAnalysisOrchestrator:
     """AI 분석 오케스트레이터 - 4단계 프로세스 관리"""
     
-    def __init__(self, mode: str = "full"):
+    def __init__(self, mode: str = "full", perspectives: Optional[List[str]] = None):
         """
         초기화
         Args:
             mode: 분석 모드 ("full", "selection", "quick")
+                  quick: 단일 LLM 호출 + 캐시/키워드 사내 검색, 전체 제한 시간 내 응답
+            perspectives: 분석 관점 목록 (ANALYSIS_PERSPECTIVES의 키)
+                  종합 분석 하나만이면 기존 최종 분석, 그 외에는 1~3단계 결과를 공유해 관점별로 동시 생성
         """
         self.mode = mode
+        self.perspectives = perspectives if perspectives and perspectives != ["comprehensive"] else None
+        self.deadline = Deadline()
+        self.degradations: List[Dict[str, Any]] = []  # 시간 부족으로 생략/축소한 단계 기록
         self.ai_service = AIService()
-        self.doc_manager = DocumentManagementService()
+        self.doc_manager = get_document_manager()
     
-    def run_complete_analysis(self, user_input: str, selection: str = None) -> Dict[str, Any]:
+    def run_complete_analysis(self, user_input: str, selection: str = None,
+                              force_refresh: bool = False) -> Dict[str, Any]:
         """
         완전한 4단계 AI 분석 프로세스 실행
         
         Args:
             user_input: 사용자 입력
             selection: 선택된 텍스트 (옵션)
+            force_refresh: 캐시된 이전 결과를 쓰지 않고 새로 분석
             
         Returns:
             분석 결과 딕셔너리
         """
         # 중복 실행 방지
         input_hash = self._generate_input_hash(user_input, selection)
-        if self._is_duplicate_analysis(input_hash):
+        if not force_refresh and self._is_duplicate_analysis(input_hash):
             st.info("이미 분석된 내용입니다. 기존 결과를 표시합니다.")
             return self._get_cached_result(input_hash)
         
+        self.ai_service.stage_records = []
+        self._start_deadline()
+        if self.mode == "quick":
+            analysis_result = self.run_quick_analysis(
+                user_input, selection, st.session_state.get('document_content', '') or ''
+            )
+            st.caption(f"⚡ 빠른 분석 {analysis_result['elapsed_seconds']:.1f}초")
+            if not analysis_result['timed_out']:
+                self._cache_result(input_hash, analysis_result)
+            return analysis_result
+        
         try:
             # 진행 상황 추적기 초기화
             tracker = create_progress_tracker(4)
             
             st.markdown("### 🔄 AI 분석 4단계 프로세스")
             
-            # 1단계: 프롬프트 고도화
-            enhanced_prompt = self._execute_step_1(tracker, user_input, selection)
+            # 표현만 다른 같은 요청의 이전 분석 결과가 있으면 바로 반환
+            cache_context = self._semantic_cache_context(
+                user_input, selection or "", st.session_state.get('document_content', '') or '', force_refresh
+            )
+            cached = self._semantic_cache_find(cache_context, KIND_REQUEST, user_input)
+            if cached:
+                self._show_semantic_cache_hit(cached)
+                self._cache_result(input_hash, cached)
+                return cached
+            
+            # 1단계: 프롬프트 고도화 (검색 쿼리와 검색 힌트도 같은 호출에서 함께 생성)
+            plan = self._execute_step_1(tracker, user_input, selection)
+            enhanced_prompt = plan['enhanced_prompt']
+            cached = self._semantic_cache_find(cache_context, KIND_REFINED, enhanced_prompt)
+            if cached:
+                self._show_semantic_cache_hit(cached)
+                self._cache_result(input_hash, cached)
+                return cached
             
-            # 2단계: 검색 쿼리 생성
-            internal_query, external_query = self._execute_step_2(tracker, enhanced_prompt)
+            # 2단계: 검색 쿼리 확정 (사내 검색용 다중 서브 쿼리, 추가 LLM 호출 없음)
+            target_content = selection if selection and selection.strip() else st.session_state.get('document_content', '')
+            internal_queries, external_query = self._execute_step_2(tracker, plan, target_content)
             
             # 3단계: 병렬 검색
-            internal_refs, external_refs = self._execute_step_3(tracker, internal_query, external_query)
+            internal_refs, external_refs = self._execute_step_3(
+                tracker, internal_queries, external_query, plan['hints']['needs_external']
+            )
             
-            # 4단계: 최종 분석 결과 생성
-            final_result = self._execute_step_4(tracker, enhanced_prompt, internal_refs, external_refs)
+            # 4단계: 최종 분석 결과 생성 (다중 관점이면 관점별 동시 생성)
+            perspective_results = None
+            if self.perspectives:
+                perspective_results = self._execute_step_4_perspectives(tracker, enhanced_prompt, internal_refs, external_refs)
+                final_result = perspective_results[self.perspectives[0]]
+            else:
+                final_result = self._execute_step_4(tracker, enhanced_prompt, internal_refs, external_refs)
             
             # 결과 캐싱 및 반환
             analysis_result = {
                 'result': final_result,
+                'perspectives': perspective_results,
                 'internal_refs': internal_refs,
                 'external_refs': external_refs,
                 'enhanced_prompt': enhanced_prompt,
-                'queries': {'internal': internal_query, 'external': external_query}
+                'queries': {
+                    'internal': internal_queries[0] if internal_queries else enhanced_prompt,
+                    'internal_queries': internal_queries,
+                    'external': external_query
+                },
+                'stage_metrics': summarize_stage_records(self.ai_service.stage_records),
+                'degradations': list(self.degradations),
+                'elapsed_seconds': self.deadline.elapsed()
             }
             
+            self._display_degradations()
             self._cache_result(input_hash, analysis_result)
+            self._semantic_cache_save(cache_context, analysis_result)
             return analysis_result
             
         except Exception as e:
             st.error(f"❌ 분석 프로세스 중 치명적 오류: {str(e)}")
             raise AIAnalysisException("complete_analysis", str(e))
     
-    def _execute_step_1(self, tracker: Dict, user_input: str, selection: str = None) -> str:
-        """1단계: 프롬프트 고도화 실행"""
+    def run_headless(self, user_input: str, selection: str = None, document_content: str = "",
+                     on_progress: Optional[Callable[[int, str, Dict[str, Any]], None]] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None,
+                     force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        UI 없이 4단계 분석 실행 (백그라운드 작업 워커용, 세션 상태에 접근하지 않음)
+        
+        Args:
+            user_input: 사용자 입력
+            selection: 선택된 텍스트 (옵션)
+            document_content: 현재 문서 내용
+            on_progress: 단계 완료 시 호출 (단계 번호, 메시지, 부분 결과)
+            is_cancelled: 취소 여부 확인 함수
+            force_refresh: 캐시된 이전 결과를 쓰지 않고 새로 분석
+            
+        Returns:
+            분석 결과 딕셔너리 (run_complete_analysis와 동일한 형식, 캐시 적중 시 cache 항목 포함)
+        """
+        self.ai_service.stage_records = []
+        # 작업 큐 분석은 사용자가 화면에서 기다리지 않으므로 별도의 더 긴 마감 시간 사용
+        self._start_deadline(JOB_CONFIG["deadline_seconds"])
+        if self.mode == "quick":
+            return self.run_quick_analysis(user_input, selection, document_content)
+        
+        def checkpoint(step: int, message: str, partial: Dict[str, Any] = None):
+            if is_cancelled and is_cancelled():
+                raise AnalysisCancelledException(f"{step + 1}")
+            if on_progress:
+                on_progress(step, message, partial or {})
+        
+        cache_context = self._semantic_cache_context(user_input, selection or "", document_content, force_refresh)
+        cached = self._semantic_cache_find(cache_context, KIND_REQUEST, user_input)
+        if cached:
+            return cached
+        
+        checkpoint(0, "🧠 프롬프트 고도화 및 검색 쿼리 생성 중...")
+        target_content = selection if selection and selection.strip() else document_content
+        plan = self._plan_analysis(user_input, target_content)
+        enhanced_prompt = plan['enhanced_prompt']
+        cached = self._semantic_cache_find(cache_context, KIND_REFINED, enhanced_prompt)
+        if cached:
+            return cached
+        
+        checkpoint(1, "🔍 검색 쿼리 확정", {'enhanced_prompt': enhanced_prompt})
+        internal_queries, external_query = self._queries_from_plan(plan, target_content)
+        queries = {
+            'internal': internal_queries[0] if internal_queries else enhanced_prompt,
+            'internal_queries': internal_queries,
+            'external': external_query
+        }
+        
+        checkpoint(2, "📚 사내 문서 및 외부 자료 검색 중...", {'queries': queries})
+        internal_refs, external_refs = self._parallel_reference_search(
+            internal_queries, external_query, plan['hints']['needs_external']
+        )
+        
+        checkpoint(3, "🤖 최종 분석 결과 생성 중...", {'internal_refs': internal_refs, 'external_refs': external_refs})
+        analysis_content = self._resolve_analysis_content(user_input, document_content, selection)
+        if self._needs_map_reduce(analysis_content) and self._map_reduce_fits_deadline():
+            sections = split_into_sections(analysis_content, AI_CONFIG["map_reduce_section_tokens"])
+            section_results = self._map_sections(
+                enhanced_prompt, sections,
+                on_section_done=lambda done, total: checkpoint(3, f"🧩 섹션 분석 {done}/{total} 완료"),
+                is_cancelled=is_cancelled
+            )
+            checkpoint(3, "🧠 섹션별 분석 결과를 종합하는 중...")
+            final_result = self._reduce_or_single_pass(
+                enhanced_prompt, section_results, internal_refs, external_refs, analysis_content
+            )
+        else:
+            final_result = self._generate_final_result(enhanced_prompt, internal_refs, external_refs, analysis_content)
+        
+        analysis_result = {
+            'result': final_result,
+            'internal_refs': internal_refs,
+            'external_refs': external_refs,
+            'enhanced_prompt': enhanced_prompt,
+            'queries': queries,
+            'context_stats': self.ai_service.last_context_stats,
+            'stage_metrics': summarize_stage_records(self.ai_service.stage_records),
+            'degradations': list(self.degradations),
+            'elapsed_seconds': self.deadline.elapsed()
+        }
+        self._semantic_cache_save(cache_context, analysis_result)
+        return analysis_result
+    
+    def run_quick_analysis(self, user_input: str, selection: str = None,
+                           document_content: str = "") -> Dict[str, Any]:
+        """
+        빠른 분석 (프롬프트 고도화/쿼리 생성/외부 검색 생략, 작은 배포로 한 번만 호출)
+        
+        사내 문서는 캐시 또는 키워드 검색으로 검색 예산 안에 찾은 것만 사용하고,
+        요청 전체가 deadline_seconds를 넘지 않도록 LLM 호출에도 남은 시간을 제한으로 건다.
+        
+        Returns:
+            분석 결과 딕셔너리 (run_headless와 같은 형식 + mode/elapsed_seconds/timed_out)
+        """
+        deadline = Deadline(QUICK_ANALYSIS_CONFIG["deadline_seconds"])
+        target_content = selection if selection and selection.strip() else document_content
+        
+        search_query = f"{user_input} {(selection or '')[:100]}".strip()
+        internal_refs = []
+        future = _quick_search_executor.submit(
+            self.doc_manager.search_training_documents_fast, search_query, QUICK_ANALYSIS_CONFIG["internal_top"]
+        )
+        try:
+            internal_refs = self._convert_docs_for_ai(
+                future.result(timeout=QUICK_ANALYSIS_CONFIG["search_budget_seconds"])
+            )
+        except FutureTimeoutError:
+            print("⚡ 빠른 분석: 사내 검색이 예산 안에 끝나지 않아 참고 자료 없이 진행")
+        except Exception as e:
+            print(f"⚡ 빠른 분석: 사내 검색 실패 - {e}")
+        
+        result = self.ai_service.generate_quick_analysis(user_input, target_content, internal_refs, deadline=deadline.at)
+        timed_out = result is None
+        if timed_out:
+            result = (f"⏱️ 빠른 분석이 제한 시간({QUICK_ANALYSIS_CONFIG['deadline_seconds']:.0f}초) 안에 "
+                      f"끝나지 않았습니다. 일반 분석으로 다시 시도해 주세요.")
+        
+        return {
+            'result': result,
+            'internal_refs': internal_refs,
+            'external_refs': [],
+            'enhanced_prompt': user_input,
+            'queries': {'internal': search_query, 'internal_queries': [search_query], 'external': None},
+            'mode': 'quick',
+            'elapsed_seconds': deadline.elapsed(),
+            'timed_out': timed_out,
+            'stage_metrics': summarize_stage_records(self.ai_service.stage_records)
+        }
+    
+    def _execute_step_1(self, tracker: Dict, user_input: str, selection: str = None) -> Dict[str, Any]:
+        """1단계: 프롬프트 고도화 실행 (검색 쿼리/힌트를 포함한 분석 계획 반환)"""
         st.markdown("#### 🔄 1단계: 프롬프트 고도화")
         update_progress(tracker, 0, "🧠 사용자 입력을 AI가 더 잘 이해할 수 있도록 개선 중...")
         
         try:
-            enhanced_prompt = self._refine_prompt(user_input, selection)
+            target_content = selection if selection and selection.strip() else st.session_state.get('document_content', '')
+            plan = self._plan_analysis(user_input, target_content)
+            enhanced_prompt = plan['enhanced_prompt']
             update_progress(tracker, 1, "✅ 1단계 완료: 프롬프트 고도화")
             st.success("✅ 1단계 완료: 프롬프트 고도화")
             
@@ -93,37 +293,44 @@ class AIAnalysisOrchestrator:
                     st.markdown(f"**선택된 텍스트:**\n{selection}")
                 st.markdown(f"**AI 고도화 프롬프트:**\n{enhanced_prompt}")
             
-            return enhanced_prompt
+            return plan
             
         except Exception as e:
             raise AIAnalysisException("prompt_enhancement", str(e))
     
-    def _execute_step_2(self, tracker: Dict, enhanced_prompt: str) -> Tuple[str, str]:
-        """2단계: 검색 쿼리 생성 실행"""
+    def _execute_step_2(self, tracker: Dict, plan: Dict[str, Any],
+                        target_content: str = "") -> Tuple[List[str], str]:
+        """2단계: 검색 쿼리 확정 (1단계 호출에서 함께 생성된 쿼리 + 분석 대상 내용 고정 쿼리)"""
         st.markdown("#### 🔍 2단계: 검색 쿼리 생성")
-        update_progress(tracker, 1, "🔍 사내/외부 검색에 최적화된 쿼리 생성 중...")
+        update_progress(tracker, 1, "🔍 사내/외부 검색에 최적화된 쿼리 정리 중...")
         
         try:
-            internal_query, external_query = self._generate_queries(enhanced_prompt)
+            internal_queries, external_query = self._queries_from_plan(plan, target_content)
             update_progress(tracker, 2, "✅ 2단계 완료: 검색 쿼리 생성")
             st.success("✅ 2단계 완료: 검색 쿼리 생성")
             
             with st.expander("🔍 생성된 검색 쿼리 확인"):
-                st.markdown(f"**사내 문서 검색 쿼리:**\n{internal_query}")
-                st.markdown(f"**외부 자료 검색 쿼리:**\n{external_query}")
+                st.markdown(f"**사내 문서 검색 쿼리 ({len(internal_queries)}개):**")
+                for i, query in enumerate(internal_queries, 1):
+                    st.markdown(f"{i}. {query}")
+                if plan['hints']['needs_external']:
+                    st.markdown(f"**외부 자료 검색 쿼리:**\n{external_query}")
+                else:
+                    st.markdown("**외부 자료 검색:** 사내 문서만으로 충분한 요청이라 생략")
             
-            return internal_query, external_query
+            return internal_queries, external_query
             
         except Exception as e:
             raise AIAnalysisException("query_generation", str(e))
     
-    def _execute_step_3(self, tracker: Dict, internal_query: str, external_query: str) -> Tuple[List[Dict], List[Dict]]:
+    def _execute_step_3(self, tracker: Dict, internal_queries: List[str], external_query: str,
+                        search_external: bool = True) -> Tuple[List[Dict], List[Dict]]:
         """3단계: 병렬 검색 실행 - 150자 미리보기와 함께"""
         st.markdown("#### � 3단계: 사내/외부 레퍼런스 병렬 검색")
         update_progress(tracker, 2, "📚 사내 문서 및 외부 자료를 동시 검색 중...")
         
         try:
-            internal_refs, external_refs = self._parallel_reference_search(internal_query, external_query)
+            internal_refs, external_refs = self._parallel_reference_search(internal_queries, external_query, search_external)
             update_progress(tracker, 3, f"✅ 3단계 완료: 사내 문서 {len(internal_refs)}개, 외부 자료 {len(external_refs)}개 발견")
             st.success(f"✅ 3단계 완료: 사내 문서 {len(internal_refs)}개, 외부 자료 {len(external_refs)}개 발견")
             
@@ -143,103 +350,448 @@ class AIAnalysisOrchestrator:
         try:
             # 분석 대상 문서 내용 가져오기
             document_content = self._get_analysis_target_content()
-            final_result = self._generate_final_result(enhanced_prompt, internal_refs, external_refs, document_content)
+            if self._needs_map_reduce(document_content) and self._map_reduce_fits_deadline():
+                final_result = self._generate_map_reduce_result(enhanced_prompt, internal_refs, external_refs, document_content)
+            else:
+                final_result = self._generate_final_result(enhanced_prompt, internal_refs, external_refs, document_content)
             update_progress(tracker, 4, "✅ 모든 단계 완료!")
             st.success("✅ 4단계 완료: 최종 분석 결과 생성")
             
+            context_stats = self.ai_service.last_context_stats
+            if context_stats:
+                st.caption(
+                    f"🧮 컨텍스트 토큰: {context_stats['total_tokens']:,} / {context_stats['budget_tokens']:,} "
+                    f"(문서 {context_stats['document_tokens']:,}, 참고 자료 {context_stats['reference_tokens']:,})"
+                )
+            self._display_stage_metrics()
+            
             return final_result
             
         except Exception as e:
             raise AIAnalysisException("result_generation", str(e))
     
-    def _refine_prompt(self, user_input: str, selection: str = None) -> str:
-        """프롬프트 고도화"""
-        # 분석 대상 문서 내용 확인
-        if selection and selection.strip():
-            # 분석할 실제 문서 내용이 있는 경우
-            context = f"사용자 요청: {user_input}\n\n분석 대상 문서 내용:\n{selection[:2000]}..."
-            if len(selection) > 2000:
-                context += f"\n(문서 총 길이: {len(selection):,}자)"
-        else:
-            # 문서 내용이 없는 경우 현재 세션의 문서 내용 시도
-            document_content = st.session_state.get('document_content', '')
-            if document_content and document_content.strip():
-                context = f"사용자 요청: {user_input}\n\n분석 대상 문서 내용:\n{document_content[:2000]}..."
-                if len(document_content) > 2000:
-                    context += f"\n(문서 총 길이: {len(document_content):,}자)"
-            else:
-                context = f"사용자 요청: {user_input}\n\n주의: 분석할 문서 내용이 제공되지 않았습니다."
+    def _execute_step_4_perspectives(self, tracker: Dict, enhanced_prompt: str, internal_refs: List[Dict],
+                                     external_refs: List[Dict]) -> Dict[str, str]:
+        """4단계(다중 관점): 같은 검색 결과/컨텍스트로 관점별 분석을 동시에 생성하며 탭마다 스트리밍 표시"""
+        st.markdown("#### 🔄 4단계: 관점별 분석 결과 생성")
+        update_progress(tracker, 3, f"🤖 {len(self.perspectives)}개 관점의 분석 결과를 동시에 생성 중...")
         
         try:
-            return self.ai_service.refine_user_prompt(context)
+            document_content = self._get_analysis_target_content()
+            document_label = None
+            if self._needs_map_reduce(document_content) and self._map_reduce_fits_deadline():
+                # 긴 문서는 섹션 분석(맵)을 한 번만 하고 관점별 종합(리듀스)만 나눠서 생성
+                sections = split_into_sections(document_content, AI_CONFIG["map_reduce_section_tokens"])
+                st.info(f"📚 긴 문서를 {len(sections)}개 섹션으로 나누어 분석한 뒤 관점별로 종합합니다.")
+                section_results = self._map_sections(enhanced_prompt, sections)
+                if any(section_results):
+                    document_content = self.ai_service.join_section_partials(section_results)
+                    document_label = f"섹션별 부분 분석 결과 (총 {len(sections)}개 섹션)"
+                else:
+                    self._degrade("map_failed", "섹션 분석이 모두 실패해 관련 패시지만 골라 관점별로 분석")
+            budget_tokens, max_tokens = self._final_call_limits()
+            context = self.ai_service.build_analysis_context(
+                enhanced_prompt, document_content, internal_refs, external_refs, document_label, budget_tokens
+            )
+            
+            tabs = st.tabs([
+                f"{ANALYSIS_PERSPECTIVES[p]['icon']} {ANALYSIS_PERSPECTIVES[p]['label']}" for p in self.perspectives
+            ])
+            placeholders = {}
+            for perspective, tab in zip(self.perspectives, tabs):
+                with tab:
+                    placeholders[perspective] = st.empty()
+                    placeholders[perspective].caption("⏳ 생성 대기 중...")
+            
+            results = self._stream_perspectives(enhanced_prompt, context, placeholders, max_tokens)
+            if self.deadline.expired():
+                self._degrade("perspective_truncated", "제한 시간이 지나 일부 관점 결과가 중간까지만 생성됨")
+            update_progress(tracker, 4, "✅ 모든 단계 완료!")
+            st.success(f"✅ 4단계 완료: {len(results)}개 관점 분석 결과 생성")
+            self._display_stage_metrics()
+            return results
+            
         except Exception as e:
-            st.warning(f"프롬프트 고도화 실패, 원본 사용: {str(e)}")
-            return user_input
+            raise AIAnalysisException("result_generation", str(e))
     
-    def _generate_queries(self, enhanced_prompt: str) -> Tuple[str, str]:
-        """검색 쿼리 생성"""
+    def _stream_perspectives(self, enhanced_prompt: str, context: str, placeholders: Dict[str, Any],
+                             max_tokens: Optional[int] = None) -> Dict[str, str]:
+        """
+        관점별 생성을 워커 스레드에서 동시 실행하고, 생성된 텍스트 조각은 대기열로 받아 현재 스레드에서 표시
+        (Streamlit 요소는 스크립트 스레드에서만 갱신 가능, 동시 호출 수는 공유 속도 제한기가 조절)
+        """
+        updates: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        texts = {perspective: "" for perspective in placeholders}
+        results: Dict[str, str] = {}
+        
+        executor = ThreadPoolExecutor(max_workers=min(len(placeholders), AI_CONFIG["perspective_max_parallel"]))
         try:
-            queries = self.ai_service.generate_search_queries(enhanced_prompt)
-            internal_query = queries.get('internal', enhanced_prompt)
-            external_query = queries.get('external', enhanced_prompt)
-            return internal_query, external_query
+            pending = {
+                executor.submit(
+                    self.ai_service.stream_perspective_analysis, perspective, enhanced_prompt, context,
+                    lambda delta, perspective=perspective: updates.put((perspective, delta)),
+                    self.deadline.at, max_tokens
+                ): perspective
+                for perspective in placeholders
+            }
+            while pending:
+                changed = set()
+                try:
+                    perspective, delta = updates.get(timeout=0.1)
+                    while True:
+                        # 이미 완료 처리된 관점의 늦게 꺼낸 조각은 무시
+                        if perspective not in results:
+                            texts[perspective] += delta
+                            changed.add(perspective)
+                        perspective, delta = updates.get_nowait()
+                except queue.Empty:
+                    pass
+                for perspective in changed:
+                    placeholders[perspective].markdown(texts[perspective] + " ▌")
+                
+                for future in [f for f in pending if f.done()]:
+                    perspective = pending.pop(future)
+                    try:
+                        results[perspective] = future.result()
+                    except Exception as e:
+                        label = ANALYSIS_PERSPECTIVES[perspective]['label']
+                        print(f"{label} 생성 실패: {e}")
+                        results[perspective] = texts[perspective] or f"⚠️ {label} 생성 실패: {str(e)}"
+                    placeholders[perspective].markdown(results[perspective])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        # 선택 순서 유지
+        return {perspective: results[perspective] for perspective in placeholders}
+    
+    def _start_deadline(self, total_seconds: Optional[float] = None):
+        """요청 단위 마감 시각 시작 (생략/축소 기록 초기화, total_seconds가 없으면 대화형 분석 마감 시간)"""
+        if total_seconds is None:
+            total_seconds = ANALYSIS_DEADLINE_CONFIG["total_seconds"]
+        self.deadline = Deadline(total_seconds)
+        self.degradations = []
+    
+    def _degrade(self, code: str, message: str):
+        """시간 부족 등으로 단계를 생략/축소한 내용 기록 (결과의 degradations 항목)"""
+        elapsed = self.deadline.elapsed()
+        self.degradations.append({'code': code, 'message': message, 'elapsed_seconds': round(elapsed, 2)})
+        print(f"⏱️ {message} (경과 {elapsed:.1f}초)")
+    
+    def _map_reduce_fits_deadline(self) -> bool:
+        """맵리듀스를 할 시간이 남았는지 (부족하면 관련 패시지만 골라 한 번에 분석)"""
+        remaining = self.deadline.remaining()
+        if remaining < ANALYSIS_DEADLINE_CONFIG["map_reduce_min_seconds"]:
+            self._degrade("map_reduce_skipped", f"남은 시간({remaining:.0f}초)이 부족해 섹션별 분석 없이 한 번에 분석")
+            return False
+        return True
+    
+    def _final_call_limits(self) -> Tuple[Optional[int], Optional[int]]:
+        """최종 분석 컨텍스트 예산/출력 토큰 (남은 시간이 부족하면 축소, 아니면 설정값을 쓰도록 None)"""
+        remaining = self.deadline.remaining()
+        if remaining >= ANALYSIS_DEADLINE_CONFIG["full_context_min_seconds"]:
+            return None, None
+        ratio = ANALYSIS_DEADLINE_CONFIG["reduced_context_ratio"]
+        self._degrade("context_reduced", f"남은 시간({remaining:.0f}초)이 부족해 참고 컨텍스트와 응답 길이를 {ratio:.0%}로 축소")
+        return int(AI_CONFIG["context_budget_tokens"] * ratio), int(AI_CONFIG["analysis_max_tokens"] * ratio)
+    
+    def _reduce_or_single_pass(self, enhanced_prompt: str, section_results: List[Optional[str]],
+                               internal_refs: List[Dict], external_refs: List[Dict], document_content: str) -> str:
+        """섹션 결과를 종합 (섹션 분석이 모두 실패했으면 관련 패시지만 골라 한 번에 분석)"""
+        if not any(section_results):
+            self._degrade("map_failed", "섹션 분석이 모두 실패해 관련 패시지만 골라 한 번에 분석")
+            return self._generate_final_result(enhanced_prompt, internal_refs, external_refs, document_content)
+        return self._reduce_sections(enhanced_prompt, section_results, internal_refs, external_refs)
+    
+    def _reduce_sections(self, enhanced_prompt: str, section_results: List[Optional[str]],
+                         internal_refs: List[Dict], external_refs: List[Dict]) -> str:
+        """리듀스 단계 (마감 시각까지)"""
+        try:
+            return self.ai_service.reduce_section_analyses(
+                enhanced_prompt, section_results, internal_refs, external_refs, deadline=self.deadline.at
+            )
+        except TimeoutError:
+            self._degrade("final_timeout", "섹션별 분석 종합이 제한 시간 안에 끝나지 않아 섹션별 분석 결과로 대신함")
+            return self._partial_sections_result(section_results)
+    
+    def _partial_sections_result(self, section_results: List[Optional[str]]) -> str:
+        """종합하지 못했을 때 완료된 섹션별 분석 결과를 그대로 반환 (하나도 없으면 시간 초과 안내)"""
+        if not any(section_results):
+            return self._deadline_exceeded_message()
+        return (f"⏱️ 제한 시간({self.deadline.seconds:.0f}초) 안에 종합하지 못해 섹션별 분석 결과를 그대로 보여드립니다.\n\n"
+                + self.ai_service.join_section_partials(section_results))
+    
+    def _deadline_exceeded_message(self) -> str:
+        return (f"⏱️ 분석이 제한 시간({self.deadline.seconds:.0f}초) 안에 끝나지 않았습니다. "
+                "잠시 후 다시 시도하거나 분석 범위를 줄여 주세요.")
+    
+    def _display_degradations(self):
+        """시간 부족/외부 검색 실패로 생략/축소한 단계 안내"""
+        if not self.degradations:
+            return
+        st.warning(
+            f"⏱️ 제한 시간({self.deadline.seconds:.0f}초) 또는 서비스 오류로 일부 단계를 줄였습니다:\n"
+            + "\n".join(f"- {item['message']}" for item in self.degradations)
+        )
+    
+    def _display_stage_metrics(self):
+        """단계별 모델/지연 시간/토큰 사용량 표시"""
+        stage_metrics = summarize_stage_records(self.ai_service.stage_records)
+        if not stage_metrics:
+            return
+        labels = {"refine": "프롬프트 고도화", "queries": "쿼리 생성", "plan": "프롬프트 고도화/쿼리 생성",
+                  "map": "섹션 분석", "analysis": "최종 분석"}
+        with st.expander("⏱️ 단계별 모델 사용 현황"):
+            for stage, metrics in stage_metrics.items():
+                st.markdown(
+                    f"- **{labels.get(stage, stage)}** ({', '.join(metrics['deployments'])}): "
+                    f"{metrics['calls']}회, {metrics['latency']:.1f}초, "
+                    f"입력 {metrics['prompt_tokens']:,} / 출력 {metrics['completion_tokens']:,} 토큰"
+                )
+    
+    def _plan_analysis(self, user_input: str, target_content: str) -> Dict[str, Any]:
+        """
+        프롬프트 고도화 + 검색 쿼리 생성 (한 번의 구조화 출력 호출, 실패 시 원본 사용)
+        
+        최종 분석용 시간을 남기고 plan_seconds 안에서만 호출하며, 그만한 시간이 없으면 고도화를 생략한다.
+        """
+        fallback = {
+            'enhanced_prompt': user_input,
+            'internal': user_input,
+            'internal_queries': [user_input],
+            'external': user_input,
+            'external_queries': [user_input],
+            'hints': {'keywords': [], 'needs_external': True},
+            'structured': False
+        }
+        plan_budget = self.deadline.budget(
+            ANALYSIS_DEADLINE_CONFIG["plan_seconds"], reserve=ANALYSIS_DEADLINE_CONFIG["final_reserve_seconds"]
+        )
+        if plan_budget is not None and plan_budget < ANALYSIS_DEADLINE_CONFIG["plan_min_seconds"]:
+            self._degrade("refine_skipped", "남은 시간이 부족해 프롬프트 고도화를 생략하고 원본 요청으로 검색")
+            return fallback
+        
+        context = self._build_refine_context(user_input, target_content)
+        try:
+            return self.ai_service.plan_analysis(
+                context, deadline=None if plan_budget is None else time.monotonic() + plan_budget
+            )
+        except TimeoutError:
+            self._degrade("refine_timeout", f"프롬프트 고도화가 {plan_budget:.1f}초 안에 끝나지 않아 원본 요청으로 검색")
+            return fallback
         except Exception as e:
-            st.warning(f"검색 쿼리 생성 실패, 원본 사용: {str(e)}")
-            return enhanced_prompt, enhanced_prompt
+            st.warning(f"프롬프트 고도화 실패, 원본 사용: {str(e)}")
+            return fallback
+    
+    def _build_refine_context(self, user_input: str, target_content: str) -> str:
+        """프롬프트 고도화용 컨텍스트 구성"""
+        if target_content and target_content.strip():
+            context = f"사용자 요청: {user_input}\n\n분석 대상 문서 내용:\n{target_content[:2000]}..."
+            if len(target_content) > 2000:
+                context += f"\n(문서 총 길이: {len(target_content):,}자)"
+            # 긴 문서는 앞부분 외에 전체 구조 개요도 함께 전달
+            if self._needs_map_reduce(target_content):
+                context += f"\n\n문서 구조 개요:\n{self._build_document_outline(target_content)}"
+        else:
+            context = f"사용자 요청: {user_input}\n\n주의: 분석할 문서 내용이 제공되지 않았습니다."
+        return context
     
-    def _parallel_reference_search(self, internal_query: str, external_query: str) -> Tuple[List[Dict], List[Dict]]:
-        """병렬 레퍼런스 검색"""
+    @staticmethod
+    def _queries_from_plan(plan: Dict[str, Any], target_content: str = "") -> Tuple[List[str], str]:
+        """
+        분석 계획에서 검색 쿼리 추출
+        
+        핵심 용어 힌트는 키워드 서브 쿼리로, 분석 대상 내용은 고정 서브 쿼리로 추가한다.
+        고정 쿼리는 편집 중 선행 검색(RetrievalPrefetcher)과 같은 쿼리라 캐시된 결과를 그대로 사용한다.
+        """
+        enhanced_prompt = plan['enhanced_prompt']
+        internal_queries = list(plan.get('internal_queries') or [plan.get('internal') or enhanced_prompt])
+        keywords = plan.get('hints', {}).get('keywords') or []
+        if keywords:
+            keyword_query = " ".join(keywords)
+            if keyword_query not in internal_queries:
+                internal_queries.append(keyword_query)
+        anchor_query = build_anchor_query(target_content)
+        if anchor_query and anchor_query not in internal_queries:
+            internal_queries.append(anchor_query)
+        return internal_queries, plan.get('external') or enhanced_prompt
+    
+    def _parallel_reference_search(self, internal_queries: List[str], external_query: str,
+                                   search_external: bool = True) -> Tuple[List[Dict], List[Dict]]:
+        """
+        병렬 레퍼런스 검색 (사내 다중 쿼리 팬아웃 + 외부 검색 동시 실행, search_external=False면 사내만)
+        
+        최종 분석용 시간을 남기고 search_seconds까지만 기다리며, 그 안에 끝나지 않은 검색 결과는 제외한다.
+        """
         internal_refs = []
         external_refs = []
         
-        # 사내 문서 검색
+        search_budget = self.deadline.budget(
+            ANALYSIS_DEADLINE_CONFIG["search_seconds"], reserve=ANALYSIS_DEADLINE_CONFIG["final_reserve_seconds"]
+        )
+        if search_external and search_budget is not None and search_budget < ANALYSIS_DEADLINE_CONFIG["external_min_seconds"]:
+            self._degrade("external_skipped", "남은 시간이 부족해 외부 자료 검색 생략")
+            search_external = False
+        wait_until = None if search_budget is None else time.monotonic() + search_budget
+        
+        def remaining() -> Optional[float]:
+            return None if wait_until is None else max(wait_until - time.monotonic(), 0.0)
+        
+        # 사내 문서 검색: 서브 쿼리들을 백그라운드에서 동시 실행 후 RRF 융합
+        internal_future = _reference_search_executor.submit(
+            self.doc_manager.search_training_documents_multi, internal_queries
+        )
+        # 외부 자료 검색도 마감 시간까지만 기다릴 수 있도록 백그라운드에서 실행 (결과 수는 3단계 완료 메시지로 표시,
+        # 백그라운드 스레드의 st 호출은 표시되지 않으므로 안내 메시지는 돌려받아 이 스레드에서 표시)
+        external_future = _reference_search_executor.submit(
+            self.ai_service.collect_external_references, external_query
+        ) if search_external else None
+        
+        if external_future:
+            try:
+                external_refs, notices = external_future.result(timeout=remaining())
+                self._show_external_notices(notices)
+            except FutureTimeoutError:
+                self._degrade("external_timeout", f"외부 자료 검색이 {search_budget:.1f}초 안에 끝나지 않아 제외")
+            except Exception as e:
+                st.warning(f"외부 자료 검색 실패: {str(e)}")
+        
         try:
-            docs = self.doc_manager.search_training_documents(internal_query, top=10)
+            docs = internal_future.result(timeout=remaining())
             internal_refs = self._convert_docs_for_ai(docs)
+        except FutureTimeoutError:
+            self._degrade("internal_timeout", f"사내 문서 검색이 {search_budget:.1f}초 안에 끝나지 않아 제외")
         except Exception as e:
             st.warning(f"사내 문서 검색 실패: {str(e)}")
         
-        # 외부 자료 검색
-        try:
-            external_results = self.ai_service.search_external_references(external_query)
-            external_refs = external_results if external_results else []
-        except Exception as e:
-            st.warning(f"외부 자료 검색 실패: {str(e)}")
-        
         return internal_refs, external_refs
     
+    def _show_external_notices(self, notices: List[Dict[str, str]]):
+        """외부 검색 안내 표시 (실패는 degradations에 기록해 분석 끝에 표시, 작업 큐 분석 결과에도 남음)"""
+        for notice in notices:
+            if notice["level"] == "warning":
+                self._degrade("external_failed", notice["message"])
+            else:
+                st.info(notice["message"])
+    
     def _get_analysis_target_content(self) -> str:
         """분석 대상 문서 내용 가져오기"""
-        # 현재 세션에 저장된 분석 텍스트 확인
-        analysis_text = st.session_state.get('analysis_text', '')
-        
-        if analysis_text and analysis_text.strip():
-            return analysis_text
-        
-        # 현재 문서 내용 확인
-        document_content = st.session_state.get('document_content', '')
-        if document_content and document_content.strip():
-            return document_content
-        
-        # 선택된 텍스트 확인
-        selected_text = st.session_state.get('selected_text', '')
-        if selected_text and selected_text.strip():
-            return selected_text
-        
+        return self._resolve_analysis_content(
+            st.session_state.get('analysis_text', ''),
+            st.session_state.get('document_content', ''),
+            st.session_state.get('selected_text', '')
+        )
+    
+    @staticmethod
+    def _resolve_analysis_content(analysis_text: str, document_content: str, selected_text: str) -> str:
+        """분석 대상 결정: 분석 텍스트 > 현재 문서 > 선택 텍스트 순"""
+        for content in (analysis_text, document_content, selected_text):
+            if content and content.strip():
+                return content
         return ""
 
     def _generate_final_result(self, enhanced_prompt: str, internal_refs: List[Dict], external_refs: List[Dict], document_content: str = "") -> str:
-        """최종 분석 결과 생성 - 문서 내용 포함"""
+        """최종 분석 결과 생성 - 문서 내용 포함 (남은 시간이 부족하면 컨텍스트/출력 축소)"""
+        budget_tokens, max_tokens = self._final_call_limits()
         try:
             return self.ai_service.generate_comprehensive_analysis(
                 query=enhanced_prompt,
                 internal_docs=internal_refs,
                 external_docs=external_refs,
-                document_content=document_content  # 실제 분석할 문서 내용 추가
+                document_content=document_content,  # 실제 분석할 문서 내용 추가
+                deadline=self.deadline.at,
+                budget_tokens=budget_tokens,
+                max_tokens=max_tokens
             )
+        except TimeoutError:
+            self._degrade("final_timeout", "최종 분석이 제한 시간 안에 끝나지 않음")
+            return self._deadline_exceeded_message()
         except Exception as e:
             raise AIAnalysisException("final_result", f"최종 결과 생성 실패: {str(e)}")
     
+    def _needs_map_reduce(self, document_content: str) -> bool:
+        """맵리듀스 분석 필요 여부 (문서 토큰 수 기준)"""
+        if not document_content or len(document_content) < AI_CONFIG["map_reduce_threshold_tokens"]:
+            return False
+        return count_tokens(document_content) > AI_CONFIG["map_reduce_threshold_tokens"]
+
+    def _build_document_outline(self, document_content: str, max_chars: int = 1500) -> str:
+        """섹션별 첫 줄로 문서 구조 개요 생성"""
+        sections = split_into_sections(document_content, AI_CONFIG["map_reduce_section_tokens"])
+        lines = []
+        for i, section in enumerate(sections, 1):
+            first_line = section.strip().splitlines()[0][:80] if section.strip() else ""
+            lines.append(f"{i}. {first_line}")
+        return "\n".join(lines)[:max_chars]
+
+    def _generate_map_reduce_result(self, enhanced_prompt: str, internal_refs: List[Dict],
+                                    external_refs: List[Dict], document_content: str) -> str:
+        """맵리듀스 분석: 섹션별 동시 분석(맵) 후 최종 결과로 종합(리듀스)"""
+        sections = split_into_sections(document_content, AI_CONFIG["map_reduce_section_tokens"])
+        total = len(sections)
+        st.info(f"📚 긴 문서를 {total}개 섹션으로 나누어 동시 분석합니다 (최대 {AI_CONFIG['map_reduce_max_parallel']}개 병렬).")
+        
+        section_progress = st.progress(0)
+        section_status = st.empty()
+        
+        def on_section_done(completed: int, total: int):
+            section_progress.progress(completed / total)
+            section_status.text(f"🧩 섹션 분석 {completed}/{total} 완료")
+        
+        section_results = self._map_sections(enhanced_prompt, sections, on_section_done)
+        
+        failed = sum(1 for result in section_results if not result)
+        if failed == total:
+            st.warning("⚠️ 모든 섹션 분석에 실패하여 관련 부분만 골라 한 번에 분석합니다.")
+            section_status.empty()
+            return self._reduce_or_single_pass(enhanced_prompt, section_results, internal_refs, external_refs, document_content)
+        if failed:
+            st.warning(f"⚠️ {failed}개 섹션 분석에 실패하여 나머지 결과로 종합합니다.")
+        
+        # 리듀스 단계
+        section_status.text("🧠 섹션별 분석 결과를 종합하는 중...")
+        try:
+            result = self._reduce_sections(enhanced_prompt, section_results, internal_refs, external_refs)
+        except Exception as e:
+            raise AIAnalysisException("final_result", f"맵리듀스 종합 실패: {str(e)}")
+        section_status.text(f"✅ {total}개 섹션 종합 완료")
+        return result
+
+    def _map_sections(self, enhanced_prompt: str, sections: List[str],
+                      on_section_done: Optional[Callable[[int, int], None]] = None,
+                      is_cancelled: Optional[Callable[[], bool]] = None) -> List[Optional[str]]:
+        """맵 단계: 섹션별 부분 분석을 동시 실행 (동시 실행 수를 제한하여 배포 한도 초과 방지)"""
+        total = len(sections)
+        section_results: List[Optional[str]] = [None] * total
+        completed = 0
+        # 섹션 분석은 리듀스용 시간을 남기고 끝나야 함 (넘긴 섹션은 실패로 처리)
+        # 리듀스는 섹션 결과 전체를 읽고 긴 답을 쓰므로 남은 시간의 일정 비율을 남김
+        reduce_reserve = max(ANALYSIS_DEADLINE_CONFIG["final_reserve_seconds"],
+                             self.deadline.remaining() * ANALYSIS_DEADLINE_CONFIG["reduce_reserve_ratio"])
+        map_deadline = self.deadline.until(reserve=reduce_reserve)
+        
+        executor = ThreadPoolExecutor(max_workers=AI_CONFIG["map_reduce_max_parallel"])
+        try:
+            futures = {
+                executor.submit(self.ai_service.analyze_document_section, enhanced_prompt, section, i + 1, total, map_deadline): i
+                for i, section in enumerate(sections)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    section_results[index] = future.result()
+                except Exception as e:
+                    print(f"섹션 {index + 1} 분석 오류: {e}")
+                completed += 1
+                if is_cancelled and is_cancelled():
+                    raise AnalysisCancelledException("map_reduce")
+                if on_section_done:
+                    on_section_done(completed, total)
+        finally:
+            # 취소/오류 시 아직 시작하지 않은 섹션은 실행하지 않음
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        return section_results
+    
     def _convert_docs_for_ai(self, docs: List[Dict]) -> List[Dict]:
         """문서 관리 서비스의 문서 형식을 AI 서비스 형식으로 변환"""
         converted_docs = []
@@ -251,6 +803,7 @@ class AIAnalysisOrchestrator:
                 "summary": doc.get("summary", ""),
                 "source_detail": f"사내 문서 - {doc.get('filename', 'Unknown')}",
                 "relevance_score": doc.get("search_score", 0.5) / 10 if doc.get("search_score") else 0.5,
+                "rrf_score": doc.get("rrf_score"),
                 "search_type": "company_docs"
             }
             converted_docs.append(converted_doc)
@@ -295,9 +848,84 @@ class AIAnalysisOrchestrator:
                 else:
                     st.markdown("*검색된 외부 자료가 없습니다.*")
     
+    def _semantic_cache_context(self, user_input: str, selection: str, document_content: str,
+                                force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """분석 결과 캐시 비교 키 준비 (캐시를 쓰지 않으면 None)"""
+        if not SEMANTIC_CACHE_CONFIG["enabled"] or self.mode == "quick":
+            return None
+        
+        try:
+            corpus_generation = self.doc_manager.search_service.get_corpus_generation()
+        except Exception as e:
+            print(f"⚠️ 코퍼스 세대 확인 실패, 분석 결과 캐시 생략: {e}")
+            return None
+        
+        # 긴 요청(문서 본문 전체 분석 등)은 질문이 아니라 분석 대상이므로 정확히 같을 때만 재사용
+        target_content = f"{selection}\x00{document_content}"
+        if len(user_input) > SEMANTIC_CACHE_CONFIG["max_request_chars"]:
+            target_content += f"\x00{user_input}"
+        
+        return {
+            'partition': SemanticAnalysisCache.partition_key(
+                f"{self.mode}|{','.join(self.perspectives)}" if self.perspectives else self.mode,
+                corpus_generation, target_content
+            ),
+            'force_refresh': force_refresh,
+            'vectors': {}
+        }
+    
+    def _semantic_cache_find(self, cache_context: Optional[Dict[str, Any]], kind: str,
+                             text: str) -> Optional[Dict[str, Any]]:
+        """유사한 이전 분석 결과 조회 (강제 새로고침이면 저장용 임베딩만 계산)"""
+        if not cache_context:
+            return None
+        
+        cache = get_semantic_cache()
+        vector = cache.embed(text)
+        if vector is None:
+            return None
+        cache_context['vectors'][kind] = (text, vector)
+        if cache_context['force_refresh']:
+            return None
+        
+        hit = cache.lookup(cache_context['partition'], kind, vector)
+        if not hit:
+            return None
+        
+        print(f"♻️ 분석 결과 캐시 적중 ({kind}, 유사도 {hit['similarity']:.3f})")
+        analysis_result = dict(hit['result'])
+        analysis_result['cache'] = {
+            'hit': True,
+            'kind': kind,
+            'similarity': hit['similarity'],
+            'cached_request': hit['request'],
+            'cached_at': hit['created_at']
+        }
+        analysis_result['stage_metrics'] = summarize_stage_records(self.ai_service.stage_records)
+        return analysis_result
+    
+    def _semantic_cache_save(self, cache_context: Optional[Dict[str, Any]], analysis_result: Dict[str, Any]):
+        """분석 결과를 원문 요청/고도화 프롬프트 임베딩 모두로 저장 (생략/축소된 결과는 이후 비슷한 요청에 재사용하지 않음)"""
+        if not cache_context or not cache_context['vectors'] or analysis_result.get('degradations'):
+            return
+        
+        cache = get_semantic_cache()
+        for kind, (text, vector) in cache_context['vectors'].items():
+            cache.put(cache_context['partition'], kind, text, vector, analysis_result)
+    
+    def _show_semantic_cache_hit(self, analysis_result: Dict[str, Any]):
+        """캐시 적중 안내"""
+        cache_info = analysis_result['cache']
+        st.info(
+            f"♻️ 비슷한 이전 요청의 분석 결과를 재사용합니다 (유사도 {cache_info['similarity']:.2f}). "
+            "새로 분석하려면 '캐시 무시하고 새로 분석'을 사용하세요."
+        )
+        with st.expander("🔍 재사용한 이전 요청"):
+            st.markdown(cache_info['cached_request'])
+    
     def _generate_input_hash(self, user_input: str, selection: str = None) -> str:
-        """입력 해시 생성"""
-        combined_input = user_input + (selection or "")
+        """입력 해시 생성 (분석 모드나 관점이 다르면 다른 분석)"""
+        combined_input = self.mode + user_input + (selection or "") + ",".join(self.perspectives or [])
         return hashlib.md5(combined_input.encode()).hexdigest()
     
     def _is_duplicate_analysis(self, input_hash: str) -> bool:
@@ -312,11 +940,13 @@ class AIAnalysisOrchestrator:
             "external": result['external_refs']
         }
         st.session_state.ai_analysis_result = result['result']
+        st.session_state.ai_analysis_perspectives = result.get('perspectives')
     
     def _get_cached_result(self, input_hash: str) -> Dict[str, Any]:
         """캐시된 결과 반환"""
         return {
             'result': st.session_state.get('ai_analysis_result', ''),
             'internal_refs': st.session_state.get('ai_analysis_references', {}).get('internal', []),
-            'external_refs': st.session_state.get('ai_analysis_references', {}).get('external', [])
+            'external_refs': st.session_state.get('ai_analysis_references', {}).get('external', []),
+            'perspectives': st.session_state.get('ai_analysis_perspectives')
         }
\ No newline at end of file
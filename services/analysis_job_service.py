@@ -0,0 +1,254 @@
+"""
+AI 분석 작업 서비스
+워커 풀에서 분석을 실행하고 작업 상태/부분 결과를 SQLite에 저장하여
+Streamlit 스크립트 실행이 분석을 기다리지 않도록 함
+작업은 입장 제어기의 세션별 공정 대기열을 거쳐 자리가 나면 워커 풀에 제출됨
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from config import JOB_CONFIG, ADMISSION_CONFIG
+from core.exceptions import AnalysisCancelledException, AdmissionRejectedException
+from services.admission_controller import get_admission_controller
+from utils.local_store import SQLiteStore, to_json, from_json, get_instance_id
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+class AnalysisJobStore(SQLiteStore):
+    """분석 작업 상태 저장소"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS analysis_jobs (
+        job_id TEXT PRIMARY KEY,
+        session_id TEXT,
+        mode TEXT,
+        status TEXT NOT NULL,
+        step INTEGER DEFAULT 0,
+        message TEXT,
+        partial TEXT,
+        result TEXT,
+        error TEXT,
+        cancel_requested INTEGER DEFAULT 0,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_analysis_jobs_session ON analysis_jobs(session_id, created_at);
+    """
+
+    MIGRATIONS = (
+        ("analysis_jobs", "owner", "TEXT"),  # 작업을 실행하는 인스턴스 (데이터 디렉터리를 여러 인스턴스가 공유)
+    )
+
+    def create(self, job_id: str, session_id: str, mode: str):
+        now = datetime.now().isoformat()
+        self.execute(
+            "INSERT INTO analysis_jobs (job_id, session_id, mode, status, message, owner, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, session_id, mode, JOB_QUEUED, "⏳ 대기 중...", get_instance_id(), now, now)
+        )
+
+    def update(self, job_id: str, **fields):
+        """지정한 컬럼만 갱신 (partial/result는 JSON 직렬화)"""
+        for key in ("partial", "result"):
+            if key in fields:
+                fields[key] = to_json(fields[key])
+        fields["updated_at"] = datetime.now().isoformat()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        self.execute(f"UPDATE analysis_jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.fetch_one("SELECT * FROM analysis_jobs WHERE job_id = ?", (job_id,))
+        return self._decode(row) if row else None
+
+    def list_by_session(self, session_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        rows = self.fetch_all(
+            "SELECT * FROM analysis_jobs WHERE session_id = ? ORDER BY created_at DESC LIMIT ?",
+            (session_id, limit)
+        )
+        return [self._decode(row) for row in rows]
+
+    def mark_interrupted(self) -> int:
+        """이 인스턴스의 이전 프로세스에서 끝나지 못한 작업을 실패 처리 (다른 인스턴스에서 실행 중인 작업은 그대로 둠)"""
+        return self.execute(
+            "UPDATE analysis_jobs SET status = ?, error = ?, updated_at = ? "
+            "WHERE status IN (?, ?) AND (owner = ? OR owner IS NULL)",
+            (JOB_FAILED, "서버 재시작으로 작업이 중단되었습니다.", datetime.now().isoformat(),
+             JOB_QUEUED, JOB_RUNNING, get_instance_id())
+        )
+
+    def purge_older_than(self, hours: int) -> int:
+        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+        return self.execute(
+            "DELETE FROM analysis_jobs WHERE updated_at < ? AND status IN (?, ?, ?)",
+            (cutoff, *FINISHED_STATUSES)
+        )
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        row["partial"] = from_json(row.get("partial"), {})
+        row["result"] = from_json(row.get("result"))
+        row["cancel_requested"] = bool(row.get("cancel_requested"))
+        return row
+
+class AnalysisJobService:
+    """AI 분석 작업 큐 - 제출/상태 조회/취소"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.store = AnalysisJobStore("jobs.db")
+        self.admission = get_admission_controller()
+        # 입장한 작업만 제출하므로 작업자 수는 동시 실행 한도와 같게
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or ADMISSION_CONFIG["max_concurrent"],
+            thread_name_prefix="analysis-job"
+        )
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+        interrupted = self.store.mark_interrupted()
+        if interrupted:
+            print(f"⚠️ 중단된 분석 작업 {interrupted}개를 실패 처리했습니다.")
+        self.store.purge_older_than(JOB_CONFIG["retention_hours"])
+
+    def submit(self, session_id: str, user_input: str, selection: str = "",
+               document_content: str = "", mode: str = "full_document", force_refresh: bool = False) -> str:
+        """
+        분석 작업 제출
+
+        Args:
+            session_id: 요청한 Streamlit 세션 ID
+            user_input: 분석 요청 텍스트
+            selection: 선택된 텍스트
+            document_content: 현재 문서 내용 (워커는 세션 상태에 접근하지 않으므로 미리 전달)
+            mode: 오케스트레이터 모드 ("full_document" / "selected_text")
+            force_refresh: 캐시된 이전 분석 결과를 쓰지 않고 새로 분석
+
+        Returns:
+            작업 ID (대기열이 가득 차면 AdmissionRejectedException)
+        """
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, session_id, mode)
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+
+        try:
+            self.admission.enqueue(
+                session_id, ticket_id=job_id,
+                on_admit=lambda: self.executor.submit(
+                    self._run_job, job_id, user_input, selection, document_content, mode, force_refresh
+                )
+            )
+        except AdmissionRejectedException as e:
+            self.store.update(job_id, status=JOB_FAILED, error=e.message, message="❌ 대기열 초과")
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+            raise
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 조회"""
+        return self.store.get(job_id)
+
+    def get_queue_position(self, job_id: str) -> int:
+        """대기 중인 작업의 대기열 순번 (1부터, 이미 시작했으면 0)"""
+        return self.admission.position(job_id)
+
+    def list_jobs(self, session_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """세션의 최근 작업 목록"""
+        return self.store.list_by_session(session_id, limit)
+
+    def cancel(self, job_id: str) -> bool:
+        """작업 취소 요청 (실행 중인 작업은 다음 단계 경계에서 중단)"""
+        job = self.store.get(job_id)
+        if not job or job["status"] in FINISHED_STATUSES:
+            return False
+
+        self.store.update(job_id, cancel_requested=1, message="🛑 취소 요청됨...")
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event:
+            event.set()
+
+        # 아직 입장하지 않은 작업은 대기열에서 빼고 바로 취소 처리
+        if self.admission.cancel(job_id):
+            self.store.update(job_id, status=JOB_CANCELLED, message="🛑 대기 중 취소됨")
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+        return True
+
+    def is_cancelled(self, job_id: str) -> bool:
+        """취소 요청 여부"""
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event is not None:
+            return event.is_set()
+        job = self.store.get(job_id)
+        return bool(job and job["cancel_requested"])
+
+    def _run_job(self, job_id: str, user_input: str, selection: str, document_content: str, mode: str,
+                 force_refresh: bool = False):
+        """워커 스레드에서 분석 실행"""
+        # 오케스트레이터는 Streamlit을 import하므로 워커에서 지연 로드
+        from services.ai_analysis_orchestrator_refactored import AIAnalysisOrchestrator
+
+        partial: Dict[str, Any] = {}
+        started_at = time.time()
+
+        def on_progress(step: int, message: str, update: Dict[str, Any]):
+            partial.update(update)
+            self.store.update(job_id, step=step, message=message, partial=partial)
+
+        try:
+            if self.is_cancelled(job_id):
+                raise AnalysisCancelledException()
+
+            self.store.update(job_id, status=JOB_RUNNING, message="🚀 분석 시작...")
+            orchestrator = AIAnalysisOrchestrator(mode=mode)
+            result = orchestrator.run_headless(
+                user_input=user_input,
+                selection=selection,
+                document_content=document_content,
+                on_progress=on_progress,
+                is_cancelled=lambda: self.is_cancelled(job_id),
+                force_refresh=force_refresh
+            )
+            self.store.update(
+                job_id, status=JOB_COMPLETED, step=4, result=result,
+                message=f"✅ 분석 완료 ({time.time() - started_at:.1f}초)"
+            )
+            print(f"✅ 분석 작업 완료: {job_id} ({time.time() - started_at:.1f}초)")
+
+        except AnalysisCancelledException as e:
+            self.store.update(job_id, status=JOB_CANCELLED, message=f"🛑 {e.message}")
+
+        except Exception as e:
+            print(f"❌ 분석 작업 실패: {job_id} - {e}")
+            self.store.update(job_id, status=JOB_FAILED, error=str(e), message="❌ 분석 실패")
+
+        finally:
+            self.admission.release(job_id)
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_job_service: Optional[AnalysisJobService] = None
+_job_service_lock = threading.Lock()
+
+def get_analysis_job_service() -> AnalysisJobService:
+    """공유 분석 작업 서비스 반환"""
+    global _job_service
+    if _job_service is None:
+        with _job_service_lock:
+            if _job_service is None:
+                _job_service = AnalysisJobService()
+    return _job_service
@@ -0,0 +1,607 @@
+"""
+문서 백업/복원 서비스
+컨테이너의 모든 Blob(메타데이터 포함)과 검색 인덱스 레코드를 tar 아카이브로 스트리밍 내보내기하고,
+같은 아카이브로 병렬 복원
+
+- 다운로드는 병렬로 임시 파일에 받고, 단일 작성자가 순서대로 아카이브에 추가 (메모리에 파일 전체를 올리지 않음)
+- 항목을 추가할 때마다 아카이브 오프셋을 체크포인트에 기록하여 중단 후 이어서 진행
+- 완성된 아카이브는 컨테이너의 backups/ 아래로 블록 단위 업로드
+
+명령줄 실행:
+    python -m services.backup_service export [--restart]
+    python -m services.backup_service restore <아카이브 경로 또는 backups/ Blob 이름> [--overwrite]
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import BACKUP_CONFIG
+from utils.azure_storage_service import AzureStorageService
+from utils.azure_search_management import AzureSearchService, get_pipeline_version
+from utils.local_store import SQLiteStore, get_app_data_dir, to_json, from_json
+
+ARCHIVE_FORMAT_VERSION = 1
+
+# 아카이브 내부 경로
+BLOB_DIR = "blobs/"
+META_DIR = "meta/"
+INDEX_DIR = "index/"
+MANIFEST_NAME = "manifest.json"
+
+# 실행 종류/상태
+KIND_EXPORT = "export"
+KIND_RESTORE = "restore"
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+
+# 내보내기 단계
+PHASE_BLOBS = "blobs"
+PHASE_INDEX = "index"
+PHASE_UPLOAD = "upload"
+
+class BackupCheckpointStore(SQLiteStore):
+    """백업/복원 실행 및 항목별 처리 체크포인트"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS backup_runs (
+        run_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        phase TEXT,
+        archive_path TEXT NOT NULL,
+        archive_offset INTEGER DEFAULT 0,
+        archive_blob TEXT,
+        stats TEXT,
+        error TEXT,
+        started_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS backup_items (
+        run_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        error TEXT,
+        PRIMARY KEY (run_id, name)
+    );
+    """
+
+    def start_run(self, kind: str, archive_path: str, phase: Optional[str] = None) -> str:
+        run_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        self.execute(
+            "INSERT INTO backup_runs (run_id, kind, status, phase, archive_path, stats, started_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, kind, RUN_RUNNING, phase, archive_path, to_json({}), now, now)
+        )
+        return run_id
+
+    def update_run(self, run_id: str, **fields):
+        if "stats" in fields:
+            fields["stats"] = to_json(fields["stats"])
+        fields["updated_at"] = datetime.now().isoformat()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        self.execute(f"UPDATE backup_runs SET {columns} WHERE run_id = ?", (*fields.values(), run_id))
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self.fetch_one("SELECT * FROM backup_runs WHERE run_id = ?", (run_id,))
+        return self._decode(row) if row else None
+
+    def find_resumable_run(self, kind: str, archive_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """끝나지 않은 최근 실행 (복원은 같은 아카이브일 때만)"""
+        if archive_path:
+            row = self.fetch_one(
+                "SELECT * FROM backup_runs WHERE kind = ? AND status != ? AND archive_path = ? "
+                "ORDER BY started_at DESC LIMIT 1",
+                (kind, RUN_COMPLETED, archive_path)
+            )
+        else:
+            row = self.fetch_one(
+                "SELECT * FROM backup_runs WHERE kind = ? AND status != ? ORDER BY started_at DESC LIMIT 1",
+                (kind, RUN_COMPLETED)
+            )
+        return self._decode(row) if row else None
+
+    def last_run(self, kind: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if kind:
+            row = self.fetch_one(
+                "SELECT * FROM backup_runs WHERE kind = ? ORDER BY started_at DESC LIMIT 1", (kind,)
+            )
+        else:
+            row = self.fetch_one("SELECT * FROM backup_runs ORDER BY started_at DESC LIMIT 1")
+        return self._decode(row) if row else None
+
+    def record_item(self, run_id: str, name: str, error: Optional[str] = None):
+        self.execute(
+            "INSERT OR REPLACE INTO backup_items (run_id, name, error) VALUES (?, ?, ?)",
+            (run_id, name, error)
+        )
+
+    def completed_items(self, run_id: str) -> set:
+        rows = self.fetch_all("SELECT name FROM backup_items WHERE run_id = ? AND error IS NULL", (run_id,))
+        return {row["name"] for row in rows}
+
+    def active_runs(self) -> List[Dict[str, Any]]:
+        return [self._decode(row) for row in self.fetch_all(
+            "SELECT * FROM backup_runs WHERE status = ?", (RUN_RUNNING,)
+        )]
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        row["stats"] = from_json(row.get("stats"), {})
+        return row
+
+class BackupService:
+    """문서 백업/복원 서비스"""
+
+    def __init__(self, storage_service: Optional[AzureStorageService] = None,
+                 search_service: Optional[AzureSearchService] = None):
+        self.storage_service = storage_service or AzureStorageService()
+        self.search_service = search_service or AzureSearchService()
+        self.checkpoints = BackupCheckpointStore("backup.db")
+        self.backup_dir = BACKUP_CONFIG["local_dir"] or get_app_data_dir("backups")
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+    def export_archive(self, resume: bool = True,
+                       progress_callback: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        모든 문서와 인덱스 레코드를 tar 아카이브로 내보내기
+
+        Args:
+            resume: 중단된 이전 내보내기가 있으면 이어서 진행
+            progress_callback: 진행 상황 콜백 (단계, 완료 수, 전체 수)
+
+        Returns:
+            실행 결과 (archive_path, archive_blob, stats)
+        """
+        if not self.storage_service.available:
+            return {"success": False, "errors": ["Azure Storage 서비스를 사용할 수 없습니다"]}
+
+        run = self.checkpoints.find_resumable_run(KIND_EXPORT) if resume else None
+        if run and not os.path.exists(run["archive_path"]):
+            run = None
+        if run:
+            run_id, archive_path = run["run_id"], run["archive_path"]
+            stats = run["stats"]
+            print(f"🔁 중단된 백업 재개: {run_id} (오프셋 {run['archive_offset']:,} bytes)")
+            # 마지막으로 기록을 마친 항목 뒤의 불완전한 데이터를 잘라내고 아카이브 끝 표시를 다시 씀
+            with open(archive_path, "r+b") as f:
+                f.truncate(run["archive_offset"])
+                f.seek(run["archive_offset"])
+                f.write(tarfile.NUL * tarfile.BLOCKSIZE * 2)
+        else:
+            archive_path = os.path.join(self.backup_dir, f"backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.tar")
+            run_id = self.checkpoints.start_run(KIND_EXPORT, archive_path, PHASE_BLOBS)
+            stats = {"blobs": 0, "blob_bytes": 0, "index_records": 0, "failed": 0, "errors": []}
+            open(archive_path, "wb").close()
+            run = self.checkpoints.get_run(run_id)
+
+        work_dir = os.path.join(self.backup_dir, f"work-{run_id}")
+        os.makedirs(work_dir, exist_ok=True)
+
+        try:
+            # 빈 아카이브는 새로 쓰고, 재개할 때는 마지막 항목 뒤에 이어 씀
+            mode = "a" if os.path.getsize(archive_path) else "w"
+            with tarfile.open(archive_path, mode, format=tarfile.PAX_FORMAT) as tar:
+                if run["phase"] == PHASE_BLOBS:
+                    self._export_blobs(tar, run_id, work_dir, stats, progress_callback)
+                    self.checkpoints.update_run(run_id, phase=PHASE_INDEX, stats=stats)
+                    run["phase"] = PHASE_INDEX
+
+                if run["phase"] == PHASE_INDEX:
+                    self._export_index(tar, run_id, work_dir, stats, progress_callback)
+                    self._add_json(tar, MANIFEST_NAME, {
+                        "format_version": ARCHIVE_FORMAT_VERSION,
+                        "created_at": datetime.now().isoformat(),
+                        "container": self.storage_service.container_name,
+                        "index_name": getattr(self.search_service, "index_name", None),
+                        "pipeline_version": get_pipeline_version(),
+                        "stats": {key: value for key, value in stats.items() if key != "errors"}
+                    })
+                    self.checkpoints.update_run(run_id, phase=PHASE_UPLOAD, archive_offset=tar.offset, stats=stats)
+                    run["phase"] = PHASE_UPLOAD
+
+            archive_blob = None
+            if BACKUP_CONFIG["upload_to_container"]:
+                archive_blob = self._upload_archive(archive_path)
+
+            stats["archive_size"] = os.path.getsize(archive_path) if os.path.exists(archive_path) else 0
+            if archive_blob and not BACKUP_CONFIG["keep_local_archive"]:
+                os.remove(archive_path)
+
+            self.checkpoints.update_run(run_id, status=RUN_COMPLETED, archive_blob=archive_blob, stats=stats)
+            return {"success": stats["failed"] == 0, "run_id": run_id, "archive_path": archive_path,
+                    "archive_blob": archive_blob, "stats": stats, "errors": stats["errors"]}
+
+        except Exception as e:
+            print(f"❌ 백업 실패: {e}")
+            self.checkpoints.update_run(run_id, status=RUN_FAILED, error=str(e), stats=stats)
+            return {"success": False, "run_id": run_id, "errors": [str(e)], "stats": stats}
+
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _export_blobs(self, tar: tarfile.TarFile, run_id: str, work_dir: str, stats: Dict[str, Any],
+                      progress_callback: Optional[Callable[[str, int, int], None]]):
+        """Blob을 병렬로 임시 파일에 받고 완료 순서대로 아카이브에 추가"""
+        done = self.checkpoints.completed_items(run_id)
+        blobs = [
+            doc for doc in self.storage_service.list_documents()
+            if not doc["blob_name"].startswith(BACKUP_CONFIG["blob_prefix"])
+        ]
+        pending = [doc for doc in blobs if doc["blob_name"] not in done]
+        completed = len(blobs) - len(pending)
+        max_parallel = BACKUP_CONFIG["max_parallel"]
+
+        def download(doc: Dict[str, Any]) -> str:
+            temp_path = os.path.join(work_dir, uuid.uuid4().hex)
+            if not self.storage_service.download_document_to_file(doc["blob_name"], temp_path, max_concurrency=2):
+                raise RuntimeError("다운로드 실패")
+            return temp_path
+
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            in_flight = {}
+            queue = iter(pending)
+            while True:
+                # 임시 파일이 무한정 쌓이지 않도록 동시 다운로드 수를 제한
+                while len(in_flight) < max_parallel:
+                    doc = next(queue, None)
+                    if doc is None:
+                        break
+                    in_flight[executor.submit(download, doc)] = doc
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    doc = in_flight.pop(future)
+                    try:
+                        temp_path = future.result()
+                        self._add_blob(tar, doc, temp_path)
+                        os.remove(temp_path)
+                        stats["blobs"] += 1
+                        stats["blob_bytes"] += doc["file_size"]
+                        self.checkpoints.record_item(run_id, doc["blob_name"])
+                    except Exception as e:
+                        stats["failed"] += 1
+                        stats["errors"].append(f"{doc['blob_name']}: {e}")
+                        self.checkpoints.record_item(run_id, doc["blob_name"], str(e))
+
+                    completed += 1
+                    self.checkpoints.update_run(run_id, archive_offset=tar.offset, stats=stats)
+                    if progress_callback:
+                        progress_callback(PHASE_BLOBS, completed, len(blobs))
+
+    def _add_blob(self, tar: tarfile.TarFile, doc: Dict[str, Any], temp_path: str):
+        """메타데이터 레코드를 먼저, 이어서 Blob 내용을 추가 (복원 시 메타데이터를 먼저 읽도록)"""
+        self._add_json(tar, f"{META_DIR}{doc['blob_name']}.json", {
+            "blob_name": doc["blob_name"],
+            "metadata": doc.get("metadata", {}),
+            "last_modified": doc.get("last_modified")
+        })
+        info = tarfile.TarInfo(f"{BLOB_DIR}{doc['blob_name']}")
+        info.size = os.path.getsize(temp_path)
+        info.mtime = time.time()
+        with open(temp_path, "rb") as f:
+            tar.addfile(info, f)
+        tar.fileobj.flush()
+
+    def _export_index(self, tar: tarfile.TarFile, run_id: str, work_dir: str, stats: Dict[str, Any],
+                      progress_callback: Optional[Callable[[str, int, int], None]]):
+        """인덱스 레코드를 JSON Lines 파일 단위로 아카이브에 추가"""
+        stats["index_records"] = 0
+        if not self.search_service.available:
+            return
+
+        part_size = BACKUP_CONFIG["index_part_size"]
+        part_number, count = 0, 0
+        part_path = os.path.join(work_dir, "index-part.jsonl")
+        part_file = open(part_path, "w", encoding="utf-8")
+        try:
+            for record in self.search_service.iter_index_documents():
+                part_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                count += 1
+                if count == part_size:
+                    part_file.close()
+                    part_number += 1
+                    self._add_file(tar, f"{INDEX_DIR}part-{part_number:05d}.jsonl", part_path)
+                    stats["index_records"] += count
+                    count = 0
+                    part_file = open(part_path, "w", encoding="utf-8")
+                    if progress_callback:
+                        progress_callback(PHASE_INDEX, stats["index_records"], 0)
+        finally:
+            part_file.close()
+
+        if count:
+            part_number += 1
+            self._add_file(tar, f"{INDEX_DIR}part-{part_number:05d}.jsonl", part_path)
+            stats["index_records"] += count
+
+    def _upload_archive(self, archive_path: str) -> Optional[str]:
+        """완성된 아카이브를 컨테이너에 블록 단위로 업로드"""
+        blob_name = f"{BACKUP_CONFIG['blob_prefix']}{os.path.basename(archive_path)}"
+        with open(archive_path, "rb") as f:
+            result = self.storage_service.upload_blob_stream(
+                blob_name, f, metadata={"document_type": "backup", "created_date": datetime.now().isoformat()}
+            )
+        if not result["success"]:
+            raise RuntimeError(f"아카이브 업로드 실패: {result.get('error')}")
+        return blob_name
+
+    @staticmethod
+    def _add_json(tar: tarfile.TarFile, name: str, value: Any):
+        data = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = time.time()
+        tar.addfile(info, io.BytesIO(data))
+
+    @staticmethod
+    def _add_file(tar: tarfile.TarFile, name: str, path: str):
+        info = tarfile.TarInfo(name)
+        info.size = os.path.getsize(path)
+        info.mtime = time.time()
+        with open(path, "rb") as f:
+            tar.addfile(info, f)
+        tar.fileobj.flush()
+
+    # ------------------------------------------------------------------
+    # 복원
+    # ------------------------------------------------------------------
+    def restore_archive(self, source: str, overwrite: bool = False, resume: bool = True,
+                        progress_callback: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, Any]:
+        """
+        아카이브에서 Blob과 인덱스 레코드 복원 (Blob 업로드는 병렬)
+
+        Args:
+            source: 로컬 아카이브 경로 또는 컨테이너의 아카이브 Blob 이름
+            overwrite: 이미 있는 Blob을 덮어쓸지 여부
+            resume: 같은 아카이브의 중단된 복원이 있으면 이어서 진행
+            progress_callback: 진행 상황 콜백 (단계, 완료 수, 전체 수)
+
+        Returns:
+            실행 결과 (stats)
+        """
+        if not self.storage_service.available:
+            return {"success": False, "errors": ["Azure Storage 서비스를 사용할 수 없습니다"]}
+
+        archive_path = source
+        downloaded = False
+        if not os.path.exists(source):
+            archive_path = os.path.join(self.backup_dir, os.path.basename(source))
+            if not os.path.exists(archive_path):
+                print(f"📥 아카이브 다운로드: {source}")
+                if not self.storage_service.download_document_to_file(source, archive_path):
+                    return {"success": False, "errors": [f"아카이브를 찾을 수 없습니다: {source}"]}
+                downloaded = True
+
+        run = self.checkpoints.find_resumable_run(KIND_RESTORE, archive_path) if resume else None
+        run_id = run["run_id"] if run else self.checkpoints.start_run(KIND_RESTORE, archive_path)
+        done = self.checkpoints.completed_items(run_id) if run else set()
+        stats = {"blobs": 0, "skipped": 0, "already_restored": len(done), "index_records": 0, "failed": 0, "errors": []}
+
+        work_dir = os.path.join(self.backup_dir, f"work-{run_id}")
+        os.makedirs(work_dir, exist_ok=True)
+        max_parallel = BACKUP_CONFIG["max_parallel"]
+        lock = threading.Lock()
+
+        def upload(blob_name: str, temp_path: str, metadata: Dict[str, str]):
+            try:
+                with open(temp_path, "rb") as f:
+                    result = self.storage_service.upload_blob_stream(blob_name, f, metadata, overwrite=overwrite,
+                                                                     max_concurrency=2)
+                error = None if result["success"] else result.get("error", "업로드 실패")
+            except Exception as e:
+                error = str(e)
+            finally:
+                os.remove(temp_path)
+
+            with lock:
+                if error:
+                    stats["failed"] += 1
+                    stats["errors"].append(f"{blob_name}: {error}")
+                elif result["status"] == "skipped":
+                    stats["skipped"] += 1
+                else:
+                    stats["blobs"] += 1
+            self.checkpoints.record_item(run_id, blob_name, error)
+
+        try:
+            pending_meta: Dict[str, Dict[str, str]] = {}
+            with tarfile.open(archive_path, "r:") as tar, ThreadPoolExecutor(max_workers=max_parallel) as executor:
+                in_flight = set()
+                for member in tar:
+                    if member.name.startswith(META_DIR):
+                        record = json.load(tar.extractfile(member))
+                        pending_meta[record["blob_name"]] = record.get("metadata", {})
+
+                    elif member.name.startswith(BLOB_DIR):
+                        blob_name = member.name[len(BLOB_DIR):]
+                        metadata = pending_meta.pop(blob_name, {})
+                        if blob_name in done:
+                            continue
+                        # 아카이브는 순차로 읽고, 임시 파일로 옮긴 뒤 업로드는 병렬로 진행
+                        temp_path = os.path.join(work_dir, uuid.uuid4().hex)
+                        with open(temp_path, "wb") as f:
+                            shutil.copyfileobj(tar.extractfile(member), f, length=1024 * 1024)
+                        if len(in_flight) >= max_parallel:
+                            _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        in_flight.add(executor.submit(upload, blob_name, temp_path, metadata))
+                        if progress_callback:
+                            progress_callback(KIND_RESTORE, stats["blobs"] + stats["skipped"] + stats["failed"], 0)
+
+                    elif member.name.startswith(INDEX_DIR):
+                        if member.name in done or not self.search_service.available:
+                            continue
+                        self._restore_index_part(tar.extractfile(member), stats)
+                        self.checkpoints.record_item(run_id, member.name)
+
+                wait(in_flight)
+
+            self.checkpoints.update_run(run_id, status=RUN_COMPLETED if not stats["failed"] else RUN_FAILED,
+                                        stats=stats)
+            if downloaded and not stats["failed"]:
+                os.remove(archive_path)
+            return {"success": stats["failed"] == 0, "run_id": run_id, "stats": stats, "errors": stats["errors"]}
+
+        except Exception as e:
+            print(f"❌ 복원 실패: {e}")
+            self.checkpoints.update_run(run_id, status=RUN_FAILED, error=str(e), stats=stats)
+            return {"success": False, "run_id": run_id, "errors": [str(e)], "stats": stats}
+
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _restore_index_part(self, part_file, stats: Dict[str, Any]):
+        """JSON Lines 인덱스 레코드를 배치로 업로드"""
+        records = [json.loads(line) for line in part_file if line.strip()]
+        results = self.search_service.upload_search_documents(records)
+        for doc_id, error in results.items():
+            if error:
+                stats["failed"] += 1
+                stats["errors"].append(f"index {doc_id}: {error}")
+            else:
+                stats["index_records"] += 1
+
+    # ------------------------------------------------------------------
+    # 상태/정리
+    # ------------------------------------------------------------------
+    def last_run(self, kind: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """최근 백업/복원 실행 정보"""
+        return self.checkpoints.last_run(kind)
+
+    def cleanup_temp_files(self, max_age_hours: Optional[int] = None) -> Dict[str, int]:
+        """
+        오래된 임시 파일 정리 (백업 작업 디렉터리, 업로드된 로컬 아카이브, 추출/인덱싱 임시 파일)
+
+        Returns:
+            정리 결과 (삭제한 파일 수, 확보한 바이트)
+        """
+        from services.ingestion_queue import get_ingestion_queue
+
+        max_age_hours = max_age_hours or BACKUP_CONFIG["temp_retention_hours"]
+        cutoff = time.time() - max_age_hours * 3600
+        active = {run["run_id"] for run in self.checkpoints.active_runs()}
+        uploaded = {
+            os.path.basename(row["archive_path"]) for row in self.checkpoints.fetch_all(
+                "SELECT archive_path FROM backup_runs WHERE kind = ? AND status = ? AND archive_blob IS NOT NULL",
+                (KIND_EXPORT, RUN_COMPLETED)
+            )
+        }
+        result = {"removed_files": 0, "freed_bytes": 0}
+
+        for name in os.listdir(self.backup_dir):
+            path = os.path.join(self.backup_dir, name)
+            if os.path.getmtime(path) > cutoff:
+                continue
+            # 진행 중인 실행의 작업 디렉터리와 아카이브는 남겨둠 (재개에 필요)
+            if name.startswith("work-") and name[len("work-"):] not in active:
+                result["freed_bytes"] += self._dir_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+                result["removed_files"] += 1
+            elif name in uploaded:
+                result["freed_bytes"] += os.path.getsize(path)
+                os.remove(path)
+                result["removed_files"] += 1
+
+        # 비정상 종료로 남은 PDF 병렬 추출용 임시 파일
+        extraction_tmp = get_app_data_dir("extraction_tmp")
+        for name in os.listdir(extraction_tmp):
+            path = os.path.join(extraction_tmp, name)
+            if os.path.getmtime(path) <= cutoff:
+                result["freed_bytes"] += os.path.getsize(path)
+                os.remove(path)
+                result["removed_files"] += 1
+
+        spool = get_ingestion_queue().cleanup_spool(max_age_hours)
+        result["removed_files"] += spool["removed_files"]
+        result["freed_bytes"] += spool["freed_bytes"]
+
+        # 보관 기간이 지난 완료 큐 항목 정리
+        get_ingestion_queue().purge_completed()
+        return result
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+# 앱 프로세스 내 백그라운드 실행 (한 번에 하나의 백업/복원만)
+_background_thread: Optional[threading.Thread] = None
+_background_lock = threading.Lock()
+
+def start_background(kind: str, service: Optional[BackupService] = None, **kwargs) -> bool:
+    """
+    백업/복원을 백그라운드 스레드로 시작 (Streamlit 스크립트가 기다리지 않도록)
+
+    Returns:
+        시작 여부 (이미 실행 중이면 False)
+    """
+    global _background_thread
+    with _background_lock:
+        if _background_thread is not None and _background_thread.is_alive():
+            return False
+
+        backup_service = service or BackupService()
+
+        def run():
+            if kind == KIND_EXPORT:
+                result = backup_service.export_archive(**kwargs)
+            else:
+                result = backup_service.restore_archive(**kwargs)
+            print(f"{'✅' if result.get('success') else '⚠️'} {kind} 종료: {result.get('stats', {})}")
+
+        _background_thread = threading.Thread(target=run, name=f"backup-{kind}", daemon=True)
+        _background_thread.start()
+        return True
+
+def is_background_running() -> bool:
+    return _background_thread is not None and _background_thread.is_alive()
+
+def main():
+    """명령줄 백업/복원"""
+    parser = argparse.ArgumentParser(description="문서 백업/복원")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="모든 문서와 인덱스 레코드를 아카이브로 내보내기")
+    export_parser.add_argument("--restart", action="store_true", help="중단된 백업을 이어가지 않고 새로 시작")
+    restore_parser = subparsers.add_parser("restore", help="아카이브에서 복원")
+    restore_parser.add_argument("source", help="로컬 아카이브 경로 또는 컨테이너의 아카이브 Blob 이름")
+    restore_parser.add_argument("--overwrite", action="store_true", help="이미 있는 Blob 덮어쓰기")
+    restore_parser.add_argument("--restart", action="store_true", help="중단된 복원을 이어가지 않고 새로 시작")
+    args = parser.parse_args()
+
+    def report(phase: str, completed: int, total: int):
+        print(f"  [{phase}] {completed}/{total or '?'}")
+
+    service = BackupService()
+    if args.command == "export":
+        result = service.export_archive(resume=not args.restart, progress_callback=report)
+    else:
+        result = service.restore_archive(args.source, overwrite=args.overwrite, resume=not args.restart,
+                                         progress_callback=report)
+
+    for error in result.get("errors", []):
+        print(f"❌ {error}")
+    print(f"📊 결과: {to_json({k: v for k, v in result.items() if k != 'errors'})}")
+    return 0 if result.get("success") else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,256 @@
+"""
+문서 일괄 작업 서비스
+여러 file_id에 대한 삭제/태그 변경/재인덱싱/복사를 한 번의 작업으로 처리
+(Storage 목록은 한 번만 조회, 삭제는 Blob Batch와 인덱스 배치, 나머지는 병렬 처리)
+"""
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import BULK_OPERATION_CONFIG
+from utils.azure_storage_service import AzureStorageService
+from utils.azure_search_management import AzureSearchService
+
+class BulkDocumentService:
+    """문서 일괄 작업 - 모든 작업은 문서별 결과를 담은 보고서를 반환"""
+
+    def __init__(self, storage_service: Optional[AzureStorageService] = None,
+                 search_service: Optional[AzureSearchService] = None):
+        self.storage_service = storage_service or AzureStorageService()
+        self.search_service = search_service or AzureSearchService()
+
+    def delete(self, file_ids: List[str]) -> Dict[str, Any]:
+        """
+        문서 일괄 삭제 (Storage + Search)
+
+        Args:
+            file_ids: 삭제할 파일 ID 목록
+
+        Returns:
+            작업 보고서 (items: file_id -> storage_deleted/search_deleted/errors)
+        """
+        docs = self._resolve(file_ids)
+        items = {
+            file_id: {"storage_deleted": False, "search_deleted": False, "errors": []}
+            for file_id in file_ids
+        }
+
+        if self.storage_service.available:
+            blob_results = self.storage_service.delete_documents([doc["blob_name"] for doc in docs.values()])
+            for file_id in file_ids:
+                doc = docs.get(file_id)
+                if not doc:
+                    items[file_id]["errors"].append("Storage에서 문서를 찾을 수 없음")
+                elif blob_results.get(doc["blob_name"]):
+                    items[file_id]["errors"].append(f"Storage에서 삭제 실패: {blob_results[doc['blob_name']]}")
+                else:
+                    items[file_id]["storage_deleted"] = True
+
+        if self.search_service.available:
+            index_results = self.search_service.delete_documents([f"doc_{file_id}" for file_id in file_ids])
+            for file_id in file_ids:
+                error = index_results.get(f"doc_{file_id}", "결과 없음")
+                if error:
+                    items[file_id]["errors"].append(f"Search 인덱스에서 삭제 실패: {error}")
+                else:
+                    items[file_id]["search_deleted"] = True
+
+        for item in items.values():
+            item["success"] = item["storage_deleted"] or item["search_deleted"]
+        return self._report("delete", items)
+
+    def retag(self, file_ids: List[str], add_tags: Optional[List[str]] = None,
+              remove_tags: Optional[List[str]] = None, fields: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        문서 태그/메타데이터 일괄 변경 (Blob 메타데이터의 meta_* 항목)
+
+        Args:
+            file_ids: 대상 파일 ID 목록
+            add_tags: 추가할 태그
+            remove_tags: 제거할 태그
+            fields: 덮어쓸 메타데이터 (예: {"department": "HR"}, 빈 값이면 항목 삭제)
+
+        Returns:
+            작업 보고서 (items: file_id -> tags)
+        """
+        docs = self._resolve(file_ids)
+        add_tags = [self._ascii(tag) for tag in add_tags or [] if self._ascii(tag)]
+        remove_tags = {self._ascii(tag) for tag in remove_tags or []}
+
+        def retag_one(doc: Dict[str, Any]) -> Dict[str, Any]:
+            metadata = dict(doc.get("metadata") or {})
+            tags = [tag.strip() for tag in metadata.get("meta_tags", "").split(",") if tag.strip()]
+            tags = [tag for tag in tags if tag not in remove_tags]
+            tags += [tag for tag in add_tags if tag not in tags]
+            if tags:
+                metadata["meta_tags"] = ", ".join(tags)
+            else:
+                metadata.pop("meta_tags", None)
+
+            for key, value in (fields or {}).items():
+                meta_key = f"meta_{self._ascii(key)}"
+                if self._ascii(value):
+                    metadata[meta_key] = self._ascii(value)
+                else:
+                    metadata.pop(meta_key, None)
+
+            # 목록 조회 시점의 메타데이터를 기준으로 통째로 교체 (문서마다 속성 조회 왕복을 줄임)
+            if not self.storage_service.set_document_metadata(doc["blob_name"], metadata):
+                raise RuntimeError("메타데이터 변경 실패")
+            return {"success": True, "tags": tags}
+
+        items = self._run_parallel(file_ids, docs, retag_one)
+        return self._report("retag", items)
+
+    def reindex(self, file_ids: List[str]) -> Dict[str, Any]:
+        """
+        문서 일괄 재인덱싱 (추출/임베딩은 병렬, 인덱스 업로드는 배치)
+
+        Args:
+            file_ids: 대상 파일 ID 목록
+
+        Returns:
+            작업 보고서
+        """
+        if not self.search_service.available:
+            return self._unavailable(file_ids, "Azure Search 서비스를 사용할 수 없습니다")
+
+        docs = self._resolve(file_ids)
+        built: Dict[str, Dict[str, Any]] = {}
+
+        def build_one(doc: Dict[str, Any]) -> Dict[str, Any]:
+            file_content = self.storage_service.download_document(doc["blob_name"])
+            if file_content is None:
+                raise RuntimeError("문서 다운로드 실패")
+            built[doc["file_id"]] = self.search_service.build_search_document(
+                file_content=file_content,
+                filename=doc["filename"],
+                file_id=doc["file_id"],
+                blob_url=doc["url"]
+            )
+            return {"success": True}
+
+        items = self._run_parallel(file_ids, docs, build_one)
+
+        index_results = self.search_service.upload_search_documents(list(built.values()))
+        for file_id, search_document in built.items():
+            error = index_results.get(search_document["id"], "결과 없음")
+            if error:
+                items[file_id] = {"success": False, "errors": [f"인덱스 업로드 실패: {error}"]}
+        return self._report("reindex", items)
+
+    def copy(self, file_ids: List[str], document_type: Optional[str] = None,
+             metadata: Optional[Dict[str, str]] = None, index: bool = True) -> Dict[str, Any]:
+        """
+        문서 일괄 복사 (Storage 서버 측 복사 후 새 file_id로 인덱싱)
+
+        Args:
+            file_ids: 원본 파일 ID 목록
+            document_type: 복사본 문서 타입 (없으면 원본과 동일)
+            metadata: 복사본에 추가할 메타데이터
+            index: 복사본을 검색 인덱스에 등록할지 여부 (training 문서만)
+
+        Returns:
+            작업 보고서 (items: file_id -> new_file_id)
+        """
+        docs = self._resolve(file_ids)
+        now = datetime.now(timezone.utc)
+
+        def copy_one(doc: Dict[str, Any]) -> Dict[str, Any]:
+            new_file_id = str(uuid.uuid4())
+            target_type = document_type or doc["document_type"]
+            ext = os.path.splitext(doc["blob_name"])[1]
+            blob_name = f"{target_type}/{now.year}/{now.month:02d}/{new_file_id}{ext}"
+
+            copy_metadata = dict(doc.get("metadata") or {})
+            copy_metadata.update({
+                "file_id": new_file_id,
+                "document_type": target_type,
+                "upload_date": now.isoformat(),
+                "copied_from": doc["file_id"]
+            })
+            for key, value in (metadata or {}).items():
+                if self._ascii(key) and self._ascii(value):
+                    copy_metadata[f"meta_{self._ascii(key)}"] = self._ascii(value)
+
+            result = self.storage_service.copy_document(doc["blob_name"], blob_name, copy_metadata)
+            if not result["success"]:
+                raise RuntimeError(result["error"])
+            return {"success": True, "new_file_id": new_file_id, "blob_name": blob_name,
+                    "url": result["url"], "copy_status": result["status"], "document_type": target_type}
+
+        items = self._run_parallel(file_ids, docs, copy_one)
+
+        # 복사본 인덱싱 - 복사가 끝난(success) training 문서만 한 번의 일괄 재인덱싱으로 처리
+        if index and self.search_service.available:
+            copies = {
+                item["new_file_id"]: file_id for file_id, item in items.items()
+                if item.get("success") and item.get("document_type") == "training" and item.get("copy_status") == "success"
+            }
+            if copies:
+                reindex_report = self.reindex(list(copies))
+                for new_file_id, file_id in copies.items():
+                    reindexed = reindex_report["items"].get(new_file_id, {})
+                    items[file_id]["indexed"] = reindexed.get("success", False)
+                    if not reindexed.get("success"):
+                        items[file_id]["errors"] = reindexed.get("errors", [])
+        return self._report("copy", items)
+
+    def _resolve(self, file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Storage 목록을 한 번만 조회하여 file_id -> 문서 정보 매핑"""
+        if not self.storage_service.available:
+            return {}
+        wanted = set(file_ids)
+        return {
+            doc["file_id"]: doc for doc in self.storage_service.list_documents()
+            if doc["file_id"] in wanted
+        }
+
+    def _run_parallel(self, file_ids: List[str], docs: Dict[str, Dict[str, Any]],
+                      func: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """문서별 작업을 병렬 실행하고 문서별 결과 수집 (찾을 수 없는 문서는 실패)"""
+        items: Dict[str, Dict[str, Any]] = {}
+        for file_id in file_ids:
+            if file_id not in docs:
+                items[file_id] = {"success": False, "errors": ["Storage에서 문서를 찾을 수 없음"]}
+
+        targets = [docs[file_id] for file_id in file_ids if file_id in docs]
+        if not targets:
+            return items
+
+        def run(doc: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+            try:
+                return doc["file_id"], func(doc)
+            except Exception as e:
+                return doc["file_id"], {"success": False, "errors": [str(e)]}
+
+        with ThreadPoolExecutor(max_workers=min(len(targets), BULK_OPERATION_CONFIG["max_parallel"])) as executor:
+            for file_id, result in executor.map(run, targets):
+                items[file_id] = result
+        return items
+
+    def _unavailable(self, file_ids: List[str], error: str) -> Dict[str, Any]:
+        return self._report("unavailable", {file_id: {"success": False, "errors": [error]} for file_id in file_ids})
+
+    @staticmethod
+    def _report(operation: str, items: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """문서별 결과를 집계한 작업 보고서"""
+        for item in items.values():
+            item.setdefault("errors", [])
+        succeeded = sum(1 for item in items.values() if item.get("success"))
+        return {
+            "operation": operation,
+            "success": succeeded == len(items),
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "items": items,
+            "errors": [f"{file_id}: {error}" for file_id, item in items.items() for error in item["errors"]]
+        }
+
+    @staticmethod
+    def _ascii(value: Any) -> str:
+        """Blob 메타데이터에 저장 가능한 ASCII 문자열로 변환"""
+        return str(value).encode('ascii', errors='ignore').decode('ascii').strip()
@@ -0,0 +1,52 @@
+"""
+문서 카탈로그
+내용 해시(SHA-256)로 이미 저장/인덱싱된 문서를 찾고, 중복 업로드를 기존 문서에 연결
+"""
+from typing import Any, Dict, Optional
+
+from utils.azure_storage_service import AzureStorageService
+from utils.azure_search_management import AzureSearchService
+
+class DocumentCatalog:
+    """내용 해시 기반 문서 카탈로그 (인덱스 우선, 인덱스를 쓸 수 없으면 Storage 메타데이터)"""
+
+    def __init__(self, storage_service: Optional[AzureStorageService] = None,
+                 search_service: Optional[AzureSearchService] = None):
+        self.storage_service = storage_service or AzureStorageService()
+        self.search_service = search_service or AzureSearchService()
+
+    def find_by_hash(self, content_hash: str, document_type: str = "training") -> Optional[Dict[str, Any]]:
+        """
+        같은 내용의 기존 문서 조회
+
+        Args:
+            content_hash: 파일 내용 SHA-256
+            document_type: 문서 타입
+
+        Returns:
+            {"file_id", "filename", "blob_name"} 또는 None
+        """
+        if not content_hash:
+            return None
+
+        if self.search_service.available:
+            for doc in self.search_service.find_documents_by_content_hash(content_hash, document_type):
+                if doc.get("file_id"):
+                    return {
+                        "file_id": doc["file_id"],
+                        "filename": doc["filename"],
+                        "blob_name": self.storage_service.blob_name_from_url(doc["blob_url"])
+                    }
+            return None
+
+        # 인덱스를 쓸 수 없으면 Storage 메타데이터를 훑어서 비교
+        for doc in self.storage_service.list_documents(document_type):
+            if doc.get("content_sha256") == content_hash and doc["file_id"] != "unknown":
+                return {"file_id": doc["file_id"], "filename": doc["filename"], "blob_name": doc["blob_name"]}
+        return None
+
+    def link_duplicate(self, existing: Dict[str, Any], filename: str, metadata: Optional[Dict] = None) -> bool:
+        """중복 업로드의 메타데이터를 기존 문서에 병합"""
+        if not existing.get("blob_name"):
+            return False
+        return self.storage_service.merge_document_metadata(existing["blob_name"], metadata, filename)
@@ -3,20 +3,62 @@
 Azure Storage + Azure AI Search 연동
 """
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
 import json
 import uuid
+import hashlib
+import threading
 from datetime import datetime
 import streamlit as st
 
+from config import RETRIEVAL_CONFIG, INGESTION_CONFIG, QUICK_ANALYSIS_CONFIG, DOCUMENT_LIST_CACHE_CONFIG
+from core.utils import reciprocal_rank_fusion, TTLCache
+from services.bulk_document_service import BulkDocumentService
+from services.document_catalog import DocumentCatalog
 from utils.azure_storage_service import AzureStorageService
 from utils.azure_search_management import AzureSearchService
+from utils.fingerprint import collapse_near_duplicates
+from utils.openai_client import PRIORITY_INTERACTIVE
+from utils.text_extraction import get_extraction_cache, PARSED_EXTENSIONS
+
+# 빠른 분석용 사내 검색 결과 캐시 (프로세스 내 모든 세션이 공유)
+_fast_search_cache = TTLCache(ttl_seconds=QUICK_ANALYSIS_CONFIG["search_cache_ttl_seconds"], max_size=256)
+
+# 쿼리별 사내 검색 결과 캐시 (편집 중 선행 검색 결과를 분석 3단계에서 재사용, 모든 세션 공유)
+_retrieval_cache = TTLCache(ttl_seconds=RETRIEVAL_CONFIG["cache_ttl_seconds"], max_size=RETRIEVAL_CONFIG["cache_max_entries"])
+
+# 문서 목록/통계 캐시 (홈/관리 화면 재실행마다 Storage·Search를 다시 조회하지 않도록 모든 세션 공유)
+_listing_cache = TTLCache(ttl_seconds=DOCUMENT_LIST_CACHE_CONFIG["ttl_seconds"], max_size=8)
+
+def clear_listing_cache():
+    """문서 목록/통계 캐시 비움 (목록 새로고침 시)"""
+    _listing_cache.clear()
+
+def _invalidates_listings(method):
+    """문서를 추가/변경/삭제하는 메서드 - 끝나면 목록/통계 캐시 비움"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        finally:
+            clear_listing_cache()
+    return wrapper
 
 class DocumentManagementService:
     def __init__(self):
         self.storage_service = AzureStorageService()
         self.search_service = AzureSearchService()
-        self.is_available = self.storage_service.available or self.search_service.available
+        self.catalog = DocumentCatalog(self.storage_service, self.search_service)
+        self.bulk = BulkDocumentService(self.storage_service, self.search_service)
     
+    @property
+    def is_available(self) -> bool:
+        """Storage 또는 Search 중 하나라도 사용 가능 (서킷 브레이커 상태를 매번 반영)"""
+        return self.storage_service.available or self.search_service.available
+    
+    @_invalidates_listings
     def upload_training_document(self, file_content: bytes, filename: str, 
                                 metadata: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -34,18 +76,30 @@ class DocumentManagementService:
             "filename": filename,
             "storage_result": None,
             "search_result": None,
+            "duplicate_of": None,
             "success": False,
             "errors": []
         }
         
         try:
+            content_hash = hashlib.sha256(file_content).hexdigest()
+            
+            # 같은 내용의 문서가 이미 있으면 저장/인덱싱 없이 기존 문서에 연결
+            if INGESTION_CONFIG["dedupe_uploads"]:
+                existing = self.catalog.find_by_hash(content_hash)
+                if existing and self.catalog.link_duplicate(existing, filename, metadata):
+                    results["duplicate_of"] = existing["file_id"]
+                    results["success"] = True
+                    return results
+            
             # 1단계: Azure Storage에 업로드
             if self.storage_service.available:
                 storage_result = self.storage_service.upload_document(
                     file_content=file_content,
                     filename=filename,
                     document_type="training",
-                    metadata=metadata
+                    metadata=metadata,
+                    content_hash=content_hash
                 )
                 results["storage_result"] = storage_result
                 
@@ -60,7 +114,8 @@ class DocumentManagementService:
                             filename=filename,
                             file_id=file_id,
                             blob_url=blob_url,
-                            metadata=metadata
+                            metadata=metadata,
+                            content_hash=content_hash
                         )
                         results["search_result"] = search_result
                         
@@ -82,6 +137,7 @@ class DocumentManagementService:
             results["errors"].append(f"업로드 중 예외 발생: {str(e)}")
             return results
     
+    @_invalidates_listings
     def save_generated_document(self, content: str, title: str, 
                               document_id: Optional[str] = None,
                               metadata: Optional[Dict] = None) -> Dict[str, Any]:
@@ -163,23 +219,38 @@ class DocumentManagementService:
             results["errors"].append(f"저장 중 예외 발생: {str(e)}")
             return results
     
-    def search_training_documents(self, query: str, top: int = 10) -> List[Dict[str, Any]]:
+    def search_training_documents(self, query: str, top: int = 10,
+                                  priority: int = PRIORITY_INTERACTIVE) -> List[Dict[str, Any]]:
         """
         사내 학습 문서 검색
         
         Args:
             query: 검색 쿼리
             top: 반환할 결과 수
+            priority: 쿼리 임베딩 우선순위 레인 (선행 검색은 PRIORITY_BACKGROUND)
             
         Returns:
-            검색 결과 목록
+            검색 결과 목록 (거의 같은 내용의 문서는 하나로 묶음)
         """
         if self.search_service.available:
-            return self.search_service.search_documents(
-                query=query,
-                top=top,
-                document_type="training"
+            # 코퍼스 세대를 키에 포함해 문서가 추가/삭제되면 이전 결과를 쓰지 않음
+            cache_key = (" ".join(query.lower().split()), top, self.search_service.get_corpus_generation())
+            cached = _retrieval_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            documents = collapse_near_duplicates(
+                self.search_service.search_documents(
+                    query=query,
+                    top=top,
+                    document_type="training",
+                    priority=priority
+                ),
+                max_distance=RETRIEVAL_CONFIG["near_duplicate_max_distance"]
             )
+            if documents:
+                _retrieval_cache.set(cache_key, documents)
+            return documents
         else:
             # 폴백: Storage 메타데이터 기반 검색
             if self.storage_service.available:
@@ -189,14 +260,130 @@ class DocumentManagementService:
                 )
             else:
                 return []
+
+    def search_training_documents_fast(self, query: str, top: int = 3) -> List[Dict[str, Any]]:
+        """
+        빠른 분석용 사내 학습 문서 검색 (캐시 우선, 키워드 검색만 - 쿼리 임베딩/시맨틱 재순위 생략)
+        
+        Args:
+            query: 검색 쿼리
+            top: 반환할 결과 수
+            
+        Returns:
+            검색 결과 목록
+        """
+        cache_key = (" ".join(query.lower().split()), top)
+        cached = _fast_search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if self.search_service.available:
+            documents = collapse_near_duplicates(
+                self.search_service.search_documents(
+                    query=query,
+                    top=top,
+                    document_type="training",
+                    use_semantic=False,
+                    use_vector=False
+                ),
+                max_distance=RETRIEVAL_CONFIG["near_duplicate_max_distance"]
+            )
+        else:
+            documents = self.search_training_documents(query, top)
+        
+        _fast_search_cache.set(cache_key, documents)
+        return documents
+
+    def search_training_documents_multi(self, queries: List[str],
+                                        top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        다중 쿼리 사내 학습 문서 검색 (동시 실행 + RRF 융합)
+
+        Args:
+            queries: 서브 쿼리 목록
+            top: 융합 후 반환할 결과 수
+
+        Returns:
+            RRF 점수 순으로 정렬되고 중복 제거된 검색 결과 목록
+        """
+        # 빈 쿼리 및 중복 쿼리 제거 (순서 유지)
+        unique_queries = []
+        for query in queries:
+            if query and query.strip() and query.strip() not in unique_queries:
+                unique_queries.append(query.strip())
+
+        if not unique_queries:
+            return []
+
+        top = top or RETRIEVAL_CONFIG["fused_top"]
+        per_query_top = RETRIEVAL_CONFIG["per_query_top"]
+
+        if len(unique_queries) == 1:
+            return self.search_training_documents(unique_queries[0], top=top)
+
+        # 서브 쿼리를 동시에 실행하여 전체 소요 시간을 단일 검색 수준으로 유지
+        result_lists = []
+        max_workers = min(len(unique_queries), RETRIEVAL_CONFIG["max_parallel_searches"])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.search_training_documents, query, per_query_top)
+                for query in unique_queries
+            ]
+            for future in futures:
+                try:
+                    result_lists.append(future.result())
+                except Exception as e:
+                    print(f"서브 쿼리 검색 실패: {e}")
+
+        # 서브 쿼리마다 다른 사본이 잡힐 수 있으므로 융합 후 한 번 더 유사 문서 묶음
+        fused = reciprocal_rank_fusion(
+            result_lists,
+            k=RETRIEVAL_CONFIG["rrf_k"],
+            key_func=self._retrieval_key
+        )
+        return collapse_near_duplicates(
+            fused, max_distance=RETRIEVAL_CONFIG["near_duplicate_max_distance"]
+        )[:top]
+
+    @staticmethod
+    def _retrieval_key(doc: Dict[str, Any]) -> Optional[str]:
+        """검색 결과 중복 제거 키 (file_id + 청크)"""
+        file_id = doc.get("file_id") or ""
+        chunk_id = doc.get("chunk_id") or doc.get("id") or ""
+        if not file_id and not chunk_id:
+            return None
+        return f"{file_id}:{chunk_id}"
+
+    @staticmethod
+    def _needs_extraction(filename: str) -> bool:
+        """바로 디코딩할 수 없고 파싱이 필요한 문서(PDF/Word)인지 여부"""
+        return '.' in filename and filename.lower().rsplit('.', 1)[-1] in PARSED_EXTENSIONS
+
+    def _cached_listing(self, key: str, loader, use_cache: bool):
+        """목록/통계 캐시 조회 (오류가 담긴 결과는 캐시하지 않고, 호출 측이 고쳐도 되도록 복사본 반환)"""
+        if use_cache:
+            cached = _listing_cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+        
+        result = loader()
+        if not (isinstance(result, dict) and result.get("error")):
+            _listing_cache.set(key, result)
+        return copy.deepcopy(result)
     
-    def list_training_documents(self) -> List[Dict[str, Any]]:
+    def list_training_documents(self, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         모든 사내 학습 문서 목록 조회
         
+        Args:
+            use_cache: 공유 캐시 사용 여부 (False면 다시 조회해 캐시 갱신)
+            
         Returns:
             문서 목록
         """
+        return self._cached_listing("training_documents", self._load_training_documents, use_cache)
+    
+    def _load_training_documents(self) -> List[Dict[str, Any]]:
         documents = []
         
         # Azure Search에서 조회 시도
@@ -246,13 +433,19 @@ class DocumentManagementService:
         documents.sort(key=lambda x: x["upload_date"], reverse=True)
         return documents
     
-    def list_generated_documents(self) -> List[Dict[str, Any]]:
+    def list_generated_documents(self, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         생성된 문서 목록 조회
         
+        Args:
+            use_cache: 공유 캐시 사용 여부 (False면 다시 조회해 캐시 갱신)
+            
         Returns:
             문서 목록
         """
+        return self._cached_listing("generated_documents", self._load_generated_documents, use_cache)
+    
+    def _load_generated_documents(self) -> List[Dict[str, Any]]:
         if not self.storage_service.available:
             return []
         
@@ -280,12 +473,13 @@ class DocumentManagementService:
             print(f"생성 문서 목록 조회 실패: {e}")
             return []
     
-    def get_document_content(self, file_id: str) -> Optional[str]:
+    def get_document_content(self, file_id: str, max_bytes: Optional[int] = None) -> Optional[str]:
         """
-        문서 내용 조회
+        문서 내용 조회 (청크 단위로 받아 디코딩)
         
         Args:
             file_id: 파일 ID
+            max_bytes: 앞부분만 필요할 때 읽을 최대 바이트 수 (미리보기 등)
             
         Returns:
             문서 내용 또는 None
@@ -301,11 +495,24 @@ class DocumentManagementService:
                         target_doc = doc
                         break
                 
+                if target_doc and self._needs_extraction(target_doc["filename"]):
+                    # PDF/Word 등은 추출 결과 캐시 사용 (캐시에 없을 때만 내려받아 추출)
+                    extraction = get_extraction_cache().lookup(target_doc.get("content_sha256"), target_doc["filename"])
+                    if extraction is None:
+                        file_content = self.storage_service.download_document(target_doc["blob_name"])
+                        if file_content is None:
+                            return None
+                        extraction = get_extraction_cache().get_or_extract(
+                            file_content, target_doc["filename"], target_doc.get("content_sha256")
+                        )
+                    content = extraction["text"]
+                    return content[:max_bytes] if max_bytes else content
+                
                 if target_doc:
-                    # 파일 다운로드
-                    file_content = self.storage_service.download_document(target_doc["blob_name"])
-                    if file_content:
-                        return file_content.decode('utf-8', errors='ignore')
+                    # 파일 다운로드 (스트리밍 디코딩으로 bytes 전체 사본을 만들지 않음)
+                    content = self.storage_service.read_document_text(target_doc["blob_name"], max_bytes=max_bytes)
+                    if content:
+                        return content
             
             return None
             
@@ -313,6 +520,7 @@ class DocumentManagementService:
             print(f"문서 내용 조회 실패: {e}")
             return None
     
+    @_invalidates_listings
     def delete_document(self, file_id: str) -> Dict[str, Any]:
         """
         문서 삭제 (Storage + Search)
@@ -323,58 +531,117 @@ class DocumentManagementService:
         Returns:
             삭제 결과
         """
-        results = {
-            "file_id": file_id,
-            "storage_deleted": False,
-            "search_deleted": False,
-            "success": False,
-            "errors": []
-        }
-        
         try:
-            # Storage에서 삭제할 문서 찾기
-            if self.storage_service.available:
-                documents = self.storage_service.list_documents()
-                target_doc = None
-                
-                for doc in documents:
-                    if doc["file_id"] == file_id:
-                        target_doc = doc
-                        break
-                
-                if target_doc:
-                    # Storage에서 삭제
-                    storage_deleted = self.storage_service.delete_document(target_doc["blob_name"])
-                    results["storage_deleted"] = storage_deleted
-                    
-                    if not storage_deleted:
-                        results["errors"].append("Storage에서 삭제 실패")
-                else:
-                    results["errors"].append("Storage에서 문서를 찾을 수 없음")
+            item = self.bulk.delete([file_id])["items"][file_id]
+            return {"file_id": file_id, **item}
             
-            # Search에서 삭제
-            if self.search_service.available:
-                search_doc_id = f"doc_{file_id}"
-                search_deleted = self.search_service.delete_document(search_doc_id)
-                results["search_deleted"] = search_deleted
-                
-                if not search_deleted:
-                    results["errors"].append("Search 인덱스에서 삭제 실패")
+        except Exception as e:
+            return {
+                "file_id": file_id,
+                "storage_deleted": False,
+                "search_deleted": False,
+                "success": False,
+                "errors": [f"삭제 중 예외 발생: {str(e)}"]
+            }
+    
+    @_invalidates_listings
+    def bulk_delete_documents(self, file_ids: List[str]) -> Dict[str, Any]:
+        """
+        문서 일괄 삭제 (Blob Batch + 인덱스 배치 삭제)
+        
+        Args:
+            file_ids: 파일 ID 목록
             
-            results["success"] = results["storage_deleted"] or results["search_deleted"]
-            return results
+        Returns:
+            작업 보고서 (문서별 결과 포함)
+        """
+        return self.bulk.delete(file_ids)
+    
+    @_invalidates_listings
+    def bulk_retag_documents(self, file_ids: List[str], add_tags: Optional[List[str]] = None,
+                             remove_tags: Optional[List[str]] = None,
+                             fields: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        문서 태그/메타데이터 일괄 변경
+        
+        Args:
+            file_ids: 파일 ID 목록
+            add_tags: 추가할 태그
+            remove_tags: 제거할 태그
+            fields: 덮어쓸 메타데이터 (빈 값이면 항목 삭제)
             
-        except Exception as e:
-            results["errors"].append(f"삭제 중 예외 발생: {str(e)}")
-            return results
+        Returns:
+            작업 보고서 (문서별 결과 포함)
+        """
+        return self.bulk.retag(file_ids, add_tags=add_tags, remove_tags=remove_tags, fields=fields)
+    
+    @_invalidates_listings
+    def bulk_reindex_documents(self, file_ids: List[str]) -> Dict[str, Any]:
+        """
+        지정한 문서만 다시 추출/임베딩하여 인덱스에 배치 업로드
+        
+        Args:
+            file_ids: 파일 ID 목록
+            
+        Returns:
+            작업 보고서 (문서별 결과 포함)
+        """
+        return self.bulk.reindex(file_ids)
+    
+    @_invalidates_listings
+    def bulk_copy_documents(self, file_ids: List[str], document_type: Optional[str] = None,
+                            metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        문서 일괄 복사 (서버 측 복사 후 새 파일 ID로 인덱싱)
+        
+        Args:
+            file_ids: 파일 ID 목록
+            document_type: 복사본 문서 타입 (없으면 원본과 동일)
+            metadata: 복사본에 추가할 메타데이터
+            
+        Returns:
+            작업 보고서 (문서별 결과 포함)
+        """
+        return self.bulk.copy(file_ids, document_type=document_type, metadata=metadata)
     
-    def get_statistics(self) -> Dict[str, Any]:
+    @_invalidates_listings
+    def reindex_documents(self, force: bool = False, dry_run: bool = False,
+                          prune_orphans: bool = False, progress_callback=None) -> Dict[str, Any]:
+        """
+        변경된 사내 문서만 증분 재인덱싱
+        
+        Args:
+            force: 변경 여부와 관계없이 모두 재인덱싱
+            dry_run: 대상만 계산
+            prune_orphans: Storage에 없는 인덱스 문서 삭제
+            progress_callback: 진행 상황 콜백 (완료 수, 전체 수, 통계)
+            
+        Returns:
+            재인덱싱 통계
+        """
+        from services.reindex_service import ReindexService
+        
+        reindex_service = ReindexService(self.storage_service, self.search_service)
+        return reindex_service.run(
+            force=force,
+            dry_run=dry_run,
+            prune_orphans=prune_orphans,
+            progress_callback=progress_callback
+        )
+    
+    def get_statistics(self, use_cache: bool = True) -> Dict[str, Any]:
         """
         문서 관리 통계 정보
         
+        Args:
+            use_cache: 공유 캐시 사용 여부 (False면 다시 조회해 캐시 갱신)
+            
         Returns:
             통계 정보
         """
+        return self._cached_listing("statistics", self._load_statistics, use_cache)
+    
+    def _load_statistics(self) -> Dict[str, Any]:
         stats = {
             "storage_available": self.storage_service.available,
             "search_available": self.search_service.available,
@@ -422,4 +689,17 @@ class DocumentManagementService:
                 "has_embedding": getattr(self.search_service, 'openai_client', None) is not None
             },
             "overall_available": self.is_available
-        }
\ No newline at end of file
+        }
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 Storage/Search 클라이언트와 연결 풀을 공유)
+_document_manager: Optional[DocumentManagementService] = None
+_document_manager_lock = threading.Lock()
+
+def get_document_manager() -> DocumentManagementService:
+    """공유 문서 관리 서비스 반환"""
+    global _document_manager
+    if _document_manager is None:
+        with _document_manager_lock:
+            if _document_manager is None:
+                _document_manager = DocumentManagementService()
+    return _document_manager
@@ -0,0 +1,272 @@
+"""
+문서 인덱싱(ingestion) 큐
+업로드된 파일을 로컬 스풀 디렉터리에 저장하고 SQLite 큐에 등록하여
+저장(Storage) → 텍스트 추출/임베딩/인덱싱(Search) 과정을 워커가 처리하도록 함
+"""
+import io
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+from config import INGESTION_CONFIG
+from utils.fingerprint import hash_stream
+from utils.local_store import SQLiteStore, get_app_data_dir, to_json, from_json
+
+# 항목 상태
+ITEM_QUEUED = "queued"
+ITEM_PROCESSING = "processing"
+ITEM_COMPLETED = "completed"
+ITEM_FAILED = "failed"
+ITEM_DUPLICATE = "duplicate"  # 같은 내용의 기존 문서에 연결됨 (저장/인덱싱 생략)
+
+# 처리 단계
+STAGE_STORAGE = "storage"
+STAGE_INDEXING = "indexing"
+
+class IngestionQueue(SQLiteStore):
+    """SQLite 기반 내구성 인덱싱 큐 (여러 워커 프로세스가 공유 가능)"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ingestion_items (
+        item_id TEXT PRIMARY KEY,
+        batch_id TEXT,
+        session_id TEXT,
+        filename TEXT NOT NULL,
+        spool_path TEXT NOT NULL,
+        file_size INTEGER,
+        metadata TEXT,
+        status TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        attempts INTEGER DEFAULT 0,
+        next_attempt_at REAL DEFAULT 0,
+        lease_until REAL DEFAULT 0,
+        worker_id TEXT,
+        blob_name TEXT,
+        blob_url TEXT,
+        content_hash TEXT,
+        duplicate_of TEXT,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_ingestion_status ON ingestion_items(status, next_attempt_at);
+    CREATE INDEX IF NOT EXISTS idx_ingestion_batch ON ingestion_items(batch_id);
+    """
+
+    MIGRATIONS = (
+        ("ingestion_items", "content_hash", "TEXT"),
+        ("ingestion_items", "duplicate_of", "TEXT"),
+    )
+
+    def __init__(self):
+        super().__init__("ingestion.db")
+        self.execute("CREATE INDEX IF NOT EXISTS idx_ingestion_hash ON ingestion_items(content_hash)")
+        self.spool_dir = get_app_data_dir("ingestion_spool")
+
+    def enqueue(self, source: Union[bytes, BinaryIO], filename: str, metadata: Optional[Dict] = None,
+                batch_id: Optional[str] = None, session_id: Optional[str] = None) -> str:
+        """
+        파일을 스풀에 저장하고 큐에 등록
+
+        파일 ID(item_id)를 등록 시점에 정하므로 재시도해도 같은 Blob/검색 문서를 덮어써 중복이 생기지 않는다.
+        스풀에 기록하면서 SHA-256을 함께 계산하고, 같은 내용의 항목이 이미 큐에 있으면 그 항목에 연결해 둔다.
+
+        Args:
+            source: 파일 내용 (bytes 또는 읽기 가능한 바이너리 스트림)
+
+        Returns:
+            항목 ID (= 파일 ID)
+        """
+        item_id = str(uuid.uuid4())
+        ext = os.path.splitext(filename)[1].lower()
+        spool_path = os.path.join(self.spool_dir, f"{item_id}{ext}")
+
+        # 임시 파일에 쓴 뒤 교체하여 부분 기록된 파일이 처리되지 않도록 함
+        temp_path = spool_path + ".part"
+        with open(temp_path, "wb") as f:
+            if isinstance(source, (bytes, bytearray)):
+                source = io.BytesIO(source)
+            elif hasattr(source, "seek"):
+                source.seek(0)
+            content_hash, file_size = hash_stream(source, sink=f)
+        os.replace(temp_path, spool_path)
+
+        duplicate_of = None
+        if INGESTION_CONFIG["dedupe_uploads"]:
+            canonical = self.find_by_hash(content_hash)
+            duplicate_of = canonical["item_id"] if canonical else None
+
+        now = datetime.now().isoformat()
+        self.execute(
+            "INSERT INTO ingestion_items (item_id, batch_id, session_id, filename, spool_path, file_size, "
+            "metadata, status, stage, content_hash, duplicate_of, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (item_id, batch_id, session_id, filename, spool_path, file_size,
+             to_json(metadata or {}), ITEM_QUEUED, STAGE_STORAGE, content_hash, duplicate_of, now, now)
+        )
+        return item_id
+
+    def find_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """같은 내용으로 먼저 등록되어 처리 중이거나 완료된 원본 항목 (중복 연결 대상)"""
+        row = self.fetch_one(
+            "SELECT * FROM ingestion_items WHERE content_hash = ? AND duplicate_of IS NULL AND status IN (?, ?, ?) "
+            "ORDER BY created_at LIMIT 1",
+            (content_hash, ITEM_QUEUED, ITEM_PROCESSING, ITEM_COMPLETED)
+        )
+        return self._decode(row) if row else None
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """처리할 항목 하나를 점유 (점유 기간이 만료된 처리 중 항목도 재처리 대상)"""
+        now = time.time()
+        candidates = self.fetch_all(
+            "SELECT item_id, status, lease_until FROM ingestion_items "
+            "WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until < ?) "
+            "ORDER BY created_at LIMIT 5",
+            (ITEM_QUEUED, now, ITEM_PROCESSING, now)
+        )
+        for candidate in candidates:
+            # 조건부 UPDATE로 다른 워커와의 경쟁 방지
+            claimed = self.execute(
+                "UPDATE ingestion_items SET status = ?, worker_id = ?, lease_until = ?, updated_at = ? "
+                "WHERE item_id = ? AND status = ? AND lease_until = ?",
+                (ITEM_PROCESSING, worker_id, now + INGESTION_CONFIG["lease_seconds"], datetime.now().isoformat(),
+                 candidate["item_id"], candidate["status"], candidate["lease_until"])
+            )
+            if claimed:
+                return self.get(candidate["item_id"])
+        return None
+
+    def update(self, item_id: str, **fields):
+        if "metadata" in fields:
+            fields["metadata"] = to_json(fields["metadata"])
+        fields["updated_at"] = datetime.now().isoformat()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        self.execute(f"UPDATE ingestion_items SET {columns} WHERE item_id = ?", (*fields.values(), item_id))
+
+    def mark_stored(self, item_id: str, blob_name: str, blob_url: str):
+        """저장 단계 완료 기록 (재시도 시 인덱싱 단계부터 재개)"""
+        self.update(item_id, stage=STAGE_INDEXING, blob_name=blob_name, blob_url=blob_url)
+
+    def mark_completed(self, item_id: str):
+        item = self.get(item_id)
+        self.update(item_id, status=ITEM_COMPLETED, error=None, lease_until=0)
+        if item:
+            self._remove_spool_file(item["spool_path"])
+
+    def mark_duplicate(self, item_id: str, file_id: str):
+        """기존 문서에 연결된 중복 항목으로 완료 처리"""
+        item = self.get(item_id)
+        self.update(item_id, status=ITEM_DUPLICATE, duplicate_of=file_id, error=None, lease_until=0)
+        if item:
+            self._remove_spool_file(item["spool_path"])
+
+    def defer(self, item_id: str, seconds: float):
+        """시도 횟수를 늘리지 않고 나중에 다시 처리 (원본 항목 처리 대기 등)"""
+        self.update(item_id, status=ITEM_QUEUED, next_attempt_at=time.time() + seconds, lease_until=0)
+
+    def mark_failed(self, item_id: str, error: str):
+        """실패 기록 - 최대 시도 횟수 전까지는 지수 백오프 후 재시도"""
+        item = self.get(item_id)
+        if not item:
+            return
+        attempts = item["attempts"] + 1
+        if attempts >= INGESTION_CONFIG["max_attempts"]:
+            self.update(item_id, status=ITEM_FAILED, attempts=attempts, error=error, lease_until=0)
+        else:
+            delay = INGESTION_CONFIG["retry_base_seconds"] * (2 ** (attempts - 1))
+            self.update(item_id, status=ITEM_QUEUED, attempts=attempts, error=error,
+                        next_attempt_at=time.time() + delay, lease_until=0)
+
+    def retry(self, item_id: str) -> bool:
+        """실패한 항목을 다시 큐에 등록"""
+        return bool(self.execute(
+            "UPDATE ingestion_items SET status = ?, attempts = 0, next_attempt_at = 0, updated_at = ? "
+            "WHERE item_id = ? AND status = ?",
+            (ITEM_QUEUED, datetime.now().isoformat(), item_id, ITEM_FAILED)
+        ))
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        row = self.fetch_one("SELECT * FROM ingestion_items WHERE item_id = ?", (item_id,))
+        return self._decode(row) if row else None
+
+    def read_content(self, item: Dict[str, Any]) -> bytes:
+        with open(item["spool_path"], "rb") as f:
+            return f.read()
+
+    def open_content(self, item: Dict[str, Any]) -> BinaryIO:
+        """스풀 파일을 스트림으로 열기 (호출한 쪽에서 닫음)"""
+        return open(item["spool_path"], "rb")
+
+    def list_items(self, session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """최근 항목 목록 (session_id 지정 시 해당 세션 항목만)"""
+        if session_id:
+            rows = self.fetch_all(
+                "SELECT * FROM ingestion_items WHERE session_id = ? ORDER BY created_at DESC LIMIT ?",
+                (session_id, limit)
+            )
+        else:
+            rows = self.fetch_all("SELECT * FROM ingestion_items ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [self._decode(row) for row in rows]
+
+    def get_counts(self) -> Dict[str, int]:
+        """상태별 항목 수"""
+        rows = self.fetch_all("SELECT status, COUNT(*) AS count FROM ingestion_items GROUP BY status")
+        return {row["status"]: row["count"] for row in rows}
+
+    def purge_completed(self, hours: int = None) -> int:
+        """보관 기간이 지난 완료 항목 삭제"""
+        hours = hours or INGESTION_CONFIG["retention_hours"]
+        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+        return self.execute(
+            "DELETE FROM ingestion_items WHERE status IN (?, ?) AND updated_at < ?",
+            (ITEM_COMPLETED, ITEM_DUPLICATE, cutoff)
+        )
+
+    def cleanup_spool(self, hours: int = None) -> Dict[str, int]:
+        """큐에 없는 스풀 파일과 중단된 업로드의 .part 파일 중 오래된 것 삭제"""
+        hours = hours or INGESTION_CONFIG["retention_hours"]
+        cutoff = time.time() - hours * 3600
+        referenced = {
+            os.path.basename(row["spool_path"]) for row in self.fetch_all(
+                "SELECT spool_path FROM ingestion_items WHERE status IN (?, ?, ?)",
+                (ITEM_QUEUED, ITEM_PROCESSING, ITEM_FAILED)
+            )
+        }
+        result = {"removed_files": 0, "freed_bytes": 0}
+        for name in os.listdir(self.spool_dir):
+            path = os.path.join(self.spool_dir, name)
+            if name in referenced or os.path.getmtime(path) > cutoff:
+                continue
+            size = os.path.getsize(path)
+            self._remove_spool_file(path)
+            result["removed_files"] += 1
+            result["freed_bytes"] += size
+        return result
+
+    @staticmethod
+    def _remove_spool_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        row["metadata"] = from_json(row.get("metadata"), {})
+        return row
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_queue: Optional[IngestionQueue] = None
+_queue_lock = threading.Lock()
+
+def get_ingestion_queue() -> IngestionQueue:
+    """공유 인덱싱 큐 반환"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = IngestionQueue()
+    return _queue
@@ -0,0 +1,191 @@
+"""
+문서 인덱싱(ingestion) 워커
+큐에서 항목을 가져와 저장 → 텍스트 추출/임베딩/인덱싱을 수행
+
+별도 프로세스로 실행:
+    python -m services.ingestion_worker
+앱 프로세스 내에서는 start_ingestion_worker()로 백그라운드 스레드 실행
+(이 경우 대화형 분석이 밀리는 동안 새 항목을 가져오지 않음)
+"""
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import INGESTION_CONFIG
+from services.admission_controller import get_admission_controller
+from services.document_catalog import DocumentCatalog
+from services.ingestion_queue import (
+    IngestionQueue, ITEM_QUEUED, ITEM_PROCESSING, ITEM_COMPLETED, STAGE_STORAGE, get_ingestion_queue
+)
+from utils.azure_storage_service import AzureStorageService
+from utils.azure_search_management import AzureSearchService
+
+# 항목 처리 결과
+RESULT_INDEXED = "indexed"
+RESULT_DUPLICATE = "duplicate"
+RESULT_DEFERRED = "deferred"
+
+class IngestionWorker:
+    """인덱싱 큐 처리 워커"""
+
+    def __init__(self, queue: Optional[IngestionQueue] = None, threads: Optional[int] = None,
+                 yield_to_analyses: bool = False):
+        self.queue = queue or get_ingestion_queue()
+        # 앱 프로세스 내 워커만 같은 프로세스의 분석 입장 상태를 보고 양보
+        self.admission = get_admission_controller() if yield_to_analyses else None
+        self._shedding = False
+        self.storage_service = AzureStorageService()
+        self.search_service = AzureSearchService()
+        self.catalog = DocumentCatalog(self.storage_service, self.search_service)
+        self.threads = threads or INGESTION_CONFIG["worker_threads"]
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads = []
+
+    def process_next(self) -> bool:
+        """항목 하나 처리 (처리할 항목이 없으면 False)"""
+        item = self.queue.claim_next(self.worker_id)
+        if not item:
+            return False
+
+        try:
+            result = self._process_item(item)
+            if result == RESULT_INDEXED:
+                self.queue.mark_completed(item["item_id"])
+                print(f"✅ 인덱싱 완료: {item['filename']}")
+            elif result == RESULT_DEFERRED:
+                self.queue.defer(item["item_id"], INGESTION_CONFIG["duplicate_wait_seconds"])
+        except Exception as e:
+            print(f"⚠️ 인덱싱 실패 ({item['filename']}, {item['attempts'] + 1}회차): {e}")
+            self.queue.mark_failed(item["item_id"], str(e))
+        return True
+
+    def _process_item(self, item: Dict[str, Any]) -> str:
+        """저장 단계와 인덱싱 단계 수행 (완료된 단계는 건너뜀, 같은 내용의 문서가 있으면 연결만 함)"""
+        if item["stage"] == STAGE_STORAGE and INGESTION_CONFIG["dedupe_uploads"] and item.get("content_hash"):
+            existing = self._find_existing(item)
+            if existing == RESULT_DEFERRED:
+                return RESULT_DEFERRED
+            if existing and self.catalog.link_duplicate(existing, item["filename"], item["metadata"]):
+                self.queue.mark_duplicate(item["item_id"], existing["file_id"])
+                print(f"🔗 중복 문서 연결: {item['filename']} → {existing['file_id']}")
+                return RESULT_DUPLICATE
+
+        if item["stage"] == STAGE_STORAGE:
+            if not self.storage_service.available:
+                raise RuntimeError("Azure Storage 서비스를 사용할 수 없습니다")
+            # 스풀 파일을 블록 단위로 스트리밍 업로드
+            with self.queue.open_content(item) as stream:
+                storage_result = self.storage_service.upload_document(
+                    file_content=stream,
+                    filename=item["filename"],
+                    document_type="training",
+                    metadata=item["metadata"],
+                    file_id=item["item_id"],
+                    blob_name=item.get("blob_name"),
+                    content_hash=item.get("content_hash")
+                )
+            if not storage_result["success"]:
+                raise RuntimeError(f"스토리지 업로드 실패: {storage_result.get('error', 'Unknown')}")
+            self.queue.mark_stored(item["item_id"], storage_result["blob_name"], storage_result["url"])
+            item["blob_url"] = storage_result["url"]
+
+        if not self.search_service.available:
+            raise RuntimeError("Azure Search 서비스를 사용할 수 없습니다")
+        # 텍스트 추출에는 파일 전체가 필요 (동시 처리 수는 워커 스레드 수로 제한됨)
+        file_content = self.queue.read_content(item)
+        search_result = self.search_service.upload_document_to_search(
+            file_content=file_content,
+            filename=item["filename"],
+            file_id=item["item_id"],
+            blob_url=item["blob_url"],
+            metadata=item["metadata"],
+            content_hash=item.get("content_hash")
+        )
+        if not search_result["success"]:
+            raise RuntimeError(f"검색 인덱싱 실패: {search_result.get('error', 'Unknown')}")
+        return RESULT_INDEXED
+
+    def _find_existing(self, item: Dict[str, Any]):
+        """같은 내용의 기존 문서 조회 (큐에서 먼저 등록된 원본이 아직 처리 중이면 RESULT_DEFERRED)"""
+        if item.get("duplicate_of"):
+            original = self.queue.get(item["duplicate_of"])
+            if original and original["status"] in (ITEM_QUEUED, ITEM_PROCESSING):
+                return RESULT_DEFERRED
+            if original and original["status"] == ITEM_COMPLETED and original.get("blob_name"):
+                return {
+                    "file_id": original["item_id"],
+                    "filename": original["filename"],
+                    "blob_name": original["blob_name"]
+                }
+        return self.catalog.find_by_hash(item["content_hash"])
+
+    def run_forever(self):
+        """큐를 계속 처리 (stop() 호출 시 종료)"""
+        while not self._stop.is_set():
+            try:
+                if self._should_yield():
+                    self._stop.wait(INGESTION_CONFIG["poll_interval_seconds"])
+                    continue
+                if not self.process_next():
+                    self._stop.wait(INGESTION_CONFIG["poll_interval_seconds"])
+            except Exception as e:
+                print(f"❌ 인덱싱 워커 오류: {e}")
+                self._stop.wait(INGESTION_CONFIG["poll_interval_seconds"])
+
+    def _should_yield(self) -> bool:
+        """대화형 분석이 밀리고 있으면 True (상태가 바뀔 때만 로그)"""
+        if self.admission is None:
+            return False
+        shedding = self.admission.should_shed_background()
+        if shedding != self._shedding:
+            self._shedding = shedding
+            print("⏸️ 분석 요청이 밀려 인덱싱을 잠시 멈춥니다." if shedding else "▶️ 인덱싱을 다시 시작합니다.")
+        return shedding
+
+    def start(self):
+        """워커 스레드 시작"""
+        for i in range(self.threads):
+            thread = threading.Thread(target=self.run_forever, name=f"ingestion-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+# 앱 프로세스 내 워커 (프로세스당 하나)
+_worker: Optional[IngestionWorker] = None
+_worker_lock = threading.Lock()
+
+def start_ingestion_worker() -> Optional[IngestionWorker]:
+    """앱 프로세스 내 인덱싱 워커 시작 (설정에서 끈 경우 None)"""
+    global _worker
+    if not INGESTION_CONFIG["run_in_process"]:
+        return None
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                worker = IngestionWorker(yield_to_analyses=True)
+                worker.queue.purge_completed()
+                worker.start()
+                _worker = worker
+                print(f"✅ 인덱싱 워커 시작 ({worker.threads}개 스레드)")
+    return _worker
+
+def main():
+    """독립 실행 워커"""
+    worker = IngestionWorker()
+    worker.queue.purge_completed()
+    print(f"🚀 인덱싱 워커 시작: {worker.worker_id} ({worker.threads}개 스레드)")
+    worker.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
+        print("🛑 인덱싱 워커 종료")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+증분 재인덱싱 서비스
+Storage 컨테이너의 문서를 순회하며 내용 해시와 파이프라인 버전을 인덱스와 비교해
+바뀐 문서만 다시 추출/임베딩/인덱싱 (체크포인트 기반 재개, 병렬 처리)
+
+명령줄 실행:
+    python -m services.reindex_service [--force] [--parallel N] [--dry-run] [--prune] [--restart]
+"""
+import argparse
+import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import INDEXING_CONFIG
+from utils.azure_storage_service import AzureStorageService
+from utils.azure_search_management import AzureSearchService, get_pipeline_version
+from utils.local_store import SQLiteStore, to_json, from_json
+
+# 문서별 처리 결과
+RESULT_UNCHANGED = "unchanged"
+RESULT_REINDEXED = "reindexed"
+RESULT_FAILED = "failed"
+
+class ReindexCheckpointStore(SQLiteStore):
+    """재인덱싱 실행 및 문서별 처리 결과 체크포인트"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS reindex_runs (
+        run_id TEXT PRIMARY KEY,
+        pipeline_version TEXT NOT NULL,
+        force INTEGER DEFAULT 0,
+        status TEXT NOT NULL,
+        stats TEXT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS reindex_items (
+        run_id TEXT NOT NULL,
+        blob_name TEXT NOT NULL,
+        result TEXT NOT NULL,
+        error TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (run_id, blob_name)
+    );
+    """
+
+    def find_resumable_run(self, pipeline_version: str, force: bool) -> Optional[Dict[str, Any]]:
+        """같은 조건으로 시작했다가 끝나지 않은 최근 실행"""
+        return self.fetch_one(
+            "SELECT * FROM reindex_runs WHERE pipeline_version = ? AND force = ? AND status = 'running' "
+            "ORDER BY started_at DESC LIMIT 1",
+            (pipeline_version, int(force))
+        )
+
+    def start_run(self, pipeline_version: str, force: bool) -> str:
+        run_id = uuid.uuid4().hex
+        self.execute(
+            "INSERT INTO reindex_runs (run_id, pipeline_version, force, status, started_at) VALUES (?, ?, ?, 'running', ?)",
+            (run_id, pipeline_version, int(force), datetime.now().isoformat())
+        )
+        return run_id
+
+    def finish_run(self, run_id: str, stats: Dict[str, Any]):
+        self.execute(
+            "UPDATE reindex_runs SET status = 'completed', stats = ?, finished_at = ? WHERE run_id = ?",
+            (to_json(stats), datetime.now().isoformat(), run_id)
+        )
+
+    def completed_blobs(self, run_id: str) -> set:
+        """이번 실행에서 이미 처리가 끝난 Blob (실패 항목은 재시도 대상)"""
+        rows = self.fetch_all(
+            "SELECT blob_name FROM reindex_items WHERE run_id = ? AND result != ?", (run_id, RESULT_FAILED)
+        )
+        return {row["blob_name"] for row in rows}
+
+    def record(self, run_id: str, blob_name: str, result: str, error: Optional[str] = None):
+        self.execute(
+            "INSERT OR REPLACE INTO reindex_items (run_id, blob_name, result, error, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (run_id, blob_name, result, error, datetime.now().isoformat())
+        )
+
+    def last_run(self) -> Optional[Dict[str, Any]]:
+        row = self.fetch_one("SELECT * FROM reindex_runs ORDER BY started_at DESC LIMIT 1")
+        if row:
+            row["stats"] = from_json(row.get("stats"), {})
+        return row
+
+class ReindexService:
+    """증분 재인덱싱 서비스"""
+
+    def __init__(self, storage_service: Optional[AzureStorageService] = None,
+                 search_service: Optional[AzureSearchService] = None):
+        self.storage_service = storage_service or AzureStorageService()
+        self.search_service = search_service or AzureSearchService()
+        self.checkpoints = ReindexCheckpointStore("reindex.db")
+
+    def run(self, force: bool = False, max_parallel: Optional[int] = None, dry_run: bool = False,
+            prune_orphans: bool = False, resume: bool = True, document_type: str = "training",
+            progress_callback: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        증분 재인덱싱 실행
+
+        Args:
+            force: 변경 여부와 관계없이 모두 재인덱싱
+            max_parallel: 동시 처리 문서 수
+            dry_run: 대상만 계산하고 실제 인덱싱은 하지 않음
+            prune_orphans: Storage에 없는 인덱스 문서 삭제
+            resume: 중단된 이전 실행이 있으면 이어서 진행
+            document_type: 대상 문서 타입
+            progress_callback: 문서 처리 시마다 호출 (완료 수, 전체 수, 통계)
+
+        Returns:
+            실행 통계
+        """
+        if not self.storage_service.available or not self.search_service.available:
+            return {"success": False, "errors": ["Azure Storage 또는 Azure Search 서비스를 사용할 수 없습니다"]}
+
+        pipeline_version = get_pipeline_version()
+        self.search_service.create_index_if_not_exists(force=True)
+
+        # Storage 목록과 인덱스 상태를 각각 한 번만 조회
+        blobs = self.storage_service.list_documents(document_type)
+        index_states = self.search_service.list_index_states(document_type)
+
+        plan = self._plan(blobs, index_states, pipeline_version, force)
+        stats = {
+            "success": True,
+            "pipeline_version": pipeline_version,
+            "total": len(blobs),
+            "to_reindex": len(plan["reindex"]),
+            "to_verify": len(plan["verify"]),
+            "unchanged": len(plan["unchanged"]),
+            "reindexed": 0,
+            "failed": 0,
+            "skipped_checkpoint": 0,
+            "orphans": len(plan["orphans"]),
+            "no_file_id": len(plan["no_file_id"]),
+            "pruned": 0,
+            "errors": []
+        }
+
+        if dry_run:
+            stats["dry_run"] = True
+            return stats
+
+        # 체크포인트: 같은 조건의 중단된 실행이 있으면 처리된 문서는 건너뜀
+        run = self.checkpoints.find_resumable_run(pipeline_version, force) if resume else None
+        run_id = run["run_id"] if run else self.checkpoints.start_run(pipeline_version, force)
+        done = self.checkpoints.completed_blobs(run_id) if run else set()
+        if run:
+            print(f"🔁 중단된 재인덱싱 실행 재개: {run_id} (이미 처리 {len(done)}개)")
+
+        work = [(doc, "reindex") for doc in plan["reindex"]] + [(doc, "verify") for doc in plan["verify"]]
+        pending = [(doc, action) for doc, action in work if doc["blob_name"] not in done]
+        stats["skipped_checkpoint"] = len(work) - len(pending)
+
+        completed = 0
+        with ThreadPoolExecutor(max_workers=max_parallel or INDEXING_CONFIG["reindex_max_parallel"]) as executor:
+            futures = {
+                executor.submit(self._process_document, doc, action, index_states.get(doc["file_id"]), pipeline_version): doc
+                for doc, action in pending
+            }
+            for future in as_completed(futures):
+                doc = futures[future]
+                try:
+                    result = future.result()
+                    self.checkpoints.record(run_id, doc["blob_name"], result)
+                    if result == RESULT_REINDEXED:
+                        stats["reindexed"] += 1
+                    else:
+                        stats["unchanged"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    stats["errors"].append(f"{doc['filename']}: {e}")
+                    self.checkpoints.record(run_id, doc["blob_name"], RESULT_FAILED, str(e))
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed, len(pending), stats)
+
+        if prune_orphans:
+            for search_doc_id in plan["orphans"]:
+                if self.search_service.delete_document(search_doc_id):
+                    stats["pruned"] += 1
+
+        # 실패가 남아 있으면 다음 실행에서 재개할 수 있도록 실행을 열어둠
+        if not stats["failed"]:
+            self.checkpoints.finish_run(run_id, stats)
+        stats["run_id"] = run_id
+        stats["success"] = stats["failed"] == 0
+        return stats
+
+    def _plan(self, blobs: List[Dict[str, Any]], index_states: Dict[str, Dict[str, Any]],
+              pipeline_version: str, force: bool) -> Dict[str, List]:
+        """문서별 처리 방식 결정 (다운로드 없이 메타데이터만으로 판단)"""
+        plan = {"reindex": [], "verify": [], "unchanged": [], "orphans": [], "no_file_id": []}
+        blob_file_ids = set()
+
+        for doc in blobs:
+            if not doc.get("file_id") or doc["file_id"] == "unknown":
+                # 파일 ID 메타데이터가 없는 Blob은 검색 문서와 연결할 수 없음
+                plan["no_file_id"].append(doc)
+                continue
+            blob_file_ids.add(doc["file_id"])
+            state = index_states.get(doc["file_id"])
+
+            if force or not state or state.get("pipeline_version") != pipeline_version:
+                plan["reindex"].append(doc)
+            elif not doc.get("content_sha256"):
+                # 해시가 없는 이전 업로드: 내려받아 해시를 비교하고 메타데이터에 기록
+                plan["verify"].append(doc)
+            elif doc["content_sha256"] != state.get("content_hash"):
+                plan["reindex"].append(doc)
+            else:
+                plan["unchanged"].append(doc)
+
+        plan["orphans"] = [state["id"] for file_id, state in index_states.items() if file_id not in blob_file_ids]
+        return plan
+
+    def _process_document(self, doc: Dict[str, Any], action: str, state: Optional[Dict[str, Any]],
+                          pipeline_version: str) -> str:
+        """문서 하나 처리 - 필요한 경우에만 추출/임베딩/인덱싱"""
+        if action == "verify":
+            # 해시 비교만 필요하므로 스트리밍으로 계산하고, 바뀐 경우에만 전체를 내려받음
+            content_hash = self.storage_service.hash_document(doc["blob_name"])
+            if content_hash is None:
+                raise RuntimeError("문서 다운로드 실패")
+            if not doc.get("content_sha256"):
+                self.storage_service.update_document_metadata(doc["blob_name"], {"content_sha256": content_hash})
+            if (state and state.get("content_hash") == content_hash
+                    and state.get("pipeline_version") == pipeline_version):
+                return RESULT_UNCHANGED
+
+        file_content = self.storage_service.download_document(doc["blob_name"])
+        if file_content is None:
+            raise RuntimeError("문서 다운로드 실패")
+
+        content_hash = hashlib.sha256(file_content).hexdigest()
+        if not doc.get("content_sha256"):
+            self.storage_service.update_document_metadata(doc["blob_name"], {"content_sha256": content_hash})
+
+        result = self.search_service.upload_document_to_search(
+            file_content=file_content,
+            filename=doc["filename"],
+            file_id=doc["file_id"],
+            blob_url=doc["url"],
+            content_hash=content_hash
+        )
+        if not result["success"]:
+            raise RuntimeError(result.get("error", "인덱싱 실패"))
+        return RESULT_REINDEXED
+
+def main():
+    """명령줄 재인덱싱"""
+    parser = argparse.ArgumentParser(description="변경된 문서만 다시 인덱싱합니다.")
+    parser.add_argument("--force", action="store_true", help="변경 여부와 관계없이 모든 문서 재인덱싱")
+    parser.add_argument("--parallel", type=int, default=None, help="동시 처리 문서 수")
+    parser.add_argument("--dry-run", action="store_true", help="대상만 계산하고 인덱싱하지 않음")
+    parser.add_argument("--prune", action="store_true", help="Storage에 없는 인덱스 문서 삭제")
+    parser.add_argument("--restart", action="store_true", help="중단된 실행을 이어가지 않고 새로 시작")
+    args = parser.parse_args()
+
+    def report(completed: int, total: int, stats: Dict[str, Any]):
+        print(f"  [{completed}/{total}] 재인덱싱 {stats['reindexed']}, 변경 없음 {stats['unchanged']}, 실패 {stats['failed']}")
+
+    print(f"🔧 증분 재인덱싱 시작 (파이프라인 버전: {get_pipeline_version()})")
+    stats = ReindexService().run(
+        force=args.force,
+        max_parallel=args.parallel,
+        dry_run=args.dry_run,
+        prune_orphans=args.prune,
+        resume=not args.restart,
+        progress_callback=report
+    )
+
+    if stats.get("errors"):
+        for error in stats["errors"]:
+            print(f"❌ {error}")
+    print(f"📊 결과: {to_json({k: v for k, v in stats.items() if k != 'errors'})}")
+    return 0 if stats.get("success") else 1
+
+if __name__ == "__main__":
+    exit(main())
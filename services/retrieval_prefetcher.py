@@ -0,0 +1,125 @@
+"""
+편집 중 사내 문서 선행 검색
+문서/선택 텍스트가 debounce_seconds 동안 바뀌지 않으면 분석 대상 내용으로 만든 고정 서브 쿼리를
+백그라운드에서 미리 검색해 검색 결과 캐시와 임베딩 캐시를 데워 둔다.
+
+LLM이 만드는 서브 쿼리는 분석 버튼을 누르기 전에는 알 수 없으므로, 3단계에서 항상 함께 실행되는
+내용 기반 고정 쿼리(build_anchor_query)의 검색 결과와 쿼리 임베딩만 미리 준비한다.
+대화형 분석이 밀리는 동안에는 선행 검색을 건너뛴다 (다음 편집 때 다시 시도).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import RETRIEVAL_CONFIG, RETRIEVAL_PREFETCH_CONFIG
+from core.utils import debounce_function
+from services.admission_controller import get_admission_controller
+from utils.openai_client import PRIORITY_BACKGROUND
+
+def build_anchor_query(target_content: str) -> str:
+    """분석 대상 내용으로 만드는 고정 서브 쿼리 (공백 정리 후 앞부분만 사용)"""
+    return " ".join((target_content or "").split())[:RETRIEVAL_CONFIG["anchor_query_chars"]]
+
+class RetrievalPrefetcher:
+    """세션별 디바운스 + 단일 백그라운드 작업자로 선행 검색 실행"""
+
+    def __init__(self, doc_manager=None):
+        self._doc_manager = doc_manager
+        # 선행 검색은 사용자 요청보다 우선순위가 낮으므로 작업자 하나로 순차 실행
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval-prefetch")
+        self._debouncers: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_fingerprint: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.scheduled = 0
+        self.completed = 0
+        self.skipped = 0
+        self.shed = 0
+        self.failures = 0
+
+    def schedule(self, session_id: str, document_content: str, selected_text: str = ""):
+        """
+        편집 내용 변경 알림 (마지막 변경 후 debounce_seconds가 지나면 한 번만 실행)
+
+        Args:
+            session_id: 브라우저 세션 식별자
+            document_content: 현재 문서 내용
+            selected_text: 현재 선택 텍스트
+        """
+        with self._lock:
+            debouncer = self._debouncers.get(session_id)
+            if debouncer is None:
+                debouncer = debounce_function(self._submit, RETRIEVAL_PREFETCH_CONFIG["debounce_seconds"])
+                self._debouncers[session_id] = debouncer
+                while len(self._debouncers) > RETRIEVAL_PREFETCH_CONFIG["max_sessions"]:
+                    old_session, old_debouncer = self._debouncers.popitem(last=False)
+                    old_debouncer.cancel()
+                    self._last_fingerprint.pop(old_session, None)
+            self._debouncers.move_to_end(session_id)
+        debouncer(session_id, document_content or "", selected_text or "")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._debouncers),
+                "scheduled": self.scheduled,
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "shed": self.shed,
+                "failures": self.failures
+            }
+
+    def _submit(self, session_id: str, document_content: str, selected_text: str):
+        """디바운스 타이머 스레드에서 호출 - 직전과 같은 내용이거나 분석이 밀리고 있으면 건너뜀"""
+        if get_admission_controller().should_shed_background():
+            with self._lock:
+                self.shed += 1
+            return
+
+        fingerprint = hashlib.sha256(f"{selected_text}\x00{document_content}".encode("utf-8")).hexdigest()
+        with self._lock:
+            if self._last_fingerprint.get(session_id) == fingerprint:
+                self.skipped += 1
+                return
+            self._last_fingerprint[session_id] = fingerprint
+            self.scheduled += 1
+        self._executor.submit(self._prefetch, document_content, selected_text)
+
+    def _prefetch(self, document_content: str, selected_text: str):
+        """선택 텍스트와 전체 문서 각각의 고정 쿼리 검색 (쿼리 임베딩은 클라이언트 캐시에 남음)"""
+        try:
+            doc_manager = self._get_doc_manager()
+            for text in (selected_text, document_content):
+                text = text.strip()
+                if len(text) < RETRIEVAL_PREFETCH_CONFIG["min_chars"]:
+                    continue
+                # 대화형 분석과 한도를 다투지 않도록 쿼리 임베딩은 백그라운드 레인으로 요청
+                doc_manager.search_training_documents(
+                    build_anchor_query(text), RETRIEVAL_CONFIG["per_query_top"], priority=PRIORITY_BACKGROUND
+                )
+            with self._lock:
+                self.completed += 1
+        except Exception as e:
+            print(f"⚠️ 사내 문서 선행 검색 실패: {e}")
+            with self._lock:
+                self.failures += 1
+
+    def _get_doc_manager(self):
+        if self._doc_manager is None:
+            from services.document_management_service import get_document_manager
+            self._doc_manager = get_document_manager()
+        return self._doc_manager
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_prefetcher: Optional[RetrievalPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+def get_retrieval_prefetcher() -> RetrievalPrefetcher:
+    """공유 선행 검색기 반환"""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = RetrievalPrefetcher()
+    return _prefetcher
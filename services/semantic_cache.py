@@ -0,0 +1,235 @@
+"""
+의미 기반(근사) 분석 결과 캐시
+요청 임베딩의 코사인 유사도로 표현만 조금 다른 같은 요청의 이전 분석 결과를 찾아 재사용
+
+분석 모드, 분석 대상 내용(정확한 해시), 사내 문서 코퍼스 세대가 모두 같은 결과끼리만 비교하며
+메모리 인덱스(numpy 행렬)를 먼저 보고, 없으면 로컬 SQLite 저장소에서 해당 묶음을 불러온다.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import AI_CONFIG, SEMANTIC_CACHE_CONFIG
+from utils.local_store import SQLiteStore, to_json, from_json
+from utils.openai_client import get_openai_client
+
+# 캐시 항목 종류 - 같은 종류끼리만 비교
+KIND_REQUEST = "request"   # 사용자 원문 요청 (LLM 호출 전 조회)
+KIND_REFINED = "refined"   # 고도화된 프롬프트 (1단계 이후 조회)
+
+class SemanticCacheStore(SQLiteStore):
+    """분석 결과 캐시 영속 저장소"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS semantic_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        partition_key TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        request_text TEXT,
+        embedding BLOB NOT NULL,
+        result TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_semantic_cache_partition ON semantic_cache(partition_key, kind, created_at);
+    """
+
+    def add(self, partition_key: str, kind: str, request_text: str, vector: np.ndarray,
+            result: Dict[str, Any], created_at: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO semantic_cache (partition_key, kind, request_text, embedding, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (partition_key, kind, request_text, vector.astype(np.float32).tobytes(), to_json(result), created_at)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def load_partition(self, partition_key: str, kind: str, since: float) -> List[Dict[str, Any]]:
+        return self.fetch_all(
+            "SELECT id, request_text, embedding, result, created_at FROM semantic_cache "
+            "WHERE partition_key = ? AND kind = ? AND created_at >= ? ORDER BY created_at",
+            (partition_key, kind, since)
+        )
+
+    def prune(self, before: float, max_entries: int) -> int:
+        """만료 항목 삭제 후 최대 개수를 넘는 오래된 항목 삭제"""
+        removed = self.execute("DELETE FROM semantic_cache WHERE created_at < ?", (before,))
+        removed += self.execute(
+            "DELETE FROM semantic_cache WHERE id NOT IN "
+            "(SELECT id FROM semantic_cache ORDER BY created_at DESC LIMIT ?)",
+            (max_entries,)
+        )
+        return removed
+
+    def clear(self) -> int:
+        return self.execute("DELETE FROM semantic_cache")
+
+class _Partition:
+    """같은 비교 키를 가진 항목들의 정규화된 임베딩 행렬"""
+
+    def __init__(self, dimensions: int):
+        self.vectors = np.empty((0, dimensions), dtype=np.float32)
+        self.entries: List[Dict[str, Any]] = []
+
+    def append(self, vector: np.ndarray, entry: Dict[str, Any]):
+        self.vectors = np.vstack([self.vectors, vector[np.newaxis, :]])
+        self.entries.append(entry)
+
+    def best_match(self, vector: np.ndarray, since: float) -> Tuple[int, float]:
+        """만료되지 않은 항목 중 코사인 유사도가 가장 높은 항목 (없으면 -1)"""
+        if not self.entries or self.vectors.shape[1] != vector.shape[0]:
+            return -1, 0.0
+        similarities = self.vectors @ vector
+        created = np.fromiter((entry["created_at"] for entry in self.entries), dtype=np.float64, count=len(self.entries))
+        similarities[created < since] = -1.0
+        index = int(np.argmax(similarities))
+        return index, float(similarities[index])
+
+class SemanticAnalysisCache:
+    """요청 임베딩 기반 분석 결과 캐시"""
+
+    def __init__(self, store: Optional[SemanticCacheStore] = None):
+        self.store = store
+        if self.store is None and SEMANTIC_CACHE_CONFIG["persist"]:
+            try:
+                self.store = SemanticCacheStore("semantic_cache.db")
+                self.store.prune(self._expired_before(), SEMANTIC_CACHE_CONFIG["max_persisted_entries"])
+            except Exception as e:
+                print(f"⚠️ 분석 결과 캐시 저장소 초기화 실패 (메모리만 사용): {e}")
+                self.store = None
+        self._partitions: "OrderedDict[Tuple[str, str], _Partition]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def partition_key(mode: str, corpus_generation: str, target_content: str) -> str:
+        """비교 키: 분석 모드 + 코퍼스 세대 + 분석 대상 내용 해시"""
+        content_hash = hashlib.sha256((target_content or "").encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{mode}|{corpus_generation}|{content_hash}".encode("utf-8")).hexdigest()
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """요청 임베딩 (정규화된 float32 벡터, 실패 시 None)"""
+        text = (text or "").strip()[:SEMANTIC_CACHE_CONFIG["max_embed_chars"]]
+        if not text:
+            return None
+        try:
+            client = get_openai_client()
+            if not client.available:
+                return None
+            response = client.create_embedding(text, deployment=AI_CONFIG.get("embedding_deployment_name"))
+            vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ 분석 결과 캐시 임베딩 실패: {e}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def lookup(self, partition_key: str, kind: str, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        유사한 이전 분석 결과 조회
+
+        Returns:
+            {"result": 분석 결과, "similarity", "request", "created_at"} 또는 None
+        """
+        partition = self._get_partition(partition_key, kind, vector.shape[0])
+        with self._lock:
+            index, similarity = partition.best_match(vector, self._expired_before())
+            if index < 0 or similarity < SEMANTIC_CACHE_CONFIG["similarity_threshold"]:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry = partition.entries[index]
+        return {
+            "result": entry["result"],
+            "similarity": similarity,
+            "request": entry["request"],
+            "created_at": entry["created_at"]
+        }
+
+    def put(self, partition_key: str, kind: str, request_text: str, vector: np.ndarray, result: Dict[str, Any]):
+        """분석 결과 저장 (메모리 인덱스 + 영속 저장소)"""
+        created_at = time.time()
+        partition = self._get_partition(partition_key, kind, vector.shape[0])
+        with self._lock:
+            partition.append(vector, {"request": request_text, "result": result, "created_at": created_at})
+            self._evict()
+
+        if self.store:
+            try:
+                self.store.add(partition_key, kind, request_text, vector, result, created_at)
+            except Exception as e:
+                print(f"⚠️ 분석 결과 캐시 저장 실패: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+        if self.store:
+            self.store.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "partitions": len(self._partitions),
+                "entries": sum(len(p.entries) for p in self._partitions.values()),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    @staticmethod
+    def _expired_before() -> float:
+        return time.time() - SEMANTIC_CACHE_CONFIG["ttl_hours"] * 3600
+
+    def _get_partition(self, partition_key: str, kind: str, dimensions: int) -> _Partition:
+        """메모리 묶음 반환 (처음 접근하면 영속 저장소에서 불러옴)"""
+        key = (partition_key, kind)
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is not None:
+                self._partitions.move_to_end(key)
+                return partition
+
+        partition = _Partition(dimensions)
+        if self.store:
+            try:
+                for row in self.store.load_partition(partition_key, kind, self._expired_before()):
+                    vector = np.frombuffer(row["embedding"], dtype=np.float32)
+                    if vector.shape[0] == dimensions:
+                        partition.append(vector, {
+                            "request": row["request_text"],
+                            "result": from_json(row["result"], {}),
+                            "created_at": row["created_at"]
+                        })
+            except Exception as e:
+                print(f"⚠️ 분석 결과 캐시 불러오기 실패: {e}")
+
+        with self._lock:
+            # 불러오는 동안 다른 스레드가 먼저 만들었으면 그쪽을 사용
+            existing = self._partitions.setdefault(key, partition)
+            self._partitions.move_to_end(key)
+            self._evict()
+            return existing
+
+    def _evict(self):
+        """메모리 항목 수가 한도를 넘으면 오래 안 쓴 묶음부터 제거 (호출 측에서 잠금 보유)"""
+        total = sum(len(p.entries) for p in self._partitions.values())
+        while total > SEMANTIC_CACHE_CONFIG["max_memory_entries"] and len(self._partitions) > 1:
+            _, partition = self._partitions.popitem(last=False)
+            total -= len(partition.entries)
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_semantic_cache: Optional[SemanticAnalysisCache] = None
+_semantic_cache_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticAnalysisCache:
+    """공유 분석 결과 캐시 반환"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticAnalysisCache()
+    return _semantic_cache
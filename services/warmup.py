@@ -0,0 +1,209 @@
+"""
+프로세스 시작 준비 (warm-up)
+첫 사용자가 연결 수립, 인덱스 스키마 확인, 모델 콜드 스타트, 문서 목록/통계 조회 비용을 떠안지 않도록
+트래픽을 받기 전에 미리 처리한다.
+
+배포 환경에서는 serve.py가 Streamlit 서버와 같은 프로세스에서 run_startup_warmup()을 먼저 실행한 뒤 서버를 띄운다.
+앱은 준비된 연결 풀과 캐시를 그대로 쓰고, 포트(와 /_stcore/health)는 이 인스턴스의 준비가 끝난 뒤에야 열린다
+(App Service는 포트가 응답한 뒤에야 트래픽을 보냄).
+`streamlit run`으로 직접 띄운 경우에는 첫 세션이 start_background_warmup()으로 같은 작업을 백그라운드에서 수행한다.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from config import AI_CONFIG, QUICK_ANALYSIS_CONFIG, WARMUP_CONFIG
+from utils.local_store import get_instance_id
+
+# 이 프로세스의 백그라운드 준비 상태
+WARMUP_IDLE = "idle"
+WARMUP_RUNNING = "running"
+WARMUP_DONE = "done"
+
+_warmup_state: Dict[str, Any] = {"state": WARMUP_IDLE, "result": None}
+_warmup_lock = threading.Lock()
+
+def _warm_index(doc_manager) -> str:
+    search_service = doc_manager.search_service
+    if not search_service.available:
+        return "Azure Search 사용 불가 - 건너뜀"
+    if not search_service.create_index_if_not_exists():
+        raise RuntimeError(f"인덱스 '{search_service.index_name}' 확인 실패")
+    return f"인덱스 '{search_service.index_name}' 확인"
+
+def _warm_document_cache(doc_manager) -> str:
+    stats = doc_manager.get_statistics(use_cache=False)
+    if stats.get("error"):
+        raise RuntimeError(stats["error"])
+    training_docs = doc_manager.list_training_documents(use_cache=False)
+    generated_docs = doc_manager.list_generated_documents(use_cache=False)
+    if doc_manager.search_service.available:
+        doc_manager.search_service.get_corpus_generation()
+    return f"사내 문서 {len(training_docs)}개, 생성 문서 {len(generated_docs)}개"
+
+def _warm_embedding() -> str:
+    from utils.openai_client import get_openai_client, PRIORITY_BACKGROUND
+
+    client = get_openai_client()
+    if not client.configured:
+        return "OpenAI 설정 없음 - 건너뜀"
+    client.create_embedding("warmup", priority=PRIORITY_BACKGROUND, cache=False)
+    return AI_CONFIG.get("embedding_deployment_name", "text-embedding-3-large")
+
+def _warm_chat() -> str:
+    from utils.openai_client import get_openai_client, PRIORITY_BACKGROUND
+
+    client = get_openai_client()
+    if not client.configured:
+        return "OpenAI 설정 없음 - 건너뜀"
+    deployments = list(dict.fromkeys([QUICK_ANALYSIS_CONFIG["deployment_name"], AI_CONFIG["deployment_name"]]))
+    for deployment in deployments:
+        client.chat_completion(
+            [{"role": "user", "content": "ping"}],
+            deployment=deployment,
+            priority=PRIORITY_BACKGROUND,
+            hedge=False,
+            max_tokens=1
+        )
+    return ", ".join(deployments)
+
+def _warm_web_search() -> str:
+    from utils.external_search import get_external_search_client
+
+    client = get_external_search_client()
+    if not client.provider.live:
+        return "로컬 대체 제공자 - 건너뜀"
+    if not client.warm_up():
+        raise RuntimeError(f"{client.provider.name} 연결 실패")
+    return client.provider.name
+
+def _run_steps(steps: Dict[str, Callable[[], str]], deadline: float) -> List[Dict[str, Any]]:
+    """단계를 동시에 실행하고 마감 시각까지 기다림 (끝나지 않은 단계는 시간 초과로 기록하고 두고 감)"""
+    records = {name: {"name": name, "ok": False, "seconds": None, "detail": "시간 초과"} for name in steps}
+
+    def run(name: str, step: Callable[[], str]):
+        started = time.monotonic()
+        try:
+            detail = step()
+            ok = True
+        except Exception as e:
+            detail = str(e)[:200]
+            ok = False
+        records[name] = {"name": name, "ok": ok, "seconds": round(time.monotonic() - started, 2), "detail": detail}
+
+    # 데몬 스레드로 실행해 응답 없는 단계가 프로세스 종료를 막지 않도록 함
+    threads = [threading.Thread(target=run, args=(name, step), name=f"warmup-{name}", daemon=True)
+               for name, step in steps.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
+    return [dict(records[name]) for name in steps]
+
+def run_warmup(doc_manager=None, ping_models: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    시작 준비 실행
+
+    Args:
+        doc_manager: 문서 관리 서비스 (없으면 공유 인스턴스 생성)
+        ping_models: 임베딩/채팅 모델 1토큰 호출 여부 (None이면 설정값)
+
+    Returns:
+        준비 결과 (ready, degraded, 단계별 성공 여부/소요 시간)
+    """
+    started_at = datetime.now().isoformat()
+    started = time.monotonic()
+    deadline = started + WARMUP_CONFIG["timeout_seconds"]
+    if ping_models is None:
+        ping_models = WARMUP_CONFIG["ping_models"]
+
+    steps: List[Dict[str, Any]] = []
+    try:
+        # 클라이언트 생성 (Storage 컨테이너 확인 포함) - 이후 단계가 모두 사용하므로 먼저 수행
+        if doc_manager is None:
+            from services.document_management_service import get_document_manager
+            doc_manager = get_document_manager()
+        steps.append({
+            "name": "services", "ok": doc_manager.is_available, "seconds": round(time.monotonic() - started, 2),
+            "detail": f"Storage {'사용 가능' if doc_manager.storage_service.available else '사용 불가'}, "
+                      f"Search {'사용 가능' if doc_manager.search_service.available else '사용 불가'}"
+        })
+
+        # 인덱스 확인이 끝나야 목록 조회가 의미 있으므로 두 단계는 한 흐름으로 묶음
+        def warm_documents() -> str:
+            return f"{_warm_index(doc_manager)} / {_warm_document_cache(doc_manager)}"
+
+        parallel_steps: Dict[str, Callable[[], str]] = {"documents": warm_documents, "web_search": _warm_web_search}
+        if ping_models:
+            parallel_steps["embedding"] = _warm_embedding
+            parallel_steps["chat"] = _warm_chat
+        steps.extend(_run_steps(parallel_steps, deadline))
+    except Exception as e:
+        steps.append({"name": "services", "ok": False, "seconds": round(time.monotonic() - started, 2),
+                      "detail": str(e)[:200]})
+
+    result = {
+        "ready": True,
+        "degraded": not all(step["ok"] for step in steps),
+        "instance": get_instance_id(),
+        "pid": os.getpid(),
+        "started_at": started_at,
+        "completed_at": datetime.now().isoformat(),
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+        "steps": steps
+    }
+    icon = "⚠️" if result["degraded"] else "✅"
+    print(f"{icon} 시작 준비 완료 ({result['elapsed_seconds']:.1f}초): "
+          + ", ".join(f"{step['name']} {'OK' if step['ok'] else '실패'}" for step in steps))
+    return result
+
+def _claim_warmup() -> bool:
+    """이 프로세스의 시작 준비를 맡음 (설정에서 껐거나 이미 시작했으면 False)"""
+    if not WARMUP_CONFIG["enabled"]:
+        return False
+    with _warmup_lock:
+        if _warmup_state["state"] != WARMUP_IDLE:
+            return False
+        _warmup_state["state"] = WARMUP_RUNNING
+        return True
+
+def _run_claimed_warmup(doc_manager=None):
+    try:
+        result = run_warmup(doc_manager)
+    except Exception as e:
+        print(f"⚠️ 시작 준비 실패: {e}")
+        result = None
+    with _warmup_lock:
+        _warmup_state.update(state=WARMUP_DONE, result=result)
+
+def run_startup_warmup() -> bool:
+    """
+    서버 시작 전 현재 스레드에서 시작 준비를 한 번 실행 (serve.py, 최대 timeout_seconds)
+
+    Returns:
+        이번 호출로 실행했는지 여부 (설정에서 껐거나 이미 시작했으면 False)
+    """
+    if not _claim_warmup():
+        return False
+    print(f"🔥 시작 준비 중... (최대 {WARMUP_CONFIG['timeout_seconds']:.0f}초)")
+    _run_claimed_warmup()
+    return True
+
+def start_background_warmup(doc_manager=None) -> bool:
+    """
+    앱 프로세스에서 시작 준비를 백그라운드로 한 번 실행 (serve.py가 이미 실행했으면 아무것도 하지 않음)
+
+    Returns:
+        이번 호출로 시작했는지 여부 (설정에서 껐거나 이미 시작했으면 False)
+    """
+    if not _claim_warmup():
+        return False
+    threading.Thread(target=_run_claimed_warmup, args=(doc_manager,), name="warmup", daemon=True).start()
+    return True
+
+def get_warmup_status() -> Dict[str, Any]:
+    """이 프로세스의 시작 준비 상태 (state, result)"""
+    with _warmup_lock:
+        return dict(_warmup_state)
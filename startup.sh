@@ -0,0 +1,9 @@
+#!/bin/bash
+# Azure App Service 시작 스크립트
+# serve.py가 같은 프로세스에서 시작 준비(warm-up)를 마친 뒤 Streamlit 서버를 띄운다.
+# 포트(와 /_stcore/health)는 이 인스턴스의 연결/캐시/모델이 준비된 뒤에야 열린다.
+cd "$(dirname "$0")"
+
+export PORT="${PORT:-${WEBSITES_PORT:-8000}}"
+
+exec python serve.py
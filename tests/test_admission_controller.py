@@ -0,0 +1,47 @@
+"""
+분석 입장 제어 테스트
+"""
+import unittest
+
+from services.admission_controller import AdmissionController
+
+class AcquireCleanupTest(unittest.TestCase):
+    """대기 중 on_wait 예외로 빠져나가도 자리가 새지 않아야 함"""
+
+    def test_on_wait_error_cancels_queued_ticket(self):
+        controller = AdmissionController(max_concurrent=1)
+        first = controller.acquire("A")
+
+        def on_wait(position):
+            raise RuntimeError("rerun")
+
+        with self.assertRaises(RuntimeError):
+            controller.acquire("B", timeout=5, on_wait=on_wait, poll_seconds=0.01)
+        self.assertEqual(controller.get_stats()["queued"], 0)
+
+        controller.release(first)
+        self.assertEqual(controller.get_stats()["running"], 0)
+
+    def test_on_wait_error_after_admission_releases_slot(self):
+        controller = AdmissionController(max_concurrent=1)
+        first = controller.acquire("A")
+
+        def on_wait(position):
+            # 콜백 실행 중 앞 분석이 끝나 이 항목이 입장한 뒤 예외
+            controller.release(first)
+            raise RuntimeError("rerun")
+
+        with self.assertRaises(RuntimeError):
+            controller.acquire("B", timeout=5, on_wait=on_wait, poll_seconds=0.01)
+        stats = controller.get_stats()
+        self.assertEqual((stats["running"], stats["queued"]), (0, 0))
+
+    def test_admit_releases_after_block(self):
+        controller = AdmissionController(max_concurrent=1)
+        with controller.admit("A", timeout=1) as ticket_id:
+            self.assertIsNotNone(ticket_id)
+            self.assertEqual(controller.get_stats()["running"], 1)
+        self.assertEqual(controller.get_stats()["running"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,8 +5,11 @@ ai_analysis_ui.py
 - 진행 상황 표시, 분석 취소, 결과/레퍼런스 확인, 문서 삽입 등
 """
 import streamlit as st
+from config import ADMISSION_CONFIG
 from services.ai_analysis_orchestrator_refactored import AIAnalysisOrchestrator
-from core.utils import show_message
+from services.admission_controller import get_admission_controller
+from utils.ai_service import ANALYSIS_PERSPECTIVES
+from core.utils import show_message, get_session_id
 
 def ai_analysis_page():
     """AI 분석 메인 페이지"""
@@ -31,17 +34,20 @@ def ai_analysis_page():
     with col1:
         mode = st.radio(
             "분석 모드 선택:",
-            ["전체 문서 분석", "선택 텍스트 분석"],
-            help="전체 문서: 현재 열린 문서 전체를 분석\n선택 텍스트: 지정한 텍스트만 분석"
+            ["전체 문서 분석", "선택 텍스트 분석", "빠른 분석"],
+            help="전체 문서: 현재 열린 문서 전체를 분석\n선택 텍스트: 지정한 텍스트만 분석\n빠른 분석: 간단한 수정 요청을 몇 초 안에 처리 (외부 검색 생략)"
         )
     
     with col2:
-        # 분석 타입 (향후 확장을 위한 옵션)
-        analysis_type = st.selectbox(
-            "분석 유형:",
-            ["종합 분석", "요약 분석", "개선점 분석"],
-            help="분석의 초점을 선택합니다"
+        # 분석 관점 (여러 개 선택 시 한 번의 검색 결과로 관점별 결과를 동시에 생성)
+        perspective_keys = {spec["label"]: key for key, spec in ANALYSIS_PERSPECTIVES.items()}
+        selected_labels = st.multiselect(
+            "분석 관점:",
+            list(perspective_keys),
+            default=["종합 분석"],
+            help="분석의 초점을 선택합니다. 여러 관점을 고르면 검색은 한 번만 하고 관점별 결과를 동시에 생성해 탭으로 보여줍니다."
         )
+        perspectives = [perspective_keys[label] for label in selected_labels]
     
     # 선택 텍스트 입력 (선택 모드일 때)
     selection = ""
@@ -68,9 +74,13 @@ def ai_analysis_page():
             if mode == "선택 텍스트 분석" and (not selection or not selection.strip()):
                 show_message("error", "분석할 텍스트를 입력해주세요.")
                 return
+            
+            if not perspectives:
+                show_message("error", "분석 관점을 하나 이상 선택해주세요.")
+                return
                 
             # AI 분석 실행
-            _run_enhanced_ai_analysis(user_input.strip(), mode, selection.strip() if selection else None, analysis_type)
+            _run_enhanced_ai_analysis(user_input.strip(), mode, selection.strip() if selection else None, perspectives)
     
     with col2:
         if st.button("🔄 새로고침", use_container_width=True):
@@ -84,23 +94,33 @@ def ai_analysis_page():
     # 분석 결과 표시 섹션
     _display_analysis_results()
 
-def _run_enhanced_ai_analysis(user_input: str, mode: str, selection: str = None, analysis_type: str = "종합 분석"):
+def _run_enhanced_ai_analysis(user_input: str, mode: str, selection: str = None, perspectives: list = None):
     """개선된 AI 분석 실행"""
     try:
         # 분석 모드 설정
-        analysis_mode = "selection" if mode == "선택 텍스트 분석" else "full"
+        analysis_mode = {"선택 텍스트 분석": "selection", "빠른 분석": "quick"}.get(mode, "full")
         
-        # 오케스트레이터 초기화 및 분석 실행
-        orchestrator = AIAnalysisOrchestrator(mode=analysis_mode)
+        # 오케스트레이터 초기화 및 분석 실행 (빠른 분석은 관점 구분 없이 단일 결과)
+        orchestrator = AIAnalysisOrchestrator(mode=analysis_mode, perspectives=perspectives)
         
         st.markdown("---")
         st.markdown("### 🔄 AI 분석 진행 상황")
         
-        # 4단계 분석 실행 (진행 상황이 자동으로 표시됨)
-        analysis_result = orchestrator.run_complete_analysis(
-            user_input=user_input,
-            selection=selection
-        )
+        # 동시 실행 한도를 넘으면 세션별 공정 대기열에서 차례를 기다림
+        waiting = st.empty()
+        on_wait = lambda position: waiting.info(f"⏳ 분석 대기열 {position}번째입니다. 앞선 분석이 끝나면 자동으로 시작합니다.")
+        with get_admission_controller().admit(get_session_id(), timeout=ADMISSION_CONFIG["inline_wait_seconds"],
+                                              on_wait=on_wait) as ticket_id:
+            waiting.empty()
+            if ticket_id is None:
+                show_message("warning", "⏳ 분석 요청이 많아 분석을 시작하지 못했습니다. 잠시 후 다시 시도해 주세요.")
+                return
+            
+            # 4단계 분석 실행 (진행 상황이 자동으로 표시됨)
+            analysis_result = orchestrator.run_complete_analysis(
+                user_input=user_input,
+                selection=selection
+            )
         
         # 성공 메시지
         st.balloons()  # 성공 축하 애니메이션
@@ -125,17 +145,18 @@ def _display_analysis_results():
         tab1, tab2, tab3 = st.tabs(["📋 분석 결과", "📚 참고 자료", "⚙️ 설정"])
         
         with tab1:
-            st.markdown(result)
-            
-            # 문서 삽입 버튼
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("� 문서에 삽입", use_container_width=True):
-                    _insert_result_to_document(result)
-            
-            with col2:
-                if st.button("📋 클립보드 복사", use_container_width=True):
-                    st.write("클립보드 복사 기능은 브라우저에서 지원됩니다.")
+            perspective_results = st.session_state.get("ai_analysis_perspectives")
+            if perspective_results:
+                # 다중 관점 분석: 관점마다 하위 탭
+                perspective_tabs = st.tabs([
+                    f"{ANALYSIS_PERSPECTIVES[key]['icon']} {ANALYSIS_PERSPECTIVES[key]['label']}"
+                    for key in perspective_results
+                ])
+                for perspective_tab, (key, text) in zip(perspective_tabs, perspective_results.items()):
+                    with perspective_tab:
+                        _render_result_with_actions(text, key)
+            else:
+                _render_result_with_actions(result)
         
         with tab2:
             _display_references_tab()
@@ -151,6 +172,20 @@ def _display_analysis_results():
                 }
             })
 
+def _render_result_with_actions(result: str, key_suffix: str = "result"):
+    """분석 결과와 문서 삽입/복사 버튼 표시"""
+    st.markdown(result)
+    
+    # 문서 삽입 버튼
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📝 문서에 삽입", use_container_width=True, key=f"insert_{key_suffix}"):
+            _insert_result_to_document(result)
+    
+    with col2:
+        if st.button("📋 클립보드 복사", use_container_width=True, key=f"copy_{key_suffix}"):
+            st.write("클립보드 복사 기능은 브라우저에서 지원됩니다.")
+
 def _display_references_tab():
     """참고 자료 탭 표시"""
     references = st.session_state.get("ai_analysis_references", {"internal": [], "external": []})
@@ -196,6 +231,7 @@ def _clear_analysis_state():
     keys_to_clear = [
         "ai_analysis_result",
         "ai_analysis_references", 
+        "ai_analysis_perspectives",
         "ai_analysis_progress",
         "ai_analysis_status",
         "last_analysis_hash",
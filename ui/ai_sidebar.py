@@ -2,10 +2,17 @@
 AI Sidebar UI Component - Enhanced 4-step Analysis Process
 새로운 요구사항에 맞춘 AI 분석 사이드바
 """
+import time
+from datetime import datetime
 import streamlit as st
 from state.session_state import session_state
+from config import JOB_CONFIG, QUICK_ANALYSIS_CONFIG, ADMISSION_CONFIG
 from services.ai_analysis_orchestrator_refactored import AIAnalysisOrchestrator
-from core.utils import show_message
+from services.analysis_job_service import (
+    get_analysis_job_service, JOB_QUEUED, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED
+)
+from services.admission_controller import get_admission_controller
+from core.utils import show_message, get_session_id
 
 def render_ai_sidebar():
     """AI sidebar panel with enhanced analysis process"""
@@ -16,6 +23,18 @@ def render_ai_sidebar():
     with st.container():
         st.markdown("### 🤖 AI 분석 패널")
         
+        # 간단한 수정 요청용 빠른 분석 (작업 큐를 거치지 않고 바로 실행)
+        st.checkbox(
+            f"⚡ 빠른 분석 ({QUICK_ANALYSIS_CONFIG['deadline_seconds']:.0f}초 이내)",
+            key="quick_analysis",
+            help="프롬프트 고도화/외부 검색 없이 한 번에 답합니다. 문장 다듬기 같은 간단한 수정에 적합합니다."
+        )
+        st.checkbox(
+            "🔄 캐시 무시하고 새로 분석",
+            key="force_refresh_analysis",
+            help="비슷한 이전 요청의 분석 결과가 있어도 재사용하지 않고 처음부터 다시 분석합니다."
+        )
+        
         if not ai_panel_open:
             # 패널이 닫혀있을 때 안내 메시지
             st.info("AI 분석 기능을 사용하려면 왼쪽의 '전체분석하기' 또는 '선택분석하기' 버튼을 클릭하세요.")
@@ -60,14 +79,20 @@ def render_ai_sidebar():
         # 분석 취소 버튼 (진행 중일 때만)
         if st.session_state.get('analysis_in_progress', False):
             if st.button("🛑 분석 중단", use_container_width=True):
+                job_id = st.session_state.get('analysis_job_id')
+                if job_id:
+                    get_analysis_job_service().cancel(job_id)
                 st.session_state.analysis_in_progress = False
                 st.warning("분석이 중단되었습니다.")
                 st.rerun()
         
-        # 분석 실행
+        # 분석 실행 (백그라운드 작업으로 제출)
         if st.session_state.get('auto_start_analysis', False):
             _run_ai_analysis()
         
+        # 진행 중인 분석 작업 상태 표시
+        _render_analysis_job()
+        
         # 분석 결과 표시
         _render_analysis_results()
         
@@ -75,7 +100,7 @@ def render_ai_sidebar():
         st.markdown("</div>", unsafe_allow_html=True)
 
 def _run_ai_analysis():
-    """AI 분석 실행"""
+    """AI 분석 작업 제출 (워커 풀에서 실행되므로 스크립트 실행을 막지 않음)"""
     # 분석할 텍스트 준비
     user_input = st.session_state.get('analysis_text', '')
     selection = st.session_state.get('selected_text', '')
@@ -84,46 +109,152 @@ def _run_ai_analysis():
     mode = st.session_state.get('analysis_mode', 'full_document')
     orchestrator_mode = 'selected_text' if mode == 'selected_text' else 'full_document'
     
+    st.session_state.auto_start_analysis = False
+    
     if not user_input and not selection:
         st.error("❌ 분석할 내용이 없습니다.")
         st.session_state.analysis_in_progress = False
         return
     
-    # 분석 실행
-    st.session_state.analysis_in_progress = True
-    st.session_state.auto_start_analysis = False
+    force_refresh = st.session_state.pop('force_refresh_once', False) or st.session_state.get('force_refresh_analysis', False)
     
-    orchestrator = AIAnalysisOrchestrator(mode=orchestrator_mode)
+    if st.session_state.get('quick_analysis', False):
+        _run_quick_analysis(user_input, selection)
+        return
     
     try:
-        st.markdown("---")
-        st.markdown("### 🔄 AI 분석 진행 상황")
-        
-        # 4단계 분석 실행
-        analysis_result = orchestrator.run_complete_analysis(
+        job_id = get_analysis_job_service().submit(
+            session_id=get_session_id(),
             user_input=user_input,
-            selection=selection
+            selection=selection,
+            document_content=st.session_state.get('document_content', '') or '',
+            mode=orchestrator_mode,
+            force_refresh=force_refresh
         )
-        
-        # 분석 완료 처리
-        if analysis_result and analysis_result.get('result'):
+        st.session_state.analysis_job_id = job_id
+        st.session_state.analysis_in_progress = True
+    except Exception as e:
+        st.error(f"❌ 분석 작업을 시작하지 못했습니다: {str(e)}")
+        st.session_state.analysis_in_progress = False
+
+def _run_quick_analysis(user_input: str, selection: str):
+    """빠른 분석을 현재 스크립트 실행 안에서 바로 수행 (제한 시간이 짧아 폴링보다 빠름)"""
+    orchestrator = AIAnalysisOrchestrator(mode="quick")
+    # 빠른 분석도 동시 실행 한도에 포함 (잠깐 기다려도 자리가 없으면 실행하지 않음)
+    with get_admission_controller().admit(get_session_id(), timeout=ADMISSION_CONFIG["quick_wait_seconds"]) as ticket_id:
+        if ticket_id is None:
             st.session_state.analysis_in_progress = False
-            st.session_state.current_analysis_result = analysis_result
-            st.session_state.ai_analysis_result = analysis_result['result']
-            
-            # 분석 완료 알림
-            st.success("🎉 **AI 분석이 완료되었습니다!**")
+            st.warning("⏳ 지금은 분석 요청이 많아 빠른 분석을 시작하지 못했습니다. "
+                       "잠시 후 다시 시도하거나 빠른 분석을 끄고 대기열에 등록하세요.")
+            return
+        with st.spinner("⚡ 빠른 분석 중..."):
+            analysis_result = orchestrator.run_quick_analysis(
+                user_input, selection, st.session_state.get('document_content', '') or ''
+            )
+    
+    st.session_state.analysis_in_progress = False
+    st.session_state.current_analysis_result = analysis_result
+    st.session_state.ai_analysis_result = analysis_result['result']
+    st.session_state.ai_analysis_references = {
+        "internal": analysis_result.get('internal_refs', []),
+        "external": []
+    }
+    if analysis_result['timed_out']:
+        st.warning("⏱️ 빠른 분석이 제한 시간을 넘겼습니다. 빠른 분석을 끄고 다시 시도해 보세요.")
+
+def _render_analysis_job():
+    """진행 중인 분석 작업 상태 표시 (st.fragment가 있으면 해당 영역만 주기적으로 갱신, 없으면 새로고침 버튼)"""
+    notice = st.session_state.pop('analysis_job_notice', None)
+    if notice:
+        notice_type, message = notice
+        if notice_type == "success":
+            st.success(message)
             st.balloons()
-            
+        elif notice_type == "warning":
+            st.warning(message)
         else:
-            st.error("❌ 분석 결과를 생성하지 못했습니다.")
-            st.session_state.analysis_in_progress = False
-            
-    except Exception as e:
-        st.error(f"❌ 분석 중 오류가 발생했습니다: {str(e)}")
-        st.session_state.analysis_in_progress = False
-        with st.expander("🔍 오류 상세 정보"):
-            st.exception(e)
+            st.error(message)
+    
+    if not st.session_state.get('analysis_job_id'):
+        return
+    
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if fragment:
+        fragment(run_every=JOB_CONFIG["poll_interval_seconds"])(_render_job_progress)()
+    else:
+        # 구버전 Streamlit(fragment 없음): 스크립트를 멈추고 재실행하며 폴링하면 아래 화면이 그려지지 않으므로
+        # 현재 상태만 표시하고 새로고침은 사용자가 누를 때(또는 다른 입력으로 재실행될 때) 반영
+        _render_job_progress()
+        st.button("🔄 진행 상황 새로고침", key="refresh_analysis_job", use_container_width=True)
+
+def _render_job_progress():
+    """분석 작업 진행 상황과 부분 결과 표시"""
+    job_id = st.session_state.get('analysis_job_id')
+    if not job_id:
+        return
+    
+    job = get_analysis_job_service().get_job(job_id)
+    if not job:
+        _finish_analysis_job("error", "❌ 분석 작업 정보를 찾을 수 없습니다.")
+        return
+    
+    status = job['status']
+    if status == JOB_COMPLETED:
+        analysis_result = job['result'] or {}
+        st.session_state.current_analysis_result = analysis_result
+        st.session_state.ai_analysis_result = analysis_result.get('result', '')
+        st.session_state.ai_analysis_references = {
+            "internal": analysis_result.get('internal_refs', []),
+            "external": analysis_result.get('external_refs', [])
+        }
+        _finish_analysis_job("success", "🎉 **AI 분석이 완료되었습니다!**")
+        return
+    if status == JOB_FAILED:
+        _finish_analysis_job("error", f"❌ 분석 중 오류가 발생했습니다: {job.get('error') or '알 수 없는 오류'}")
+        return
+    if status == JOB_CANCELLED:
+        _finish_analysis_job("warning", "🛑 분석이 취소되었습니다.")
+        return
+    
+    st.markdown("---")
+    st.markdown("### 🔄 AI 분석 진행 상황")
+    if status == JOB_QUEUED:
+        _render_queue_position(job_id)
+        return
+    st.progress(min(job.get('step') or 0, 4) / 4)
+    st.caption(job.get('message') or "")
+    
+    partial = job.get('partial') or {}
+    if partial.get('enhanced_prompt'):
+        with st.expander("🔍 고도화된 프롬프트 확인"):
+            st.markdown(partial['enhanced_prompt'])
+    if partial.get('queries'):
+        with st.expander("🔍 생성된 검색 쿼리 확인"):
+            for query in partial['queries'].get('internal_queries', []):
+                st.markdown(f"- 사내 검색: `{query}`")
+            st.markdown(f"- 외부 검색: `{partial['queries'].get('external', 'N/A')}`")
+    if 'internal_refs' in partial:
+        st.caption(
+            f"📚 사내 문서 {len(partial.get('internal_refs', []))}개, "
+            f"외부 자료 {len(partial.get('external_refs', []))}개 발견"
+        )
+
+def _render_queue_position(job_id: str):
+    """입장 대기 중인 작업의 대기열 순번 표시"""
+    position = get_analysis_job_service().get_queue_position(job_id)
+    stats = get_admission_controller().get_stats()
+    if position:
+        st.info(f"⏳ 분석 대기열 {position}번째입니다. 앞선 분석이 끝나면 자동으로 시작합니다.")
+    else:
+        st.info("⏳ 분석을 시작하는 중...")
+    st.caption(f"동시 분석 {stats['running']}/{stats['max_concurrent']} · 대기 {stats['queued']}건")
+
+def _finish_analysis_job(notice_type: str, message: str):
+    """작업 종료 처리 후 전체 화면 갱신"""
+    st.session_state.analysis_job_id = None
+    st.session_state.analysis_in_progress = False
+    st.session_state.analysis_job_notice = (notice_type, message)
+    st.rerun()
 
 def _render_analysis_results():
     """분석 결과 렌더링"""
@@ -155,6 +286,28 @@ def _render_analysis_results():
     # 메인 분석 결과 강조 표시
     st.markdown("---")
     st.markdown("## 🎯 **최종 분석 결과**")
+    if current_result.get('mode') == 'quick':
+        st.caption(f"⚡ 빠른 분석 · {current_result.get('elapsed_seconds', 0):.1f}초")
+    degradations = current_result.get('degradations') or []
+    if degradations:
+        st.caption(
+            f"⏱️ 제한 시간 내 응답을 위해 축소된 분석 ({current_result.get('elapsed_seconds', 0):.1f}초): "
+            + " · ".join(item['message'] for item in degradations)
+        )
+    cache_info = current_result.get('cache') or {}
+    if cache_info.get('hit'):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.caption(
+                f"♻️ 비슷한 이전 요청의 결과 재사용 (유사도 {cache_info.get('similarity', 0):.2f}, "
+                f"{datetime.fromtimestamp(cache_info.get('cached_at', 0)).strftime('%m-%d %H:%M')} 분석)"
+            )
+        with col2:
+            if st.button("🔄 새로 분석", key="refresh_cached_analysis", use_container_width=True):
+                st.session_state.force_refresh_once = True
+                st.session_state.auto_start_analysis = True
+                st.session_state.current_analysis_result = None
+                st.rerun()
     
     final_result = current_result.get('result', '')
     if final_result:
@@ -262,7 +415,9 @@ def _display_step_details(analysis_result):
     
     st.markdown("**2단계: 검색 쿼리 생성**")
     queries = analysis_result.get('queries', {})
-    st.markdown(f"- 사내 검색: `{queries.get('internal', 'N/A')}`")
+    internal_queries = queries.get('internal_queries') or [queries.get('internal', 'N/A')]
+    for query in internal_queries:
+        st.markdown(f"- 사내 검색: `{query}`")
     st.markdown(f"- 외부 검색: `{queries.get('external', 'N/A')}`")
     
     st.markdown("**3단계: 레퍼런스 검색 결과**")
@@ -321,6 +476,10 @@ def _insert_content_to_document(content: str, content_type: str):
 
 def _close_ai_panel():
     """AI 패널 닫기"""
+    job_id = st.session_state.get('analysis_job_id')
+    if job_id:
+        get_analysis_job_service().cancel(job_id)
+        st.session_state.analysis_job_id = None
     st.session_state.ai_panel_open = False
     st.session_state.analysis_mode = None
     st.session_state.analysis_text = ""
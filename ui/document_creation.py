@@ -6,7 +6,9 @@ import time
 from state.session_state import session_state
 from core.session_manager import session_manager
 from core.constants import UIConstants, MessageConstants
-from core.utils import show_message, get_text_stats
+from core.utils import show_message, get_text_stats, get_session_id
+from config import RETRIEVAL_PREFETCH_CONFIG
+from services.retrieval_prefetcher import get_retrieval_prefetcher
 from datetime import datetime
 
 def render_document_creation_page():
@@ -175,6 +177,15 @@ def render_document_creation():
     if selected_text != st.session_state.get('selected_text', ''):
         st.session_state.selected_text = selected_text
     
+    # 편집 중 선행 검색 (내용이 잠시 그대로면 백그라운드에서 사내 문서 검색 결과를 미리 준비)
+    if st.checkbox(
+        "🔮 편집 중 사내 문서 미리 검색",
+        value=RETRIEVAL_PREFETCH_CONFIG["enabled"],
+        key="retrieval_prefetch",
+        help="입력을 멈추면 분석에 쓰일 사내 문서 검색을 미리 실행해 분석 시작 후 검색 단계를 줄입니다."
+    ):
+        get_retrieval_prefetcher().schedule(get_session_id(), document_content, selected_text)
+    
     # 빠른 통계 표시
     _render_quick_stats(document_content, selected_text)
     
@@ -225,8 +225,8 @@ def _render_save_dialog(doc):
                     doc_manager = st.session_state.doc_manager
                 else:
                     # 동적으로 문서 관리 서비스 생성
-                    from services.document_management_service import DocumentManagementService
-                    doc_manager = DocumentManagementService()
+                    from services.document_management_service import get_document_manager
+                    doc_manager = get_document_manager()
                 
                 result = doc_manager.save_generated_document(
                     content=content,
@@ -3,9 +3,17 @@
 """
 import streamlit as st
 import time
+import uuid
 from typing import List, Dict, Any
 from datetime import datetime
 
+from config import INGESTION_CONFIG, APP_CONFIG
+from core.utils import get_session_id
+from services.document_management_service import clear_listing_cache
+from services.ingestion_queue import (
+    get_ingestion_queue, ITEM_QUEUED, ITEM_PROCESSING, ITEM_COMPLETED, ITEM_FAILED, ITEM_DUPLICATE
+)
+
 def render_document_upload_page(doc_manager):
     """사내 문서 업로드 페이지"""
     st.markdown("## 📚 사내 문서 학습")
@@ -69,7 +77,7 @@ def render_upload_interface(doc_manager):
             with col1:
                 st.write(f"{i+1}. {file.name}")
             with col2:
-                file_size = len(file.getvalue())
+                file_size = file.size
                 st.write(f"{file_size:,} bytes")
             with col3:
                 st.write(file.type if file.type else "Unknown")
@@ -113,30 +121,26 @@ def render_upload_interface(doc_manager):
                 "tags": tags,
                 "description": description
             })
+    
+    # 처리 현황
+    render_ingestion_status()
 
 def upload_documents(doc_manager, files: List, metadata: Dict[str, str]):
-    """문서 업로드 실행"""
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    results_container = st.empty()
+    """문서 업로드 실행 - 인덱싱 큐에 등록하고 처리는 백그라운드 워커가 담당"""
+    queue = get_ingestion_queue()
+    batch_id = str(uuid.uuid4())
+    session_id = get_session_id()
     
     total_files = len(files)
-    successful_uploads = 0
+    queued_files = 0
     failed_uploads = []
     
-    for i, file in enumerate(files):
-        status_text.text(f"📤 업로드 중: {file.name} ({i+1}/{total_files})")
-        progress = (i) / total_files
-        progress_bar.progress(progress)
-        
+    for file in files:
         try:
-            # 파일 내용 읽기
-            file_content = file.getvalue()
-            
-            # 파일 크기 제한 검사 (10MB)
-            if len(file_content) > 10 * 1024 * 1024:
-                failed_uploads.append((file.name, ["파일 크기가 10MB를 초과합니다"]))
-                st.error(f"❌ {file.name}: 파일 크기 초과")
+            # 파일 크기 제한 검사 - 내용은 큐 등록 시 해시와 함께 스트리밍으로 기록
+            max_size = APP_CONFIG["max_upload_size"]
+            if file.size > max_size:
+                failed_uploads.append((file.name, [f"파일 크기가 {max_size // (1024 * 1024)}MB를 초과합니다"]))
                 continue
             
             # 메타데이터 준비 (안전한 문자열만 사용)
@@ -161,56 +165,83 @@ def upload_documents(doc_manager, files: List, metadata: Dict[str, str]):
                     "uploader": "streamlit_user"
                 }
             
-            # 업로드 실행
-            result = doc_manager.upload_training_document(
-                file_content=file_content,
+            queue.enqueue(
+                source=file,
                 filename=file.name,
-                metadata=file_metadata
+                metadata=file_metadata,
+                batch_id=batch_id,
+                session_id=session_id
             )
-            
-            if result["success"]:
-                successful_uploads += 1
-                st.success(f"✅ {file.name} 업로드 완료")
-            else:
-                failed_uploads.append((file.name, result.get("errors", ["Unknown error"])))
-                st.error(f"❌ {file.name} 업로드 실패")
-            
-            time.sleep(0.5)  # 시각적 효과
+            queued_files += 1
             
         except Exception as e:
             failed_uploads.append((file.name, [str(e)]))
-            st.error(f"❌ {file.name} 처리 중 오류: {str(e)}")
     
-    # 완료
-    progress_bar.progress(1.0)
-    status_text.text("✅ 업로드 완료!")
+    if queued_files:
+        st.success(f"📥 {queued_files}개 문서를 처리 대기열에 등록했습니다. 창을 닫아도 백그라운드에서 계속 처리됩니다.")
     
-    # 결과 요약
-    with results_container.container():
-        st.markdown("---")
-        st.markdown("### 📊 업로드 결과")
-        
-        col1, col2, col3 = st.columns(3)
-        
+    if failed_uploads:
+        st.markdown("#### ❌ 등록 실패 파일")
+        for filename, errors in failed_uploads:
+            with st.expander(f"❌ {filename}"):
+                for error in errors:
+                    st.error(f"오류: {error}")
+    
+    if queued_files < total_files:
+        st.warning(f"⚠️ {total_files - queued_files}개 파일은 등록되지 않았습니다.")
+
+def render_ingestion_status():
+    """인덱싱 대기열 상태 (현재 세션에서 올린 파일별)"""
+    queue = get_ingestion_queue()
+    items = queue.list_items(session_id=get_session_id(), limit=50)
+    if not items:
+        return
+    
+    st.markdown("---")
+    st.markdown("### 📦 문서 처리 현황")
+    
+    status_labels = {
+        ITEM_QUEUED: "⏳ 대기",
+        ITEM_PROCESSING: "🔄 처리 중",
+        ITEM_COMPLETED: "✅ 완료",
+        ITEM_FAILED: "❌ 실패",
+        ITEM_DUPLICATE: "🔗 기존 문서에 연결"
+    }
+    counts = {status: 0 for status in status_labels}
+    for item in items:
+        counts[item['status']] = counts.get(item['status'], 0) + 1
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("대기", counts[ITEM_QUEUED])
+    col2.metric("처리 중", counts[ITEM_PROCESSING])
+    col3.metric("완료", counts[ITEM_COMPLETED] + counts[ITEM_DUPLICATE])
+    col4.metric("실패", counts[ITEM_FAILED])
+    
+    for item in items:
+        col1, col2, col3 = st.columns([3, 2, 1])
         with col1:
-            st.metric("전체 파일", total_files)
-        
+            st.write(f"📄 {item['filename']}")
         with col2:
-            st.metric("성공", successful_uploads, delta=f"{(successful_uploads/total_files)*100:.0f}%")
-        
+            label = status_labels.get(item['status'], item['status'])
+            if item['status'] == ITEM_QUEUED and item['attempts']:
+                label += f" (재시도 {item['attempts']}회)"
+            st.write(label)
+            if item['status'] == ITEM_DUPLICATE:
+                st.caption("같은 내용의 문서가 이미 있어 새로 저장하지 않았습니다.")
+            if item.get('error') and item['status'] not in (ITEM_COMPLETED, ITEM_DUPLICATE):
+                st.caption(f"오류: {item['error'][:200]}")
         with col3:
-            st.metric("실패", len(failed_uploads))
-        
-        if failed_uploads:
-            st.markdown("#### ❌ 업로드 실패 파일")
-            for filename, errors in failed_uploads:
-                with st.expander(f"❌ {filename}"):
-                    for error in errors:
-                        st.error(f"오류: {error}")
-        
-        if successful_uploads > 0:
-            st.success(f"🎉 {successful_uploads}개 문서가 성공적으로 학습되었습니다!")
-            st.info("업로드된 문서들은 이제 AI 분석에서 참조할 수 있습니다.")
+            if item['status'] == ITEM_FAILED:
+                if st.button("🔁 재시도", key=f"retry_ingestion_{item['item_id']}"):
+                    queue.retry(item['item_id'])
+                    st.rerun()
+    
+    pending = counts[ITEM_QUEUED] + counts[ITEM_PROCESSING]
+    if pending:
+        if st.button("🔄 처리 현황 새로고침", key="refresh_ingestion_status"):
+            st.rerun()
+        if not INGESTION_CONFIG["run_in_process"]:
+            st.caption("ℹ️ 별도 워커 프로세스(`python -m services.ingestion_worker`)가 대기열을 처리합니다.")
 
 def render_training_documents_list(doc_manager):
     """학습된 문서 목록"""
@@ -241,6 +272,8 @@ def render_training_documents_list(doc_manager):
                 if cache_key in st.session_state:
                     del st.session_state[cache_key]
             
+            clear_listing_cache()
+            
             # 검색 입력 초기화
             st.session_state['training_docs_search'] = ""
             
@@ -280,6 +313,8 @@ def render_training_documents_list(doc_manager):
         search_available = stats.get("search_available", False) 
         st.metric("Search 상태", "✅ 연결됨" if search_available else "❌ 비연결")
     
+    render_bulk_actions(doc_manager, documents)
+    
     st.markdown("---")
     
     # 문서 목록 표시
@@ -322,6 +357,82 @@ def render_training_documents_list(doc_manager):
                         st.session_state[f'confirm_delete_{doc["file_id"]}'] = True
                         st.warning("⚠️ 다시 한번 클릭하면 삭제됩니다.")
 
+def render_bulk_actions(doc_manager, documents: List[Dict[str, Any]]):
+    """여러 문서에 대한 일괄 작업 (삭제/태그 변경/재인덱싱/복사)"""
+    with st.expander("🧰 일괄 작업"):
+        titles = {doc['file_id']: f"{doc['title']} ({doc['filename']})" for doc in documents}
+        
+        select_all = st.checkbox("목록의 모든 문서 선택", key="bulk_select_all")
+        selected = st.multiselect(
+            "대상 문서",
+            options=list(titles),
+            default=list(titles) if select_all else [],
+            format_func=lambda file_id: titles[file_id],
+            key="bulk_selected_docs"
+        )
+        
+        if not selected:
+            st.caption("작업할 문서를 선택하세요.")
+            return
+        
+        action = st.radio(
+            "작업",
+            ["🏷️ 태그 변경", "🔄 재인덱싱", "📑 복사", "🗑️ 삭제"],
+            horizontal=True,
+            key="bulk_action"
+        )
+        
+        report = None
+        if action == "🏷️ 태그 변경":
+            col1, col2 = st.columns(2)
+            with col1:
+                add_tags = st.text_input("추가할 태그 (쉼표로 구분)", key="bulk_add_tags")
+            with col2:
+                remove_tags = st.text_input("제거할 태그 (쉼표로 구분)", key="bulk_remove_tags")
+            department = st.text_input("관련 부서 변경 (비워두면 유지)", key="bulk_department")
+            
+            if st.button(f"🏷️ {len(selected)}개 문서 태그 변경", key="bulk_retag_button"):
+                with st.spinner("태그를 변경하는 중..."):
+                    report = doc_manager.bulk_retag_documents(
+                        selected,
+                        add_tags=[tag.strip() for tag in add_tags.split(',') if tag.strip()],
+                        remove_tags=[tag.strip() for tag in remove_tags.split(',') if tag.strip()],
+                        fields={"department": department.strip()} if department.strip() else None
+                    )
+        
+        elif action == "🔄 재인덱싱":
+            if st.button(f"🔄 {len(selected)}개 문서 재인덱싱", key="bulk_reindex_button"):
+                with st.spinner("문서를 다시 인덱싱하는 중..."):
+                    report = doc_manager.bulk_reindex_documents(selected)
+        
+        elif action == "📑 복사":
+            if st.button(f"📑 {len(selected)}개 문서 복사", key="bulk_copy_button"):
+                with st.spinner("문서를 복사하는 중..."):
+                    report = doc_manager.bulk_copy_documents(selected)
+        
+        else:
+            confirmed = st.checkbox(f"선택한 {len(selected)}개 문서를 삭제합니다 (되돌릴 수 없음)", key="bulk_delete_confirm")
+            if st.button(f"🗑️ {len(selected)}개 문서 삭제", key="bulk_delete_button", type="secondary", disabled=not confirmed):
+                with st.spinner("문서를 삭제하는 중..."):
+                    report = doc_manager.bulk_delete_documents(selected)
+        
+        if report:
+            render_bulk_report(report, titles)
+
+def render_bulk_report(report: Dict[str, Any], titles: Dict[str, str]):
+    """일괄 작업 결과 (문서별)"""
+    if report["success"]:
+        st.success(f"✅ {report['succeeded']}개 문서 처리 완료")
+    else:
+        st.warning(f"⚠️ {report['total']}개 중 {report['succeeded']}개 성공, {report['failed']}개 실패")
+    
+    for file_id, item in report["items"].items():
+        if not item.get("success") or item.get("errors"):
+            st.error(f"❌ {titles.get(file_id, file_id)}: {', '.join(item['errors']) or '실패'}")
+    
+    if report["succeeded"]:
+        st.caption("🔄 목록 새로고침 버튼을 누르면 변경 사항이 반영됩니다.")
+
 def show_document_content(doc_manager, doc):
     """문서 내용 표시"""
     st.markdown(f"### 📖 문서 내용: {doc['title']}")
@@ -6,6 +6,8 @@ import time
 from typing import List, Dict, Any
 from datetime import datetime
 
+from services.document_management_service import clear_listing_cache
+
 def render_generated_documents_page(doc_manager):
     """생성된 문서 관리 페이지"""
     st.markdown("## 📄 생성된 문서 관리")
@@ -51,6 +53,7 @@ def render_documents_list(doc_manager):
     
     with col3:
         if st.button("🔄 새로고침", use_container_width=True):
+            clear_listing_cache()
             st.rerun()
     
     # 문서 목록 가져오기
@@ -154,7 +157,7 @@ def render_document_card(doc_manager, doc):
             
             # AI 분석 버튼
             if st.button("🤖 AI 분석", key=f"ai_analyze_{doc['file_id']}", use_container_width=True):
-                content = doc_manager.get_document_content(doc['file_id'])
+                content = doc_manager.get_document_content(doc['file_id'], max_bytes=16 * 1024)
                 if content:
                     st.session_state['selected_text'] = content[:1000] if len(content) > 1000 else content
                     st.session_state['ai_panel_open'] = True
@@ -177,7 +180,8 @@ def render_document_card(doc_manager, doc):
 
 def get_document_preview(doc_manager, file_id: str) -> str:
     """문서 미리보기 생성"""
-    content = doc_manager.get_document_content(file_id)
+    # 미리보기에 필요한 앞부분만 범위 요청으로 가져옴
+    content = doc_manager.get_document_content(file_id, max_bytes=4096)
     if content:
         # 처음 200자만 미리보기로 표시
         preview = content[:200]
@@ -345,6 +349,8 @@ def render_management_tools(doc_manager):
         if st.button("🧹 임시 파일 정리", use_container_width=True):
             cleanup_temp_files(doc_manager)
     
+    render_backup_status()
+    
     # 서비스 상태
     st.markdown("#### 🔍 서비스 상태")
     
@@ -390,12 +396,61 @@ def count_recent_documents(documents: List[Dict], days: int = 7) -> int:
     return count
 
 def backup_all_documents(doc_manager):
-    """모든 문서 백업"""
-    st.info("🔄 문서 백업 기능은 개발 중입니다.")
+    """모든 문서 백업 (백그라운드 실행, 중단된 백업은 이어서 진행)"""
+    from services.backup_service import BackupService, start_background, KIND_EXPORT
+    
+    service = BackupService(doc_manager.storage_service, doc_manager.search_service)
+    if start_background(KIND_EXPORT, service=service):
+        st.success("🗂️ 백업을 시작했습니다. 진행 상황은 아래 백업 상태에서 확인할 수 있습니다.")
+    else:
+        st.warning("⏳ 이미 백업/복원이 진행 중입니다.")
+
+def render_backup_status():
+    """최근 백업/복원 실행 상태"""
+    from services.backup_service import BackupCheckpointStore, is_background_running, RUN_COMPLETED, RUN_RUNNING
+    
+    run = BackupCheckpointStore("backup.db").last_run()
+    if not run:
+        return
+    
+    st.markdown("#### 🗂️ 백업 상태")
+    stats = run["stats"]
+    status_icon = {RUN_COMPLETED: "✅", RUN_RUNNING: "🔄"}.get(run["status"], "❌")
+    if run["status"] == RUN_RUNNING and not is_background_running():
+        status_icon = "⏸️"
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("상태", f"{status_icon} {run['status']}")
+    with col2:
+        st.metric("문서", stats.get("blobs", 0), delta=f"실패 {stats.get('failed', 0)}" if stats.get("failed") else None)
+    with col3:
+        st.metric("인덱스 레코드", stats.get("index_records", 0))
+    
+    st.caption(f"{run['kind']} · 시작 {format_date(run['started_at'])} · 갱신 {format_date(run['updated_at'])}")
+    if run.get("archive_blob"):
+        st.info(f"📦 아카이브: {run['archive_blob']}")
+    elif run["status"] == RUN_COMPLETED:
+        st.info(f"📦 아카이브: {run['archive_path']}")
+    if run.get("error"):
+        st.error(run["error"])
+    for error in stats.get("errors", [])[:10]:
+        st.caption(f"⚠️ {error}")
+    
+    if run["status"] == RUN_RUNNING:
+        st.button("🔄 상태 새로고침", key="refresh_backup_status")
 
 def cleanup_temp_files(doc_manager):
     """임시 파일 정리"""
-    st.info("🧹 임시 파일 정리 기능은 개발 중입니다.")
+    from services.backup_service import BackupService
+    
+    with st.spinner("임시 파일 정리 중..."):
+        result = BackupService(doc_manager.storage_service, doc_manager.search_service).cleanup_temp_files()
+    
+    if result["removed_files"]:
+        st.success(f"🧹 {result['removed_files']}개 항목 정리 ({result['freed_bytes'] / (1024*1024):.1f} MB 확보)")
+    else:
+        st.info("🧹 정리할 임시 파일이 없습니다.")
 
 def show_detailed_statistics(doc_manager):
     """상세 통계 표시"""
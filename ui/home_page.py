@@ -8,6 +8,11 @@ from typing import Dict, List, Any
 from core.session_manager import session_manager
 from core.constants import UIConstants, MessageConstants
 from core.utils import show_message, format_datetime
+from utils.model_router import get_model_router
+from utils.openai_client import get_openai_client
+from utils.external_search import get_external_search_client
+from utils.circuit_breaker import get_all_breaker_status, STATE_CLOSED, STATE_OPEN
+from services.warmup import get_warmup_status, WARMUP_RUNNING
 
 def render_home_page():
     """메인 홈 페이지 렌더링"""
@@ -46,7 +51,7 @@ def _render_welcome_section():
         _render_system_status()
 
 def _render_system_status():
-    """시스템 상태 표시"""
+    """시스템 상태 표시 (서킷 브레이커 상태 반영 - 프로세스 내 모든 세션 공통)"""
     st.markdown("#### 🔍 시스템 상태")
     
     doc_manager = st.session_state.get('doc_manager')
@@ -55,9 +60,12 @@ def _render_system_status():
         return
     
     test_results = doc_manager.test_services()
+    breakers = {status["name"]: status for status in get_all_breaker_status()}
     
-    # Azure Storage 상태
-    if test_results["storage_service"]["available"]:
+    # Azure Storage 상태 (복구 확인 중에도 available이므로 브레이커 상태를 먼저 확인)
+    if breakers["azure_storage"]["state"] != STATE_CLOSED:
+        _render_breaker_card(breakers["azure_storage"])
+    elif test_results["storage_service"]["available"]:
         st.markdown(
             '<div class="status-card status-good">✅ Azure Storage 연결됨</div>', 
             unsafe_allow_html=True
@@ -69,7 +77,9 @@ def _render_system_status():
         )
     
     # Azure AI Search 상태
-    if test_results["search_service"]["available"]:
+    if breakers["azure_search"]["state"] != STATE_CLOSED:
+        _render_breaker_card(breakers["azure_search"])
+    elif test_results["search_service"]["available"]:
         st.markdown(
             '<div class="status-card status-good">✅ Azure AI Search 연결됨</div>', 
             unsafe_allow_html=True
@@ -84,6 +94,75 @@ def _render_system_status():
             '<div class="status-card status-warning">⚠️ Azure AI Search 연결 실패</div>', 
             unsafe_allow_html=True
         )
+    
+    # Azure OpenAI 상태
+    if not get_openai_client().configured:
+        st.markdown(
+            '<div class="status-card status-warning">⚠️ Azure OpenAI 설정 없음</div>', 
+            unsafe_allow_html=True
+        )
+    elif breakers["openai"]["state"] != STATE_CLOSED:
+        _render_breaker_card(breakers["openai"])
+    else:
+        st.markdown(
+            '<div class="status-card status-good">✅ Azure OpenAI 사용 가능</div>', 
+            unsafe_allow_html=True
+        )
+    
+    # 외부 웹 검색 상태
+    if not get_external_search_client().provider.live:
+        st.markdown(
+            '<div class="status-card status-warning">ℹ️ 외부 웹 검색 미설정 (예시 결과 사용)</div>', 
+            unsafe_allow_html=True
+        )
+    elif breakers["tavily"]["state"] != STATE_CLOSED:
+        _render_breaker_card(breakers["tavily"])
+    else:
+        st.markdown(
+            '<div class="status-card status-good">✅ Tavily 웹 검색 사용 가능</div>', 
+            unsafe_allow_html=True
+        )
+    
+    warmup = get_warmup_status()
+    if warmup["state"] == WARMUP_RUNNING:
+        st.caption("🔥 연결과 문서 목록을 준비하는 중입니다. 첫 분석이 조금 느릴 수 있습니다.")
+    elif warmup["result"] and warmup["result"]["degraded"]:
+        failed = [step["name"] for step in warmup["result"]["steps"] if not step["ok"]]
+        st.caption(f"⚠️ 시작 준비 일부 실패: {', '.join(failed)}")
+    
+    _render_model_metrics()
+
+def _render_breaker_card(status: Dict[str, Any]):
+    """서킷 브레이커가 차단/복구 확인 중인 서비스 카드"""
+    if status["state"] == STATE_OPEN:
+        st.markdown(
+            f'<div class="status-card status-error">⛔ {status["label"]} 일시 차단 '
+            f'(연속 실패 {status["consecutive_failures"]}회, {status["retry_after"]:.0f}초 후 재시도)</div>', 
+            unsafe_allow_html=True
+        )
+    else:
+        st.markdown(
+            f'<div class="status-card status-warning">🔄 {status["label"]} 복구 확인 중</div>', 
+            unsafe_allow_html=True
+        )
+    if status["last_error"]:
+        st.caption(f"최근 오류: {status['last_error']}")
+
+def _render_model_metrics():
+    """분석 단계별 모델 호출 지표 (프로세스 시작 이후 누적)"""
+    metrics = get_model_router().get_metrics()
+    if not metrics:
+        return
+    
+    with st.expander("⏱️ 단계별 모델 지표"):
+        for stage, stage_metrics in metrics.items():
+            deployments = ", ".join(f"{name} {count}회" for name, count in stage_metrics["deployments"].items())
+            st.markdown(
+                f"**{stage}** · {deployments or '-'}  \n"
+                f"p50 {stage_metrics['p50_latency']:.1f}초 / p95 {stage_metrics['p95_latency']:.1f}초 · "
+                f"토큰 {stage_metrics['prompt_tokens'] + stage_metrics['completion_tokens']:,} · "
+                f"${stage_metrics['cost_usd']:.4f} · 실패 {stage_metrics['failures']} / 대체 {stage_metrics['fallbacks']}"
+            )
 
 def _render_feature_cards():
     """주요 기능 카드 렌더링"""
@@ -1,11 +1,65 @@
 """
 AI 서비스 모듈 - 간소화된 버전 (리팩토링용)
 """
-import openai
 import streamlit as st
 import json
-from typing import List, Dict, Any, Optional
-from config import AI_CONFIG, TAVILY_CONFIG
+import time
+import openai
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from config import AI_CONFIG, RETRIEVAL_CONFIG, QUICK_ANALYSIS_CONFIG
+from utils.context_packer import ContextPacker
+from utils.openai_client import get_openai_client
+from utils.model_router import get_model_router
+from utils.external_search import get_external_search_client, LocalSearchProvider
+
+# 1+2단계 통합 호출의 구조화 출력 스키마
+_ANALYSIS_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "refined_prompt": {"type": "string"},
+        "internal_queries": {"type": "array", "items": {"type": "string"}},
+        "external_queries": {"type": "array", "items": {"type": "string"}},
+        "hints": {
+            "type": "object",
+            "properties": {
+                "keywords": {"type": "array", "items": {"type": "string"}},
+                "needs_external": {"type": "boolean"}
+            },
+            "required": ["keywords", "needs_external"],
+            "additionalProperties": False
+        }
+    },
+    "required": ["refined_prompt", "internal_queries", "external_queries", "hints"],
+    "additionalProperties": False
+}
+_ANALYSIS_PLAN_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "analysis_plan", "strict": True, "schema": _ANALYSIS_PLAN_SCHEMA}
+}
+# 배포/API 버전이 json_schema 형식을 거부하면 이후에는 JSON 모드로만 호출
+_json_schema_unsupported = False
+
+# 다중 관점 분석 - 같은 검색 결과와 컨텍스트를 공유하고 관점별 지시문만 다르게 생성
+ANALYSIS_PERSPECTIVES = {
+    "comprehensive": {
+        "label": "종합 분석",
+        "icon": "🔍",
+        "instruction": "주어진 문서 내용을 분석하고, 사내 문서와 외부 자료를 참고하여 포괄적이고 실용적인 분석 결과를 제공하세요.",
+        "temperature": 0.7
+    },
+    "summary": {
+        "label": "요약 분석",
+        "icon": "📝",
+        "instruction": "주어진 문서 내용의 핵심을 요약하세요. 주요 주장, 결론, 수치를 개조식으로 간결하게 정리하고, 사내 문서와 외부 자료는 요약을 보완하는 데에만 사용하세요.",
+        "temperature": 0.3
+    },
+    "improvement": {
+        "label": "개선점 분석",
+        "icon": "💡",
+        "instruction": "주어진 문서 내용의 부족한 점과 개선이 필요한 부분을 찾아 구체적인 수정 방향과 실행 방안을 제시하세요. 사내 문서의 기준과 외부 자료의 모범 사례를 근거로 드세요.",
+        "temperature": 0.5
+    }
+}
 
 class AIService:
     """AI 서비스 클래스"""
@@ -13,246 +67,525 @@ class AIService:
     def __init__(self):
         """AI 서비스 초기화"""
         self.client = None
+        self.router = None
+        self.context_packer = ContextPacker()
+        self.last_context_stats: Dict[str, Any] = {}
+        self.stage_records: List[Dict[str, Any]] = []  # 단계별 모델 호출 기록 (지연 시간/토큰)
         self._initialize_openai_client()
     
     def _initialize_openai_client(self):
-        """OpenAI 클라이언트 초기화"""
+        """OpenAI 클라이언트 초기화 (속도 제한/재시도가 적용된 공유 클라이언트)"""
         try:
-            if AI_CONFIG.get("openai_api_key") and AI_CONFIG.get("openai_endpoint"):
-                self.client = openai.AzureOpenAI(
-                    api_key=AI_CONFIG["openai_api_key"],
-                    azure_endpoint=AI_CONFIG["openai_endpoint"],
-                    api_version=AI_CONFIG["api_version"]
-                )
+            client = get_openai_client()
+            if client.configured:
+                self.client = client
+                self.router = get_model_router()
         except Exception as e:
             st.warning(f"OpenAI 클라이언트 초기화 실패: {str(e)}")
     
-    def refine_user_prompt(self, context: str) -> str:
+    def _chat(self, stage: str, messages: List[Dict[str, str]], **kwargs):
+        """단계별 라우팅으로 모델 호출 후 호출 기록 보관 (워커 스레드에서도 호출됨)"""
+        response, record = self.router.chat_completion(stage, messages, **kwargs)
+        self.stage_records.append(record)
+        return response
+    
+    def refine_user_prompt(self, context: str, deadline: Optional[float] = None) -> str:
         """사용자 프롬프트 고도화"""
         if not self.client:
             return context
             
         try:
-            response = self.client.chat.completions.create(
-                model=AI_CONFIG["deployment_name"],
+            response = self._chat(
+                "refine",
                 messages=[
                     {"role": "system", "content": "사용자의 요청을 더 구체적이고 명확하게 개선해주세요."},
                     {"role": "user", "content": f"다음 요청을 개선해주세요: {context}"}
                 ],
                 max_tokens=500,
-                temperature=0.3
+                temperature=0.3,
+                deadline=deadline
             )
             return response.choices[0].message.content
         except Exception as e:
             st.warning(f"프롬프트 고도화 실패: {str(e)}")
             return context
     
-    def generate_search_queries(self, enhanced_prompt: str) -> Dict[str, str]:
-        """검색 쿼리 생성"""
+    def generate_search_queries(self, enhanced_prompt: str, num_internal_queries: Optional[int] = None,
+                                deadline: Optional[float] = None) -> Dict[str, Any]:
+        """검색 쿼리 생성 (사내 검색용 다중 서브 쿼리 포함)"""
+        num_internal_queries = num_internal_queries or RETRIEVAL_CONFIG["num_internal_queries"]
+        fallback = {
+            "internal": enhanced_prompt,
+            "internal_queries": [enhanced_prompt],
+            "external": enhanced_prompt
+        }
+
         if not self.client:
-            return {"internal": enhanced_prompt, "external": enhanced_prompt}
-            
+            return fallback
+
         try:
-            response = self.client.chat.completions.create(
-                model=AI_CONFIG["deployment_name"],
+            system_prompt = (
+                f"사내 문서 검색용 쿼리 {num_internal_queries}개와 외부 검색용 쿼리 1개를 생성해주세요.\n"
+                "사내 검색 쿼리들은 서로 다른 관점(핵심 키워드, 동의어/유사 표현, 세부 주제 등)을 다루도록 다양하게 작성하세요.\n"
+                'JSON 형식으로만 반환하세요: {"internal_queries": ["...", "..."], "external": "..."}'
+            )
+            response = self._chat(
+                "queries",
                 messages=[
-                    {"role": "system", "content": "사내 문서 검색용과 외부 검색용 쿼리를 각각 생성해주세요. JSON 형식으로 반환하세요."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": f"요청: {enhanced_prompt}"}
                 ],
-                max_tokens=300,
-                temperature=0.3
+                deadline=deadline,
+                max_tokens=400,
+                temperature=0.5,
+                response_format={"type": "json_object"}
             )
-            
+
             result = response.choices[0].message.content
             try:
                 queries = json.loads(result)
-                return {
-                    "internal": queries.get("internal", enhanced_prompt),
-                    "external": queries.get("external", enhanced_prompt)
-                }
             except:
-                return {"internal": enhanced_prompt, "external": enhanced_prompt}
-                
+                return fallback
+
+            internal_queries = queries.get("internal_queries") or []
+            if isinstance(internal_queries, str):
+                internal_queries = [internal_queries]
+            # 이전 형식({"internal": "..."}) 응답도 허용
+            if not internal_queries and queries.get("internal"):
+                internal_queries = [queries["internal"]]
+            internal_queries = [q.strip() for q in internal_queries if isinstance(q, str) and q.strip()]
+            internal_queries = internal_queries[:num_internal_queries] or [enhanced_prompt]
+
+            return {
+                "internal": internal_queries[0],
+                "internal_queries": internal_queries,
+                "external": queries.get("external") or enhanced_prompt
+            }
+
         except Exception as e:
             st.warning(f"검색 쿼리 생성 실패: {str(e)}")
-            return {"internal": enhanced_prompt, "external": enhanced_prompt}
+            return fallback
     
+    def plan_analysis(self, context: str, num_internal_queries: Optional[int] = None,
+                      deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        프롬프트 고도화 + 검색 쿼리 생성을 한 번의 구조화 출력 호출로 처리
+
+        Args:
+            context: 사용자 요청과 분석 대상 내용 (refine_user_prompt와 같은 형식)
+            num_internal_queries: 사내 검색 서브 쿼리 수
+            deadline: 절대 마감 시각 (넘기면 TimeoutError - 호출 측에서 원본 요청으로 대체)
+
+        Returns:
+            {"enhanced_prompt", "internal", "internal_queries", "external", "external_queries",
+             "hints": {"keywords", "needs_external"}, "structured": 통합 호출 성공 여부}
+            (통합 호출이 실패하거나 스키마에 맞지 않으면 기존 두 단계 호출 결과)
+        """
+        global _json_schema_unsupported
+        num_internal_queries = num_internal_queries or RETRIEVAL_CONFIG["num_internal_queries"]
+
+        if self.client:
+            system_prompt = (
+                "문서 분석 요청을 처리하기 위한 계획을 세웁니다.\n"
+                "1. refined_prompt: 사용자의 요청을 더 구체적이고 명확하게 개선한 분석 요청\n"
+                f"2. internal_queries: 사내 문서 검색용 쿼리 {num_internal_queries}개 "
+                "(핵심 키워드, 동의어/유사 표현, 세부 주제 등 서로 다른 관점)\n"
+                "3. external_queries: 외부 웹 검색용 쿼리 1~2개\n"
+                "4. hints.keywords: 사내 문서에 그대로 나올 법한 핵심 용어 (최대 5개)\n"
+                "5. hints.needs_external: 최신 동향/업계 자료 등 외부 자료가 도움이 되면 true, "
+                "사내 문서만으로 충분한 작업(문장 다듬기, 형식 변환 등)이면 false"
+            )
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"다음 요청의 분석 계획을 세워주세요: {context}"}
+            ]
+
+            for response_format in (_ANALYSIS_PLAN_FORMAT, {"type": "json_object"}):
+                if response_format is _ANALYSIS_PLAN_FORMAT and _json_schema_unsupported:
+                    continue
+                if response_format["type"] == "json_object":
+                    # json_object 모드는 스키마를 강제하지 않으므로 형식을 프롬프트로 전달
+                    messages[0] = {"role": "system", "content": system_prompt + "\nJSON 형식으로만 반환하세요: " + json.dumps(
+                        _ANALYSIS_PLAN_SCHEMA, ensure_ascii=False)}
+                try:
+                    response = self._chat(
+                        "plan",
+                        messages=messages,
+                        max_tokens=700,
+                        temperature=0.3,
+                        response_format=response_format,
+                        deadline=deadline
+                    )
+                except TimeoutError:
+                    raise
+                except openai.BadRequestError as e:
+                    if response_format is _ANALYSIS_PLAN_FORMAT:
+                        print(f"⚠️ 구조화 출력(json_schema) 미지원 - JSON 모드로 재시도: {e}")
+                        _json_schema_unsupported = True
+                        continue
+                    print(f"⚠️ 분석 계획 생성 실패: {e}")
+                    break
+                except Exception as e:
+                    print(f"⚠️ 분석 계획 생성 실패: {e}")
+                    break
+
+                plan = self._validate_analysis_plan(response.choices[0].message.content, num_internal_queries)
+                if plan:
+                    return plan
+                print("⚠️ 분석 계획 응답이 스키마와 맞지 않음")
+                break
+
+        # 폴백: 기존 두 단계 호출 (각 호출도 실패 시 원문으로 대체됨)
+        enhanced_prompt = self.refine_user_prompt(context, deadline=deadline)
+        queries = self.generate_search_queries(enhanced_prompt, num_internal_queries, deadline=deadline)
+        return {
+            "enhanced_prompt": enhanced_prompt,
+            **queries,
+            "external_queries": [queries["external"]],
+            "hints": {"keywords": [], "needs_external": True},
+            "structured": False
+        }
+
+    @staticmethod
+    def _validate_analysis_plan(content: Optional[str], num_internal_queries: int) -> Optional[Dict[str, Any]]:
+        """분석 계획 응답 검증 및 정규화 (필수 항목이 없거나 형식이 다르면 None)"""
+        try:
+            data = json.loads(content or "")
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        def string_list(value: Any) -> List[str]:
+            if isinstance(value, str):
+                value = [value]
+            if not isinstance(value, list):
+                return []
+            return list(dict.fromkeys(v.strip() for v in value if isinstance(v, str) and v.strip()))
+
+        refined_prompt = data.get("refined_prompt")
+        internal_queries = string_list(data.get("internal_queries"))[:num_internal_queries]
+        if not isinstance(refined_prompt, str) or not refined_prompt.strip() or not internal_queries:
+            return None
+
+        external_queries = string_list(data.get("external_queries")) or [refined_prompt.strip()]
+        hints = data.get("hints") if isinstance(data.get("hints"), dict) else {}
+        needs_external = hints.get("needs_external")
+
+        return {
+            "enhanced_prompt": refined_prompt.strip(),
+            "internal": internal_queries[0],
+            "internal_queries": internal_queries,
+            "external": external_queries[0],
+            "external_queries": external_queries,
+            "hints": {
+                "keywords": string_list(hints.get("keywords"))[:5],
+                "needs_external": needs_external if isinstance(needs_external, bool) else True
+            },
+            "structured": True
+        }
+
     def search_external_references(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
-        """외부 레퍼런스 검색 (Tavily 또는 더미 데이터)"""
+        """외부 레퍼런스 검색 (Tavily 또는 더미 데이터, 안내 메시지를 바로 표시 - 스크립트 스레드에서 호출)"""
+        results, notices = self.collect_external_references(query, max_results)
+        self.show_notices(notices)
+        return results
+    
+    def collect_external_references(self, query: str,
+                                    max_results: int = 5) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """
+        외부 레퍼런스 검색 - 안내 메시지를 표시하지 않고 함께 반환 (백그라운드 스레드용,
+        Streamlit은 스크립트 스레드 밖의 st 호출을 표시하지 않으므로 호출 측에서 show_notices로 표시)
+        
+        Returns:
+            (검색 결과, 안내 메시지 목록 [{"level": "info" 또는 "warning", "message": ...}])
+        """
+        notices: List[Dict[str, str]] = []
         try:
-            if TAVILY_CONFIG.get("api_key"):
-                # Tavily API 사용 (실제 구현 시)
-                return self._search_with_tavily(query, max_results)
-            else:
-                # 더미 데이터 반환
-                return self._get_dummy_external_results(query, max_results)
+            if get_external_search_client().is_live:
+                return self._search_with_tavily(query, max_results, notices), notices
+            # 더미 데이터 반환
+            return self._get_dummy_external_results(query, max_results, notices), notices
         except Exception as e:
-            st.warning(f"외부 검색 실패: {str(e)}")
-            return []
+            notices.append({"level": "warning", "message": f"외부 검색 실패: {str(e)}"})
+            return [], notices
     
-    def _search_with_tavily(self, query: str, max_results: int) -> List[Dict[str, Any]]:
-        """Tavily를 사용한 외부 검색"""
+    @staticmethod
+    def show_notices(notices: List[Dict[str, str]]):
+        """collect_external_references 안내 메시지 표시"""
+        for notice in notices:
+            if notice["level"] == "warning":
+                st.warning(notice["message"])
+            else:
+                st.info(notice["message"])
+    
+    def _search_with_tavily(self, query: str, max_results: int, notices: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Tavily를 사용한 외부 검색 (공유 세션 + 응답 캐시)"""
         try:
-            # Tavily API 사용 (requests 사용)
-            import requests
+            results = get_external_search_client().search(query, max_results=max_results)
             
-            api_key = TAVILY_CONFIG.get("api_key")
-            if not api_key:
-                st.warning("Tavily API 키가 설정되지 않았습니다.")
-                return self._get_dummy_external_results(query, max_results)
+            # Tavily 결과를 표준 형식으로 변환
+            external_results = []
+            for i, item in enumerate(results):
+                external_results.append({
+                    "id": f"tavily_{i}",
+                    "title": item.get("title") or "제목 없음",
+                    "content": item.get("content", "")[:500],  # 500자 제한
+                    "url": item.get("url", ""),
+                    "score": item.get("score", 0.5),
+                    "source": "Tavily Search",
+                    "source_detail": f"Tavily - {item.get('url', '')}",
+                    "search_type": "external_web"
+                })
             
-            # Tavily API 요청
-            url = "https://api.tavily.com/search"
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "api_key": api_key,
-                "query": query,
-                "search_depth": TAVILY_CONFIG.get("search_depth", "basic"),
-                "max_results": max_results,
-                "include_answer": True,
-                "include_raw_content": False
-            }
-            
-            response = requests.post(url, headers=headers, json=data, timeout=10)
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Tavily 결과를 표준 형식으로 변환
-                external_results = []
-                if "results" in result:
-                    for i, item in enumerate(result["results"][:max_results]):
-                        external_results.append({
-                            "id": f"tavily_{i}",
-                            "title": item.get("title", "제목 없음"),
-                            "content": item.get("content", "")[:500],  # 500자 제한
-                            "url": item.get("url", ""),
-                            "score": item.get("score", 0.5),
-                            "source": "Tavily Search",
-                            "source_detail": f"Tavily - {item.get('url', '')}",
-                            "search_type": "external_web"
-                        })
-                
-                st.info(f"✅ Tavily로 {len(external_results)}개의 외부 자료를 찾았습니다.")
-                return external_results
-            else:
-                st.warning(f"Tavily API 요청 실패: {response.status_code}")
-                return self._get_dummy_external_results(query, max_results)
+            notices.append({"level": "info", "message": f"✅ Tavily로 {len(external_results)}개의 외부 자료를 찾았습니다."})
+            return external_results
                 
         except Exception as e:
-            st.warning(f"Tavily 검색 중 오류: {str(e)}")
-            return self._get_dummy_external_results(query, max_results)
+            notices.append({"level": "warning", "message": f"Tavily 검색 중 오류: {str(e)}"})
+            return self._get_dummy_external_results(query, max_results, notices)
     
-    def _get_dummy_external_results(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+    def _get_dummy_external_results(self, query: str, max_results: int,
+                                    notices: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """더미 외부 검색 결과 (Tavily API 없을 때)"""
-        import random
-        
-        # 더 다양하고 현실적인 더미 데이터
-        dummy_templates = [
-            {
-                "source": "Wikipedia",
-                "title_format": "{query} - 위키백과",
-                "content_format": "{query}에 대한 백과사전적 정보입니다. 역사적 배경, 정의, 특징 등을 포함한 종합적인 개요를 제공합니다. 이는 검증된 정보원에서 수집된 신뢰할 수 있는 내용입니다.",
-                "url_format": "https://ko.wikipedia.org/wiki/{query}"
-            },
-            {
-                "source": "Stack Overflow",
-                "title_format": "{query} 구현 방법 - 개발자 커뮤니티",
-                "content_format": "{query}와 관련된 실제 개발 경험과 해결책을 공유하는 개발자들의 토론입니다. 코드 예제, 모범 사례, 일반적인 문제와 해결방법을 포함합니다.",
-                "url_format": "https://stackoverflow.com/questions/tagged/{query}"
-            },
-            {
-                "source": "Medium",
-                "title_format": "{query} 트렌드 분석 - 전문가 블로그",
-                "content_format": "{query}에 대한 최신 트렌드와 전문가 의견을 제공하는 기술 블로그입니다. 실무 경험을 바탕으로 한 인사이트와 향후 전망을 다룹니다.",
-                "url_format": "https://medium.com/topic/{query}"
-            },
-            {
-                "source": "GitHub",
-                "title_format": "{query} 오픈소스 프로젝트",
-                "content_format": "{query}와 관련된 오픈소스 프로젝트 및 코드 저장소입니다. 실제 구현 예제, 라이브러리, 도구 등을 포함하여 개발에 직접 활용할 수 있는 자료입니다.",
-                "url_format": "https://github.com/topics/{query}"
-            },
-            {
-                "source": "Academic Paper",
-                "title_format": "{query} 연구 논문 - 학술 자료",
-                "content_format": "{query}에 대한 학술적 연구 결과입니다. 체계적인 연구 방법론과 실증적 데이터를 바탕으로 한 전문적인 분석과 결론을 제공합니다.",
-                "url_format": "https://scholar.google.com/scholar?q={query}"
-            }
-        ]
-        
         results = []
-        for i in range(min(max_results, len(dummy_templates))):
-            template = dummy_templates[i]
+        for i, item in enumerate(LocalSearchProvider().search(query, max_results, "basic")):
             results.append({
                 "id": f"dummy_ext_{i+1}",
-                "title": template["title_format"].format(query=query),
-                "content": template["content_format"].format(query=query),
-                "url": template["url_format"].format(query=query.replace(" ", "-")),
-                "score": 0.9 - (i * 0.15),
-                "source": template["source"],
-                "source_detail": f"{template['source']} (데모 데이터)",
+                "title": item["title"],
+                "content": item["content"],
+                "url": item["url"],
+                "score": item["score"],
+                "source": item["source"],
+                "source_detail": f"{item['source']} (데모 데이터)",
                 "search_type": "external_demo"
             })
         
-        st.info(f"🔄 데모 모드: {len(results)}개의 더미 외부 자료 생성 (실제 환경에서는 Tavily API 사용)")
+        notices.append({"level": "info", "message": f"🔄 데모 모드: {len(results)}개의 더미 외부 자료 생성 (실제 환경에서는 Tavily API 사용)"})
         return results
     
-    def generate_comprehensive_analysis(self, query: str, internal_docs: List[Dict], external_docs: List[Dict], document_content: str = "") -> str:
-        """종합 분석 결과 생성 - 문서 내용 포함"""
+    def generate_comprehensive_analysis(self, query: str, internal_docs: List[Dict], external_docs: List[Dict], document_content: str = "",
+                                        deadline: Optional[float] = None, budget_tokens: Optional[int] = None,
+                                        max_tokens: Optional[int] = None) -> str:
+        """
+        종합 분석 결과 생성 - 문서 내용 포함
+        
+        deadline을 넘기면 TimeoutError, budget_tokens/max_tokens로 시간이 부족할 때 컨텍스트/출력을 줄인다.
+        """
         if not self.client:
             return self._get_dummy_analysis(query, internal_docs, external_docs, document_content)
             
         try:
             # 분석할 문서 내용과 참고 자료를 포함한 완전한 컨텍스트 생성
-            context = self._build_comprehensive_context(query, document_content, internal_docs, external_docs)
+            context = self._build_comprehensive_context(query, document_content, internal_docs, external_docs, budget_tokens)
             
-            response = self.client.chat.completions.create(
-                model=AI_CONFIG["deployment_name"],
+            response = self._chat(
+                "analysis",
                 messages=[
-                    {"role": "system", "content": "주어진 문서 내용을 분석하고, 사내 문서와 외부 자료를 참고하여 포괄적이고 실용적인 분석 결과를 제공하세요."},
+                    {"role": "system", "content": ANALYSIS_PERSPECTIVES["comprehensive"]["instruction"]},
                     {"role": "user", "content": context}
                 ],
-                max_tokens=1500,
-                temperature=0.7
+                max_tokens=max_tokens or AI_CONFIG["analysis_max_tokens"],
+                temperature=0.7,
+                deadline=deadline
             )
             return response.choices[0].message.content
             
+        except TimeoutError:
+            raise
         except Exception as e:
             st.warning(f"종합 분석 생성 실패: {str(e)}")
             return self._get_dummy_analysis(query, internal_docs, external_docs, document_content)
     
-    def _build_comprehensive_context(self, query: str, document_content: str, internal_docs: List[Dict], external_docs: List[Dict]) -> str:
-        """포괄적인 분석용 컨텍스트 구성"""
-        context = f"사용자 요청: {query}\n\n"
+    def build_analysis_context(self, query: str, document_content: str, internal_docs: List[Dict],
+                               external_docs: List[Dict], document_label: Optional[str] = None,
+                               budget_tokens: Optional[int] = None) -> str:
+        """최종 분석용 컨텍스트 구성 (다중 관점 분석에서 한 번 만들어 모든 관점이 공유)"""
+        kwargs = {"document_label": document_label} if document_label else {}
+        packer = ContextPacker(budget_tokens=budget_tokens) if budget_tokens else self.context_packer
+        packed = packer.pack(query, document_content, internal_docs, external_docs, **kwargs)
+        self.last_context_stats = packed["stats"]
+        return packed["context"]
+    
+    def stream_perspective_analysis(self, perspective: str, query: str, context: str,
+                                    on_delta: Optional[Callable[[str], None]] = None,
+                                    deadline: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+        """
+        관점별 분석 결과를 스트리밍으로 생성 (워커 스레드에서 호출됨)
         
-        # 분석 대상 문서 내용 (가장 중요!)
-        if document_content and document_content.strip():
-            context += f"===== 분석 대상 문서 내용 =====\n{document_content}\n\n"
-        else:
-            context += "===== 분석 대상 문서 내용 =====\n(문서 내용이 제공되지 않음)\n\n"
+        Args:
+            perspective: ANALYSIS_PERSPECTIVES의 키
+            query: 고도화된 프롬프트 (더미 결과용)
+            context: build_analysis_context로 만든 공유 컨텍스트
+            on_delta: 생성된 텍스트 조각을 받을 콜백
+            deadline: 절대 마감 시각 (넘기면 그때까지 생성된 부분만 반환)
+            max_tokens: 출력 토큰 (None이면 설정값)
+            
+        Returns:
+            전체 분석 결과
+        """
+        spec = ANALYSIS_PERSPECTIVES[perspective]
+        if not self.client:
+            text = f"## {spec['icon']} {spec['label']}\n\n" + self._get_dummy_analysis(query, [], [])
+            if on_delta:
+                on_delta(text)
+            return text
         
-        # 사내 참고 문서
-        if internal_docs:
-            context += "===== 사내 참고 문서 =====\n"
-            for i, doc in enumerate(internal_docs[:3], 1):
-                title = doc.get('title', 'N/A')
-                content = doc.get('content', '')[:300]  # 300자까지
-                context += f"{i}. {title}\n{content}...\n\n"
+        response, record = self.router.chat_completion(
+            "analysis",
+            messages=[
+                {"role": "system", "content": spec["instruction"]},
+                {"role": "user", "content": context}
+            ],
+            max_tokens=max_tokens or AI_CONFIG["analysis_max_tokens"],
+            temperature=spec["temperature"],
+            stream=True,
+            # 고정된 openai 버전에는 stream_options 인자가 없어 요청 본문에 직접 추가
+            extra_body={"stream_options": {"include_usage": True}},
+            hedge=False,
+            deadline=deadline
+        )
         
-        # 외부 참고 자료
-        if external_docs:
-            context += "===== 외부 참고 자료 =====\n"
-            for i, doc in enumerate(external_docs[:3], 1):
-                title = doc.get('title', 'N/A')
-                content = doc.get('content', '')[:300]  # 300자까지
-                context += f"{i}. {title}\n{content}...\n\n"
+        parts: List[str] = []
+        usage = None
+        for chunk in response:
+            if deadline is not None and time.monotonic() >= deadline:
+                if hasattr(response, "close"):
+                    response.close()
+                parts.append("\n\n⏱️ *(제한 시간으로 여기까지만 생성되었습니다)*")
+                break
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            # Azure는 첫 청크에 choices 없이 콘텐츠 필터 결과만 보내기도 함
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                if on_delta:
+                    on_delta(delta)
         
-        context += "위의 문서 내용을 중심으로 분석하되, 참고 자료들을 활용하여 포괄적인 분석 결과를 제공해주세요."
-        return context
+        self.router.record_stream_usage(record, usage)
+        self.stage_records.append(record)
+        return "".join(parts)
+    
+    def generate_quick_analysis(self, request: str, target_content: str, internal_docs: List[Dict],
+                                deadline: Optional[float] = None) -> Optional[str]:
+        """
+        빠른 분석 - 프롬프트 고도화/쿼리 생성 없이 작은 배포로 한 번만 호출
+        
+        Args:
+            request: 사용자 요청
+            target_content: 분석/수정 대상 텍스트
+            internal_docs: 참고할 사내 문서 (이미 확보된 것만)
+            deadline: 절대 마감 시각 (time.monotonic 기준)
+            
+        Returns:
+            분석 결과 (제한 시간 초과/실패 시 None)
+        """
+        if not self.client:
+            return self._get_dummy_analysis(request, internal_docs, [], target_content)
+        
+        max_chars = QUICK_ANALYSIS_CONFIG["document_max_chars"]
+        context = f"요청: {request}"
+        if target_content and target_content.strip():
+            context += f"\n\n대상 텍스트:\n{target_content[:max_chars]}"
+            if len(target_content) > max_chars:
+                context += f"\n(이하 생략, 전체 {len(target_content):,}자)"
+        if internal_docs:
+            context += "\n\n참고할 사내 문서:\n" + "\n".join(
+                f"- {doc.get('title', 'N/A')}: {(doc.get('summary') or doc.get('content', ''))[:200]}"
+                for doc in internal_docs
+            )
+        
+        try:
+            response = self._chat(
+                "quick",
+                messages=[
+                    {"role": "system", "content": "문서 작성 도우미입니다. 요청에 맞춰 대상 텍스트를 바로 고치거나 짧게 분석하세요. 서론 없이 결과만 간결하게 답하세요."},
+                    {"role": "user", "content": context}
+                ],
+                max_tokens=QUICK_ANALYSIS_CONFIG["max_tokens"],
+                temperature=0.3,
+                hedge=False,
+                deadline=deadline
+            )
+            return response.choices[0].message.content
+        except TimeoutError as e:
+            print(f"빠른 분석 시간 초과: {e}")
+            return None
+        except Exception as e:
+            print(f"빠른 분석 실패: {e}")
+            return None
+    
+    def analyze_document_section(self, query: str, section: str, index: int, total: int,
+                                 deadline: Optional[float] = None) -> Optional[str]:
+        """맵 단계: 문서 섹션 하나에 대한 부분 분석 (실패 시 None, 워커 스레드에서 호출됨)"""
+        if not self.client:
+            return None
+
+        try:
+            response = self._chat(
+                "map",
+                messages=[
+                    {"role": "system", "content": "긴 문서의 일부 섹션입니다. 사용자 요청의 관점에서 이 섹션의 핵심 내용, 문제점, 개선 포인트를 간결한 개조식으로 정리하세요. 다른 섹션에 대한 추측은 하지 마세요."},
+                    {"role": "user", "content": f"사용자 요청: {query}\n\n===== 섹션 {index}/{total} =====\n{section}"}
+                ],
+                max_tokens=AI_CONFIG["map_section_max_tokens"],
+                temperature=0.3,
+                deadline=deadline
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"섹션 {index}/{total} 분석 실패: {e}")
+            return None
+
+    def reduce_section_analyses(self, query: str, section_results: List[Optional[str]],
+                                internal_docs: List[Dict], external_docs: List[Dict],
+                                deadline: Optional[float] = None) -> str:
+        """리듀스 단계: 섹션별 부분 분석 결과를 종합하여 최종 분석 생성 (deadline을 넘기면 TimeoutError)"""
+        partials = self.join_section_partials(section_results)
+
+        if not self.client:
+            return self._get_dummy_analysis(query, internal_docs, external_docs, partials)
+
+        try:
+            packed = self.context_packer.pack(
+                query, partials, internal_docs, external_docs,
+                document_label=f"섹션별 부분 분석 결과 (총 {len(section_results)}개 섹션)"
+            )
+            self.last_context_stats = packed["stats"]
+
+            response = self._chat(
+                "analysis",
+                messages=[
+                    {"role": "system", "content": "긴 문서를 섹션별로 분석한 부분 결과들이 주어집니다. 중복을 제거하고 문서 전체 관점에서 통합하여, 사내 문서와 외부 자료를 참고한 포괄적이고 실용적인 분석 결과를 제공하세요."},
+                    {"role": "user", "content": packed["context"]}
+                ],
+                max_tokens=AI_CONFIG["analysis_max_tokens"],
+                temperature=0.7,
+                deadline=deadline
+            )
+            return response.choices[0].message.content
+
+        except TimeoutError:
+            raise
+        except Exception as e:
+            st.warning(f"종합 분석 생성 실패: {str(e)}")
+            return self._get_dummy_analysis(query, internal_docs, external_docs, partials)
+
+    @staticmethod
+    def join_section_partials(section_results: List[Optional[str]]) -> str:
+        """섹션별 부분 분석 결과를 리듀스 입력 텍스트로 합침"""
+        return "\n\n".join(
+            f"[섹션 {i}] {result if result else '(분석 실패)'}"
+            for i, result in enumerate(section_results, 1)
+        )
+
+    def _build_comprehensive_context(self, query: str, document_content: str, internal_docs: List[Dict], external_docs: List[Dict],
+                                     budget_tokens: Optional[int] = None) -> str:
+        """포괄적인 분석용 컨텍스트 구성 (토큰 예산 내에서 관련도 높은 패시지 선택)"""
+        return self.build_analysis_context(query, document_content, internal_docs, external_docs, budget_tokens=budget_tokens)
 
     def _build_analysis_context(self, internal_docs: List[Dict], external_docs: List[Dict]) -> str:
         """기존 분석용 컨텍스트 구성 (하위 호환성)"""
@@ -304,8 +637,7 @@ class AIService:
         
         try:
             # 간단한 테스트 요청
-            response = self.client.chat.completions.create(
-                model=AI_CONFIG["deployment_name"],
+            response = self.client.chat_completion(
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=10
             )
@@ -3,13 +3,20 @@ Azure AI Search 문서 관리 서비스
 문서 업로드, 인덱싱, 검색 기능 제공
 """
 import json
+import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
-import openai
+from typing import List, Dict, Any, Optional, Iterator
 import hashlib
 import re
-from config import AZURE_SEARCH_CONFIG, AI_CONFIG
+from config import AZURE_SEARCH_CONFIG, AI_CONFIG, INDEXING_CONFIG, BULK_OPERATION_CONFIG, SEMANTIC_CACHE_CONFIG
+from utils.openai_client import get_openai_client, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from utils.fingerprint import simhash
+from utils.text_extraction import get_extraction_cache, ExtractionFailedError
+from utils.circuit_breaker import get_circuit_breaker, CircuitBreakerPolicy
+from utils.local_store import SQLiteStore, get_instance_id
 
 # Azure Search 패키지 조건부 import
 try:
@@ -40,9 +47,88 @@ except ImportError:
     VectorizedQuery = None
     AzureKeyCredential = None
 
+# 인덱스 스키마 버전 (필드 구성이 바뀌면 올려서 재인덱싱 대상이 되도록 함)
+INDEX_SCHEMA_VERSION = 2
+
+# 기존 인덱스에 없으면 추가하는 변경 감지/중복 판정용 필드
+CHANGE_TRACKING_FIELDS = ("content_hash", "pipeline_version", "content_simhash")
+
+def get_pipeline_version() -> str:
+    """인덱싱 파이프라인 버전 (스키마/임베딩 모델/추출 로직 조합, 달라지면 재인덱싱)"""
+    return (f"schema{INDEX_SCHEMA_VERSION}"
+            f"|{AI_CONFIG.get('embedding_deployment_name', 'text-embedding-3-large')}"
+            f"|{INDEXING_CONFIG['pipeline_version']}")
+
+# 사내 문서 코퍼스 세대 - 영속 인덱스 쓰기 카운터 + 주기적으로 확인한 학습 문서 수
+# (분석 결과 캐시가 문서가 바뀌기 전의 결과를 재사용하지 않도록 비교 키로 사용)
+# 카운터는 앱 데이터 디렉터리의 SQLite에 두어 재시작 후에도 이어지고, 같은 디렉터리를 쓰는 인스턴스끼리 공유된다.
+_index_write_generation = 0
+_corpus_generation_cache: Dict[str, Any] = {"value": None, "checked_at": 0.0, "write_generation": -1}
+_corpus_generation_lock = threading.Lock()
+
+# 이 프로세스에서 스키마를 확인한 인덱스 (인덱스 이름, 벡터 필드 사용 여부) - 확인은 프로세스당 한 번
+_verified_indexes = set()
+
+class CorpusGenerationStore(SQLiteStore):
+    """인덱스별 쓰기 카운터 영속 저장소"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS corpus_generation (
+        index_name TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    """
+
+    def increment(self, index_name: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO corpus_generation (index_name, generation, updated_at) VALUES (?, 1, ?) "
+                "ON CONFLICT(index_name) DO UPDATE SET generation = generation + 1, updated_at = excluded.updated_at",
+                (index_name, datetime.now().isoformat())
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT generation FROM corpus_generation WHERE index_name = ?", (index_name,)
+            ).fetchone()
+            return row["generation"]
+
+    def get(self, index_name: str) -> int:
+        row = self.fetch_one("SELECT generation FROM corpus_generation WHERE index_name = ?", (index_name,))
+        return row["generation"] if row else 0
+
+_corpus_generation_store: Optional[CorpusGenerationStore] = None
+_corpus_generation_store_failed = False
+
+def _get_corpus_generation_store() -> Optional[CorpusGenerationStore]:
+    """영속 카운터 저장소 (초기화에 실패하면 None - 이 프로세스의 쓰기 횟수만 사용)"""
+    global _corpus_generation_store, _corpus_generation_store_failed
+    if _corpus_generation_store is None and not _corpus_generation_store_failed:
+        with _corpus_generation_lock:
+            if _corpus_generation_store is None and not _corpus_generation_store_failed:
+                try:
+                    _corpus_generation_store = CorpusGenerationStore("corpus_generation.db")
+                except Exception as e:
+                    print(f"⚠️ 코퍼스 세대 저장소 초기화 실패 (프로세스 내 카운터만 사용): {e}")
+                    _corpus_generation_store_failed = True
+    return _corpus_generation_store
+
+def _mark_index_changed(index_name: str):
+    """인덱스 쓰기 성공 시 코퍼스 세대 증가 (영속 카운터와 이 프로세스의 캐시 무효화용 카운터)"""
+    global _index_write_generation
+    store = _get_corpus_generation_store()
+    if store is not None:
+        try:
+            store.increment(index_name)
+        except Exception as e:
+            print(f"⚠️ 코퍼스 세대 기록 실패: {e}")
+    with _corpus_generation_lock:
+        _index_write_generation += 1
+
 class AzureSearchService:
     def __init__(self):
-        self.available = False
+        self._configured = False
+        self.breaker = get_circuit_breaker("azure_search")
         self.search_client = None
         self.index_client = None
         self.openai_client = None
@@ -50,55 +136,65 @@ class AzureSearchService:
         self._init_search()
         self._init_openai()
     
+    @property
+    def available(self) -> bool:
+        """설정/초기화에 성공했고 서킷 브레이커가 요청을 허용하는 상태"""
+        return self._configured and self.breaker.is_available()
+    
     def _init_search(self):
         """Azure Search 초기화"""
         try:
             if not AZURE_SEARCH_AVAILABLE:
                 print("⚠️ Azure Search 패키지를 사용할 수 없습니다.")
-                self.available = False
+                self._configured = False
                 return
                 
             if AZURE_SEARCH_CONFIG["endpoint"] and AZURE_SEARCH_CONFIG["admin_key"]:
                 credential = AzureKeyCredential(AZURE_SEARCH_CONFIG["admin_key"])
+                # 재시도가 끝난 요청 결과를 공유 서킷 브레이커에 기록 (차단 중이면 요청 없이 즉시 실패)
+                breaker_policy = CircuitBreakerPolicy(self.breaker)
                 
                 self.search_client = SearchClient(
                     endpoint=AZURE_SEARCH_CONFIG["endpoint"],
                     index_name=self.index_name,
-                    credential=credential
+                    credential=credential,
+                    per_call_policies=[breaker_policy]
                 )
                 
                 self.index_client = SearchIndexClient(
                     endpoint=AZURE_SEARCH_CONFIG["endpoint"],
-                    credential=credential
+                    credential=credential,
+                    per_call_policies=[breaker_policy]
                 )
                 
-                self.available = True
+                self._configured = True
                 print("✅ Azure Search 초기화 성공")
             else:
                 print("⚠️ Azure Search 설정이 없습니다.")
-                self.available = False
+                self._configured = False
                 
         except Exception as e:
             print(f"⚠️ Azure Search 초기화 실패: {e}")
-            self.available = False
+            self._configured = False
     
     def _init_openai(self):
         """OpenAI 초기화 (벡터 임베딩용)"""
         try:
-            if AI_CONFIG["openai_api_key"] and AI_CONFIG["openai_endpoint"]:
-                self.openai_client = openai.AzureOpenAI(
-                    azure_endpoint=AI_CONFIG["openai_endpoint"],
-                    api_key=AI_CONFIG["openai_api_key"],
-                    api_version=AI_CONFIG["api_version"]
-                )
+            client = get_openai_client()
+            if client.configured:
+                self.openai_client = client
         except Exception as e:
             print(f"⚠️ OpenAI 초기화 실패: {e}")
     
-    def create_index_if_not_exists(self):
-        """인덱스가 없으면 생성 (벡터 필드 문제 해결 포함)"""
+    def create_index_if_not_exists(self, force: bool = False):
+        """인덱스가 없으면 생성 (벡터 필드 문제 해결 포함, force가 아니면 프로세스당 한 번만 확인)"""
         if not self.available or not AZURE_SEARCH_AVAILABLE:
             return False
         
+        verify_key = (self.index_name, self.openai_client is not None)
+        if not force and verify_key in _verified_indexes:
+            return True
+        
         try:
             from azure.search.documents.indexes.models import (
                 SearchIndex, SimpleField, SearchableField, ComplexField,
@@ -126,7 +222,9 @@ class AzureSearchService:
                         print(f"⚠️ 기존 인덱스에 벡터 필드가 올바르게 구성되지 않았습니다. 인덱스를 재생성합니다.")
                 
                 if not index_needs_recreation:
+                    self._ensure_change_tracking_fields(existing_index)
                     print(f"✅ Azure Search 인덱스 '{self.index_name}' 이미 존재하고 올바르게 구성되었습니다.")
+                    _verified_indexes.add(verify_key)
                     return True
                 else:
                     # 기존 인덱스 삭제
@@ -174,6 +272,10 @@ class AzureSearchService:
                 SearchableField(name="keywords", type=SearchFieldDataType.String),
                 SearchableField(name="summary", type=SearchFieldDataType.String),
                 SimpleField(name="blob_url", type=SearchFieldDataType.String),
+                # 변경 감지용 필드 (증분 재인덱싱)
+                SimpleField(name="content_hash", type=SearchFieldDataType.String, filterable=True),
+                SimpleField(name="pipeline_version", type=SearchFieldDataType.String, filterable=True),
+                SimpleField(name="content_simhash", type=SearchFieldDataType.String, filterable=True),
                 # 벡터 필드 (임베딩이 가능한 경우)
                 SearchField(
                     name="contentVector",
@@ -197,14 +299,30 @@ class AzureSearchService:
             
             self.index_client.create_index(index)
             print(f"✅ 인덱스 '{self.index_name}' 생성 완료")
+            _verified_indexes.add(verify_key)
             return True
             
         except Exception as e:
             print(f"❌ 인덱스 생성 실패: {e}")
             return False
     
-    def generate_embedding(self, text: str) -> Optional[List[float]]:
-        """텍스트 임베딩 생성 - 토큰 길이 제한 처리"""
+    def _ensure_change_tracking_fields(self, existing_index):
+        """기존 인덱스에 변경 감지용 필드가 없으면 추가 (필드 추가는 인덱스 재생성 없이 가능)"""
+        existing_names = {field.name for field in existing_index.fields}
+        missing = [name for name in CHANGE_TRACKING_FIELDS if name not in existing_names]
+        if not missing:
+            return
+        
+        for name in missing:
+            existing_index.fields.append(
+                SimpleField(name=name, type=SearchFieldDataType.String, filterable=True)
+            )
+        self.index_client.create_or_update_index(existing_index)
+        print(f"✅ 인덱스 '{self.index_name}'에 필드 추가: {', '.join(missing)}")
+    
+    def generate_embedding(self, text: str, priority: int = PRIORITY_INTERACTIVE,
+                           cache: Optional[bool] = None) -> Optional[List[float]]:
+        """텍스트 임베딩 생성 - 토큰 길이 제한 처리 (priority: 공유 클라이언트 우선순위 레인, cache: 임베딩 캐시 사용 여부)"""
         if not self.openai_client:
             return None
         
@@ -215,10 +333,7 @@ class AzureSearchService:
                 text = text[:30000] + "... (내용 길이로 인해 일부 생략됨)"
                 print(f"⚠️ 텍스트가 길어서 {len(text):,}자로 축소했습니다.")
             
-            response = self.openai_client.embeddings.create(
-                model=AI_CONFIG.get("embedding_deployment_name", "text-embedding-3-large"),
-                input=text
-            )
+            response = self.openai_client.create_embedding(text, priority=priority, cache=cache)
             return response.data[0].embedding
             
         except Exception as e:
@@ -228,10 +343,7 @@ class AzureSearchService:
                 # 더 짧게 자르고 재시도
                 short_text = text[:15000]
                 try:
-                    response = self.openai_client.embeddings.create(
-                        model=AI_CONFIG.get("embedding_deployment_name", "text-embedding-3-large"),
-                        input=short_text
-                    )
+                    response = self.openai_client.create_embedding(short_text, priority=priority, cache=cache)
                     return response.data[0].embedding
                 except:
                     print("❌ 짧은 텍스트로도 임베딩 실패")
@@ -240,89 +352,25 @@ class AzureSearchService:
                 print(f"❌ 임베딩 생성 실패: {error_msg}")
                 return None
     
-    def extract_text_content(self, file_content: bytes, filename: str) -> str:
-        """파일에서 텍스트 추출"""
+    def extract_text_content(self, file_content: bytes, filename: str,
+                             content_hash: Optional[str] = None) -> str:
+        """파일에서 텍스트 추출 (같은 내용은 캐시된 추출 결과 재사용)"""
+        return self.extract_document(file_content, filename, content_hash)["text"]
+    
+    def extract_document(self, file_content: bytes, filename: str,
+                         content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """파일에서 텍스트/페이지 경계/추출 메타데이터 추출 (내용 해시 기준 캐시, 일시적 실패는 ExtractionFailedError)"""
         try:
-            # 파일 확장자에 따른 처리
-            file_ext = filename.lower().split('.')[-1]
-            
-            if file_ext in ['txt', 'md', 'py', 'js', 'html', 'css', 'json', 'csv']:
-                # 텍스트 파일은 직접 디코딩
-                return file_content.decode('utf-8', errors='ignore')
-            
-            elif file_ext in ['docx']:
-                # Word 문서 처리 (python-docx 사용)
-                try:
-                    from docx import Document
-                    import io
-                    
-                    doc = Document(io.BytesIO(file_content))
-                    text_parts = []
-                    for paragraph in doc.paragraphs:
-                        text_parts.append(paragraph.text)
-                    return '\n'.join(text_parts)
-                except:
-                    return f"Word 문서 처리 오류: {filename}"
-            
-            elif file_ext == 'pdf':
-                # PDF 텍스트 추출
-                try:
-                    import io
-                    import PyPDF2
-                    
-                    # PyPDF2로 PDF 텍스트 추출 시도
-                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-                    text_parts = []
-                    
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        try:
-                            page_text = page.extract_text()
-                            if page_text.strip():
-                                text_parts.append(page_text)
-                        except Exception as e:
-                            print(f"PDF 페이지 {page_num} 추출 오류: {e}")
-                            continue
-                    
-                    extracted_text = '\n'.join(text_parts)
-                    
-                    # 추출된 텍스트가 너무 적으면 pdfplumber 시도
-                    if len(extracted_text.strip()) < 100:
-                        try:
-                            import pdfplumber
-                            
-                            with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                                plumber_text = []
-                                for page in pdf.pages:
-                                    try:
-                                        page_text = page.extract_text()
-                                        if page_text:
-                                            plumber_text.append(page_text)
-                                    except:
-                                        continue
-                                
-                                if plumber_text:
-                                    extracted_text = '\n'.join(plumber_text)
-                        except ImportError:
-                            pass  # pdfplumber가 없으면 PyPDF2 결과 사용
-                    
-                    if extracted_text.strip():
-                        return extracted_text
-                    else:
-                        return f"PDF 파일에서 텍스트를 추출할 수 없습니다: {filename}"
-                        
-                except Exception as e:
-                    return f"PDF 처리 오류 ({filename}): {str(e)}"
-            
-            else:
-                # 기타 파일은 바이너리로 처리
-                return f"바이너리 파일: {filename} (크기: {len(file_content)} bytes)"
-                
+            return get_extraction_cache().get_or_extract(file_content, filename, content_hash)
+        except ExtractionFailedError:
+            raise  # 대체 문구를 인덱싱하지 않고 큐/재인덱싱이 다시 시도하도록 전달
         except Exception as e:
-            return f"텍스트 추출 오류: {str(e)}"
+            return {"text": f"텍스트 추출 오류: {str(e)}", "pages": [], "metadata": {"method": "error", "errors": [str(e)]}}
     
     def upload_document_to_search(self, file_content: bytes, filename: str, 
                                  file_id: str, blob_url: str, 
-                                 metadata: Optional[Dict] = None) -> Dict[str, Any]:
+                                 metadata: Optional[Dict] = None,
+                                 content_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         문서를 Azure AI Search에 업로드
         
@@ -332,6 +380,7 @@ class AzureSearchService:
             file_id: 파일 고유 ID
             blob_url: Azure Storage blob URL
             metadata: 추가 메타데이터
+            content_hash: 파일 내용 SHA-256 (없으면 계산)
             
         Returns:
             업로드 결과
@@ -343,59 +392,21 @@ class AzureSearchService:
             # 인덱스 존재 확인 및 생성
             self.create_index_if_not_exists()
             
-            # 텍스트 추출
-            content = self.extract_text_content(file_content, filename)
-            
-            # 요약 생성 (내용이 긴 경우)
-            summary = content[:300] + "..." if len(content) > 300 else content
-            
-            # 키워드 추출 (간단한 방식)
-            keywords = self.extract_keywords(content)
-            
-            # 제목 추출 (파일명에서 확장자 제거)
-            title = filename.rsplit('.', 1)[0] if '.' in filename else filename
-            
-            # 임베딩 생성
-            content_vector = self.generate_embedding(content) if self.openai_client else None
-            
-            # 문서 ID 생성 (검색용)
-            search_doc_id = f"doc_{file_id}"
-            
-            # 검색 문서 구성
-            search_document = {
-                "id": search_doc_id,
-                "title": title,
-                "content": content,
-                "filename": filename,
-                "file_id": file_id,
-                "document_type": "training",
-                "upload_date": datetime.now(timezone.utc).isoformat(),
-                "file_size": len(file_content),
-                "keywords": keywords,
-                "summary": summary,
-                "blob_url": blob_url
-            }
-            
-            # 벡터 필드 추가 (임베딩이 있는 경우)
-            if content_vector:
-                search_document["contentVector"] = content_vector
-            
-            # 추가 메타데이터 포함
-            if metadata:
-                for key, value in metadata.items():
-                    if key not in search_document:
-                        search_document[f"meta_{key}"] = str(value)
+            search_document = self.build_search_document(
+                file_content, filename, file_id, blob_url, metadata, content_hash
+            )
             
             # 문서 업로드
             result = self.search_client.upload_documents([search_document])
+            _mark_index_changed(self.index_name)
             
             return {
                 "success": True,
-                "search_doc_id": search_doc_id,
-                "title": title,
-                "content_length": len(content),
-                "keywords": keywords,
-                "has_embedding": content_vector is not None,
+                "search_doc_id": search_document["id"],
+                "title": search_document["title"],
+                "content_length": len(search_document["content"]),
+                "keywords": search_document["keywords"],
+                "has_embedding": "contentVector" in search_document,
                 "upload_result": result
             }
             
@@ -406,6 +417,59 @@ class AzureSearchService:
                 "filename": filename
             }
     
+    def build_search_document(self, file_content: bytes, filename: str, file_id: str, blob_url: str,
+                              metadata: Optional[Dict] = None,
+                              content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """텍스트 추출/요약/키워드/임베딩을 수행하여 검색 문서 구성 (업로드는 하지 않음)"""
+        # 텍스트 추출 (재인덱싱 시에는 캐시된 추출 결과를 재사용)
+        content_hash = content_hash or hashlib.sha256(file_content).hexdigest()
+        content = self.extract_text_content(file_content, filename, content_hash)
+        
+        # 요약 생성 (내용이 긴 경우)
+        summary = content[:300] + "..." if len(content) > 300 else content
+        
+        # 키워드 추출 (간단한 방식)
+        keywords = self.extract_keywords(content)
+        
+        # 제목 추출 (파일명에서 확장자 제거)
+        title = filename.rsplit('.', 1)[0] if '.' in filename else filename
+        
+        # 임베딩 생성
+        content_vector = self.generate_embedding(content, priority=PRIORITY_BACKGROUND) if self.openai_client else None
+        
+        # 문서 ID 생성 (검색용)
+        search_doc_id = f"doc_{file_id}"
+        
+        # 검색 문서 구성
+        search_document = {
+            "id": search_doc_id,
+            "title": title,
+            "content": content,
+            "filename": filename,
+            "file_id": file_id,
+            "document_type": "training",
+            "upload_date": datetime.now(timezone.utc).isoformat(),
+            "file_size": len(file_content),
+            "keywords": keywords,
+            "summary": summary,
+            "blob_url": blob_url,
+            "content_hash": content_hash,
+            "pipeline_version": get_pipeline_version(),
+            "content_simhash": simhash(content)
+        }
+        
+        # 벡터 필드 추가 (임베딩이 있는 경우)
+        if content_vector:
+            search_document["contentVector"] = content_vector
+        
+        # 추가 메타데이터 포함
+        if metadata:
+            for key, value in metadata.items():
+                if key not in search_document:
+                    search_document[f"meta_{key}"] = str(value)
+        
+        return search_document
+    
     def extract_keywords(self, content: str) -> str:
         """간단한 키워드 추출"""
         if not content:
@@ -426,7 +490,9 @@ class AzureSearchService:
     
     def search_documents(self, query: str, top: int = 10, 
                         document_type: Optional[str] = None,
-                        use_semantic: bool = True) -> List[Dict[str, Any]]:
+                        use_semantic: bool = True,
+                        use_vector: bool = True,
+                        priority: int = PRIORITY_INTERACTIVE) -> List[Dict[str, Any]]:
         """
         문서 검색
         
@@ -435,6 +501,8 @@ class AzureSearchService:
             top: 반환할 결과 수
             document_type: 문서 타입 필터
             use_semantic: 시맨틱 검색 사용 여부
+            use_vector: 벡터 검색 사용 여부 (False면 쿼리 임베딩 호출 생략)
+            priority: 쿼리 임베딩 우선순위 레인 (선행 검색은 백그라운드 레인)
             
         Returns:
             검색 결과 목록
@@ -460,8 +528,9 @@ class AzureSearchService:
                 search_params["semantic_configuration_name"] = "my-semantic-config"
             
             # 벡터 검색 추가 (임베딩이 가능한 경우)
-            if self.openai_client:
-                query_vector = self.generate_embedding(query)
+            if use_vector and self.openai_client:
+                # 쿼리 임베딩은 레인과 관계없이 캐시 (백그라운드 선행 검색이 데운 임베딩을 분석에서 재사용)
+                query_vector = self.generate_embedding(query, priority=priority, cache=True)
                 if query_vector:
                     search_params["vector_queries"] = [
                         VectorizedQuery(
@@ -488,6 +557,7 @@ class AzureSearchService:
                     "keywords": result.get("keywords", ""),
                     "summary": result.get("summary", ""),
                     "blob_url": result.get("blob_url", ""),
+                    "content_simhash": result.get("content_simhash"),
                     "search_score": result.get("@search.score", 0),
                     "search_reranker_score": result.get("@search.reranker_score")
                 }
@@ -565,11 +635,70 @@ class AzureSearchService:
         
         try:
             self.search_client.delete_documents([{"id": search_doc_id}])
+            _mark_index_changed(self.index_name)
             return True
         except Exception as e:
             print(f"문서 삭제 실패: {e}")
             return False
     
+    def delete_documents(self, search_doc_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        검색 인덱스에서 여러 문서를 배치로 삭제
+        
+        Args:
+            search_doc_ids: 검색 문서 ID 목록
+            
+        Returns:
+            검색 문서 ID -> 오류 메시지 (성공 시 None)
+        """
+        return self._index_batches("delete", [{"id": doc_id} for doc_id in search_doc_ids],
+                                   BULK_OPERATION_CONFIG["index_delete_batch_size"])
+    
+    def upload_search_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """
+        구성된 검색 문서를 배치로 업로드 (build_search_document 결과)
+        
+        Returns:
+            검색 문서 ID -> 오류 메시지 (성공 시 None)
+        """
+        if documents and self.available:
+            self.create_index_if_not_exists()
+        return self._index_batches("upload", documents, BULK_OPERATION_CONFIG["index_upload_batch_size"])
+    
+    def merge_search_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """
+        기존 검색 문서의 일부 필드만 배치로 갱신
+        
+        Returns:
+            검색 문서 ID -> 오류 메시지 (성공 시 None)
+        """
+        return self._index_batches("merge", documents, BULK_OPERATION_CONFIG["index_upload_batch_size"])
+    
+    def _index_batches(self, action: str, documents: List[Dict[str, Any]], batch_size: int) -> Dict[str, Optional[str]]:
+        """인덱스 작업을 배치 단위로 전송하고 문서별 결과 반환"""
+        if not self.available:
+            return {doc["id"]: "Azure Search 사용 불가" for doc in documents}
+        
+        operations = {
+            "delete": self.search_client.delete_documents,
+            "upload": self.search_client.upload_documents,
+            "merge": self.search_client.merge_documents
+        }
+        results: Dict[str, Optional[str]] = {}
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i:i + batch_size]
+            try:
+                for item in operations[action](documents=batch):
+                    results[item.key] = None if item.succeeded else (item.error_message or f"HTTP {item.status_code}")
+            except Exception as e:
+                # 일부 실패는 항목별 결과로 오지만, 요청 자체가 실패하면 배치 전체를 실패 처리
+                print(f"인덱스 일괄 작업 실패 ({action}): {e}")
+                for doc in batch:
+                    results[doc["id"]] = str(e)
+        if any(error is None for error in results.values()):
+            _mark_index_changed(self.index_name)
+        return results
+    
     def get_document_by_file_id(self, file_id: str) -> Optional[Dict[str, Any]]:
         """
         파일 ID로 문서 검색
@@ -610,6 +739,139 @@ class AzureSearchService:
             print(f"문서 조회 실패: {e}")
             return None
     
+    def list_index_states(self, document_type: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        인덱싱된 문서별 변경 감지 정보 조회 (재인덱싱 비교용)
+        
+        Returns:
+            file_id -> {"id", "content_hash", "pipeline_version"}
+        """
+        if not self.available:
+            return {}
+        
+        search_params = {
+            "search_text": "*",
+            "select": ["id", "file_id", "content_hash", "pipeline_version"],
+            "top": 1000
+        }
+        if document_type:
+            search_params["filter"] = f"document_type eq '{document_type}'"
+        
+        states = {}
+        for result in self.search_client.search(**search_params):
+            file_id = result.get("file_id")
+            if file_id:
+                states[file_id] = {
+                    "id": result["id"],
+                    "content_hash": result.get("content_hash"),
+                    "pipeline_version": result.get("pipeline_version")
+                }
+        return states
+    
+    def find_documents_by_content_hash(self, content_hash: str,
+                                       document_type: Optional[str] = "training") -> List[Dict[str, Any]]:
+        """
+        내용 해시가 같은 인덱스 문서 조회 (업로드 중복 판정용)
+        
+        Args:
+            content_hash: 파일 내용 SHA-256
+            document_type: 문서 타입 필터
+            
+        Returns:
+            일치하는 문서 목록 (id, file_id, filename, blob_url)
+        """
+        if not self.available or not content_hash:
+            return []
+        
+        filters = [f"content_hash eq '{content_hash}'"]
+        if document_type:
+            filters.append(f"document_type eq '{document_type}'")
+        
+        try:
+            results = self.search_client.search(
+                search_text="*",
+                filter=" and ".join(filters),
+                select=["id", "file_id", "filename", "blob_url"],
+                top=10
+            )
+            return [
+                {
+                    "id": result["id"],
+                    "file_id": result.get("file_id"),
+                    "filename": result.get("filename", ""),
+                    "blob_url": result.get("blob_url", "")
+                }
+                for result in results
+            ]
+        except Exception as e:
+            print(f"내용 해시 조회 실패: {e}")
+            return []
+    
+    def iter_index_documents(self, document_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        인덱스 문서 원본 레코드를 페이지 단위로 순회 (백업용, 벡터 필드 포함)
+        
+        Args:
+            document_type: 문서 타입 필터
+            
+        Returns:
+            검색 점수 등 응답 전용 필드를 제외한 문서 레코드 이터레이터
+        """
+        if not self.available:
+            return
+        
+        search_params = {"search_text": "*"}
+        if document_type:
+            search_params["filter"] = f"document_type eq '{document_type}'"
+        
+        for result in self.search_client.search(**search_params):
+            yield {key: value for key, value in result.items() if not key.startswith("@")}
+    
+    def get_corpus_generation(self) -> str:
+        """
+        사내 학습 문서 코퍼스 세대 식별자 (문서가 추가/삭제/재인덱싱되면 바뀜)
+        
+        학습 문서 수와 영속 쓰기 카운터는 generation_check_seconds마다 다시 조회하므로,
+        다른 인스턴스의 변경은 그 주기 안에 반영되고 이 프로세스의 쓰기는 즉시 반영된다.
+        카운터는 재시작 후에도 이어지므로 저장된 캐시 결과가 재시작 전 코퍼스와 잘못 일치하지 않는다.
+        
+        Returns:
+            "<학습 문서 수>:<인덱스 쓰기 카운터>"
+        """
+        now = time.monotonic()
+        with _corpus_generation_lock:
+            cached = dict(_corpus_generation_cache)
+            write_generation = _index_write_generation
+        if (cached["value"] is not None and cached["write_generation"] == write_generation
+                and now - cached["checked_at"] < SEMANTIC_CACHE_CONFIG["generation_check_seconds"]):
+            return cached["value"]
+        
+        document_count = "local"
+        if self.available:
+            try:
+                results = self.search_client.search(
+                    search_text="*", filter="document_type eq 'training'", top=0, include_total_count=True
+                )
+                document_count = str(results.get_count())
+            except Exception as e:
+                print(f"코퍼스 세대 확인 실패: {e}")
+        
+        generation = None
+        store = _get_corpus_generation_store()
+        if store is not None:
+            try:
+                generation = str(store.get(self.index_name))
+            except Exception as e:
+                print(f"코퍼스 세대 조회 실패: {e}")
+        if generation is None:
+            # 영속 카운터를 쓸 수 없으면 이 프로세스에서만 유효한 값 (재시작 후 이전 값과 겹치지 않도록 인스턴스/PID 포함)
+            generation = f"{get_instance_id()}-{os.getpid()}-{write_generation}"
+        
+        value = f"{document_count}:{generation}"
+        with _corpus_generation_lock:
+            _corpus_generation_cache.update(value=value, checked_at=now, write_generation=write_generation)
+        return value
+    
     def list_all_documents(self) -> List[Dict[str, Any]]:
         """
         모든 문서 목록 조회
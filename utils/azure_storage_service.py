@@ -3,40 +3,81 @@ Azure Storage Account 서비스
 파일 업로드, 다운로드, 관리 기능 제공
 """
 import os
+import base64
+import codecs
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
+from typing import List, Dict, Any, Optional, Union, BinaryIO, Iterator, Tuple
+from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient, BlobBlock
 import json
 import uuid
-from config import AZURE_STORAGE_CONFIG
+import hashlib
+from config import AZURE_STORAGE_CONFIG, BULK_OPERATION_CONFIG
+from utils.circuit_breaker import get_circuit_breaker, CircuitBreakerPolicy
+
+# 인스턴스별로 바꿀 수 있는 전송 설정 키
+TRANSFER_OPTION_KEYS = ("block_size", "single_put_threshold", "single_get_size", "download_chunk_size", "max_concurrency")
 
 class AzureStorageService:
-    def __init__(self):
-        self.available = False
+    def __init__(self, connection_string: Optional[str] = None, container_name: Optional[str] = None,
+                 transfer_options: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            connection_string: 연결 문자열 (없으면 설정값 사용)
+            container_name: 컨테이너 이름 (없으면 설정값 사용)
+            transfer_options: 전송 설정 덮어쓰기 (block_size, single_put_threshold, single_get_size,
+                              download_chunk_size, max_concurrency)
+        """
+        self._configured = False
+        self.breaker = get_circuit_breaker("azure_storage")
         self.blob_service_client = None
         self.container_name = None
+        self.transfer = {key: AZURE_STORAGE_CONFIG[key] for key in TRANSFER_OPTION_KEYS}
+        self.transfer.update(transfer_options or {})
+        self._connection_string = connection_string
+        self._container_name = container_name
         self._init_storage()
     
+    @property
+    def available(self) -> bool:
+        """설정/초기화에 성공했고 서킷 브레이커가 요청을 허용하는 상태"""
+        return self._configured and self.breaker.is_available()
+    
+    def _get_connection_string(self) -> Optional[str]:
+        """연결 문자열 결정 (직접 지정 > 설정의 연결 문자열 > 계정 이름/키)"""
+        if self._connection_string or AZURE_STORAGE_CONFIG["connection_string"]:
+            return self._connection_string or AZURE_STORAGE_CONFIG["connection_string"]
+        if AZURE_STORAGE_CONFIG["account_name"] and AZURE_STORAGE_CONFIG["account_key"]:
+            return (
+                f"DefaultEndpointsProtocol=https;"
+                f"AccountName={AZURE_STORAGE_CONFIG['account_name']};"
+                f"AccountKey={AZURE_STORAGE_CONFIG['account_key']};"
+                f"EndpointSuffix=core.windows.net"
+            )
+        return None
+    
     def _init_storage(self):
         """Azure Storage 초기화"""
         try:
-            if (AZURE_STORAGE_CONFIG["account_name"] and 
-                AZURE_STORAGE_CONFIG["account_key"] and
-                AZURE_STORAGE_CONFIG["container_name"]):
+            connection_string = self._get_connection_string()
+            container_name = self._container_name or AZURE_STORAGE_CONFIG["container_name"]
+            if connection_string and container_name:
                 
-                connection_string = (
-                    f"DefaultEndpointsProtocol=https;"
-                    f"AccountName={AZURE_STORAGE_CONFIG['account_name']};"
-                    f"AccountKey={AZURE_STORAGE_CONFIG['account_key']};"
-                    f"EndpointSuffix=core.windows.net"
+                # 임계값을 넘는 파일은 블록 단위로 나눠 max_concurrency개씩 병렬 전송
+                self.blob_service_client = BlobServiceClient.from_connection_string(
+                    connection_string,
+                    max_block_size=self.transfer["block_size"],
+                    max_single_put_size=self.transfer["single_put_threshold"],
+                    max_single_get_size=self.transfer["single_get_size"],
+                    max_chunk_get_size=self.transfer["download_chunk_size"],
+                    # 공유 서킷 브레이커 - Storage SDK는 추가 정책을 재시도 정책 뒤에 붙이므로 시도마다 기록됨
+                    _additional_pipeline_policies=[CircuitBreakerPolicy(self.breaker)]
                 )
-                
-                self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
-                self.container_name = AZURE_STORAGE_CONFIG["container_name"]
+                self.container_name = container_name
                 
                 # 컨테이너 존재 확인 및 생성
                 self._ensure_container_exists()
-                self.available = True
+                self._configured = True
                 print("✅ Azure Storage 초기화 성공")
                 
             else:
@@ -44,7 +85,7 @@ class AzureStorageService:
                 
         except Exception as e:
             print(f"⚠️ Azure Storage 초기화 실패: {e}")
-            self.available = False
+            self._configured = False
     
     def _ensure_container_exists(self):
         """컨테이너 존재 확인 및 생성"""
@@ -56,16 +97,23 @@ class AzureStorageService:
         except Exception as e:
             print(f"⚠️ 컨테이너 확인/생성 실패: {e}")
     
-    def upload_document(self, file_content: bytes, filename: str, 
-                       document_type: str = "training", metadata: Optional[Dict] = None) -> Dict[str, Any]:
+    def upload_document(self, file_content: Union[bytes, BinaryIO], filename: str, 
+                       document_type: str = "training", metadata: Optional[Dict] = None,
+                       file_id: Optional[str] = None, blob_name: Optional[str] = None,
+                       content_hash: Optional[str] = None,
+                       max_concurrency: Optional[int] = None) -> Dict[str, Any]:
         """
         문서 업로드
         
         Args:
-            file_content: 파일 내용 (bytes)
+            file_content: 파일 내용 (bytes 또는 읽기 가능한 바이너리 스트림 - 스트림은 블록 단위로 전송)
             filename: 원본 파일명
             document_type: 문서 타입 ('training' 또는 'generated')
             metadata: 추가 메타데이터
+            file_id: 파일 ID (지정 시 재시도해도 같은 Blob을 덮어씀)
+            blob_name: Blob 이름 (이전 시도에서 정해진 이름 재사용)
+            content_hash: 파일 내용 SHA-256 (이미 계산한 경우, 없으면 계산)
+            max_concurrency: 병렬 전송 수 (없으면 인스턴스 설정값)
             
         Returns:
             업로드 결과 정보
@@ -79,20 +127,33 @@ class AzureStorageService:
         
         try:
             # 고유한 파일 ID 생성
-            file_id = str(uuid.uuid4())
+            file_id = file_id or str(uuid.uuid4())
             
             # 파일 확장자 추출
             file_ext = os.path.splitext(filename)[1].lower()
             
             # Blob 이름 생성 (폴더 구조: type/year/month/file_id.ext)
             now = datetime.now(timezone.utc)
-            blob_name = f"{document_type}/{now.year}/{now.month:02d}/{file_id}{file_ext}"
+            blob_name = blob_name or f"{document_type}/{now.year}/{now.month:02d}/{file_id}{file_ext}"
             
             # 파일명을 안전한 형태로 인코딩 (메타데이터용)
             safe_filename = filename.encode('ascii', errors='ignore').decode('ascii')
             if not safe_filename:
                 safe_filename = f"document_{file_id}"
             
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            
+            # 스트림은 블록을 먼저 스테이징하면서 크기와 해시를 계산 (메타데이터는 커밋 시 설정)
+            blocks = None
+            if isinstance(file_content, (bytes, bytearray)):
+                file_size = len(file_content)
+                content_hash = content_hash or hashlib.sha256(file_content).hexdigest()
+            else:
+                blocks, content_hash, file_size = self._stage_blocks(blob_client, file_content, max_concurrency)
+            
             # 메타데이터 설정 (모든 값을 문자열로 변환하고 안전하게 인코딩)
             blob_metadata = {}
             try:
@@ -124,7 +185,8 @@ class AzureStorageService:
                 blob_metadata["document_type"] = str(document_type)
                 blob_metadata["upload_date"] = now.isoformat()
                 blob_metadata["file_id"] = str(file_id)
-                blob_metadata["file_size"] = str(len(file_content))
+                blob_metadata["file_size"] = str(file_size)
+                blob_metadata["content_sha256"] = content_hash
                 
                 if metadata:
                     for key, value in metadata.items():
@@ -144,16 +206,15 @@ class AzureStorageService:
                 }
             
             # 파일 업로드
-            blob_client = self.blob_service_client.get_blob_client(
-                container=self.container_name,
-                blob=blob_name
-            )
-            
-            blob_client.upload_blob(
-                file_content,
-                overwrite=True,
-                metadata=blob_metadata
-            )
+            if blocks is None:
+                blob_client.upload_blob(
+                    file_content,
+                    overwrite=True,
+                    metadata=blob_metadata,
+                    max_concurrency=max_concurrency or self.transfer["max_concurrency"]
+                )
+            else:
+                blob_client.commit_block_list(blocks, metadata=blob_metadata)
             
             return {
                 "success": True,
@@ -163,7 +224,8 @@ class AzureStorageService:
                 "filename": filename,
                 "document_type": document_type,
                 "upload_date": now.isoformat(),
-                "file_size": len(file_content)
+                "file_size": file_size,
+                "content_sha256": content_hash
             }
             
         except Exception as e:
@@ -174,6 +236,42 @@ class AzureStorageService:
                 "filename": filename
             }
     
+    def _stage_blocks(self, blob_client, stream: BinaryIO,
+                      max_concurrency: Optional[int] = None) -> Tuple[List[BlobBlock], str, int]:
+        """스트림을 블록 단위로 읽어 동시에 스테이징 (메모리에는 동시 처리 수만큼의 블록만 유지)"""
+        block_size = self.transfer["block_size"]
+        max_concurrency = max_concurrency or self.transfer["max_concurrency"]
+        digest = hashlib.sha256()
+        file_size = 0
+        block_ids = []
+        
+        if hasattr(stream, "seek"):
+            stream.seek(0)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            in_flight = set()
+            while True:
+                chunk = stream.read(block_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                file_size += len(chunk)
+                
+                # 블록 ID는 Blob 내에서 길이가 모두 같아야 함
+                block_id = base64.b64encode(f"block-{len(block_ids):08d}".encode()).decode()
+                block_ids.append(block_id)
+                in_flight.add(executor.submit(blob_client.stage_block, block_id, chunk))
+                
+                if len(in_flight) >= max_concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+            
+            for future in in_flight:
+                future.result()
+        
+        return [BlobBlock(block_id=block_id) for block_id in block_ids], digest.hexdigest(), file_size
+    
     def _decode_filename(self, encoded_filename: str) -> str:
         """Base64로 인코딩된 파일명을 디코딩"""
         try:
@@ -273,6 +371,8 @@ class AzureStorageService:
                     "upload_date": blob.metadata.get("upload_date", "unknown"),
                     "file_size": int(blob.metadata.get("file_size", blob.size or 0)),
                     "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
+                    "content_sha256": blob.metadata.get("content_sha256"),
+                    "metadata": dict(blob.metadata or {}),
                     "url": f"{self.blob_service_client.url}/{self.container_name}/{blob.name}"
                 }
                 documents.append(doc_info)
@@ -285,12 +385,13 @@ class AzureStorageService:
             print(f"문서 목록 조회 실패: {e}")
             return []
     
-    def download_document(self, blob_name: str) -> Optional[bytes]:
+    def download_document(self, blob_name: str, max_concurrency: Optional[int] = None) -> Optional[bytes]:
         """
         문서 다운로드
         
         Args:
             blob_name: 블롭 이름
+            max_concurrency: 병렬 범위 요청 수 (없으면 인스턴스 설정값)
             
         Returns:
             파일 내용 (bytes) 또는 None
@@ -303,12 +404,141 @@ class AzureStorageService:
                 container=self.container_name,
                 blob=blob_name
             )
-            return blob_client.download_blob().readall()
+            return blob_client.download_blob(max_concurrency=max_concurrency or self.transfer["max_concurrency"]).readall()
             
         except Exception as e:
             print(f"문서 다운로드 실패: {e}")
             return None
     
+    def download_document_chunks(self, blob_name: str, offset: int = 0,
+                                 length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        문서를 청크 단위로 스트리밍 다운로드 (전체를 메모리에 올리지 않음)
+        
+        Args:
+            blob_name: 블롭 이름
+            offset: 시작 위치 (바이트)
+            length: 읽을 길이 (None이면 끝까지)
+            
+        Returns:
+            청크(bytes) 이터레이터 - 사용할 수 없거나 실패하면 아무것도 내보내지 않음
+        """
+        if not self.available:
+            return
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            downloader = blob_client.download_blob(offset=offset, length=length)
+            for chunk in downloader.chunks():
+                yield chunk
+                
+        except Exception as e:
+            print(f"문서 스트리밍 다운로드 실패: {e}")
+    
+    def download_document_range(self, blob_name: str, offset: int, length: int) -> Optional[bytes]:
+        """
+        문서의 일부 범위만 다운로드
+        
+        Args:
+            blob_name: 블롭 이름
+            offset: 시작 위치 (바이트)
+            length: 읽을 길이
+            
+        Returns:
+            범위 내용 (bytes) 또는 None
+        """
+        if not self.available:
+            return None
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            return blob_client.download_blob(offset=offset, length=length).readall()
+            
+        except Exception as e:
+            print(f"문서 범위 다운로드 실패: {e}")
+            return None
+    
+    def download_document_to_file(self, blob_name: str, path: str, max_concurrency: Optional[int] = None) -> bool:
+        """
+        문서를 로컬 파일로 병렬 다운로드 (메모리를 거치지 않고 바로 기록)
+        
+        Args:
+            blob_name: 블롭 이름
+            path: 저장할 파일 경로
+            max_concurrency: 병렬 범위 요청 수 (없으면 인스턴스 설정값)
+            
+        Returns:
+            다운로드 성공 여부
+        """
+        if not self.available:
+            return False
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            with open(path, "wb") as f:
+                blob_client.download_blob(max_concurrency=max_concurrency or self.transfer["max_concurrency"]).readinto(f)
+            return True
+            
+        except Exception as e:
+            print(f"문서 파일 다운로드 실패: {e}")
+            return False
+    
+    def hash_document(self, blob_name: str) -> Optional[str]:
+        """문서를 스트리밍으로 읽으며 SHA-256 계산 (실패 시 None)"""
+        if not self.available:
+            return None
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            digest = hashlib.sha256()
+            for chunk in blob_client.download_blob().chunks():
+                digest.update(chunk)
+            return digest.hexdigest()
+            
+        except Exception as e:
+            print(f"문서 해시 계산 실패: {e}")
+            return None
+    
+    def read_document_text(self, blob_name: str, max_bytes: Optional[int] = None,
+                           encoding: str = "utf-8") -> Optional[str]:
+        """
+        문서를 청크 단위로 받아 점진적으로 디코딩 (max_bytes 지정 시 앞부분만 범위 요청)
+        
+        Args:
+            blob_name: 블롭 이름
+            max_bytes: 읽을 최대 바이트 수
+            encoding: 텍스트 인코딩
+            
+        Returns:
+            디코딩된 텍스트 또는 None
+        """
+        if not self.available:
+            return None
+        
+        # 청크 경계에서 잘린 멀티바이트 문자도 다음 청크와 이어서 디코딩
+        decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+        parts = []
+        received = False
+        for chunk in self.download_document_chunks(blob_name, length=max_bytes):
+            received = True
+            parts.append(decoder.decode(chunk))
+        if not received:
+            return None
+        parts.append(decoder.decode(b"", final=True))
+        return "".join(parts)
+    
     def delete_document(self, blob_name: str) -> bool:
         """
         문서 삭제
@@ -334,6 +564,119 @@ class AzureStorageService:
             print(f"문서 삭제 실패: {e}")
             return False
     
+    def delete_documents(self, blob_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        여러 문서를 Blob Batch 요청으로 삭제 (배치당 최대 256개, 배치는 동시에 전송)
+        
+        Args:
+            blob_names: 블롭 이름 목록
+            
+        Returns:
+            블롭 이름 -> 오류 메시지 (성공 시 None)
+        """
+        if not self.available:
+            return {name: "Azure Storage가 사용할 수 없습니다." for name in blob_names}
+        
+        container_client = self.blob_service_client.get_container_client(self.container_name)
+        batch_size = BULK_OPERATION_CONFIG["blob_batch_size"]
+        batches = [blob_names[i:i + batch_size] for i in range(0, len(blob_names), batch_size)]
+        results: Dict[str, Optional[str]] = {}
+        
+        def delete_batch(batch: List[str]) -> Dict[str, Optional[str]]:
+            try:
+                responses = container_client.delete_blobs(*batch, raise_on_any_failure=False)
+                batch_results = {}
+                for name, response in zip(batch, responses):
+                    # 404는 이미 삭제된 경우이므로 성공으로 처리
+                    if response.status_code in (200, 202, 404):
+                        batch_results[name] = None
+                    else:
+                        batch_results[name] = f"HTTP {response.status_code}: {getattr(response, 'reason', '')}"
+                return batch_results
+            except Exception as e:
+                print(f"일괄 삭제 실패: {e}")
+                return {name: str(e) for name in batch}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(len(batches), self.transfer["max_concurrency"]))) as executor:
+            for batch_results in executor.map(delete_batch, batches):
+                results.update(batch_results)
+        return results
+    
+    def upload_blob_stream(self, blob_name: str, stream: BinaryIO, metadata: Optional[Dict[str, str]] = None,
+                           overwrite: bool = True, max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        이름과 메타데이터를 그대로 지정하여 스트림 업로드 (복원/아카이브 업로드용)
+        
+        Args:
+            blob_name: 블롭 이름
+            stream: 읽기 가능한 바이너리 스트림
+            metadata: 블롭 메타데이터
+            overwrite: 이미 있으면 덮어쓸지 여부 (False면 건너뜀)
+            max_concurrency: 병렬 블록 업로드 수
+            
+        Returns:
+            업로드 결과 (status: uploaded/skipped)
+        """
+        if not self.available:
+            return {"success": False, "error": "Azure Storage가 사용할 수 없습니다."}
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            if not overwrite and blob_client.exists():
+                return {"success": True, "status": "skipped", "blob_name": blob_name}
+            
+            blob_client.upload_blob(
+                stream,
+                overwrite=True,
+                metadata=metadata,
+                max_concurrency=max_concurrency or self.transfer["max_concurrency"]
+            )
+            return {"success": True, "status": "uploaded", "blob_name": blob_name, "url": blob_client.url}
+            
+        except Exception as e:
+            print(f"스트림 업로드 실패: {e}")
+            return {"success": False, "error": str(e)}
+    
+    def copy_document(self, source_blob_name: str, dest_blob_name: str,
+                      metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        문서를 서버 측에서 복사 (내용을 내려받지 않음)
+        
+        Args:
+            source_blob_name: 원본 블롭 이름
+            dest_blob_name: 대상 블롭 이름
+            metadata: 대상 블롭 메타데이터 (없으면 원본 메타데이터 유지)
+            
+        Returns:
+            복사 결과 (status: success/pending)
+        """
+        if not self.available:
+            return {"success": False, "error": "Azure Storage가 사용할 수 없습니다."}
+        
+        try:
+            source_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=source_blob_name
+            )
+            dest_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=dest_blob_name
+            )
+            copy = dest_client.start_copy_from_url(source_client.url, metadata=metadata)
+            return {
+                "success": True,
+                "blob_name": dest_blob_name,
+                "url": dest_client.url,
+                "status": copy.get("copy_status")
+            }
+            
+        except Exception as e:
+            print(f"문서 복사 실패: {e}")
+            return {"success": False, "error": str(e)}
+    
     def get_document_info(self, blob_name: str) -> Optional[Dict[str, Any]]:
         """
         문서 정보 조회
@@ -407,6 +750,102 @@ class AzureStorageService:
             print(f"메타데이터 업데이트 실패: {e}")
             return False
     
+    def merge_document_metadata(self, blob_name: str, metadata: Optional[Dict] = None,
+                                filename: Optional[str] = None) -> bool:
+        """
+        같은 내용의 중복 업로드 메타데이터를 기존 문서에 병합
+        
+        기존 값은 유지하고 없는 항목만 추가하며, 태그는 합집합으로 병합한다.
+        
+        Args:
+            blob_name: 기존 문서의 블롭 이름
+            metadata: 중복 업로드의 메타데이터
+            filename: 중복 업로드의 파일명
+            
+        Returns:
+            병합 성공 여부
+        """
+        if not self.available:
+            return False
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            current_metadata = blob_client.get_blob_properties().metadata or {}
+            
+            for key, value in (metadata or {}).items():
+                safe_key = str(key).encode('ascii', errors='ignore').decode('ascii')
+                safe_value = str(value).encode('ascii', errors='ignore').decode('ascii')
+                if not safe_key or not safe_value:
+                    continue
+                meta_key = f"meta_{safe_key}"
+                if meta_key == "meta_tags" and current_metadata.get(meta_key):
+                    tags = [t.strip() for t in current_metadata[meta_key].split(',') if t.strip()]
+                    for tag in safe_value.split(','):
+                        if tag.strip() and tag.strip() not in tags:
+                            tags.append(tag.strip())
+                    current_metadata[meta_key] = ", ".join(tags)
+                elif not current_metadata.get(meta_key):
+                    current_metadata[meta_key] = safe_value
+            
+            # 중복 업로드 이력 (다른 파일명으로 올라온 경우 기록)
+            current_metadata["duplicate_count"] = str(int(current_metadata.get("duplicate_count", "0")) + 1)
+            current_metadata["last_duplicate_upload"] = datetime.now(timezone.utc).isoformat()
+            if filename:
+                import urllib.parse
+                alias = urllib.parse.quote(filename, safe='')
+                aliases = [a for a in current_metadata.get("alias_names", "").split(',') if a]
+                if alias != current_metadata.get("display_name") and alias not in aliases:
+                    aliases.append(alias)
+                    # Azure 메타데이터 전체 크기 제한(8KB)을 넘지 않도록 최근 항목만 유지
+                    current_metadata["alias_names"] = ",".join(aliases[-10:])
+            
+            blob_client.set_blob_metadata(current_metadata)
+            return True
+            
+        except Exception as e:
+            print(f"중복 문서 메타데이터 병합 실패: {e}")
+            return False
+    
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        """Blob URL에서 컨테이너 내 블롭 이름 추출 (다른 컨테이너 URL이면 None)"""
+        if not self.available or not url:
+            return None
+        
+        import urllib.parse
+        prefix = f"{self.blob_service_client.url.rstrip('/')}/{self.container_name}/"
+        if not url.startswith(prefix):
+            return None
+        return urllib.parse.unquote(url[len(prefix):].split('?', 1)[0])
+    
+    def set_document_metadata(self, blob_name: str, metadata: Dict[str, str]) -> bool:
+        """
+        문서 메타데이터 전체 교체 (기존 메타데이터를 이미 알고 있을 때 조회 왕복 없이 설정)
+        
+        Args:
+            blob_name: 블롭 이름
+            metadata: 설정할 전체 메타데이터
+            
+        Returns:
+            설정 성공 여부
+        """
+        if not self.available:
+            return False
+        
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            blob_client.set_blob_metadata(metadata)
+            return True
+            
+        except Exception as e:
+            print(f"메타데이터 설정 실패: {e}")
+            return False
+    
     def search_documents(self, query: str, document_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         문서 검색 (파일명 및 메타데이터 기반)
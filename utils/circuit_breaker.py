@@ -0,0 +1,259 @@
+"""
+외부 의존 서비스 서킷 브레이커
+서비스별로 연속 실패를 세어 임계값을 넘으면 일정 시간 요청을 보내지 않고 즉시 실패(대체 경로로 진행)시키고,
+복구 대기 시간이 지나면 소수의 시험 요청(half-open)으로 복구 여부를 확인한다.
+
+브레이커는 서비스 이름별로 프로세스에 하나만 만들어 모든 세션/재실행이 상태를 공유한다.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config import CIRCUIT_BREAKER_CONFIG
+from core.exceptions import ServiceConnectionException
+
+# azure-core 파이프라인 정책 (Azure SDK 클라이언트에 끼워 넣는 용도, 없으면 정책만 사용 불가)
+try:
+    from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+    from azure.core.pipeline.policies import HTTPPolicy
+    AZURE_CORE_AVAILABLE = True
+except ImportError:
+    AZURE_CORE_AVAILABLE = False
+    HTTPPolicy = object
+    ServiceRequestError = ServiceResponseError = None
+
+# 브레이커 상태
+STATE_CLOSED = "closed"        # 정상 - 모든 요청 허용
+STATE_OPEN = "open"            # 차단 - 요청 없이 즉시 실패
+STATE_HALF_OPEN = "half_open"  # 복구 확인 중 - 시험 요청만 허용
+
+# 서비스 이름 → 표시 이름 (상태 화면 표시 순서)
+SERVICE_LABELS = {
+    "azure_storage": "Azure Storage",
+    "azure_search": "Azure AI Search",
+    "openai": "Azure OpenAI",
+    "tavily": "Tavily 웹 검색"
+}
+
+class CircuitOpenError(ServiceConnectionException):
+    """브레이커가 차단 중이라 요청을 보내지 않음"""
+
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(SERVICE_LABELS.get(service, service), f"연속 실패로 일시 차단됨 ({retry_after:.0f}초 후 재시도)")
+        self.service = service
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (스레드 안전)"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30.0,
+                 half_open_max_calls: int = 1, enabled: bool = True):
+        """
+        Args:
+            name: 서비스 이름
+            failure_threshold: 차단까지의 연속 실패 수
+            recovery_seconds: 차단 후 시험 요청을 허용하기까지 대기 시간 (초)
+            half_open_max_calls: 복구 확인 중 동시에 허용할 시험 요청 수
+            enabled: False면 상태만 기록하고 요청은 항상 허용
+        """
+        self.name = name
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.recovery_seconds = float(recovery_seconds)
+        self.half_open_max_calls = max(int(half_open_max_calls), 1)
+        self.enabled = enabled
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        self._probes_in_flight = 0
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self, now: float):
+        """복구 대기 시간이 지났으면 복구 확인 상태로 전환 (호출 측에서 잠금 보유)"""
+        if self.state == STATE_OPEN and now - self.opened_at >= self.recovery_seconds:
+            self.state = STATE_HALF_OPEN
+            self._probes_in_flight = 0
+
+    def _open(self, now: float):
+        self.state = STATE_OPEN
+        self.opened_at = now
+        self._probes_in_flight = 0
+
+    def is_available(self) -> bool:
+        """요청을 보낼 수 있는 상태인지 (시험 요청 슬롯은 소비하지 않음)"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self.state != STATE_OPEN
+
+    def allow_request(self) -> bool:
+        """요청 허용 여부 (복구 확인 중이면 시험 요청 슬롯을 하나 소비)"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._refresh(now)
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_HALF_OPEN:
+                # 결과가 기록되지 않은 시험 요청이 오래되면 슬롯을 돌려받음
+                if (self._probes_in_flight < self.half_open_max_calls
+                        or now - self._probe_started_at >= self.recovery_seconds):
+                    if self._probes_in_flight >= self.half_open_max_calls:
+                        self._probes_in_flight = 0
+                    self._probes_in_flight += 1
+                    self._probe_started_at = now
+                    return True
+            self.rejected += 1
+            return False
+
+    def before_call(self):
+        """요청 직전 확인 - 차단 중이면 CircuitOpenError"""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        """서비스가 응답함 (차단/복구 확인 상태였으면 정상으로 복구)"""
+        with self._lock:
+            recovered = self.state != STATE_CLOSED
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self._probes_in_flight = 0
+        if recovered:
+            print(f"✅ {SERVICE_LABELS.get(self.name, self.name)} 서킷 브레이커 복구")
+
+    def record_failure(self, error: Any = None):
+        """서비스 장애로 볼 수 있는 실패 기록 (연결 오류, 시간 초과, 5xx 등)"""
+        with self._lock:
+            now = time.monotonic()
+            self.total_failures += 1
+            self.last_error = str(error)[:200] if error is not None else None
+            self.last_failure_at = time.time()
+            self.consecutive_failures += 1
+            opened = False
+            if self.state == STATE_HALF_OPEN or (
+                    self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self._open(now)
+                opened = True
+        if opened:
+            print(f"🚫 {SERVICE_LABELS.get(self.name, self.name)} 서킷 브레이커 차단 "
+                  f"(연속 실패 {self.consecutive_failures}회, {self.recovery_seconds:.0f}초 후 재시도): {self.last_error}")
+
+    def release(self):
+        """장애 여부를 판단할 수 없이 끝난 요청 (복구 확인 중이면 시험 요청 슬롯만 반환)"""
+        with self._lock:
+            if self.state == STATE_HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def call(self, func: Callable[..., Any], *args,
+             is_failure: Optional[Callable[[Exception], bool]] = None, **kwargs) -> Any:
+        """
+        브레이커를 적용한 함수 호출
+
+        Args:
+            func: 호출할 함수
+            is_failure: 예외가 서비스 장애인지 판정 (None이면 모든 예외를 장애로 기록,
+                        False로 판정된 예외는 서비스가 응답한 것으로 보고 성공 처리)
+
+        Returns:
+            func 반환값 (차단 중이면 CircuitOpenError)
+        """
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure(e)
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def retry_after(self) -> float:
+        """시험 요청이 허용되기까지 남은 시간 (초, 차단 중이 아니면 0)"""
+        with self._lock:
+            if self.state != STATE_OPEN:
+                return 0.0
+            return max(self.opened_at + self.recovery_seconds - time.monotonic(), 0.0)
+
+    def reset(self):
+        """수동 복구 (상태 초기화)"""
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh(time.monotonic())
+            state = self.state
+        return {
+            "name": self.name,
+            "label": SERVICE_LABELS.get(self.name, self.name),
+            "enabled": self.enabled,
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "total_failures": self.total_failures,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after(),
+            "last_error": self.last_error,
+            "last_failure_at": self.last_failure_at
+        }
+
+class CircuitBreakerPolicy(HTTPPolicy):
+    """Azure SDK 파이프라인 정책 - 차단 중이면 요청 없이 실패, 연결 오류/5xx/408 응답은 장애로 기록"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        super().__init__()
+        self.breaker = breaker
+
+    def send(self, request):
+        self.breaker.before_call()
+        try:
+            response = self.next.send(request)
+        except (ServiceRequestError, ServiceResponseError) as e:
+            self.breaker.record_failure(e)
+            raise
+        except Exception:
+            self.breaker.release()
+            raise
+
+        status_code = response.http_response.status_code
+        if status_code >= 500 or status_code == 408:
+            self.breaker.record_failure(f"HTTP {status_code}")
+        else:
+            self.breaker.record_success()
+        return response
+
+# 서비스별 브레이커 (프로세스 내 모든 세션이 공유)
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """서비스 이름별 공유 브레이커 반환 (CIRCUIT_BREAKER_CONFIG의 서비스별 덮어쓰기 적용)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                settings = {
+                    "failure_threshold": CIRCUIT_BREAKER_CONFIG["failure_threshold"],
+                    "recovery_seconds": CIRCUIT_BREAKER_CONFIG["recovery_seconds"],
+                    "half_open_max_calls": CIRCUIT_BREAKER_CONFIG["half_open_max_calls"]
+                }
+                settings.update(CIRCUIT_BREAKER_CONFIG["services"].get(name, {}))
+                breaker = CircuitBreaker(name, enabled=CIRCUIT_BREAKER_CONFIG["enabled"], **settings)
+                _breakers[name] = breaker
+    return breaker
+
+def get_all_breaker_status() -> List[Dict[str, Any]]:
+    """알려진 모든 서비스의 브레이커 상태 (표시 순서대로)"""
+    names = list(SERVICE_LABELS) + [name for name in list(_breakers) if name not in SERVICE_LABELS]
+    return [get_circuit_breaker(name).get_status() for name in names]
@@ -0,0 +1,349 @@
+"""
+토큰 예산 기반 컨텍스트 패킹
+분석 대상 문서와 참고 자료를 모델 컨텍스트 한도 내에서 관련도 순으로 선택
+"""
+import re
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from config import AI_CONFIG
+
+# tiktoken 조건부 import (없으면 문자 수 기반 추정)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    print("⚠️ tiktoken 패키지가 설치되지 않았습니다. 토큰 수를 추정치로 계산합니다.")
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+_encoding = None
+_encoding_failed = False  # 인코딩 파일을 받지 못함 (이후 호출은 다시 시도하지 않고 추정치 사용)
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """토크나이저 인코딩 반환 (gpt-4o 계열: o200k_base, 불러올 수 없으면 None)"""
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed or not TIKTOKEN_AVAILABLE:
+        return _encoding
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            # tiktoken은 첫 사용 시 BPE 파일을 내려받으므로 외부 접속이 막힌 환경에서는 실패할 수 있음
+            for name in ("o200k_base", "cl100k_base"):
+                try:
+                    _encoding = tiktoken.get_encoding(name)
+                    break
+                except Exception as e:
+                    print(f"⚠️ tiktoken 인코딩({name}) 로드 실패: {e}")
+            if _encoding is None:
+                _encoding_failed = True
+                print("⚠️ 토크나이저를 사용할 수 없어 토큰 수를 추정치로 계산합니다.")
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수 계산"""
+    if not text:
+        return 0
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    # 추정치: ASCII는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 1토큰 (보수적)
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """최대 토큰 수에 맞게 텍스트 자르기"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+    # 추정치 기반: 이분 탐색으로 자를 위치 결정
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+def split_into_passages(text: str, max_tokens: int = 200) -> List[str]:
+    """텍스트를 문단 단위 패시지로 분할 (짧은 문단은 병합, 긴 문단은 분할)"""
+    if not text or not text.strip():
+        return []
+
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
+    passages = []
+    buffer = ""
+
+    for paragraph in paragraphs:
+        # 긴 문단은 문장/줄 단위로 분할
+        if count_tokens(paragraph) > max_tokens:
+            if buffer:
+                passages.append(buffer)
+                buffer = ""
+            pieces = re.split(r'(?<=[.!?。])\s+|\n', paragraph)
+            piece_buffer = ""
+            for piece in pieces:
+                if not piece.strip():
+                    continue
+                candidate = f"{piece_buffer} {piece}".strip() if piece_buffer else piece
+                if count_tokens(candidate) <= max_tokens:
+                    piece_buffer = candidate
+                    continue
+                if piece_buffer:
+                    passages.append(piece_buffer)
+                # 한 문장이 한도를 넘으면 토큰 기준으로 강제 분할
+                while count_tokens(piece) > max_tokens:
+                    head = truncate_to_tokens(piece, max_tokens).rstrip("\ufffd")
+                    if not head:
+                        break
+                    passages.append(head)
+                    piece = piece[len(head):].strip()
+                piece_buffer = piece
+            if piece_buffer:
+                passages.append(piece_buffer)
+            continue
+
+        candidate = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+        if count_tokens(candidate) <= max_tokens:
+            buffer = candidate
+        else:
+            passages.append(buffer)
+            buffer = paragraph
+
+    if buffer:
+        passages.append(buffer)
+    return passages
+
+def split_into_sections(text: str, max_tokens: int) -> List[str]:
+    """긴 문서를 섹션 단위로 분할 (마크다운 제목 우선, 초과 시 문단 단위 분할)"""
+    if not text or not text.strip():
+        return []
+
+    # 제목(#) 줄을 기준으로 블록 분리
+    blocks = []
+    current = []
+    for line in text.splitlines():
+        if re.match(r'^#{1,6}\s', line) and current:
+            blocks.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current).strip())
+
+    sections = []
+    buffer = ""
+    for block in [b for b in blocks if b]:
+        if count_tokens(block) > max_tokens:
+            if buffer:
+                sections.append(buffer)
+                buffer = ""
+            sections.extend(split_into_passages(block, max_tokens))
+            continue
+
+        candidate = f"{buffer}\n\n{block}" if buffer else block
+        if count_tokens(candidate) <= max_tokens:
+            buffer = candidate
+        else:
+            sections.append(buffer)
+            buffer = block
+
+    if buffer:
+        sections.append(buffer)
+    return sections
+
+def _extract_terms(text: str) -> set:
+    """관련도 계산용 용어 추출 (한글 2자 이상, 영문 3자 이상)"""
+    return {word.lower() for word in re.findall(r'[가-힣]{2,}|[a-zA-Z]{3,}|\d{2,}', text or "")}
+
+def _lexical_relevance(query_terms: set, passage: str) -> float:
+    """쿼리 용어와 패시지의 어휘 중첩도 (0~1)"""
+    if not query_terms:
+        return 0.0
+    passage_terms = _extract_terms(passage)
+    if not passage_terms:
+        return 0.0
+    return len(query_terms & passage_terms) / len(query_terms)
+
+def _doc_weight(doc: Dict[str, Any], rank: int) -> float:
+    """문서 단위 관련도 가중치 (검색 점수 + 순위 prior)"""
+    score = doc.get("rrf_score") or doc.get("relevance_score") or doc.get("score") or 0.5
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        score = 0.5
+    # RRF 점수는 매우 작은 값이므로 순위 prior를 함께 사용
+    return 1.0 / (1 + rank) + min(score, 1.0)
+
+class ContextPacker:
+    """토큰 예산 내에서 분석 컨텍스트를 구성하는 패커"""
+
+    def __init__(self, budget_tokens: Optional[int] = None,
+                 reserved_output_tokens: Optional[int] = None,
+                 document_share: float = 0.6,
+                 passage_tokens: int = 200):
+        """
+        초기화
+        Args:
+            budget_tokens: 컨텍스트에 사용할 최대 토큰 수 (None이면 설정값)
+            reserved_output_tokens: 모델 출력용으로 남겨둘 토큰 수
+            document_share: 참고 자료가 있을 때 분석 대상 문서에 할당할 최대 비율
+            passage_tokens: 패시지 분할 단위 토큰 수
+        """
+        reserved_output_tokens = reserved_output_tokens or AI_CONFIG["analysis_max_tokens"]
+        window_limit = AI_CONFIG["context_window_tokens"] - reserved_output_tokens
+        self.budget_tokens = min(budget_tokens or AI_CONFIG["context_budget_tokens"], window_limit)
+        self.document_share = document_share
+        self.passage_tokens = passage_tokens
+
+    def pack(self, query: str, document_content: str,
+             internal_docs: List[Dict], external_docs: List[Dict],
+             document_label: str = "분석 대상 문서 내용") -> Dict[str, Any]:
+        """
+        분석 컨텍스트 구성
+
+        Args:
+            query: 사용자 요청 (고도화된 프롬프트)
+            document_content: 분석 대상 문서 내용
+            internal_docs: 사내 참고 문서 목록
+            external_docs: 외부 참고 자료 목록
+            document_label: 문서 영역 제목
+
+        Returns:
+            컨텍스트 문자열과 토큰 사용 통계
+        """
+        header = f"사용자 요청: {query}\n\n"
+        footer = "위의 문서 내용을 중심으로 분석하되, 참고 자료들을 활용하여 포괄적인 분석 결과를 제공해주세요."
+        available = max(self.budget_tokens - count_tokens(header) - count_tokens(footer), 0)
+        query_terms = _extract_terms(query)
+
+        # 1) 분석 대상 문서 예산 할당
+        has_references = bool(internal_docs or external_docs)
+        doc_tokens = count_tokens(document_content) if document_content else 0
+        doc_limit = int(available * self.document_share) if has_references else available
+        document_text, document_used = self._pack_document(document_content, doc_tokens, doc_limit, query_terms)
+
+        # 2) 남은 예산을 참고 자료 패시지에 관련도 순으로 할당
+        reference_budget = available - document_used
+        selected, reference_used = self._select_reference_passages(
+            internal_docs, external_docs, query_terms, reference_budget
+        )
+
+        context = header
+        context += f"===== {document_label} =====\n"
+        context += f"{document_text}\n\n" if document_text else "(문서 내용이 제공되지 않음)\n\n"
+        context += self._render_references("===== 사내 참고 문서 =====", internal_docs, selected.get("internal", {}))
+        context += self._render_references("===== 외부 참고 자료 =====", external_docs, selected.get("external", {}))
+        context += footer
+
+        return {
+            "context": context,
+            "stats": {
+                "budget_tokens": self.budget_tokens,
+                "total_tokens": count_tokens(context),
+                "document_tokens": document_used,
+                "document_original_tokens": doc_tokens,
+                "document_truncated": document_used < doc_tokens,
+                "reference_tokens": reference_used,
+                "internal_docs_used": len(selected.get("internal", {})),
+                "external_docs_used": len(selected.get("external", {})),
+                "exact_tokenizer": _get_encoding() is not None
+            }
+        }
+
+    def _pack_document(self, content: str, content_tokens: int, limit: int,
+                       query_terms: set) -> Tuple[str, int]:
+        """분석 대상 문서를 예산에 맞게 선택 (초과 시 관련 패시지 위주로 발췌)"""
+        if not content or not content.strip():
+            return "", 0
+        if content_tokens <= limit:
+            return content, content_tokens
+
+        passages = split_into_passages(content, self.passage_tokens)
+        if not passages:
+            text = truncate_to_tokens(content, limit)
+            return text, count_tokens(text)
+
+        # 첫 패시지(도입부)는 항상 포함, 나머지는 관련도 순으로 선택
+        scored = [(0, float("inf"))] + [
+            (i, _lexical_relevance(query_terms, passage) + 1.0 / (1 + i))
+            for i, passage in enumerate(passages) if i > 0
+        ]
+        scored.sort(key=lambda x: x[1], reverse=True)
+
+        chosen = []
+        used = 0
+        for index, _ in scored:
+            tokens = count_tokens(passages[index]) + 2
+            if used + tokens > limit:
+                continue
+            chosen.append(index)
+            used += tokens
+
+        # 원래 순서대로 재배열하고 생략 구간 표시
+        chosen.sort()
+        parts = []
+        previous = -1
+        for index in chosen:
+            if index != previous + 1:
+                parts.append("(... 중략 ...)")
+            parts.append(passages[index])
+            previous = index
+        if previous != len(passages) - 1:
+            parts.append(f"(... 이하 생략, 원문 약 {content_tokens:,} 토큰 ...)")
+
+        text = "\n\n".join(parts)
+        return text, count_tokens(text)
+
+    def _select_reference_passages(self, internal_docs: List[Dict], external_docs: List[Dict],
+                                   query_terms: set, budget: int) -> Tuple[Dict[str, Dict[int, List[str]]], int]:
+        """참고 자료 패시지를 관련도 순으로 선택"""
+        candidates = []
+        for source, docs in (("internal", internal_docs or []), ("external", external_docs or [])):
+            for rank, doc in enumerate(docs):
+                weight = _doc_weight(doc, rank)
+                passages = split_into_passages(doc.get("content", ""), self.passage_tokens)
+                for position, passage in enumerate(passages):
+                    relevance = weight * (0.5 + _lexical_relevance(query_terms, passage))
+                    # 같은 문서의 뒤쪽 패시지는 약간 감점하여 다양한 문서가 포함되도록 함
+                    relevance *= 0.85 ** position
+                    candidates.append((relevance, source, rank, position, passage))
+
+        candidates.sort(key=lambda x: x[0], reverse=True)
+
+        selected: Dict[str, Dict[int, List[Tuple[int, str]]]] = {"internal": {}, "external": {}}
+        used = 0
+        for _, source, rank, position, passage in candidates:
+            # 문서 제목 헤더 비용 포함
+            header_cost = 0 if rank in selected[source] else 15
+            tokens = count_tokens(passage) + header_cost + 2
+            if used + tokens > budget:
+                continue
+            selected[source].setdefault(rank, []).append((position, passage))
+            used += tokens
+
+        # 문서 내 원래 순서로 정렬
+        ordered = {
+            source: {rank: [p for _, p in sorted(items)] for rank, items in docs.items()}
+            for source, docs in selected.items()
+        }
+        return ordered, used
+
+    def _render_references(self, title: str, docs: List[Dict], selected: Dict[int, List[str]]) -> str:
+        """선택된 참고 자료 패시지를 문자열로 구성"""
+        if not selected:
+            return ""
+        text = f"{title}\n"
+        for number, rank in enumerate(sorted(selected), 1):
+            doc = docs[rank]
+            text += f"{number}. {doc.get('title', 'N/A')}\n"
+            text += "\n...\n".join(selected[rank])
+            text += "\n\n"
+        return text
@@ -0,0 +1,254 @@
+"""
+외부 웹 검색 클라이언트
+공유 HTTP 세션(커넥션 풀/keep-alive), 타임아웃·재시도 정책, TTL 응답 캐시, 서킷 브레이커, 검색 제공자 인터페이스 제공
+"""
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import TAVILY_CONFIG, EXTERNAL_SEARCH_CONFIG
+from core.exceptions import ServiceConnectionException
+from core.utils import TTLCache
+from utils.circuit_breaker import get_circuit_breaker
+
+class ExternalSearchProvider:
+    """외부 검색 제공자 인터페이스
+
+    search()는 {"title", "content", "url", "score"} 형식의 결과 목록을 반환하고,
+    실패 시 ServiceConnectionException을 발생시킨다.
+    """
+
+    name = "base"
+    live = True  # 실제 웹 검색 여부 (False면 로컬 대체 결과)
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def search(self, query: str, max_results: int, search_depth: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """첫 검색 전에 연결을 미리 맺어 둠 (기본은 할 일 없음)"""
+
+class TavilySearchProvider(ExternalSearchProvider):
+    """Tavily 검색 제공자 (커넥션 풀을 재사용하는 공유 세션 사용)"""
+
+    name = "tavily"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or TAVILY_CONFIG.get("api_key")
+        self.endpoint = TAVILY_CONFIG["endpoint"]
+        self.timeout = (EXTERNAL_SEARCH_CONFIG["connect_timeout"], EXTERNAL_SEARCH_CONFIG["read_timeout"])
+        self.session = self._create_session()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """keep-alive 커넥션 풀과 재시도 정책이 적용된 세션 생성"""
+        retry = Retry(
+            total=EXTERNAL_SEARCH_CONFIG["max_retries"],
+            backoff_factor=EXTERNAL_SEARCH_CONFIG["backoff_factor"],
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),  # 검색 요청은 멱등
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=EXTERNAL_SEARCH_CONFIG["pool_connections"],
+            pool_maxsize=EXTERNAL_SEARCH_CONFIG["pool_maxsize"],
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Content-Type": "application/json"})
+        return session
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def warm_up(self):
+        """DNS 조회와 TLS 연결을 미리 맺어 풀에 넣어 둠 (응답 상태와 관계없이 연결만 목적, 검색 한도는 쓰지 않음)"""
+        self.session.head(self.endpoint, timeout=self.timeout)
+
+    def search(self, query: str, max_results: int, search_depth: str) -> List[Dict[str, Any]]:
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "search_depth": search_depth,
+            "max_results": max_results,
+            "include_answer": True,
+            "include_raw_content": False
+        }
+
+        try:
+            response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ServiceConnectionException("Tavily", str(e))
+
+        if response.status_code != 200:
+            raise ServiceConnectionException("Tavily", f"HTTP {response.status_code}: {response.text[:200]}")
+
+        return [
+            {
+                "title": item.get("title", ""),
+                "content": item.get("content", ""),
+                "url": item.get("url", ""),
+                "score": item.get("score", 0)
+            }
+            for item in response.json().get("results", [])[:max_results]
+        ]
+
+class LocalSearchProvider(ExternalSearchProvider):
+    """로컬 대체 제공자 (API 키가 없는 개발/데모 환경용 템플릿 결과)"""
+
+    name = "local"
+    live = False
+
+    TEMPLATES = [
+        {
+            "source": "Wikipedia",
+            "title_format": "{query} - 위키백과",
+            "content_format": "{query}에 대한 백과사전적 정보입니다. 역사적 배경, 정의, 특징 등을 포함한 종합적인 개요를 제공합니다. 이는 검증된 정보원에서 수집된 신뢰할 수 있는 내용입니다.",
+            "url_format": "https://ko.wikipedia.org/wiki/{query}"
+        },
+        {
+            "source": "Stack Overflow",
+            "title_format": "{query} 구현 방법 - 개발자 커뮤니티",
+            "content_format": "{query}와 관련된 실제 개발 경험과 해결책을 공유하는 개발자들의 토론입니다. 코드 예제, 모범 사례, 일반적인 문제와 해결방법을 포함합니다.",
+            "url_format": "https://stackoverflow.com/questions/tagged/{query}"
+        },
+        {
+            "source": "Medium",
+            "title_format": "{query} 트렌드 분석 - 전문가 블로그",
+            "content_format": "{query}에 대한 최신 트렌드와 전문가 의견을 제공하는 기술 블로그입니다. 실무 경험을 바탕으로 한 인사이트와 향후 전망을 다룹니다.",
+            "url_format": "https://medium.com/topic/{query}"
+        },
+        {
+            "source": "GitHub",
+            "title_format": "{query} 오픈소스 프로젝트",
+            "content_format": "{query}와 관련된 오픈소스 프로젝트 및 코드 저장소입니다. 실제 구현 예제, 라이브러리, 도구 등을 포함하여 개발에 직접 활용할 수 있는 자료입니다.",
+            "url_format": "https://github.com/topics/{query}"
+        },
+        {
+            "source": "Academic Paper",
+            "title_format": "{query} 연구 논문 - 학술 자료",
+            "content_format": "{query}에 대한 학술적 연구 결과입니다. 체계적인 연구 방법론과 실증적 데이터를 바탕으로 한 전문적인 분석과 결론을 제공합니다.",
+            "url_format": "https://scholar.google.com/scholar?q={query}"
+        }
+    ]
+
+    def search(self, query: str, max_results: int, search_depth: str) -> List[Dict[str, Any]]:
+        results = []
+        for i, template in enumerate(self.TEMPLATES[:max_results]):
+            results.append({
+                "title": template["title_format"].format(query=query),
+                "content": template["content_format"].format(query=query),
+                "url": template["url_format"].format(query=query.replace(" ", "-")),
+                "score": 0.9 - (i * 0.15),
+                "source": template["source"]
+            })
+        return results
+
+# 제공자 레지스트리 (이름 -> 생성 함수)
+PROVIDERS: Dict[str, Callable[[], ExternalSearchProvider]] = {
+    "tavily": TavilySearchProvider,
+    "local": LocalSearchProvider,
+}
+
+def register_provider(name: str, factory: Callable[[], ExternalSearchProvider]):
+    """외부 검색 제공자 등록"""
+    PROVIDERS[name] = factory
+
+class ExternalSearchClient:
+    """외부 검색 클라이언트 - 제공자 호출 결과를 TTL 캐시에 보관"""
+
+    def __init__(self, provider: Optional[ExternalSearchProvider] = None):
+        self.provider = provider or self._create_provider(EXTERNAL_SEARCH_CONFIG["provider"])
+        # 실제 웹 검색 제공자만 공유 서킷 브레이커 적용 (인증/한도 오류도 계속 실패하므로 모든 예외를 장애로 기록)
+        self.breaker = get_circuit_breaker(self.provider.name) if self.provider.live else None
+        self.cache = TTLCache(
+            ttl_seconds=EXTERNAL_SEARCH_CONFIG["cache_ttl_seconds"],
+            max_size=EXTERNAL_SEARCH_CONFIG["cache_max_entries"]
+        )
+
+    @staticmethod
+    def _create_provider(name: str) -> ExternalSearchProvider:
+        """설정된 제공자 생성 (사용 불가 시 로컬 대체 제공자 사용)"""
+        factory = PROVIDERS.get(name)
+        if factory is None:
+            print(f"⚠️ 알 수 없는 외부 검색 제공자: {name} - 로컬 대체 제공자를 사용합니다.")
+            return LocalSearchProvider()
+
+        provider = factory()
+        if not provider.available:
+            print(f"⚠️ 외부 검색 제공자({name})를 사용할 수 없어 로컬 대체 제공자를 사용합니다.")
+            return LocalSearchProvider()
+        return provider
+
+    @property
+    def is_live(self) -> bool:
+        """실제 웹 검색 제공자 사용 여부 (서킷 브레이커가 차단 중이면 False)"""
+        return self.provider.live and self.breaker.is_available()
+
+    def warm_up(self) -> bool:
+        """
+        제공자 연결 미리 맺기 (실패해도 예외를 올리지 않음)
+
+        Returns:
+            실제 웹 검색 제공자 연결에 성공했는지 여부 (로컬 대체 제공자면 False)
+        """
+        if not self.is_live:
+            return False
+        try:
+            self.provider.warm_up()
+            return True
+        except Exception as e:
+            print(f"⚠️ 외부 검색 연결 준비 실패: {e}")
+            return False
+
+    def search(self, query: str, max_results: int = 5, search_depth: Optional[str] = None,
+               use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        외부 검색 (동일한 query/depth/max_results 요청은 TTL 동안 캐시 응답 사용)
+
+        Args:
+            query: 검색 쿼리
+            max_results: 최대 결과 수
+            search_depth: 검색 깊이 (None이면 설정값)
+            use_cache: 캐시 사용 여부
+
+        Returns:
+            검색 결과 목록 (실제 웹 검색 제공자가 차단 중이면 CircuitOpenError)
+        """
+        search_depth = search_depth or TAVILY_CONFIG.get("search_depth", "basic")
+        cache_key = (self.provider.name, query.strip(), search_depth, max_results)
+
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return [dict(item) for item in cached]
+
+        if self.provider.live:
+            results = self.breaker.call(self.provider.search, query, max_results, search_depth)
+        else:
+            results = self.provider.search(query, max_results, search_depth)
+        self.cache.set(cache_key, results)
+        return [dict(item) for item in results]
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_shared_client: Optional[ExternalSearchClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_external_search_client() -> ExternalSearchClient:
+    """공유 외부 검색 클라이언트 반환"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = ExternalSearchClient()
+    return _shared_client
@@ -0,0 +1,146 @@
+"""
+텍스트 추출 작업 함수 (프로세스 풀 워커에서 실행)
+워커 프로세스가 가볍게 시작되도록 파서 패키지 외에는 import하지 않음
+
+모든 작업은 절대 시각 deadline을 받아, 넘으면 그때까지 추출한 페이지만 담아 반환한다 (부분 결과).
+"""
+import io
+import signal
+import threading
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+# 작업 입력: 파일 내용(bytes) 또는 임시 파일 경로 (큰 PDF를 여러 작업에 나눌 때 복사 비용을 줄임)
+Source = Union[bytes, str]
+
+class ExtractionTimeout(Exception):
+    """파일별 추출 제한 시간 초과"""
+
+def init_worker(memory_limit_mb: int):
+    """워커 프로세스 초기화 - 주소 공간 상한 설정 (넘으면 해당 작업에서 MemoryError)"""
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"⚠️ 추출 워커 메모리 제한 설정 실패: {e}")
+
+class _Alarm:
+    """deadline에 ExtractionTimeout을 발생시키는 타이머 (워커 프로세스의 메인 스레드에서만 동작)"""
+
+    def __init__(self, deadline: Optional[float]):
+        self.deadline = deadline
+        self.active = (
+            deadline is not None
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        )
+
+    def __enter__(self):
+        if self.active:
+            def on_alarm(signum, frame):
+                raise ExtractionTimeout()
+            self._previous = signal.signal(signal.SIGALRM, on_alarm)
+            signal.setitimer(signal.ITIMER_REAL, max(self.deadline - time.time(), 0.01))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.active:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous)
+        return False
+
+def _open(source: Source) -> BinaryIO:
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+
+def _result(page_count: int = 0) -> Dict[str, Any]:
+    return {"page_count": page_count, "pages": {}, "errors": {}, "timed_out": False, "error": None}
+
+def extract_pdf_pages(source: Source, start: int = 0, end: Optional[int] = None,
+                      deadline: Optional[float] = None, fanout_threshold: Optional[int] = None) -> Dict[str, Any]:
+    """
+    PyPDF2로 PDF 페이지 범위 [start, end) 추출
+
+    end가 없고 전체 페이지 수가 fanout_threshold를 넘으면 추출하지 않고
+    페이지 수와 fanout=True만 반환 (호출 측에서 페이지 범위로 나눠 다시 요청)
+
+    Returns:
+        {"page_count", "pages": {페이지 번호(1부터): 텍스트}, "errors": {페이지 번호: 오류}, "timed_out", "error"}
+    """
+    import PyPDF2
+
+    result = _result()
+    try:
+        with _Alarm(deadline), _open(source) as stream:
+            pdf_reader = PyPDF2.PdfReader(stream)
+            result["page_count"] = len(pdf_reader.pages)
+            if end is None and fanout_threshold and result["page_count"] > fanout_threshold:
+                result["fanout"] = True
+                return result
+
+            for page_num in range(start, min(end or result["page_count"], result["page_count"])):
+                if deadline is not None and time.time() > deadline:
+                    raise ExtractionTimeout()
+                try:
+                    result["pages"][page_num + 1] = pdf_reader.pages[page_num].extract_text() or ""
+                except (ExtractionTimeout, MemoryError):
+                    raise
+                except Exception as e:
+                    print(f"PDF 페이지 {page_num} 추출 오류: {e}")
+                    result["errors"][page_num + 1] = str(e)
+    except ExtractionTimeout:
+        result["timed_out"] = True
+    except MemoryError:
+        result["error"] = "메모리 제한 초과"
+    except ImportError:
+        raise
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def extract_pdf_plumber(source: Source, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """pdfplumber로 PDF 전체 추출 (PyPDF2 결과가 거의 없을 때의 대체 경로)"""
+    import pdfplumber
+
+    result = _result()
+    try:
+        with _Alarm(deadline), _open(source) as stream, pdfplumber.open(stream) as pdf:
+            result["page_count"] = len(pdf.pages)
+            for page_num, page in enumerate(pdf.pages, start=1):
+                if deadline is not None and time.time() > deadline:
+                    raise ExtractionTimeout()
+                try:
+                    result["pages"][page_num] = page.extract_text() or ""
+                except (ExtractionTimeout, MemoryError):
+                    raise
+                except Exception as e:
+                    result["errors"][page_num] = str(e)
+    except ExtractionTimeout:
+        result["timed_out"] = True
+    except MemoryError:
+        result["error"] = "메모리 제한 초과"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def extract_docx(source: Source, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """Word 문서 문단 추출 (페이지 정보가 없으므로 문서 전체를 한 페이지로 취급)"""
+    from docx import Document
+
+    result = _result(page_count=1)
+    try:
+        with _Alarm(deadline), _open(source) as stream:
+            doc = Document(stream)
+            paragraphs: List[str] = []
+            for paragraph in doc.paragraphs:
+                paragraphs.append(paragraph.text)
+            result["pages"][1] = '\n'.join(paragraphs)
+    except ExtractionTimeout:
+        result["timed_out"] = True
+    except MemoryError:
+        result["error"] = "메모리 제한 초과"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
@@ -0,0 +1,94 @@
+"""
+문서 지문(fingerprint) 유틸리티
+업로드 중복 판정을 위한 내용 해시(SHA-256)와 유사 문서 판정을 위한 SimHash 제공
+"""
+import hashlib
+import re
+from collections import Counter
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+CHUNK_SIZE = 1024 * 1024
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-zA-Z]+|\d+")
+
+def hash_stream(source: BinaryIO, sink: Optional[BinaryIO] = None,
+                chunk_size: int = CHUNK_SIZE) -> Tuple[str, int]:
+    """
+    스트림을 청크 단위로 읽으며 SHA-256 계산 (sink가 있으면 같은 청크를 그대로 기록)
+
+    Returns:
+        (16진수 해시, 읽은 바이트 수)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return digest.hexdigest(), size
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[str]:
+    """텍스트 SimHash (단어 shingle 기반 64비트, 16진수 문자열) - 내용이 거의 같으면 비트 차이가 작음"""
+    tokens = [token.lower() for token in _TOKEN_PATTERN.findall(text or "")]
+    if not tokens:
+        return None
+
+    if len(tokens) < shingle_size:
+        shingles = Counter([" ".join(tokens)])
+    else:
+        shingles = Counter(" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+
+    weights = [0] * SIMHASH_BITS
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return f"{fingerprint:016x}"
+
+def hamming_distance(a: str, b: str) -> int:
+    """두 SimHash 사이의 다른 비트 수"""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+def collapse_near_duplicates(documents: List[Dict[str, Any]], max_distance: int = 3,
+                             fingerprint_func: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None
+                             ) -> List[Dict[str, Any]]:
+    """
+    순위가 매겨진 검색 결과에서 거의 같은 문서를 하나로 묶음 (앞선 순위 문서를 대표로 유지)
+
+    묶인 문서의 파일 ID는 대표 문서의 "near_duplicates"에 기록한다.
+    """
+    if fingerprint_func is None:
+        fingerprint_func = document_fingerprint
+
+    kept: List[Dict[str, Any]] = []
+    kept_fingerprints: List[Optional[str]] = []
+    for doc in documents:
+        fingerprint = fingerprint_func(doc)
+        duplicate_of = None
+        if fingerprint:
+            for index, other in enumerate(kept_fingerprints):
+                if other and hamming_distance(fingerprint, other) <= max_distance:
+                    duplicate_of = index
+                    break
+
+        if duplicate_of is None:
+            kept.append(doc)
+            kept_fingerprints.append(fingerprint)
+        else:
+            representative = kept[duplicate_of]
+            representative.setdefault("near_duplicates", []).append(doc.get("file_id") or doc.get("id"))
+    return kept
+
+def document_fingerprint(doc: Dict[str, Any]) -> Optional[str]:
+    """검색 결과의 SimHash (인덱스에 저장된 값이 없으면 본문으로 계산)"""
+    return doc.get("content_simhash") or simhash(doc.get("content", ""))
@@ -0,0 +1,86 @@
+"""
+로컬 영속 저장소
+앱 데이터 디렉터리와 SQLite 기반 저장소 공통 기능 제공 (작업 상태, 큐, 체크포인트 등)
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+
+from config import APP_CONFIG
+
+def get_app_data_dir(*parts: str) -> str:
+    """앱 데이터 디렉터리 경로 반환 (없으면 생성)"""
+    path = os.path.join(APP_CONFIG["data_dir"], *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def get_instance_id() -> str:
+    """현재 인스턴스 식별자 (App Service 스케일 아웃 인스턴스 ID, 없으면 호스트 이름)"""
+    return os.getenv("WEBSITE_INSTANCE_ID") or socket.gethostname()
+
+def to_json(value: Any) -> Optional[str]:
+    """JSON 컬럼 저장용 직렬화"""
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+def from_json(value: Optional[str], default: Any = None) -> Any:
+    """JSON 컬럼 역직렬화"""
+    if not value:
+        return default
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return default
+
+class SQLiteStore:
+    """스레드 간 공유 가능한 SQLite 저장소 기본 클래스
+
+    하위 클래스는 SCHEMA에 테이블 생성 SQL을 정의하고,
+    기존 DB 파일에 나중에 추가된 컬럼은 MIGRATIONS에 (테이블, 컬럼, 정의)로 등록한다.
+    """
+
+    SCHEMA: str = ""
+    MIGRATIONS: Tuple[Tuple[str, str, str], ...] = ()
+
+    def __init__(self, filename: str):
+        self.path = os.path.join(get_app_data_dir(), filename)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            journal_mode = APP_CONFIG["sqlite_journal_mode"].upper()
+            self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            # NORMAL은 WAL에서만 안전 (롤백 저널 모드는 FULL)
+            self._conn.execute(f"PRAGMA synchronous={'NORMAL' if journal_mode == 'WAL' else 'FULL'}")
+            if self.SCHEMA:
+                self._conn.executescript(self.SCHEMA)
+            self._apply_migrations()
+            self._conn.commit()
+
+    def _apply_migrations(self):
+        """이전 버전 스키마로 만든 테이블에 없는 컬럼 추가"""
+        for table, column, definition in self.MIGRATIONS:
+            existing = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        """쓰기 쿼리 실행 후 커밋, 변경된 행 수 반환"""
+        with self._lock:
+            cursor = self._conn.execute(sql, tuple(params))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def fetch_one(self, sql: str, params: Iterable[Any] = ()) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(sql, tuple(params)).fetchone()
+        return dict(row) if row else None
+
+    def fetch_all(self, sql: str, params: Iterable[Any] = ()) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,262 @@
+"""
+분석 단계별 모델 라우팅
+단계(프롬프트 고도화, 쿼리 생성, 섹션 분석, 최종 분석 등)마다 배포 후보를 두고
+장애/지연 시간/비용 규칙으로 순서를 정해 호출하며, 단계별 지연 시간과 토큰 사용량을 기록
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import openai
+
+from config import MODEL_ROUTING_CONFIG
+from utils.openai_client import RateLimitedOpenAIClient, get_openai_client
+
+class StageMetrics:
+    """단계별 누적 지표"""
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.failures = 0
+        self.fallbacks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.deployments: Dict[str, int] = {}
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(ratio: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(len(latencies) * ratio), len(latencies) - 1)]
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50_latency": percentile(0.5),
+            "p95_latency": percentile(0.95),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": self.cost_usd,
+            "deployments": dict(self.deployments)
+        }
+
+class ModelRouter:
+    """단계별 배포 선택 + 대체(fallback) 호출 + 지표 기록"""
+
+    def __init__(self, client: RateLimitedOpenAIClient):
+        self.client = client
+        self._lock = threading.Lock()
+        self._stage_metrics: Dict[str, StageMetrics] = {}
+        self._latency_ewma: Dict[Tuple[str, str], float] = {}
+        self._latency_updated: Dict[Tuple[str, str], float] = {}
+        self._cooldown_until: Dict[str, float] = {}
+
+    def route(self, stage: str) -> List[str]:
+        """
+        단계의 배포 호출 순서 결정
+
+        규칙 (앞의 규칙이 우선):
+            1. 최근 실패해 쿨다운 중인 배포는 맨 뒤로
+            2. 이 단계의 최근 지연 시간이 max_latency_seconds를 넘는 배포는 뒤로
+               (측정값은 쿨다운 시간이 지나면 무시해 느렸던 배포도 다시 시도)
+            3. prefer_cheaper이면 비용 순, 아니면 설정된 후보 순서
+        """
+        stage_config = self._stage_config(stage)
+        candidates = [d.strip() for d in stage_config["deployments"] if d and d.strip()]
+        candidates = list(dict.fromkeys(candidates))
+        max_latency = stage_config.get("max_latency_seconds")
+        now = time.monotonic()
+
+        with self._lock:
+            def sort_key(item):
+                index, deployment = item
+                cooling = self._cooldown_until.get(deployment, 0.0) > now
+                latency = self._latency_ewma.get((stage, deployment))
+                fresh = now - self._latency_updated.get((stage, deployment), 0.0) < MODEL_ROUTING_CONFIG["failure_cooldown_seconds"]
+                too_slow = max_latency is not None and latency is not None and fresh and latency > max_latency
+                preference = self._unit_cost(deployment) if MODEL_ROUTING_CONFIG["prefer_cheaper"] else index
+                return (cooling, too_slow, preference, index)
+
+            return [deployment for _, deployment in sorted(enumerate(candidates), key=sort_key)]
+
+    def chat_completion(self, stage: str, messages: List[Dict[str, str]],
+                        deadline: Optional[float] = None, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """
+        단계 라우팅을 적용한 Chat Completion 호출
+
+        Args:
+            stage: 분석 단계 이름 (MODEL_ROUTING_CONFIG["stages"]의 키)
+            messages: 메시지 목록
+            deadline: 절대 마감 시각 (넘기면 대체 배포를 시도하지 않고 TimeoutError)
+            **kwargs: RateLimitedOpenAIClient.chat_completion 추가 인자
+
+        Returns:
+            (OpenAI 응답 객체, 호출 기록 {"stage", "deployment", "latency", "prompt_tokens", "completion_tokens", "cost_usd", "fallback"})
+        """
+        candidates = self.route(stage)
+        last_error: Optional[Exception] = None
+
+        for attempt, deployment in enumerate(candidates):
+            started = time.monotonic()
+            try:
+                response = self.client.chat_completion(messages, deployment=deployment, deadline=deadline, **kwargs)
+            except (TimeoutError, openai.BadRequestError):
+                # 마감 초과/요청 자체의 문제는 다른 배포로 바꿔도 해결되지 않음
+                self._record_failure(stage, deployment, cooldown=0)
+                raise
+            except openai.NotFoundError as e:
+                print(f"⚠️ 배포를 찾을 수 없음 ({stage}: {deployment}) - 다음 배포로 대체")
+                self._record_failure(stage, deployment, MODEL_ROUTING_CONFIG["missing_cooldown_seconds"])
+                last_error = e
+                continue
+            except Exception as e:
+                print(f"⚠️ 모델 호출 실패 ({stage}: {deployment}) - {type(e).__name__}: {e}")
+                self._record_failure(stage, deployment, MODEL_ROUTING_CONFIG["failure_cooldown_seconds"])
+                last_error = e
+                continue
+
+            record = self._record_success(stage, deployment, time.monotonic() - started,
+                                          getattr(response, "usage", None), fallback=attempt > 0)
+            return response, record
+
+        raise last_error or RuntimeError(f"'{stage}' 단계에 사용할 배포가 없습니다.")
+
+    def record_stream_usage(self, record: Dict[str, Any], usage: Any):
+        """
+        스트리밍 호출의 토큰 사용량 반영 (본문을 끝까지 읽어야 사용량을 알 수 있음)
+
+        Args:
+            record: chat_completion(stream=True)이 반환한 호출 기록 (제자리에서 갱신)
+            usage: 마지막 청크의 usage (없으면 무시)
+        """
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        cost = self._usage_cost(record["deployment"], prompt_tokens, completion_tokens)
+
+        with self._lock:
+            metrics = self._metrics(record["stage"])
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+            metrics.cost_usd += cost
+        record.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """프로세스 전체 단계별 지표 요약"""
+        with self._lock:
+            return {stage: metrics.summary() for stage, metrics in self._stage_metrics.items()}
+
+    def get_deployment_status(self) -> Dict[str, Dict[str, Any]]:
+        """배포별 단계 지연 시간 이동 평균과 남은 쿨다운"""
+        now = time.monotonic()
+        status: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (stage, deployment), latency in self._latency_ewma.items():
+                status.setdefault(deployment, {"latency": {}, "cooldown_seconds": 0.0})["latency"][stage] = latency
+            for deployment, until in self._cooldown_until.items():
+                status.setdefault(deployment, {"latency": {}, "cooldown_seconds": 0.0})["cooldown_seconds"] = max(until - now, 0.0)
+        return status
+
+    def reset_metrics(self):
+        with self._lock:
+            self._stage_metrics.clear()
+
+    @staticmethod
+    def _stage_config(stage: str) -> Dict[str, Any]:
+        stages = MODEL_ROUTING_CONFIG["stages"]
+        return stages.get(stage) or stages[MODEL_ROUTING_CONFIG["default_stage"]]
+
+    @staticmethod
+    def _unit_cost(deployment: str) -> float:
+        costs = MODEL_ROUTING_CONFIG["deployment_costs"].get(deployment)
+        if not costs:
+            return float("inf")
+        return costs.get("input", 0.0) + costs.get("output", 0.0)
+
+    @staticmethod
+    def _usage_cost(deployment: str, prompt_tokens: int, completion_tokens: int) -> float:
+        costs = MODEL_ROUTING_CONFIG["deployment_costs"].get(deployment, {})
+        return (prompt_tokens * costs.get("input", 0.0) + completion_tokens * costs.get("output", 0.0)) / 1000.0
+
+    def _metrics(self, stage: str) -> StageMetrics:
+        if stage not in self._stage_metrics:
+            self._stage_metrics[stage] = StageMetrics(MODEL_ROUTING_CONFIG["metrics_window"])
+        return self._stage_metrics[stage]
+
+    def _record_failure(self, stage: str, deployment: str, cooldown: float):
+        with self._lock:
+            metrics = self._metrics(stage)
+            metrics.failures += 1
+            if cooldown:
+                self._cooldown_until[deployment] = time.monotonic() + cooldown
+
+    def _record_success(self, stage: str, deployment: str, latency: float,
+                        usage: Any, fallback: bool) -> Dict[str, Any]:
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        cost = self._usage_cost(deployment, prompt_tokens, completion_tokens)
+        alpha = MODEL_ROUTING_CONFIG["latency_ewma_alpha"]
+
+        with self._lock:
+            metrics = self._metrics(stage)
+            metrics.calls += 1
+            metrics.fallbacks += 1 if fallback else 0
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+            metrics.cost_usd += cost
+            metrics.latencies.append(latency)
+            metrics.deployments[deployment] = metrics.deployments.get(deployment, 0) + 1
+
+            key = (stage, deployment)
+            previous = self._latency_ewma.get(key)
+            self._latency_ewma[key] = latency if previous is None else alpha * latency + (1 - alpha) * previous
+            self._latency_updated[key] = time.monotonic()
+            self._cooldown_until.pop(deployment, None)
+
+        return {
+            "stage": stage,
+            "deployment": deployment,
+            "latency": latency,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": cost,
+            "fallback": fallback
+        }
+
+def summarize_stage_records(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """한 번의 분석에서 발생한 호출 기록을 단계별로 합산"""
+    summary: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        stage = summary.setdefault(record["stage"], {
+            "calls": 0, "latency": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+            "cost_usd": 0.0, "deployments": []
+        })
+        stage["calls"] += 1
+        stage["latency"] += record["latency"]
+        stage["prompt_tokens"] += record["prompt_tokens"]
+        stage["completion_tokens"] += record["completion_tokens"]
+        stage["cost_usd"] += record["cost_usd"]
+        if record["deployment"] not in stage["deployments"]:
+            stage["deployments"].append(record["deployment"])
+    return summary
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_shared_router: Optional[ModelRouter] = None
+_shared_router_lock = threading.Lock()
+
+def get_model_router() -> ModelRouter:
+    """공유 모델 라우터 반환"""
+    global _shared_router
+    if _shared_router is None:
+        with _shared_router_lock:
+            if _shared_router is None:
+                _shared_router = ModelRouter(get_openai_client())
+    return _shared_router
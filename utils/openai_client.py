@@ -0,0 +1,352 @@
+"""
+Azure OpenAI 공유 클라이언트
+배포별 토큰 버킷(RPM/TPM) 속도 제한, 우선순위 레인, 429 재시도(retry-after 준수), 요청 헤징, 서킷 브레이커 제공
+"""
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+
+from config import AI_CONFIG, OPENAI_RATE_LIMIT_CONFIG
+from utils.context_packer import count_tokens
+from core.utils import TTLCache
+from utils.circuit_breaker import get_circuit_breaker
+
+# 우선순위 레인 (값이 작을수록 우선)
+PRIORITY_INTERACTIVE = 0   # 사용자 대화형 분석
+PRIORITY_BACKGROUND = 1    # 문서 인덱싱 등 백그라운드 작업
+
+# 재시도 대상 오류
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# 재시도 후에도 실패하면 서킷 브레이커에 장애로 기록할 오류 (429/4xx는 서비스가 응답한 것으로 봄)
+BREAKER_FAILURE_ERRORS = (
+    openai.APIConnectionError,   # APITimeoutError 포함
+    openai.InternalServerError,
+)
+
+class TokenBucket:
+    """분당 용량 기반 토큰 버킷"""
+
+    def __init__(self, capacity_per_minute: int):
+        self.capacity = max(int(capacity_per_minute), 1)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """amount 소비가 가능해질 때까지 남은 시간 (초), reserve는 남겨둘 용량"""
+        now = time.monotonic()
+        self._refill(now)
+        needed = min(amount, self.capacity) + reserve
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """실제 사용량 반영 (양수: 추가 차감, 음수: 환급)"""
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+class DeploymentLimiter:
+    """배포별 RPM/TPM 제한기 - 우선순위 대기열 방식"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, background_reserve_ratio: float):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.background_reserve_ratio = background_reserve_ratio
+        self.paused_until = 0.0
+        self._condition = threading.Condition()
+        self._waiters: List[tuple] = []
+        self._sequence = 0
+
+    def acquire(self, estimated_tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> bool:
+        """요청 슬롯 확보 (우선순위가 높은 대기자부터 처리)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self._condition:
+            self._sequence += 1
+            ticket = (priority, self._sequence)
+            self._waiters.append(ticket)
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait_seconds = max(self.paused_until - now, 0.0)
+
+                    if wait_seconds == 0.0 and min(self._waiters) == ticket:
+                        # 백그라운드 레인은 대화형 요청용 예비 용량을 남겨둠
+                        reserve_ratio = self.background_reserve_ratio if priority > PRIORITY_INTERACTIVE else 0.0
+                        wait_seconds = max(
+                            self.request_bucket.wait_time(1, self.request_bucket.capacity * reserve_ratio),
+                            self.token_bucket.wait_time(estimated_tokens, self.token_bucket.capacity * reserve_ratio)
+                        )
+                        if wait_seconds == 0.0:
+                            self.request_bucket.consume(1)
+                            self.token_bucket.consume(estimated_tokens)
+                            return True
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait_seconds = min(wait_seconds or 0.5, remaining)
+
+                    self._condition.wait(min(wait_seconds or 0.5, 0.5))
+            finally:
+                self._waiters.remove(ticket)
+                self._condition.notify_all()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """예상 토큰과 실제 사용 토큰의 차이 반영"""
+        if actual_tokens is None:
+            return
+        with self._condition:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """서버가 429를 반환한 경우 모든 레인을 일시 중지"""
+        with self._condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+class RateLimitedOpenAIClient:
+    """프로세스 전체에서 공유하는 Azure OpenAI 클라이언트"""
+
+    def __init__(self):
+        self.client = None
+        self.breaker = get_circuit_breaker("openai")
+        self._limiters: Dict[str, DeploymentLimiter] = {}
+        self._limiters_lock = threading.Lock()
+        # 같은 쿼리/요청 텍스트의 반복 임베딩 방지 (선행 검색 결과 재사용 포함)
+        self._embedding_cache = TTLCache(
+            ttl_seconds=OPENAI_RATE_LIMIT_CONFIG["embedding_cache_ttl_seconds"],
+            max_size=OPENAI_RATE_LIMIT_CONFIG["embedding_cache_max_entries"]
+        )
+        self._hedge_executor = ThreadPoolExecutor(
+            max_workers=OPENAI_RATE_LIMIT_CONFIG["hedge_max_workers"],
+            thread_name_prefix="openai-hedge"
+        )
+        self._init_client()
+
+    def _init_client(self):
+        """OpenAI 클라이언트 초기화 (재시도는 이 래퍼에서 직접 처리)"""
+        try:
+            if AI_CONFIG.get("openai_api_key") and AI_CONFIG.get("openai_endpoint"):
+                self.client = openai.AzureOpenAI(
+                    api_key=AI_CONFIG["openai_api_key"],
+                    azure_endpoint=AI_CONFIG["openai_endpoint"],
+                    api_version=AI_CONFIG["api_version"],
+                    max_retries=0,
+                    timeout=OPENAI_RATE_LIMIT_CONFIG["request_timeout_seconds"]
+                )
+        except Exception as e:
+            print(f"⚠️ OpenAI 클라이언트 초기화 실패: {e}")
+            self.client = None
+
+    @property
+    def configured(self) -> bool:
+        """클라이언트 생성 여부 (서킷 브레이커 상태와 무관)"""
+        return self.client is not None
+
+    @property
+    def available(self) -> bool:
+        """클라이언트가 있고 서킷 브레이커가 요청을 허용하는 상태"""
+        return self.client is not None and self.breaker.is_available()
+
+    def chat_completion(self, messages: List[Dict[str, str]], deployment: Optional[str] = None,
+                        priority: int = PRIORITY_INTERACTIVE, hedge: Optional[bool] = None,
+                        deadline: Optional[float] = None, **kwargs):
+        """
+        Chat Completion 호출
+
+        Args:
+            messages: 메시지 목록
+            deployment: 배포 이름 (None이면 기본 배포)
+            priority: 우선순위 레인
+            hedge: 요청 헤징 사용 여부 (None이면 설정값과 max_tokens로 결정)
+            deadline: 절대 마감 시각 (time.monotonic 기준, 넘기면 대기/재시도 없이 TimeoutError)
+            **kwargs: chat.completions.create 추가 인자
+
+        Returns:
+            OpenAI 응답 객체
+        """
+        deployment = deployment or AI_CONFIG["deployment_name"]
+        max_tokens = kwargs.get("max_tokens") or AI_CONFIG["max_tokens"]
+        estimated_tokens = sum(count_tokens(m.get("content") or "") + 4 for m in messages) + max_tokens
+
+        hedge_after = OPENAI_RATE_LIMIT_CONFIG["chat_hedge_after_seconds"]
+        if hedge is None:
+            hedge = (priority == PRIORITY_INTERACTIVE and hedge_after > 0
+                     and max_tokens <= OPENAI_RATE_LIMIT_CONFIG["hedge_max_tokens"])
+
+        def request():
+            if deadline is not None:
+                # 요청 자체의 타임아웃도 남은 시간으로 제한
+                kwargs["timeout"] = max(deadline - time.monotonic(), 0.05)
+            return self.client.chat.completions.create(model=deployment, messages=messages, **kwargs)
+
+        return self._call(deployment, estimated_tokens, priority, request, hedge_after if hedge else 0.0, deadline)
+
+    def create_embedding(self, text: str, deployment: Optional[str] = None,
+                         priority: int = PRIORITY_INTERACTIVE, hedge: Optional[bool] = None,
+                         cache: Optional[bool] = None):
+        """임베딩 생성 호출 (cache가 None이면 대화형 레인 호출만 결과 캐시)"""
+        deployment = deployment or AI_CONFIG.get("embedding_deployment_name", "text-embedding-3-large")
+        if cache is None:
+            cache = priority == PRIORITY_INTERACTIVE
+        cache_key = (deployment, hashlib.sha256(text.encode("utf-8")).hexdigest()) if cache else None
+        if cache_key:
+            cached = self._embedding_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        estimated_tokens = count_tokens(text)
+
+        hedge_after = OPENAI_RATE_LIMIT_CONFIG["embedding_hedge_after_seconds"]
+        if hedge is None:
+            hedge = priority == PRIORITY_INTERACTIVE and hedge_after > 0
+
+        response = self._call(
+            deployment, estimated_tokens, priority,
+            lambda: self.client.embeddings.create(model=deployment, input=text),
+            hedge_after if hedge else 0.0
+        )
+        if cache_key:
+            self._embedding_cache.set(cache_key, response)
+        return response
+
+    def _get_limiter(self, deployment: str) -> DeploymentLimiter:
+        """배포별 제한기 반환 (없으면 생성)"""
+        with self._limiters_lock:
+            if deployment not in self._limiters:
+                limits = OPENAI_RATE_LIMIT_CONFIG["deployment_limits"].get(deployment, {})
+                self._limiters[deployment] = DeploymentLimiter(
+                    requests_per_minute=limits.get("rpm", OPENAI_RATE_LIMIT_CONFIG["requests_per_minute"]),
+                    tokens_per_minute=limits.get("tpm", OPENAI_RATE_LIMIT_CONFIG["tokens_per_minute"]),
+                    background_reserve_ratio=OPENAI_RATE_LIMIT_CONFIG["background_reserve_ratio"]
+                )
+            return self._limiters[deployment]
+
+    def _call(self, deployment: str, estimated_tokens: int, priority: int,
+              request: Callable[[], Any], hedge_after: float, deadline: Optional[float] = None):
+        """서킷 브레이커 + 속도 제한 + 재시도 + 헤징을 적용한 요청 실행 (deadline이 있으면 그 안에서만 대기/재시도)"""
+        if not self.client:
+            raise RuntimeError("OpenAI 클라이언트가 초기화되지 않았습니다.")
+
+        self.breaker.before_call()
+        try:
+            response = self._call_with_retries(deployment, estimated_tokens, priority, request, hedge_after, deadline)
+        except BREAKER_FAILURE_ERRORS as e:
+            self.breaker.record_failure(e)
+            raise
+        except openai.APIStatusError:
+            self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def _call_with_retries(self, deployment: str, estimated_tokens: int, priority: int,
+                           request: Callable[[], Any], hedge_after: float, deadline: Optional[float] = None):
+        """속도 제한 + 재시도 + 헤징 (deadline이 있으면 그 안에서만 대기/재시도)"""
+        limiter = self._get_limiter(deployment)
+        max_retries = OPENAI_RATE_LIMIT_CONFIG["max_retries"]
+
+        for attempt in range(max_retries + 1):
+            if deadline is None:
+                limiter.acquire(estimated_tokens, priority)
+            elif not limiter.acquire(estimated_tokens, priority, timeout=max(deadline - time.monotonic(), 0)):
+                raise TimeoutError(f"OpenAI 요청 제한 시간 초과 ({deployment}, 속도 제한 대기)")
+            try:
+                if hedge_after > 0:
+                    response = self._hedged(limiter, estimated_tokens, priority, request, hedge_after)
+                else:
+                    response = request()
+                usage = getattr(response, "usage", None)
+                limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+                return response
+
+            except RETRYABLE_ERRORS as e:
+                if attempt >= max_retries:
+                    raise
+                wait_seconds = self._backoff_seconds(e, attempt)
+                if deadline is not None and time.monotonic() + wait_seconds >= deadline:
+                    raise TimeoutError(f"OpenAI 요청 제한 시간 초과 ({deployment}): {type(e).__name__}") from e
+                if isinstance(e, openai.RateLimitError):
+                    limiter.pause(wait_seconds)
+                print(f"⏳ OpenAI 요청 재시도 ({deployment}, {attempt + 1}/{max_retries}) - {wait_seconds:.1f}초 대기: {type(e).__name__}")
+                time.sleep(wait_seconds)
+
+    def _hedged(self, limiter: DeploymentLimiter, estimated_tokens: int, priority: int,
+                request: Callable[[], Any], hedge_after: float):
+        """첫 요청이 hedge_after초 안에 끝나지 않으면 동일 요청을 한 번 더 보내고 먼저 끝난 결과 사용"""
+        primary = self._hedge_executor.submit(request)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        # 헤지 요청도 속도 제한을 따름 (즉시 슬롯이 없으면 헤징 생략)
+        if not limiter.acquire(estimated_tokens, priority, timeout=0):
+            return primary.result()
+
+        secondary = self._hedge_executor.submit(request)
+        pending = {primary, secondary}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def _backoff_seconds(self, error: Exception, attempt: int) -> float:
+        """지수 백오프(지터 포함), 서버의 retry-after 헤더가 있으면 우선 적용"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000.0
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+
+        base = OPENAI_RATE_LIMIT_CONFIG["backoff_base_seconds"]
+        cap = OPENAI_RATE_LIMIT_CONFIG["backoff_max_seconds"]
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_shared_client: Optional[RateLimitedOpenAIClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_openai_client() -> RateLimitedOpenAIClient:
+    """공유 OpenAI 클라이언트 반환"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = RateLimitedOpenAIClient()
+    return _shared_client
@@ -0,0 +1,488 @@
+"""
+문서 텍스트 추출 및 추출 결과 캐시
+PDF/Word/텍스트 파일에서 본문과 페이지 경계, 추출 메타데이터를 만들고
+내용 해시(SHA-256) 기준으로 캐시하여 재인덱싱/미리보기에서 다시 파싱하지 않도록 함
+
+PDF/Word 파싱은 프로세스 풀에서 실행 (페이지가 많은 PDF는 페이지 범위별 병렬,
+파일당 제한 시간과 워커 메모리 상한을 넘으면 그때까지의 부분 결과 반환)
+
+캐시 계층: 프로세스 메모리 → 로컬 디스크(gzip JSON) → 사이드카 Blob 컨테이너(설정 시)
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import multiprocessing
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import EXTRACTION_CONFIG, EXTRACTION_CACHE_CONFIG
+from core.exceptions import DocumentProcessingException
+from core.utils import TTLCache
+from utils.extraction_workers import init_worker, extract_pdf_pages, extract_pdf_plumber, extract_docx
+from utils.local_store import get_app_data_dir
+
+# 추출 로직을 바꾸면 올려서 기존 캐시를 무효화
+EXTRACTOR_VERSION = 1
+
+TEXT_EXTENSIONS = ('txt', 'md', 'py', 'js', 'html', 'css', 'json', 'csv')
+PARSED_EXTENSIONS = ('pdf', 'docx')
+
+# PyPDF2 결과가 이보다 짧으면 pdfplumber로 다시 추출
+MIN_PDF_TEXT_LENGTH = 100
+
+class ExtractionFailedError(DocumentProcessingException):
+    """워커 비정상 종료/시간 초과로 추출하지 못함 (대체 문구를 인덱싱하지 않고 호출 측이 나중에 다시 시도)"""
+
+    def __init__(self, filename: str, details: str):
+        super().__init__("텍스트 추출", f"{filename} - {details}")
+        self.filename = filename
+
+def extract_document(file_content: bytes, filename: str,
+                     timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    파일에서 텍스트 추출 (캐시를 거치지 않음, PDF/Word는 프로세스 풀에서 제한 시간 내 추출)
+
+    Returns:
+        추출 결과 (text, pages: 페이지별 [시작, 끝) 문자 위치,
+                   metadata: 추출 방식/소요 시간/오류/부분 결과 여부)
+        워커가 비정상 종료되었거나 시간 안에 아무것도 추출하지 못하면 ExtractionFailedError
+    """
+    started = time.perf_counter()
+    file_ext = filename.lower().split('.')[-1]
+    deadline = time.time() + (timeout_seconds or EXTRACTION_CONFIG["timeout_seconds"])
+    outcome = {"page_count": 1, "pages": {}, "errors": {}, "timed_out": False, "error": None, "crashed": False}
+
+    try:
+        if file_ext in TEXT_EXTENSIONS:
+            # 텍스트 파일은 직접 디코딩
+            method = "text"
+            outcome["pages"][1] = file_content.decode('utf-8', errors='ignore')
+
+        elif file_ext == 'docx':
+            method = "docx"
+            outcome = get_extraction_pool().run_all([(extract_docx, (file_content, deadline))], deadline)[0]
+
+        elif file_ext == 'pdf':
+            method, outcome = _extract_pdf(file_content, deadline)
+
+        else:
+            # 기타 파일은 바이너리로 처리
+            method = "binary"
+            outcome["pages"][1] = f"바이너리 파일: {filename} (크기: {len(file_content)} bytes)"
+
+    except ImportError as e:
+        # 파서 패키지가 없는 환경 - 패키지 설치 후 다시 추출하도록 캐시하지 않음
+        method = "error"
+        outcome["error"] = f"{file_ext.upper()} 처리 패키지가 없습니다: {e}"
+
+    except Exception as e:
+        method = "error"
+        outcome["error"] = str(e)
+
+    page_texts = [outcome["pages"].get(page, "") for page in range(1, outcome["page_count"] + 1)]
+    text, pages = _join_pages(page_texts)
+    # 일시적인 실패는 대체 문구로 인덱싱하면 내용 해시가 같아 재인덱싱에서도 고쳐지지 않으므로 호출 측에 알림
+    if outcome.get("crashed"):
+        raise ExtractionFailedError(filename, outcome["error"] or "추출 워커 프로세스가 비정상 종료되었습니다")
+    if outcome["timed_out"] and not text.strip():
+        raise ExtractionFailedError(filename, "제한 시간 안에 텍스트를 추출하지 못했습니다")
+    errors = [f"page {page}: {error}" for page, error in sorted(outcome["errors"].items())]
+    if outcome["error"]:
+        errors.append(outcome["error"])
+    if outcome["timed_out"]:
+        errors.append(f"제한 시간 초과 ({len(pages)}/{outcome['page_count']} 페이지 추출)")
+
+    # 부분 결과: 시간 초과/워커 오류로 일부 페이지만 추출됨
+    partial = outcome["timed_out"] or bool(outcome["error"] and text)
+    if not text.strip():
+        if outcome["timed_out"]:
+            text = f"텍스트 추출 시간 초과: {filename}"
+        elif outcome["error"]:
+            method, text = "error", f"텍스트 추출 오류 ({filename}): {outcome['error']}"
+        elif file_ext == 'pdf':
+            text = f"PDF 파일에서 텍스트를 추출할 수 없습니다: {filename}"
+
+    return {
+        "text": text,
+        "pages": pages,
+        "metadata": {
+            "method": method,
+            "filename": filename,
+            "file_size": len(file_content),
+            "page_count": outcome["page_count"],
+            "extracted_pages": len(pages),
+            "char_count": len(text),
+            "elapsed_ms": int((time.perf_counter() - started) * 1000),
+            "extracted_at": datetime.now().isoformat(),
+            "extractor_version": EXTRACTOR_VERSION,
+            "errors": errors,
+            "timed_out": outcome["timed_out"],
+            "partial": partial,
+            # 오류/부분 결과는 다음에 다시 추출하도록 캐시하지 않음
+            "cacheable": method != "error" and not partial
+        }
+    }
+
+def _extract_pdf(file_content: bytes, deadline: float) -> Tuple[str, Dict[str, Any]]:
+    """PDF 추출 (페이지가 많으면 페이지 범위별 병렬, PyPDF2 결과가 거의 없으면 pdfplumber)"""
+    pool = get_extraction_pool()
+    outcome = pool.run_all([(extract_pdf_pages, (file_content, 0, None, deadline,
+                                                 EXTRACTION_CONFIG["page_fanout_threshold"]))], deadline)[0]
+    source_path = None
+    try:
+        if outcome.get("fanout"):
+            # 작업마다 파일 내용을 복사해 보내지 않도록 임시 파일 경로를 전달
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False,
+                                             dir=get_app_data_dir("extraction_tmp")) as f:
+                f.write(file_content)
+                source_path = f.name
+            page_count = outcome["page_count"]
+            step = EXTRACTION_CONFIG["pages_per_task"]
+            tasks = [
+                (extract_pdf_pages, (source_path, start, min(start + step, page_count), deadline))
+                for start in range(0, page_count, step)
+            ]
+            outcome = _merge_outcomes(pool.run_all(tasks, deadline), page_count)
+
+        method = "pypdf2"
+        text_length = sum(len(text.strip()) for text in outcome["pages"].values())
+        if text_length < MIN_PDF_TEXT_LENGTH and not outcome["timed_out"] and time.time() < deadline:
+            try:
+                plumber = pool.run_all([(extract_pdf_plumber, (source_path or file_content, deadline))], deadline)[0]
+                if any(text.strip() for text in plumber["pages"].values()):
+                    method, outcome = "pdfplumber", plumber
+            except ImportError:
+                pass  # pdfplumber가 없으면 PyPDF2 결과 사용
+        return method, outcome
+    finally:
+        if source_path:
+            try:
+                os.remove(source_path)
+            except OSError:
+                pass
+
+def _merge_outcomes(outcomes: List[Dict[str, Any]], page_count: int) -> Dict[str, Any]:
+    """페이지 범위별 작업 결과 합치기"""
+    merged = {"page_count": page_count, "pages": {}, "errors": {}, "timed_out": False, "error": None, "crashed": False}
+    for outcome in outcomes:
+        merged["pages"].update(outcome["pages"])
+        merged["errors"].update(outcome["errors"])
+        merged["timed_out"] = merged["timed_out"] or outcome["timed_out"]
+        merged["error"] = merged["error"] or outcome["error"]
+        merged["crashed"] = merged["crashed"] or outcome.get("crashed", False)
+    return merged
+
+class ExtractionPool:
+    """PDF/Word 추출 프로세스 풀 - 파일당 제한 시간을 넘겨 멈춘 워커는 풀을 재시작하여 정리"""
+
+    # 워커가 deadline에 부분 결과를 돌려줄 때까지 기다리는 여유 시간
+    GRACE_SECONDS = 5
+
+    def __init__(self, workers: int, memory_limit_mb: int):
+        self.workers = workers
+        self.memory_limit_mb = memory_limit_mb
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def run_all(self, tasks: List[Tuple[Callable, tuple]], deadline: float) -> List[Dict[str, Any]]:
+        """
+        작업들을 병렬 실행하고 입력 순서대로 결과 반환
+
+        제한 시간 안에 끝나지 않은 작업은 timed_out 결과로 대체한다.
+        다른 파일 때문에 풀이 재시작되며 함께 종료/취소된 작업은 새 풀에서 한 번 더 실행하고,
+        그래도 워커가 비정상 종료되면 crashed 결과로 대체한다.
+        파서 패키지가 없으면 ImportError를 그대로 전달한다.
+        """
+        if self.workers <= 0:
+            return [func(*args) for func, args in tasks]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        pending = list(range(len(tasks)))
+        for attempt in range(2):
+            pending = self._run_indexes(tasks, pending, deadline, results, last_attempt=attempt == 1)
+            if not pending:
+                break
+            print(f"⚠️ 추출 풀 재시작으로 중단된 작업 {len(pending)}개를 다시 실행합니다.")
+        return results
+
+    def _run_indexes(self, tasks: List[Tuple[Callable, tuple]], indexes: List[int], deadline: float,
+                     results: List[Optional[Dict[str, Any]]], last_attempt: bool) -> List[int]:
+        """지정한 작업을 실행해 results에 채우고, 풀 재시작으로 중단되어 다시 실행할 작업 번호 반환"""
+        executor = self._get_executor()
+        futures = {}
+        for index in indexes:
+            func, args = tasks[index]
+            try:
+                futures[index] = executor.submit(func, *args)
+            except (BrokenProcessPool, RuntimeError):
+                # 다른 스레드가 방금 종료한 풀 - 새 풀을 받아 다시 제출
+                self._restart(executor)
+                executor = self._get_executor()
+                futures[index] = executor.submit(func, *args)
+        done, not_done = wait(futures.values(), timeout=max(deadline - time.time(), 0) + self.GRACE_SECONDS)
+
+        interrupted = []
+        for index, future in futures.items():
+            if future in done:
+                try:
+                    results[index] = future.result()
+                except ImportError:
+                    raise
+                except (BrokenProcessPool, CancelledError):
+                    # 메모리 상한 초과 또는 다른 파일의 시간 초과로 풀이 재시작되며 함께 종료됨
+                    self._restart(executor)
+                    if last_attempt:
+                        results[index] = dict(self._failed("추출 워커 프로세스가 비정상 종료되었습니다"), crashed=True)
+                    else:
+                        interrupted.append(index)
+                except Exception as e:
+                    results[index] = self._failed(str(e))
+            else:
+                future.cancel()
+                results[index] = dict(self._failed(None), timed_out=True)
+
+        # 시작된 작업이 시간 안에 돌아오지 않으면 워커가 멈춘 것 - 프로세스를 종료하고 풀 재생성
+        if any(future.running() for future in not_done):
+            print("⚠️ 텍스트 추출이 제한 시간을 넘겨 멈췄습니다. 추출 프로세스를 재시작합니다.")
+            self._restart(executor)
+        return interrupted
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 앱 프로세스(스레드 다수)를 fork하지 않도록 forkserver/spawn 사용
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=init_worker,
+                    initargs=(self.memory_limit_mb,)
+                )
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is not executor:
+                return  # 다른 스레드가 이미 재시작함
+            self._executor = None
+            self.restarts += 1
+        # ProcessPoolExecutor는 실행 중인 작업을 취소할 수 없으므로 워커 프로세스를 직접 종료
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _failed(error: Optional[str]) -> Dict[str, Any]:
+        return {"page_count": 0, "pages": {}, "errors": {}, "timed_out": False, "error": error, "crashed": False}
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def _join_pages(page_texts: List[str]) -> tuple:
+    """빈 페이지를 제외하고 줄바꿈으로 이어 붙이며 페이지별 문자 위치 기록"""
+    parts, pages, position = [], [], 0
+    for page_number, page_text in enumerate(page_texts, start=1):
+        if not page_text.strip():
+            continue
+        if parts:
+            position += 1  # 페이지 사이 줄바꿈
+        parts.append(page_text)
+        pages.append({"page": page_number, "start": position, "end": position + len(page_text)})
+        position += len(page_text)
+    return '\n'.join(parts), pages
+
+def page_text(extraction: Dict[str, Any], page_number: int) -> str:
+    """추출 결과에서 특정 페이지의 텍스트"""
+    for page in extraction.get("pages", []):
+        if page["page"] == page_number:
+            return extraction["text"][page["start"]:page["end"]]
+    return ""
+
+class ExtractionCache:
+    """내용 해시 기준 추출 결과 캐시 (메모리 → 로컬 디스크 → 사이드카 Blob)"""
+
+    def __init__(self, sidecar_storage=None):
+        self.enabled = EXTRACTION_CACHE_CONFIG["enabled"]
+        self.cache_dir = get_app_data_dir("extraction_cache")
+        self.max_local_bytes = EXTRACTION_CACHE_CONFIG["max_local_cache_mb"] * 1024 * 1024
+        self.memory = TTLCache(ttl_seconds=3600, max_size=EXTRACTION_CACHE_CONFIG["memory_items"])
+        self.sidecar_storage = sidecar_storage
+        self._prune_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "local_hits": 0, "sidecar_hits": 0, "extractions": 0}
+
+    def get_or_extract(self, file_content: bytes, filename: str,
+                       content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        캐시된 추출 결과를 반환하고, 없으면 추출 후 저장
+
+        Args:
+            file_content: 파일 내용
+            filename: 파일명 (확장자로 추출 방식 결정)
+            content_hash: 파일 내용 SHA-256 (이미 계산한 경우)
+
+        Returns:
+            추출 결과 (extract_document와 같은 형식, content_hash 포함)
+        """
+        content_hash = content_hash or hashlib.sha256(file_content).hexdigest()
+        key = self._key(content_hash, filename)
+        if self.enabled:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        extraction = extract_document(file_content, filename)
+        extraction["content_hash"] = content_hash
+        self.stats["extractions"] += 1
+        if self.enabled and extraction["metadata"]["cacheable"]:
+            self.put(key, extraction)
+        return extraction
+
+    def lookup(self, content_hash: str, filename: str) -> Optional[Dict[str, Any]]:
+        """파일을 내려받지 않고 캐시만 조회 (미리보기용)"""
+        if not self.enabled or not content_hash:
+            return None
+        return self.get(self._key(content_hash, filename))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        extraction = self.memory.get(key)
+        if extraction is not None:
+            self.stats["memory_hits"] += 1
+            return extraction
+
+        path = self._local_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                extraction = json.load(f)
+            os.utime(path)  # 최근 사용 시각 갱신 (정리 순서 기준)
+            self.stats["local_hits"] += 1
+            self.memory.set(key, extraction)
+            return extraction
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 추출 캐시 파일 손상, 삭제: {e}")
+            self._remove(path)
+
+        if self.sidecar_storage is not None:
+            data = self.sidecar_storage.download_document(self._sidecar_name(key))
+            if data:
+                try:
+                    extraction = json.loads(gzip.decompress(data).decode("utf-8"))
+                    self.stats["sidecar_hits"] += 1
+                    self.memory.set(key, extraction)
+                    self._write_local(key, data)
+                    return extraction
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ 추출 사이드카 손상: {e}")
+        return None
+
+    def put(self, key: str, extraction: Dict[str, Any]):
+        self.memory.set(key, extraction)
+        data = gzip.compress(json.dumps(extraction, ensure_ascii=False).encode("utf-8"))
+        self._write_local(key, data)
+        if self.sidecar_storage is not None:
+            self.sidecar_storage.upload_blob_stream(
+                self._sidecar_name(key), io.BytesIO(data),
+                metadata={"content_sha256": extraction["content_hash"],
+                          "extractor_version": str(EXTRACTOR_VERSION)}
+            )
+
+    def _write_local(self, key: str, data: bytes):
+        path = self._local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.part"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ 추출 캐시 저장 실패: {e}")
+            self._remove(temp_path)
+            return
+        self._prune()
+
+    def _prune(self):
+        """로컬 캐시가 최대 크기를 넘으면 오래 사용하지 않은 항목부터 삭제"""
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                    except OSError:
+                        continue
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_local_bytes:
+                    break
+                self._remove(path)
+                total -= size
+        finally:
+            self._prune_lock.release()
+
+    def _local_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    @staticmethod
+    def _key(content_hash: str, filename: str) -> str:
+        # 같은 내용이라도 확장자에 따라 추출 방식이 달라지므로 키에 포함
+        file_ext = filename.lower().split('.')[-1] if '.' in filename else "bin"
+        return f"{content_hash}-{file_ext}-v{EXTRACTOR_VERSION}"
+
+    @staticmethod
+    def _sidecar_name(key: str) -> str:
+        return f"extractions/{key[:2]}/{key}.json.gz"
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# 전역 인스턴스 (프로세스 내 모든 세션이 공유)
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+def get_extraction_pool() -> ExtractionPool:
+    """공유 추출 프로세스 풀 반환 (워커 프로세스는 첫 작업 때 시작)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExtractionPool(EXTRACTION_CONFIG["process_workers"], EXTRACTION_CONFIG["memory_limit_mb"])
+    return _pool
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+def get_extraction_cache() -> ExtractionCache:
+    """공유 추출 결과 캐시 반환"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                sidecar_storage = None
+                if EXTRACTION_CACHE_CONFIG["sidecar_container"]:
+                    from utils.azure_storage_service import AzureStorageService
+                    sidecar_storage = AzureStorageService(container_name=EXTRACTION_CACHE_CONFIG["sidecar_container"])
+                    if not sidecar_storage.available:
+                        sidecar_storage = None
+                _cache = ExtractionCache(sidecar_storage)
+    return _cache